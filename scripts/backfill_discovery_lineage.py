@@ -125,8 +125,6 @@ def _child_gids_in_graph(cfg: eus.ServerConfig) -> Set[str]:
     """group_ids that already appear as children in the persisted graph (parent-infer done at least once)."""
     path = eus._discovery_lineage_edges_path(cfg)
     out: Set[str] = set()
-    if not path.is_file():
-        return out
     try:
         doc = eus._discovery_load_lineage_graph(path)
     except Exception:
@@ -147,6 +145,20 @@ def _child_gids_in_graph(cfg: eus.ServerConfig) -> Set[str]:
     return out
 
 
+def _export_lineage_json(cfg: eus.ServerConfig) -> None:
+    path = eus._discovery_lineage_edges_path(cfg)
+    con = eus._discovery_lineage_store_open(path)
+    if con is None:
+        print(f"[backfill] lineage store unavailable beside {path}", file=sys.stderr)
+        return
+    try:
+        from discovery_lineage_store import export_json  # type: ignore
+
+        print(f"[backfill] exported edges={export_json(con, path)} -> {path}")
+    finally:
+        con.close()
+
+
 def _item_mtime(it: Dict[str, Any]) -> float:
     try:
         return float(it.get("mtime") or 0)
@@ -315,7 +327,7 @@ def main() -> int:
     ap.add_argument(
         "--prefer-missing",
         action="store_true",
-        help="Prioritize rows that are not yet a child in discovery_lineage_edges.json.",
+        help="Prioritize rows that are not yet a child in the lineage edge store.",
     )
     ap.add_argument(
         "--newest-first",
@@ -327,6 +339,11 @@ def main() -> int:
         action="store_true",
         help="Also forward-fill via citation index (warm stem candidates on cold miss) and persist child edges.",
     )
+    ap.add_argument(
+        "--export-json",
+        action="store_true",
+        help="Rewrite discovery_lineage_edges.json from the edge store after each pass (off: store only).",
+    )
     ap.add_argument(
         "--reset-state",
         action="store_true",
@@ -379,7 +396,7 @@ def main() -> int:
 
     print(f"[backfill] workspace={cfg.workspace_root}")
     print(f"[backfill] discovery_index={idx_path}")
-    print(f"[backfill] graph_out={eus._discovery_lineage_edges_path(cfg)}")
+    print(f"[backfill] graph_out={eus._discovery_lineage_edges_path(cfg).with_name('discovery_lineage_edges.sqlite')}")
     print(
         f"[backfill] gentle={gentle} persist={persist} max_depth={max_depth} "
         f"sleep={sleep_s}s resume={bool(args.resume)} loop={bool(args.loop)} "
@@ -473,6 +490,8 @@ def main() -> int:
                 if sleep_s > 0 and i + 1 < len(rows):
                     time.sleep(sleep_s)
 
+            if args.export_json and persist:
+                _export_lineage_json(cfg)
             if not args.loop:
                 break
             print(f"[backfill] batch done — sleeping {args.loop_sleep}s before next pass")
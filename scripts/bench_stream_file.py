@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Load test: Experiments UI file serving (``_stream_file``) — copy loop vs sendfile vs revalidation.
+
+Writes a synthetic ``--size-mb`` MP4 plus ``--thumbs`` small JPEGs, serves them from a child
+process through ``experiments_ui_server._stream_file`` and drives ``--clients`` concurrent
+HTTP clients, each doing ``--rounds`` of: full video GET, one 2 MiB range GET, every thumb.
+
+- ``copy``       — ``EXPERIMENTS_UI_SENDFILE=0``: 1 MiB ``read`` / ``wfile.write`` (previous path)
+- ``sendfile``   — zero-copy ``socket.sendfile`` for full and ranged bodies
+- ``revalidate`` — sendfile, clients replay ETags via ``If-None-Match`` like a browser cache (304s)
+
+Reports MiB/s, requests/s and server CPU seconds (user + sys of the serving process).
+
+Usage:
+  python3 scripts/bench_stream_file.py                        # 64 MiB video, 4 clients, 3 rounds
+  python3 scripts/bench_stream_file.py --size-mb 512 --clients 8
+
+Every first full body is hashed against the file and every length is checked; the run
+aborts on a mismatch.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(_SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPTS_DIR))
+
+MODES = ("copy", "sendfile", "revalidate")
+_RANGE_BYTES = 2 * 1024 * 1024
+
+
+def write_fixtures(root: Path, *, size_mb: int, thumbs: int, seed: int = 0) -> Dict[str, bytes]:
+    """clip.mp4 + thumb_<i>.jpg filled with pseudo-random bytes; returns name → sha256 digest."""
+    rng = random.Random(seed)
+    block = rng.randbytes(1024 * 1024)
+    digests: Dict[str, bytes] = {}
+    h = hashlib.sha256()
+    with (root / "clip.mp4").open("wb") as fh:
+        for i in range(size_mb):
+            chunk = block[i % 251 :] + block[: i % 251]
+            fh.write(chunk)
+            h.update(chunk)
+    digests["clip.mp4"] = h.digest()
+    for i in range(thumbs):
+        data = rng.randbytes(48 * 1024 + i)
+        (root / f"thumb_{i}.jpg").write_bytes(data)
+        digests[f"thumb_{i}.jpg"] = hashlib.sha256(data).digest()
+    return digests
+
+
+def _serve(root: str, sendfile: bool, port_q: Any) -> None:
+    os.environ["EXPERIMENTS_UI_SENDFILE"] = "1" if sendfile else "0"
+    import experiments_ui_server as eus
+
+    base = Path(root)
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *_args: Any) -> None:
+            return None
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path == "/__cpu":
+                t = os.times()
+                body = json.dumps({"cpu_s": t.user + t.system}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            full = base / self.path.lstrip("/")
+            ctype = "video/mp4" if full.suffix == ".mp4" else "image/jpeg"
+            eus._stream_file(self, full, content_type=ctype, cache_control="public, max-age=60")
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    port_q.put(httpd.server_address[1])
+    httpd.serve_forever()
+
+
+def _fetch(
+    port: int,
+    name: str,
+    headers: Dict[str, str],
+    *,
+    digest: bool,
+) -> Tuple[int, int, Optional[str], Optional[bytes]]:
+    """(status, body bytes, etag, sha256 when ``digest``) — bodies are drained, not kept."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        conn.request("GET", "/" + name, headers=headers)
+        resp = conn.getresponse()
+        h = hashlib.sha256() if digest else None
+        buf = bytearray(1024 * 1024)
+        view = memoryview(buf)
+        n = 0
+        while True:
+            got = resp.readinto(buf)
+            if not got:
+                break
+            if h is not None:
+                h.update(view[:got])
+            n += got
+        return resp.status, n, resp.getheader("ETag"), h.digest() if h is not None else None
+    finally:
+        conn.close()
+
+
+def _client(
+    port: int,
+    names: List[str],
+    sizes: Dict[str, int],
+    digests: Dict[str, bytes],
+    *,
+    rounds: int,
+    revalidate: bool,
+    seed: int,
+    out: Dict[str, int],
+    lock: threading.Lock,
+) -> None:
+    rng = random.Random(seed)
+    etags: Dict[str, str] = {}
+    verified = set()
+    stats = {"requests": 0, "bytes": 0, "not_modified": 0}
+    video = sizes["clip.mp4"]
+    for _ in range(rounds):
+        for name in names:
+            headers = {"If-None-Match": etags[name]} if revalidate and name in etags else {}
+            status, n, etag, dig = _fetch(port, name, headers, digest=name not in verified)
+            stats["requests"] += 1
+            stats["bytes"] += n
+            if status == 304:
+                stats["not_modified"] += 1
+                continue
+            if status != 200 or n != sizes[name] or (dig is not None and dig != digests[name]):
+                raise SystemExit(f"bad body for {name}: status={status} bytes={n}")
+            verified.add(name)
+            if etag:
+                etags[name] = etag
+        start = rng.randrange(0, max(1, video - _RANGE_BYTES))
+        status, n, _etag, _dig = _fetch(port, "clip.mp4", {"Range": f"bytes={start}-{start + _RANGE_BYTES - 1}"}, digest=False)
+        if status != 206 or n != min(_RANGE_BYTES, video - start):
+            raise SystemExit(f"bad range response: status={status} bytes={n}")
+        stats["requests"] += 1
+        stats["bytes"] += n
+    with lock:
+        for k, v in stats.items():
+            out[k] = out.get(k, 0) + v
+
+
+def run_mode(mode: str, root: Path, digests: Dict[str, bytes], *, clients: int, rounds: int) -> Dict[str, Any]:
+    ctx = multiprocessing.get_context("spawn")
+    port_q = ctx.Queue()
+    proc = ctx.Process(target=_serve, args=(str(root), mode != "copy", port_q), daemon=True)
+    proc.start()
+    try:
+        port = int(port_q.get(timeout=30))
+        names = sorted(digests)
+        sizes = {n: (root / n).stat().st_size for n in names}
+        cpu0 = json.loads(_fetch_json(port))["cpu_s"]
+        totals: Dict[str, int] = {}
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(
+                target=_client,
+                args=(port, names, sizes, digests),
+                kwargs={"rounds": rounds, "revalidate": mode == "revalidate", "seed": i, "out": totals, "lock": lock},
+            )
+            for i in range(clients)
+        ]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - t0
+        cpu = json.loads(_fetch_json(port))["cpu_s"] - cpu0
+    finally:
+        proc.terminate()
+        proc.join(timeout=10)
+    mib = totals.get("bytes", 0) / (1024 * 1024)
+    return {
+        "wall_s": round(wall, 3),
+        "requests": totals.get("requests", 0),
+        "not_modified": totals.get("not_modified", 0),
+        "mib_sent": round(mib, 1),
+        "mib_per_s": round(mib / max(1e-9, wall), 1),
+        "requests_per_s": round(totals.get("requests", 0) / max(1e-9, wall), 1),
+        "server_cpu_s": round(cpu, 3),
+        "server_cpu_ms_per_mib": round(cpu * 1000 / max(1e-9, mib), 3),
+    }
+
+
+def _fetch_json(port: int) -> str:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        conn.request("GET", "/__cpu")
+        return conn.getresponse().read().decode("utf-8")
+    finally:
+        conn.close()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Load test Experiments UI file serving: copy vs sendfile vs 304s")
+    ap.add_argument("--size-mb", type=int, default=64)
+    ap.add_argument("--thumbs", type=int, default=24)
+    ap.add_argument("--clients", type=int, default=4)
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--modes", default=",".join(MODES), help=f"comma list of {', '.join(MODES)}")
+    args = ap.parse_args()
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    bad = [m for m in modes if m not in MODES]
+    if bad:
+        raise SystemExit(f"unknown modes: {bad}")
+
+    with tempfile.TemporaryDirectory(prefix="bench_stream_file_") as td:
+        root = Path(td)
+        digests = write_fixtures(root, size_mb=args.size_mb, thumbs=args.thumbs)
+        result: Dict[str, Any] = {
+            "size_mb": args.size_mb,
+            "thumbs": args.thumbs,
+            "clients": args.clients,
+            "rounds": args.rounds,
+            "modes": {m: run_mode(m, root, digests, clients=args.clients, rounds=args.rounds) for m in modes},
+        }
+    base = result["modes"].get("copy")
+    if base:
+        for m, r in result["modes"].items():
+            r["cpu_vs_copy"] = round(r["server_cpu_s"] / max(1e-9, base["server_cpu_s"]), 3)
+            r["wall_vs_copy"] = round(r["wall_s"] / max(1e-9, base["wall_s"]), 3)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
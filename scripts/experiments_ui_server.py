@@ -22,6 +22,7 @@ from __future__ import annotations
 import argparse
 import collections
 import datetime as _dt
+import email.utils
 import hashlib
 import heapq
 import json
@@ -29,6 +30,7 @@ import math
 import mimetypes
 import os
 import posixpath
+import queue
 import re
 import shutil
 import sqlite3
@@ -42,6 +44,7 @@ import zlib
 import urllib.parse
 import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
@@ -168,51 +171,70 @@ _DISCOVERY_SIDECAR_EXTS = {".xmp", ".json"}
 _DISCOVERY_HEALTH_SAMPLE_LIMIT = 25
 
 
-def _read_png_text_chunks(png_path: Path) -> Dict[str, str]:
-    """PNG tEXt / zTXt / iTXt reader (stdlib only). Raises if not a PNG."""
-    data = png_path.read_bytes()
-    if data[:8] != _PNG_MAGIC:
-        raise ValueError("not_png")
-    off = 8
-    out: Dict[str, str] = {}
-    while off + 8 <= len(data):
-        length = struct.unpack(">I", data[off : off + 4])[0]
-        ctype = data[off + 4 : off + 8]
-        cdata = data[off + 8 : off + 8 + length]
-        off = off + 12 + length
-
-        if ctype == b"tEXt":
-            k, v = cdata.split(b"\x00", 1)
-            out[k.decode("latin1", "replace")] = v.decode("utf-8", "replace")
-        elif ctype == b"zTXt":
-            k, rest = cdata.split(b"\x00", 1)
-            compressed = rest[1:]
+def _decode_png_text_chunk(ctype: bytes, cdata: bytes) -> Optional[Tuple[str, str]]:
+    """(keyword, text) for one tEXt / zTXt / iTXt chunk body; None for other or malformed chunks."""
+    if ctype == b"tEXt":
+        k, v = cdata.split(b"\x00", 1)
+        return k.decode("latin1", "replace"), v.decode("utf-8", "replace")
+    if ctype == b"zTXt":
+        k, rest = cdata.split(b"\x00", 1)
+        compressed = rest[1:]
+        try:
+            v = zlib.decompress(compressed).decode("utf-8", "replace")
+        except Exception:
+            v = ""
+        return k.decode("latin1", "replace"), v
+    if ctype == b"iTXt":
+        i = cdata.find(b"\x00")
+        if i == -1:
+            return None
+        keyword = cdata[:i].decode("latin1", "replace")
+        comp_flag = cdata[i + 1]
+        j = i + 3
+        k0 = cdata.find(b"\x00", j)
+        if k0 == -1:
+            return None
+        j = k0 + 1
+        k1 = cdata.find(b"\x00", j)
+        if k1 == -1:
+            return None
+        text_bytes = cdata[k1 + 1 :]
+        if comp_flag == 1:
             try:
-                v = zlib.decompress(compressed).decode("utf-8", "replace")
+                text_bytes = zlib.decompress(text_bytes)
             except Exception:
-                v = ""
-            out[k.decode("latin1", "replace")] = v
-        elif ctype == b"iTXt":
-            i = cdata.find(b"\x00")
-            if i == -1:
-                continue
-            keyword = cdata[:i].decode("latin1", "replace")
-            comp_flag = cdata[i + 1]
-            j = i + 3
-            k0 = cdata.find(b"\x00", j)
-            if k0 == -1:
-                continue
-            j = k0 + 1
-            k1 = cdata.find(b"\x00", j)
-            if k1 == -1:
-                continue
-            text_bytes = cdata[k1 + 1 :]
-            if comp_flag == 1:
-                try:
-                    text_bytes = zlib.decompress(text_bytes)
-                except Exception:
-                    text_bytes = b""
-            out[keyword] = text_bytes.decode("utf-8", "replace")
+                text_bytes = b""
+        return keyword, text_bytes.decode("utf-8", "replace")
+    return None
+
+
+def _read_png_text_chunks(png_path: Path, *, include_trailing: bool = True) -> Dict[str, str]:
+    """
+    PNG tEXt / zTXt / iTXt reader (stdlib only). Raises if not a PNG.
+
+    Streams chunk headers and seeks over image data; ``include_trailing=False`` stops at the
+    first IDAT (Comfy writes prompt/workflow ahead of it). Mirrors comfy_meta_lib.
+    """
+    out: Dict[str, str] = {}
+    with png_path.open("rb") as fh:
+        if fh.read(8) != _PNG_MAGIC:
+            raise ValueError("not_png")
+        while True:
+            head = fh.read(8)
+            if len(head) < 8:
+                break
+            length = struct.unpack(">I", head[:4])[0]
+            ctype = head[4:8]
+            if ctype == b"IEND" or (ctype == b"IDAT" and not include_trailing):
+                break
+            if ctype in (b"tEXt", b"zTXt", b"iTXt"):
+                cdata = fh.read(length)
+                fh.seek(4, 1)
+                decoded = _decode_png_text_chunk(ctype, cdata)
+                if decoded is not None:
+                    out[decoded[0]] = decoded[1]
+            else:
+                fh.seek(length + 4, 1)
     return out
 
 
@@ -265,7 +287,7 @@ def _png_metadata_fields(path: Path) -> Tuple[Optional[str], List[str], bool]:
     fingerprint is SHA256 prefix of raw Comfy 'prompt' chunk text when present.
     """
     try:
-        chunks = _read_png_text_chunks(path)
+        chunks = _read_png_text_chunks(path, include_trailing=False)
     except Exception:
         return (None, [], False)
     pr = chunks.get("prompt")
@@ -569,72 +591,228 @@ def _discovery_is_ephemeral_work_artifact(name: str) -> bool:
     return any(tok in n for tok in ("_RAW_", "_PREVIEW_", "_DEBUG_"))
 
 
-def _build_discovery_og_wip_index(cfg: "ServerConfig") -> Dict[str, Any]:
+_DISCOVERY_SCAN_MANIFEST_VERSION = 1
+
+
+def _discovery_scan_manifest_path(index_path: Path) -> Path:
+    """Per-file (mtime, size) → sha256 / PNG probe cache beside the discovery index."""
+    return index_path.with_name("discovery_scan_manifest.json")
+
+
+def _load_discovery_scan_manifest(path: Path) -> Dict[str, Dict[str, Any]]:
+    if not path.exists():
+        return {}
+    try:
+        obj = _read_json(path)
+    except Exception:
+        return {}
+    if not isinstance(obj, dict) or int(obj.get("version") or 0) != _DISCOVERY_SCAN_MANIFEST_VERSION:
+        return {}
+    files = obj.get("files")
+    if not isinstance(files, dict):
+        return {}
+    return {str(k): v for k, v in files.items() if isinstance(v, dict)}
+
+
+def _discovery_scan_reusable(prior: Optional[Dict[str, Any]], *, mtime: float, size: int) -> bool:
+    if not prior or not prior.get("sha256"):
+        return False
+    try:
+        return float(prior.get("mtime")) == mtime and int(prior.get("size")) == size
+    except (TypeError, ValueError):
+        return False
+
+
+class _DiscoveryScanThrottle:
+    """Shared byte-rate limiter for scan workers (0 = unthrottled)."""
+
+    def __init__(self, mb_per_s: float) -> None:
+        self.bytes_per_s = max(0.0, float(mb_per_s or 0.0)) * 1024 * 1024
+        self._lock = threading.Lock()
+        self._next_at = time.monotonic()
+
+    def consume(self, nbytes: int) -> None:
+        if self.bytes_per_s <= 0 or nbytes <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at)
+            self._next_at = start + float(nbytes) / self.bytes_per_s
+            wait = start - now
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _discovery_scan_walk(root: Path) -> List[Tuple[str, str]]:
+    """(abs path, name) for every file under root via os.scandir; symlinked dirs are not followed."""
+    out: List[Tuple[str, str]] = []
+    stack = [str(root)]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            out.append((entry.path, entry.name))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return out
+
+
+def _discovery_scan_probe(
+    path: Path,
+    ext_lc: str,
+    size: int,
+    throttle: Optional[_DiscoveryScanThrottle],
+) -> Optional[Tuple[str, Optional[str], List[str], bool]]:
+    """Hash + PNG embed probe for one file: (sha256, workflow_fingerprint, class_types_preview, has_prompt)."""
+    if throttle is not None:
+        throttle.consume(size if size <= 25_000_000 else 2_000_000)
+    wf_fp: Optional[str] = None
+    cls_prev: List[str] = []
+    has_prompt = False
+    if ext_lc == ".png":
+        wf_fp, cls_prev, has_prompt = _png_metadata_fields(path)
+    try:
+        content_hash = _file_content_hash(path)
+    except OSError:
+        # Vanished / unreadable mid-scan: leave it out of this index generation.
+        return None
+    return content_hash, wf_fp, cls_prev, has_prompt
+
+
+def _build_discovery_og_wip_index(
+    cfg: "ServerConfig",
+    *,
+    incremental: bool = True,
+    workers: Optional[int] = None,
+    io_mb_per_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Walk og/ + wip/ and group media by (library, exact stem).
+
+    With ``incremental`` the sidecar scan manifest is consulted and only files whose
+    (mtime, size) changed are re-hashed / re-probed; the manifest is rewritten with the
+    files seen on this walk, so deleted files drop out.
+
+    Hash + PNG probes fan out to ``workers`` threads (default ``cfg.discovery_scan_workers``);
+    files are ordered by (library, relpath) before probing so the result is identical to
+    the serial path. ``io_mb_per_s`` caps hashing read rate across all workers.
+    """
     og_root, wip_root = _og_wip_library_roots(cfg)
     t0 = time.time()
     try:
         out_resolved = cfg.output_root.resolve()
     except Exception:
         out_resolved = cfg.output_root
+    n_workers = max(1, int(workers if workers is not None else cfg.discovery_scan_workers))
+    mbps = float(io_mb_per_s if io_mb_per_s is not None else cfg.discovery_scan_io_mb_per_s)
+    throttle = _DiscoveryScanThrottle(mbps) if mbps > 0 else None
 
-    # (library, exact filename stem lowercased) -> all extensions for that output.
-    # Matches FB9_GEX2_OVERHEAD_2026-04-13_00006.mp4 + .png even if they land in different subfolders.
-    by_stem: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    manifest_path = _discovery_scan_manifest_path(cfg.discovery_index_path)
+    prior_files = _load_discovery_scan_manifest(manifest_path) if incremental else {}
+    seen_files: Dict[str, Dict[str, Any]] = {}
     skipped_raw = 0
 
+    # (library, relpath, path, name, ext, mtime, size) for every media file to index.
+    candidates: List[Tuple[str, str, Path, str, str, float, int]] = []
     for lib, root in (("og", og_root), ("wip", wip_root)):
         if not root.is_dir():
             continue
-        try:
-            for p in root.rglob("*"):
-                try:
-                    if not p.is_file():
-                        continue
-                except Exception:
-                    continue
-                ext_lc = p.suffix.lower()
-                if ext_lc not in _DISCOVERY_MEDIA_EXTS:
-                    continue
-                if _discovery_is_ephemeral_work_artifact(p.name):
-                    skipped_raw += 1
-                    continue
-                try:
-                    rel = p.resolve().relative_to(out_resolved)
-                except Exception:
-                    continue
-                rel_posix = _normalize_rel_posix(str(rel).replace("\\", "/"))
-                if not rel_posix:
-                    continue
-                try:
-                    st = p.stat()
-                    mtime = float(st.st_mtime)
-                    size = int(st.st_size)
-                except Exception:
-                    mtime = 0.0
-                    size = 0
-                wf_fp: Optional[str] = None
-                cls_prev: List[str] = []
-                has_prompt = False
-                if ext_lc == ".png":
-                    wf_fp, cls_prev, has_prompt = _png_metadata_fields(p)
-                content_hash = _file_content_hash(p)
-                stem_key = Path(p.name).stem.lower()
-                skey = (lib, stem_key)
-                rec = {
-                    "relpath": rel_posix,
-                    "library": lib,
-                    "name": p.name,
-                    "ext": ext_lc,
-                    "mtime": mtime,
-                    "size": size,
-                    "sha256": content_hash,
-                    "workflow_fingerprint": wf_fp,
-                    "class_types_preview": cls_prev,
-                    "has_embedded_prompt": has_prompt,
-                }
-                by_stem.setdefault(skey, []).append(rec)
-        except Exception:
+        lib_rows: List[Tuple[str, str, Path, str, str, float, int]] = []
+        for abs_s, name in _discovery_scan_walk(root):
+            ext_lc = os.path.splitext(name)[1].lower()
+            if ext_lc not in _DISCOVERY_MEDIA_EXTS:
+                continue
+            if _discovery_is_ephemeral_work_artifact(name):
+                skipped_raw += 1
+                continue
+            p = Path(abs_s)
+            try:
+                rel = p.resolve().relative_to(out_resolved)
+            except Exception:
+                continue
+            rel_posix = _normalize_rel_posix(str(rel).replace("\\", "/"))
+            if not rel_posix:
+                continue
+            try:
+                st = p.stat()
+                mtime = float(st.st_mtime)
+                size = int(st.st_size)
+            except Exception:
+                mtime = 0.0
+                size = 0
+            lib_rows.append((lib, rel_posix, p, name, ext_lc, mtime, size))
+        lib_rows.sort(key=lambda r: r[1])
+        candidates.extend(lib_rows)
+
+    # Reuse manifest entries; everything else is probed (serially or on the pool).
+    probes: List[Optional[Tuple[str, Optional[str], List[str], bool]]] = []
+    todo: List[int] = []
+    for i, (_lib, rel_posix, _p, _name, _ext, mtime, size) in enumerate(candidates):
+        prior = prior_files.get(rel_posix)
+        if _discovery_scan_reusable(prior, mtime=mtime, size=size):
+            assert prior is not None
+            probes.append(
+                (
+                    str(prior.get("sha256")),
+                    prior.get("workflow_fingerprint"),
+                    list(prior.get("class_types_preview") or []),
+                    bool(prior.get("has_embedded_prompt")),
+                )
+            )
+        else:
+            probes.append(None)
+            todo.append(i)
+
+    def _probe(i: int) -> Optional[Tuple[str, Optional[str], List[str], bool]]:
+        row = candidates[i]
+        return _discovery_scan_probe(row[2], row[4], row[6], throttle)
+
+    if n_workers > 1 and len(todo) > 1:
+        with ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="discovery-scan") as pool:
+            for i, res in zip(todo, pool.map(_probe, todo)):
+                probes[i] = res
+    else:
+        for i in todo:
+            probes[i] = _probe(i)
+
+    # (library, exact filename stem lowercased) -> all extensions for that output.
+    # Matches FB9_GEX2_OVERHEAD_2026-04-13_00006.mp4 + .png even if they land in different subfolders.
+    by_stem: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for (lib, rel_posix, _p, name, ext_lc, mtime, size), probe in zip(candidates, probes):
+        if probe is None:
             continue
+        content_hash, wf_fp, cls_prev, has_prompt = probe
+        seen_files[rel_posix] = {
+            "mtime": mtime,
+            "size": size,
+            "sha256": content_hash,
+            "workflow_fingerprint": wf_fp,
+            "class_types_preview": cls_prev,
+            "has_embedded_prompt": has_prompt,
+        }
+        stem_key = Path(name).stem.lower()
+        rec = {
+            "relpath": rel_posix,
+            "library": lib,
+            "name": name,
+            "ext": ext_lc,
+            "mtime": mtime,
+            "size": size,
+            "sha256": content_hash,
+            "workflow_fingerprint": wf_fp,
+            "class_types_preview": cls_prev,
+            "has_embedded_prompt": has_prompt,
+        }
+        by_stem.setdefault((lib, stem_key), []).append(rec)
+    hashed = len(todo)
+    reused = len(candidates) - hashed
 
     items: List[Dict[str, Any]] = []
     for (lib, stem_key), members in by_stem.items():
@@ -657,7 +835,26 @@ def _build_discovery_og_wip_index(cfg: "ServerConfig") -> Dict[str, Any]:
         "items": items,
         "skipped_raw_files": skipped_raw,
         "scan_ms": int((time.time() - t0) * 1000),
+        "scan_stats": {
+            "mode": "incremental" if prior_files else "full",
+            "workers": n_workers,
+            "io_mb_per_s": mbps if mbps > 0 else None,
+            "hashed_files": hashed,
+            "reused_files": reused,
+            "dropped_files": sum(1 for k in prior_files if k not in seen_files),
+        },
     }
+    try:
+        _atomic_write_json(
+            manifest_path,
+            {
+                "version": _DISCOVERY_SCAN_MANIFEST_VERSION,
+                "updated_at": built["updated_at"],
+                "files": seen_files,
+            },
+        )
+    except Exception:
+        pass
     return built
 
 
@@ -686,6 +883,75 @@ def _load_discovery_index_disk(path: Path) -> Optional[Dict[str, Any]]:
     return obj
 
 
+_DISCOVERY_INDEX_STORE_LOCK = threading.Lock()
+
+
+def _discovery_index_store_open(cfg: "ServerConfig") -> Optional[sqlite3.Connection]:
+    """
+    Open the SQLite mirror of the discovery index (``discovery_index.sqlite`` beside the JSON),
+    reloading it from the JSON export when that changed since the last sync. None if unavailable.
+    """
+    idx_path = cfg.discovery_index_path
+    if not idx_path.exists():
+        return None
+    d = _workspace_scripts_dir()
+    if d.is_dir() and str(d) not in sys.path:
+        sys.path.insert(0, str(d))
+    try:
+        from discovery_index_store import (  # type: ignore
+            default_discovery_index_store_path,
+            open_discovery_index_store,
+            sync_from_json,
+        )
+
+        con = open_discovery_index_store(default_discovery_index_store_path(idx_path))
+    except Exception:
+        return None
+    try:
+        with _DISCOVERY_INDEX_STORE_LOCK:
+            sync_from_json(con, idx_path)
+    except Exception:
+        con.close()
+        return None
+    return con
+
+
+def _discovery_index_store_meta(con: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+    try:
+        from discovery_index_store import read_meta  # type: ignore
+
+        meta = read_meta(con)
+    except Exception:
+        return None
+    return meta if meta.get("updated_at") else None
+
+
+def _discovery_write_index(cfg: "ServerConfig", payload: Dict[str, Any]) -> None:
+    """Write the JSON export, then mirror the same rows into the SQLite store."""
+    idx_path = cfg.discovery_index_path
+    _atomic_write_json(idx_path, payload)
+    d = _workspace_scripts_dir()
+    if d.is_dir() and str(d) not in sys.path:
+        sys.path.insert(0, str(d))
+    try:
+        from discovery_index_store import (  # type: ignore
+            default_discovery_index_store_path,
+            open_discovery_index_store,
+            replace_from_index,
+        )
+
+        st = idx_path.stat()
+        with _DISCOVERY_INDEX_STORE_LOCK:
+            con = open_discovery_index_store(default_discovery_index_store_path(idx_path))
+            try:
+                replace_from_index(con, payload, source_stat=(float(st.st_mtime), int(st.st_size)))
+            finally:
+                con.close()
+    except Exception:
+        # The store re-syncs from the JSON on next open.
+        pass
+
+
 def _discovery_index_health_path(path: Path) -> Path:
     return path.with_name("discovery_index_health.json")
 
@@ -1437,54 +1703,96 @@ def _discovery_index_item_map(index_obj: Any) -> Dict[str, Dict[str, Any]]:
     return out
 
 
+_DISCOVERY_STEM_STRIP_EXTS = (".mp4", ".png", ".jpg", ".jpeg", ".webp", ".gif", ".xmp")
+# (updated_at, item count) -> (items list, lookup tables); a couple of live index generations at most.
+_DISCOVERY_INDEX_LOOKUPS: Dict[Tuple[str, int], Tuple[List[Any], Dict[str, Dict[str, Dict[str, Any]]]]] = {}
+_DISCOVERY_INDEX_LOOKUPS_MAX = 4
+_DISCOVERY_INDEX_LOOKUPS_LOCK = threading.Lock()
+
+
+def _discovery_relpath_stem_key(rel: str) -> str:
+    norm = _normalize_rel_posix(rel.strip())
+    for ext in _DISCOVERY_STEM_STRIP_EXTS:
+        if norm.lower().endswith(ext):
+            return norm[: -len(ext)]
+    return norm
+
+
+def _discovery_item_path_candidates(it: Dict[str, Any]) -> List[str]:
+    cands: List[str] = []
+    for k in ("relpath", "video_relpath", "thumb_relpath"):
+        v = it.get(k)
+        if isinstance(v, str) and v.strip():
+            cands.append(v.strip())
+    mems = it.get("members")
+    if isinstance(mems, list):
+        for mm in mems:
+            if isinstance(mm, dict):
+                rv = mm.get("relpath")
+                if isinstance(rv, str) and rv.strip():
+                    cands.append(rv.strip())
+    return cands
+
+
+def _discovery_index_lookups(index_obj: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Hash tables over one loaded index generation, keyed on its ``updated_at`` stamp:
+    ``by_group_id``, ``by_path_stem`` (first row in index order) and ``by_basename`` (newest row).
+    A reload of the same generation rebuilds them so rows always come from ``index_obj``.
+    """
+    items = index_obj.get("items")
+    if not isinstance(items, list):
+        items = []
+    stamp = (str(index_obj.get("updated_at") or ""), len(items))
+    with _DISCOVERY_INDEX_LOOKUPS_LOCK:
+        cached = _DISCOVERY_INDEX_LOOKUPS.get(stamp)
+    if cached is not None and cached[0] is items:
+        return cached[1]
+    by_gid: Dict[str, Dict[str, Any]] = {}
+    by_stem: Dict[str, Dict[str, Any]] = {}
+    by_base: Dict[str, Dict[str, Any]] = {}
+    for it in items:
+        if not isinstance(it, dict):
+            continue
+        gid = str(it.get("group_id") or "").strip()
+        if gid:
+            by_gid[gid] = it
+        cands = _discovery_item_path_candidates(it)
+        for c in cands:
+            key = _discovery_relpath_stem_key(c)
+            if key:
+                by_stem.setdefault(key, it)
+        bases = {Path(c).name.lower() for c in cands}
+        bases.add(str(it.get("name") or "").lower())
+        mems = it.get("members")
+        if isinstance(mems, list):
+            bases.update(str(mm.get("name") or "").lower() for mm in mems if isinstance(mm, dict))
+        mt = float(it.get("mtime") or 0)
+        for bn in bases:
+            if not bn:
+                continue
+            prev = by_base.get(bn)
+            if prev is None or mt > float(prev.get("mtime") or 0):
+                by_base[bn] = it
+    tables = {"by_group_id": by_gid, "by_path_stem": by_stem, "by_basename": by_base}
+    with _DISCOVERY_INDEX_LOOKUPS_LOCK:
+        _DISCOVERY_INDEX_LOOKUPS.pop(stamp, None)
+        while len(_DISCOVERY_INDEX_LOOKUPS) >= _DISCOVERY_INDEX_LOOKUPS_MAX:
+            _DISCOVERY_INDEX_LOOKUPS.pop(next(iter(_DISCOVERY_INDEX_LOOKUPS)))
+        _DISCOVERY_INDEX_LOOKUPS[stamp] = (items, tables)
+    return tables
+
+
 def _discovery_item_for_relpath(index_obj: Any, rel_posix: str) -> Optional[Dict[str, Any]]:
     """Find merged Discovery row where any member path matches rel_posix (full path or stem)."""
     if not isinstance(index_obj, dict):
         return None
-    items = index_obj.get("items")
-    if not isinstance(items, list):
+    if not isinstance(index_obj.get("items"), list):
         return None
     norm_rel = _normalize_rel_posix(rel_posix.strip())
     if not norm_rel:
         return None
-    stem_rel = norm_rel
-    for ext in (".mp4", ".png", ".jpg", ".jpeg", ".webp", ".gif", ".xmp"):
-        if stem_rel.lower().endswith(ext):
-            stem_rel = stem_rel[: -len(ext)]
-            break
-
-    def _path_matches(candidate: str) -> bool:
-        nc = _normalize_rel_posix(candidate.strip())
-        if not nc:
-            return False
-        if nc == norm_rel:
-            return True
-        cand_stem = nc
-        for ext in (".mp4", ".png", ".jpg", ".jpeg", ".webp", ".gif", ".xmp"):
-            if cand_stem.lower().endswith(ext):
-                cand_stem = cand_stem[: -len(ext)]
-                break
-        return cand_stem == stem_rel
-
-    for it in items:
-        if not isinstance(it, dict):
-            continue
-        cands: List[str] = []
-        for k in ("relpath", "video_relpath", "thumb_relpath"):
-            v = it.get(k)
-            if isinstance(v, str) and v.strip():
-                cands.append(v.strip())
-        mems = it.get("members")
-        if isinstance(mems, list):
-            for mm in mems:
-                if isinstance(mm, dict):
-                    rv = mm.get("relpath")
-                    if isinstance(rv, str) and rv.strip():
-                        cands.append(rv.strip())
-        for c in cands:
-            if _path_matches(c):
-                return it
-    return None
+    return _discovery_index_lookups(index_obj)["by_path_stem"].get(_discovery_relpath_stem_key(norm_rel))
 
 
 def _repo_root() -> Path:
@@ -1600,7 +1908,9 @@ def _discovery_rating_sampler_payload(cfg: "ServerConfig", q: Dict[str, List[str
         session["vision_gaps"] = analyze_vision_gaps(session)
         return session
 
-    def _enrich(session: Dict[str, Any]) -> Dict[str, Any]:
+    def _enrich(session: Dict[str, Any], *, sampled: bool = False) -> Dict[str, Any]:
+        if sampled and session.get("extension_ranges_enriched"):
+            return session  # the sampler just looked ranges up (and cached hits in its pool)
         try:
             from shape_factory_map import resolve_shape_factory_data_root  # type: ignore
             from shape_factory_rating_sampler import enrich_session_extension_ranges  # type: ignore
@@ -1617,14 +1927,14 @@ def _discovery_rating_sampler_payload(cfg: "ServerConfig", q: Dict[str, List[str
         return session
 
     if refresh:
-        return _enrich(_sample())
+        return _enrich(_sample(), sampled=True)
 
     sessions_dir = default_sampler_sessions_dir(og_root)
     paths = sorted(sessions_dir.glob("session_*.json")) if sessions_dir.is_dir() else []
     if not paths:
         session = _sample()
         session["bootstrapped"] = True
-        return _enrich(session)
+        return _enrich(session, sampled=True)
 
     try:
         session = json.loads(paths[-1].read_text(encoding="utf-8"))
@@ -1636,7 +1946,7 @@ def _discovery_rating_sampler_payload(cfg: "ServerConfig", q: Dict[str, List[str
     if _session_is_stale(session) or not _request_matches(session):
         session = _sample()
         session["regenerated_stale"] = True
-        return _enrich(session)
+        return _enrich(session, sampled=True)
 
     session["session_path"] = str(paths[-1])
     session["vision_gaps"] = analyze_vision_gaps(session)
@@ -1739,13 +2049,22 @@ def _asset_audit_payload(cfg: ServerConfig, q: Dict[str, List[str]]) -> Dict[str
 def _home_fresh_outputs(cfg: ServerConfig, limit: int = 12) -> List[Dict[str, Any]]:
     """Newest indexed outputs (og+wip), enriched with live URLs + rating rollup."""
     idx_path = cfg.discovery_index_path
-    idx = _load_discovery_index_disk(idx_path) if idx_path.exists() else None
-    items = idx.get("items") if isinstance(idx, dict) else None
-    if not isinstance(items, list):
-        return []
-    rows = [it for it in items if isinstance(it, dict)]
-    rows.sort(key=lambda it: float(it.get("mtime") or 0), reverse=True)
-    rows = rows[: max(1, int(limit))]
+    store = _discovery_index_store_open(cfg)
+    if store is not None:
+        try:
+            from discovery_index_store import newest_items  # type: ignore
+
+            rows = newest_items(store, max(1, int(limit)))
+        finally:
+            store.close()
+    else:
+        idx = _load_discovery_index_disk(idx_path) if idx_path.exists() else None
+        items = idx.get("items") if isinstance(idx, dict) else None
+        if not isinstance(items, list):
+            return []
+        rows = [it for it in items if isinstance(it, dict)]
+        rows.sort(key=lambda it: float(it.get("mtime") or 0), reverse=True)
+        rows = rows[: max(1, int(limit))]
 
     def _live(relpath: Any) -> Optional[str]:
         if not isinstance(relpath, str) or not relpath.strip():
@@ -2742,6 +3061,7 @@ def _shape_factory_work_products_payload(cfg: ServerConfig, q: Dict[str, List[st
         limit = 40
     hourly_only = str((q.get("hourly_only") or ["1"])[0]).strip().lower() not in {"0", "false", "no"}
     family = str((q.get("family") or [""])[0]).strip() or None
+    cursor = str((q.get("cursor") or [""])[0]).strip() or None
 
     # Comfy /queue is canonical for in-flight. Reconcile job.json before listing so
     # the UI never shows ghost running/queued rows after clears/restarts.
@@ -2780,21 +3100,25 @@ def _shape_factory_work_products_payload(cfg: ServerConfig, q: Dict[str, List[st
         limit=limit,
         hourly_only=hourly_only,
         family=family,
+        cursor=cursor,
     )
+    # Live queue + history failure rows are pinned to the top of the first page only.
+    first_page = cursor is None
     if isinstance(queue_obj, dict) and "error" not in queue_obj:
-        payload = attach_live_comfy_queue(
-            payload,
-            queue_running=queue_obj.get("queue_running"),
-            queue_pending=queue_obj.get("queue_pending"),
-            data_root=data_root,
-            output_root=cfg.output_root,
-        )
+        if first_page:
+            payload = attach_live_comfy_queue(
+                payload,
+                queue_running=queue_obj.get("queue_running"),
+                queue_pending=queue_obj.get("queue_pending"),
+                data_root=data_root,
+                output_root=cfg.output_root,
+            )
         payload = demote_stale_inflight_items(
             payload,
             queue_running=queue_obj.get("queue_running"),
             queue_pending=queue_obj.get("queue_pending"),
         )
-    if isinstance(history_obj, dict) and "error" not in history_obj:
+    if first_page and isinstance(history_obj, dict) and "error" not in history_obj:
         try:
             payload = attach_comfy_history_failures(
                 payload,
@@ -2805,7 +3129,7 @@ def _shape_factory_work_products_payload(cfg: ServerConfig, q: Dict[str, List[st
             )
         except Exception as e:
             payload["history_attach_error"] = str(e)
-    elif isinstance(history_obj, dict) and history_obj.get("error"):
+    elif first_page and isinstance(history_obj, dict) and history_obj.get("error"):
         payload["history_attach_error"] = history_obj.get("detail") or history_obj.get("error")
     if reconcile is not None:
         payload["comfy_reconcile"] = reconcile
@@ -4159,6 +4483,78 @@ def _invalidate_ratings_caches(cfg: "ServerConfig") -> None:
         _APPETITE_INDEX_CACHE.pop(str(db), None)
 
 
+# Star / appetite clicks queue their heuristics delta here; one worker applies them in order.
+_HEURISTICS_REFRESH_QUEUE: "queue.Queue[Tuple[str, str, str, Dict[str, Any]]]" = queue.Queue()
+_HEURISTICS_REFRESH_PENDING: set = set()
+_HEURISTICS_REFRESH_LOCK = threading.Lock()
+_HEURISTICS_REFRESH_WORKER: Optional[threading.Thread] = None
+
+
+def _refresh_heuristics_for_output(cfg: "ServerConfig", saved: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Queue a delta update of ``heuristics_index.json`` after a star / appetite write, so
+    hourly planning sees the click before the next ``heuristics build``. The ratings row is
+    already committed; the worker reads it when it gets to the event, so repeat clicks on
+    one output coalesce. None when no index exists yet.
+    """
+    index_path = cfg.discovery_index_path.with_name("heuristics_index.json")
+    if not index_path.is_file():
+        return None
+    discovery_key = str(saved.get("discovery_key") or "")
+    short_key = str(saved.get("short_key") or "")
+    if not discovery_key and not short_key:
+        return None
+    key = (str(index_path), discovery_key, short_key)
+    kwargs = {
+        "heuristics_index_path": index_path,
+        "ratings_index_path": _discovery_ratings_index_path(cfg),
+        "lineage_edges_path": _discovery_lineage_edges_path(cfg),
+        "asset_tags_path": cfg.discovery_index_path.with_name("asset_tags.json"),
+        "discovery_key": discovery_key,
+        "short_key": short_key,
+    }
+    global _HEURISTICS_REFRESH_WORKER
+    with _HEURISTICS_REFRESH_LOCK:
+        if key not in _HEURISTICS_REFRESH_PENDING:
+            _HEURISTICS_REFRESH_PENDING.add(key)
+            _HEURISTICS_REFRESH_QUEUE.put((*key, kwargs))
+        if _HEURISTICS_REFRESH_WORKER is None or not _HEURISTICS_REFRESH_WORKER.is_alive():
+            _HEURISTICS_REFRESH_WORKER = threading.Thread(
+                target=_heuristics_refresh_worker, name="heuristics-refresh", daemon=True
+            )
+            _HEURISTICS_REFRESH_WORKER.start()
+        depth = _HEURISTICS_REFRESH_QUEUE.qsize()
+    return {"ok": True, "queued": True, "queue_depth": depth}
+
+
+def _heuristics_refresh_worker() -> None:
+    while True:
+        index_path, discovery_key, short_key, kwargs = _HEURISTICS_REFRESH_QUEUE.get()
+        try:
+            with _HEURISTICS_REFRESH_LOCK:
+                # Cleared before applying: a click landing mid-apply queues another pass.
+                _HEURISTICS_REFRESH_PENDING.discard((index_path, discovery_key, short_key))
+            result = _apply_heuristics_event(kwargs)
+            if result.get("error") == "heuristics_apply_failed":
+                print(f"heuristics refresh failed for {discovery_key or short_key}: {result.get('detail')}", file=sys.stderr)
+        finally:
+            _HEURISTICS_REFRESH_QUEUE.task_done()
+
+
+def _apply_heuristics_event(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Run ``apply_output_event``; errors are reported, never raised."""
+    d = _workspace_scripts_dir()
+    if d.is_dir() and str(d) not in sys.path:
+        sys.path.insert(0, str(d))
+    try:
+        from shape_factory_heuristics_incremental import apply_output_event  # type: ignore
+
+        out = apply_output_event(**kwargs)
+    except Exception as e:
+        return {"ok": False, "error": "heuristics_apply_failed", "detail": str(e)}
+    return {k: out.get(k) for k in ("ok", "error", "touched_buckets", "lineage_drift") if k in out}
+
+
 def _discovery_ratings_verifications_path(cfg: "ServerConfig") -> Path:
     return cfg.discovery_index_path.with_name("ratings_verifications.json")
 
@@ -4467,30 +4863,45 @@ def _discovery_compute_asset_ratings(
     cfg: "ServerConfig",
     idx: Dict[str, Any],
     relpath: str,
+    *,
+    contributors_limit: int = 48,
+    contributors_offset: int = 0,
 ) -> Dict[str, Any]:
     rel = _normalize_rel_posix(relpath.strip())
     if not rel:
         return {"ok": False, "error": "missing_or_bad_relpath"}
 
-    ratings_doc = _discovery_load_ratings_index(cfg)
-    if not ratings_doc:
+    d = _workspace_scripts_dir()
+    if d.is_dir() and str(d) not in sys.path:
+        sys.path.insert(0, str(d))
+    from shape_factory_ratings import (  # type: ignore
+        build_asset_ratings_explorer_from_db,
+        open_ratings_db,
+        ratings_db_path_for_index,
+    )
+
+    index_path = _discovery_ratings_index_path(cfg)
+    db_path = ratings_db_path_for_index(index_path)
+    if not db_path.is_file() and not index_path.is_file():
         return {
             "ok": False,
             "error": "ratings_index_missing",
-            "detail": str(_discovery_ratings_index_path(cfg)),
+            "detail": str(index_path),
         }
 
     item = _discovery_item_for_relpath(idx, rel)
-    d = _workspace_scripts_dir()
-    if d.is_dir() and str(d) not in sys.path:
-        sys.path.insert(0, str(d))
-    from shape_factory_ratings import build_asset_ratings_explorer  # type: ignore
-
-    payload = build_asset_ratings_explorer(
-        relpath=rel,
-        ratings_doc=ratings_doc,
-        item=item if isinstance(item, dict) else None,
-    )
+    # Output row + materialized aggregates straight from ratings.sqlite (no JSON export parse).
+    con = open_ratings_db(db_path, ratings_json=index_path)
+    try:
+        payload = build_asset_ratings_explorer_from_db(
+            con,
+            relpath=rel,
+            item=item if isinstance(item, dict) else None,
+            contributors_limit=contributors_limit,
+            contributors_offset=contributors_offset,
+        )
+    finally:
+        con.close()
     payload["asset_key"] = _discovery_ratings_canonical_asset_key(rel)
     payload["ratings_index_path"] = str(_discovery_ratings_index_path(cfg))
     ver_doc = _discovery_load_ratings_verifications(cfg)
@@ -4542,87 +4953,102 @@ def _discovery_compute_asset_ratings(
     return payload
 
 
-_LINEAGE_GRAPH_CACHE: Dict[str, Tuple[float, int, Dict[str, Any]]] = {}
+_LINEAGE_GRAPH_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+# Seconds between rewrites of the discovery_lineage_edges.json export after persists (0 = never).
+_LINEAGE_JSON_EXPORT_INTERVAL_S = 600.0
+_LINEAGE_JSON_LAST_EXPORT: Dict[str, float] = {}
+
+
+def _discovery_lineage_store_open(path: Path) -> Optional[sqlite3.Connection]:
+    """
+    Open the append-only lineage edge store beside ``path`` (``discovery_lineage_edges.sqlite``),
+    folding in a newer JSON export first. None if unavailable.
+    """
+    d = _workspace_scripts_dir()
+    if d.is_dir() and str(d) not in sys.path:
+        sys.path.insert(0, str(d))
+    try:
+        from discovery_lineage_store import open_synced_lineage_store  # type: ignore
+
+        return open_synced_lineage_store(path)
+    except Exception:
+        return None
 
 
 def _discovery_load_lineage_graph(path: Path) -> Dict[str, Any]:
-    if not path.exists():
+    """``{"version": 1, "edges": [...]}`` from the lineage store; cached until the next insert."""
+    if not path.exists() and not path.with_name("discovery_lineage_edges.sqlite").exists():
+        return {"version": 1, "edges": []}
+    con = _discovery_lineage_store_open(path)
+    if con is None:
         return {"version": 1, "edges": []}
     try:
-        st = path.stat()
+        from discovery_lineage_store import all_edges, store_version  # type: ignore
+
         key = str(path)
+        version = store_version(con)
         cached = _LINEAGE_GRAPH_CACHE.get(key)
-        if cached and cached[0] == st.st_mtime and cached[1] == st.st_size:
-            return cached[2]
-        obj = _read_json(path)
+        if cached and cached[0] == version:
+            return cached[1]
+        obj: Dict[str, Any] = {"version": 1, "edges": all_edges(con)}
+        _LINEAGE_GRAPH_CACHE[key] = (version, obj)
+        return obj
     except Exception:
         return {"version": 1, "edges": []}
-    if not isinstance(obj, dict):
-        return {"version": 1, "edges": []}
-    edges = obj.get("edges")
-    if not isinstance(edges, list):
-        obj["edges"] = []
-    try:
-        st = path.stat()
-        _LINEAGE_GRAPH_CACHE[str(path)] = (st.st_mtime, st.st_size, obj)
-    except OSError:
-        pass
-    return obj
+    finally:
+        con.close()
+
+
+def _discovery_maybe_export_lineage_json(con: sqlite3.Connection, path: Path) -> None:
+    if _LINEAGE_JSON_EXPORT_INTERVAL_S <= 0:
+        return
+    now = time.time()
+    last = _LINEAGE_JSON_LAST_EXPORT.get(str(path))
+    if last is None:
+        # First persist since start: seed the clock from the last export (or now) so a
+        # restart does not rewrite the JSON at once.
+        try:
+            last = path.stat().st_mtime
+        except OSError:
+            last = now
+        _LINEAGE_JSON_LAST_EXPORT[str(path)] = last
+    if now - last < _LINEAGE_JSON_EXPORT_INTERVAL_S:
+        return
+    from discovery_lineage_store import export_json  # type: ignore
+
+    export_json(con, path)
+    _LINEAGE_JSON_LAST_EXPORT[str(path)] = now
 
 
 def _discovery_persist_lineage_edge_rows(cfg: "ServerConfig", rows: List[Dict[str, Any]]) -> int:
+    """Append non-spurious edges to the lineage store (``INSERT OR IGNORE`` on child / parent / via)."""
     if not rows:
         return 0
+    keep = [r for r in rows if isinstance(r, dict) and not _discovery_lineage_edge_looks_spurious(r)]
+    if not keep:
+        return 0
     path = _discovery_lineage_edges_path(cfg)
     with _DISCOVERY_LINEAGE_GRAPH_LOCK:
-        doc = _discovery_load_lineage_graph(path)
-        edges = doc.get("edges")
-        if not isinstance(edges, list):
-            edges = []
-        seen: set = set()
-        for e in edges:
-            if not isinstance(e, dict):
-                continue
-            seen.add(
-                (
-                    str(e.get("child_group_id") or ""),
-                    str(e.get("parent_group_id") or ""),
-                    str(e.get("via_source_raw") or ""),
-                )
-            )
-        added = 0
-        for row in rows:
-            if not isinstance(row, dict):
-                continue
-            if _discovery_lineage_edge_looks_spurious(row):
-                continue
-            key = (
-                str(row.get("child_group_id") or ""),
-                str(row.get("parent_group_id") or ""),
-                str(row.get("via_source_raw") or ""),
-            )
-            if not key[0] or not key[1]:
-                continue
-            if key in seen:
-                continue
-            seen.add(key)
-            edges.append(row)
-            added += 1
-        doc["edges"] = edges
-        doc["version"] = 1
-        doc["updated_at"] = _dt.datetime.now(tz=_dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-        _atomic_write_json(path, doc)
-        try:
-            st = path.stat()
-            _LINEAGE_GRAPH_CACHE[str(path)] = (st.st_mtime, st.st_size, doc)
-        except OSError:
-            _LINEAGE_GRAPH_CACHE.pop(str(path), None)
-        # Keep inverted citation index warm for forward-fill lookups.
+        con = _discovery_lineage_store_open(path)
+        if con is None:
+            return 0
         try:
-            _discovery_citations_ingest_lineage_edge_rows(cfg, rows)
-        except Exception:
-            pass
-        return added
+            from discovery_lineage_store import insert_edges  # type: ignore
+
+            added = insert_edges(con, keep)
+            if added:
+                try:
+                    _discovery_maybe_export_lineage_json(con, path)
+                except Exception:
+                    pass
+        finally:
+            con.close()
+    # Keep inverted citation index warm for forward-fill lookups.
+    try:
+        _discovery_citations_ingest_lineage_edge_rows(cfg, rows)
+    except Exception:
+        pass
+    return added
 
 
 def _discovery_extract_source_path_strings_from_facets_payload(payload: Dict[str, Any]) -> List[str]:
@@ -4871,45 +5297,13 @@ def _discovery_ensure_thumb_payload(cfg: "ServerConfig", body: Dict[str, Any]) -
     }
 
 
-def _discovery_basename_matches_item(it: Dict[str, Any], base_lc: str) -> bool:
-    nm = str(it.get("name") or "")
-    if nm.lower() == base_lc:
-        return True
-    mems = it.get("members")
-    if isinstance(mems, list):
-        for mm in mems:
-            if not isinstance(mm, dict):
-                continue
-            n2 = str(mm.get("name") or "")
-            if n2.lower() == base_lc:
-                return True
-            rv = mm.get("relpath")
-            if isinstance(rv, str) and rv.strip():
-                if Path(rv.strip()).name.lower() == base_lc:
-                    return True
-    for k in ("relpath", "video_relpath", "thumb_relpath"):
-        v = it.get(k)
-        if isinstance(v, str) and v.strip():
-            if Path(v.strip()).name.lower() == base_lc:
-                return True
-    return False
-
-
 def _discovery_find_item_by_media_basename(idx: Dict[str, Any], filename: str) -> Optional[Dict[str, Any]]:
     base_lc = Path(str(filename or "").strip()).name.lower().strip()
     if not base_lc:
         return None
-    items = idx.get("items")
-    if not isinstance(items, list):
-        return None
-    hits: List[Dict[str, Any]] = []
-    for it in items:
-        if isinstance(it, dict) and _discovery_basename_matches_item(it, base_lc):
-            hits.append(it)
-    if not hits:
+    if not isinstance(idx.get("items"), list):
         return None
-    hits.sort(key=lambda x: float(x.get("mtime") or 0), reverse=True)
-    return hits[0]
+    return _discovery_index_lookups(idx)["by_basename"].get(base_lc)
 
 
 def _discovery_find_item_by_output_relpath_prefix(idx: Dict[str, Any], hint_rel: str) -> Optional[Dict[str, Any]]:
@@ -5509,19 +5903,10 @@ def _discovery_lineage_facets_probe_relpath(item: Dict[str, Any]) -> str:
 
 
 def _discovery_index_items_by_group_id(index_obj: Any) -> Dict[str, Dict[str, Any]]:
-    out: Dict[str, Dict[str, Any]] = {}
-    if not isinstance(index_obj, dict):
-        return out
-    items_list = index_obj.get("items")
-    if not isinstance(items_list, list):
-        return out
-    for it in items_list:
-        if not isinstance(it, dict):
-            continue
-        gid = str(it.get("group_id") or "").strip()
-        if gid:
-            out[gid] = it
-    return out
+    """group_id → row (shared memoized table; do not mutate)."""
+    if not isinstance(index_obj, dict) or not isinstance(index_obj.get("items"), list):
+        return {}
+    return _discovery_index_lookups(index_obj)["by_group_id"]
 
 
 def _lineage_edge_parent_child(e: Dict[str, Any]) -> Tuple[str, str]:
@@ -5787,6 +6172,18 @@ def _build_lineage_direct_children(
     return out
 
 
+def _lineage_csr_from_edges(edges: List[Dict[str, Any]]) -> Optional[Any]:
+    """``lineage_csr.LineageCSR`` over child / parent group ids (None if the module is unavailable)."""
+    d = _workspace_scripts_dir()
+    if d.is_dir() and str(d) not in sys.path:
+        sys.path.insert(0, str(d))
+    try:
+        from lineage_csr import LineageCSR  # type: ignore
+    except Exception:
+        return None
+    return LineageCSR.from_edges(edges, closure_cache_size=0)
+
+
 def _build_lineage_descendants_transitive(
     seed_gid: str,
     merged_edges: List[Dict[str, Any]],
@@ -5794,29 +6191,28 @@ def _build_lineage_descendants_transitive(
     *,
     limit: int,
 ) -> List[Dict[str, Any]]:
-    """Forward BFS on merged edges (parent → child), capped for UI."""
+    """Forward BFS on merged edges (parent → child) over a CSR graph, capped for UI."""
     if not seed_gid:
         return []
+    graph = _lineage_csr_from_edges(merged_edges)
+    start = graph.ids.get(seed_gid) if graph is not None else None
+    if start is None:
+        return []
     out: List[Dict[str, Any]] = []
-    seen: set = {seed_gid}
-    q: collections.deque = collections.deque()
-    q.append((seed_gid, 0))
-    while q and len(out) < max(1, int(limit)):
-        gid, gen = q.popleft()
-        for e in merged_edges:
-            if str(e.get("parent_group_id") or "") != gid:
-                continue
-            cid = str(e.get("child_group_id") or "")
-            if not cid or cid in seen:
-                continue
-            seen.add(cid)
-            it = by_gid.get(cid)
-            row = dict(e) if isinstance(e, dict) else {}
-            row["child"] = _discovery_lineage_summarize_item(it) if isinstance(it, dict) else None
-            row["child_group_id"] = cid
-            row["generation"] = gen + 1
-            out.append(row)
-            q.append((cid, gen + 1))
+    cap = max(1, int(limit))
+    for _, edge_i, dst, gen, new in graph.walk(start, "down", max_depth=1 << 30):
+        if not new:
+            continue
+        cid = graph.names[dst]
+        e = graph.edges[edge_i]
+        it = by_gid.get(cid)
+        row = dict(e)
+        row["child"] = _discovery_lineage_summarize_item(it) if isinstance(it, dict) else None
+        row["child_group_id"] = cid
+        row["generation"] = gen + 1
+        out.append(row)
+        if len(out) >= cap:
+            break
     return out
 
 
@@ -6330,10 +6726,30 @@ def _build_discovery_index_health(
     orphan_thumb = 0
 
     stale_reference_items = previous_items if previous_items else current_items
+
+    # Existence probes are independent stats: resolve them on the scan pool when configured.
+    rels = sorted(
+        {
+            str(item.get(k))
+            for item in stale_reference_items.values()
+            for k in ("relpath", "video_relpath", "thumb_relpath")
+            if item.get(k)
+        }
+    )
+    n_workers = max(1, int(cfg.discovery_scan_workers))
+    if n_workers > 1 and len(rels) > 1:
+        with ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="discovery-health") as pool:
+            exists_by_rel = dict(zip(rels, pool.map(lambda r: _discovery_rel_file_exists(cfg, r), rels)))
+    else:
+        exists_by_rel = {r: _discovery_rel_file_exists(cfg, r) for r in rels}
+
+    def _exists(rel: Any) -> bool:
+        return bool(rel) and exists_by_rel.get(str(rel), False)
+
     for item in stale_reference_items.values():
-        primary_exists = _discovery_rel_file_exists(cfg, item.get("relpath"))
-        video_exists = _discovery_rel_file_exists(cfg, item.get("video_relpath"))
-        thumb_exists = _discovery_rel_file_exists(cfg, item.get("thumb_relpath"))
+        primary_exists = _exists(item.get("relpath"))
+        video_exists = _exists(item.get("video_relpath"))
+        thumb_exists = _exists(item.get("thumb_relpath"))
         if item.get("relpath") and not primary_exists:
             missing_primary += 1
             _discovery_sample_append(missing_primary_sample, item)
@@ -6367,6 +6783,10 @@ def _build_discovery_index_health(
         "current_updated_at": current_index.get("updated_at"),
         "previous_item_count": len(previous_items) if previous_items else None,
         "current_item_count": len(current_items),
+        "scan": {
+            "scan_ms": current_index.get("scan_ms"),
+            **(current_index.get("scan_stats") if isinstance(current_index.get("scan_stats"), dict) else {}),
+        },
         "summary": {
             "missing_primary": missing_primary,
             "missing_video": missing_video,
@@ -6872,47 +7292,114 @@ def _safe_join(root: Path, rel_posix: str) -> Optional[Path]:
     return None
 
 
-def _parse_range_header(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+_STREAM_CHUNK = 1024 * 1024
+_STREAM_MAX_RANGES = 32
+
+
+def _stream_sendfile_enabled() -> bool:
+    """Zero-copy ``socket.sendfile`` bodies unless ``EXPERIMENTS_UI_SENDFILE=0`` (read/write copies)."""
+    return os.environ.get("EXPERIMENTS_UI_SENDFILE", "1").strip().lower() not in ("0", "off", "false", "no")
+
+
+def _parse_range_set(range_header: Optional[str], size: int) -> Optional[List[Tuple[int, int]]]:
     """
-    Parse a single HTTP Range header of form: bytes=start-end
-    Returns (start, end) inclusive, or None if unsupported/invalid.
+    Parse ``bytes=a-b, c-, -n`` into sorted, coalesced inclusive (start, end) spans.
+
+    Returns None when the header is absent, malformed or lists more than
+    ``_STREAM_MAX_RANGES`` specs (serve the whole file), and an empty list when it is
+    well-formed but no spec overlaps the file (416).
     """
     if not range_header:
         return None
-    m = re.match(r"^\s*bytes=(\d*)-(\d*)\s*$", range_header)
+    m = re.match(r"^\s*bytes\s*=(.*)$", range_header)
     if not m:
         return None
-    a, b = m.group(1), m.group(2)
-    if a == "" and b == "":
+    specs = [x.strip() for x in m.group(1).split(",") if x.strip()]
+    if not specs or len(specs) > _STREAM_MAX_RANGES:
         return None
-    if a == "":
-        try:
-            suf = int(b)
-        except Exception:
-            return None
-        if suf <= 0:
+    spans: List[Tuple[int, int]] = []
+    for spec in specs:
+        sm = re.match(r"^(\d*)\s*-\s*(\d*)$", spec)
+        if not sm or (sm.group(1) == "" and sm.group(2) == ""):
             return None
-        if suf > size:
-            suf = size
-        return (size - suf, size - 1)
-    try:
+        a, b = sm.group(1), sm.group(2)
+        if a == "":
+            suf = int(b)
+            if suf > 0 and size > 0:
+                spans.append((max(0, size - suf), size - 1))
+            continue
         start = int(a)
-    except Exception:
-        return None
-    if b == "":
-        end = size - 1
-    else:
-        try:
-            end = int(b)
-        except Exception:
+        if b != "" and int(b) < start:
             return None
-    if start < 0 or end < start:
+        if start < size:
+            spans.append((start, size - 1 if b == "" else min(int(b), size - 1)))
+    spans.sort()
+    merged: List[Tuple[int, int]] = []
+    for start, end in spans:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _file_etag(st: os.stat_result, content_id: Optional[str] = None) -> str:
+    """Strong validator: the caller's content id when known, else (size, mtime_ns)."""
+    if content_id:
+        return '"' + re.sub(r'[^\x21\x23-\x7e]', "", str(content_id)) + '"'
+    return f'"{int(st.st_size):x}-{int(st.st_mtime_ns):x}"'
+
+
+def _http_date_ts(raw: Optional[str]) -> Optional[float]:
+    if not raw:
         return None
-    if start >= size:
+    try:
+        return email.utils.parsedate_to_datetime(raw.strip()).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
         return None
-    if end >= size:
-        end = size - 1
-    return (start, end)
+
+
+def _not_modified(handler: BaseHTTPRequestHandler, etag: str, mtime: float) -> bool:
+    """If-None-Match (weak comparison, ``*``) wins over If-Modified-Since (second precision)."""
+    inm = handler.headers.get("If-None-Match")
+    if inm is not None:
+        for tok in inm.split(","):
+            tok = tok.strip()
+            if tok == "*" or (tok[2:] if tok.startswith("W/") else tok) == etag:
+                return True
+        return False
+    ims = _http_date_ts(handler.headers.get("If-Modified-Since"))
+    return ims is not None and int(mtime) <= ims
+
+
+def _if_range_matches(handler: BaseHTTPRequestHandler, etag: str, mtime: float) -> bool:
+    """Range applies only while If-Range still names this version (strong ETag or exact date)."""
+    raw = (handler.headers.get("If-Range") or "").strip()
+    if not raw:
+        return True
+    if raw.startswith('"') or raw.startswith("W/"):
+        return raw == etag
+    ts = _http_date_ts(raw)
+    return ts is not None and int(mtime) == int(ts)
+
+
+def _send_file_span(handler: BaseHTTPRequestHandler, f: Any, offset: int, count: int) -> None:
+    if count <= 0:
+        return
+    sock = getattr(handler, "connection", None)
+    if _stream_sendfile_enabled() and sock is not None and hasattr(sock, "sendfile"):
+        handler.wfile.flush()
+        # socket.sendfile: os.sendfile when the kernel allows it, send() loop otherwise (TLS, Windows).
+        sock.sendfile(f, offset, count)
+        return
+    f.seek(offset)
+    remaining = count
+    while remaining > 0:
+        chunk = f.read(min(_STREAM_CHUNK, remaining))
+        if not chunk:
+            break
+        handler.wfile.write(chunk)
+        remaining -= len(chunk)
 
 
 def _stream_file(
@@ -6922,49 +7409,91 @@ def _stream_file(
     content_type: str,
     cache_control: str,
     allow_ranges: bool = True,
+    content_id: Optional[str] = None,
 ) -> None:
-    st = path.stat()
-    size = int(st.st_size)
-    rng = _parse_range_header(handler.headers.get("Range"), size) if allow_ranges else None
-
-    if rng is None:
-        handler.send_response(200)
-        handler.send_header("Content-Type", content_type)
-        handler.send_header("Content-Length", str(size))
-        handler.send_header("Cache-Control", cache_control)
-        if allow_ranges:
+    """
+    Serve ``path`` with validators, conditional GETs and byte ranges.
+
+    ETag / Last-Modified on every response; If-None-Match / If-Modified-Since → 304;
+    ``Range`` (single → 206, several → ``multipart/byteranges``) honoured unless a stale
+    If-Range says the client holds another version. Bodies go out via ``socket.sendfile``.
+    """
+    with path.open("rb") as f:
+        st = os.fstat(f.fileno())
+        size = int(st.st_size)
+        etag = _file_etag(st, content_id)
+        last_modified = email.utils.formatdate(st.st_mtime, usegmt=True)
+
+        def validators() -> None:
+            handler.send_header("ETag", etag)
+            handler.send_header("Last-Modified", last_modified)
+            handler.send_header("Cache-Control", cache_control)
+
+        if _not_modified(handler, etag, st.st_mtime):
+            handler.send_response(304)
+            validators()
+            handler.end_headers()
+            return
+
+        spans = None
+        if allow_ranges and _if_range_matches(handler, etag, st.st_mtime):
+            spans = _parse_range_set(handler.headers.get("Range"), size)
+
+        if spans is not None and not spans:
+            handler.send_response(416)
+            handler.send_header("Content-Range", f"bytes */{size}")
+            handler.send_header("Content-Length", "0")
+            validators()
+            handler.end_headers()
+            return
+
+        if spans is None:
+            handler.send_response(200)
+            handler.send_header("Content-Type", content_type)
+            handler.send_header("Content-Length", str(size))
+            validators()
+            if allow_ranges:
+                handler.send_header("Accept-Ranges", "bytes")
+            handler.end_headers()
+            if handler.command != "HEAD":
+                _send_file_span(handler, f, 0, size)
+            return
+
+        if len(spans) == 1:
+            start, end = spans[0]
+            handler.send_response(206)
+            handler.send_header("Content-Type", content_type)
+            handler.send_header("Content-Length", str(end - start + 1))
+            handler.send_header("Content-Range", f"bytes {start}-{end}/{size}")
             handler.send_header("Accept-Ranges", "bytes")
+            validators()
+            handler.end_headers()
+            if handler.command != "HEAD":
+                _send_file_span(handler, f, start, end - start + 1)
+            return
+
+        boundary = uuid.uuid4().hex
+        heads = [
+            (
+                f"\r\n--{boundary}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+            ).encode("latin-1")
+            for start, end in spans
+        ]
+        tail = f"\r\n--{boundary}--\r\n".encode("latin-1")
+        length = sum(len(h) for h in heads) + sum(e - s + 1 for s, e in spans) + len(tail)
+        handler.send_response(206)
+        handler.send_header("Content-Type", f"multipart/byteranges; boundary={boundary}")
+        handler.send_header("Content-Length", str(length))
+        handler.send_header("Accept-Ranges", "bytes")
+        validators()
         handler.end_headers()
         if handler.command == "HEAD":
             return
-        with path.open("rb") as f:
-            while True:
-                buf = f.read(1024 * 1024)
-                if not buf:
-                    break
-                handler.wfile.write(buf)
-        return
-
-    start, end = rng
-    length = end - start + 1
-    handler.send_response(206)
-    handler.send_header("Content-Type", content_type)
-    handler.send_header("Content-Length", str(length))
-    handler.send_header("Content-Range", f"bytes {start}-{end}/{size}")
-    handler.send_header("Accept-Ranges", "bytes")
-    handler.send_header("Cache-Control", cache_control)
-    handler.end_headers()
-    if handler.command == "HEAD":
-        return
-    with path.open("rb") as f:
-        f.seek(start)
-        remaining = length
-        while remaining > 0:
-            chunk = f.read(min(1024 * 1024, remaining))
-            if not chunk:
-                break
-            handler.wfile.write(chunk)
-            remaining -= len(chunk)
+        for head, (start, end) in zip(heads, spans):
+            handler.wfile.write(head)
+            _send_file_span(handler, f, start, end - start + 1)
+        handler.wfile.write(tail)
 
 
 def _extract_outputs_from_history(history_obj: Any) -> List[Dict[str, Any]]:
@@ -7502,6 +8031,8 @@ class ServerConfig:
     discovery_index_path: Path
     factory_db_path: Path
     factory_browse_roots: List[Dict[str, Any]]
+    discovery_scan_workers: int = 1
+    discovery_scan_io_mb_per_s: float = 0.0
 
 
 def _resolve_workspace_root(base: Path) -> Path:
@@ -9296,6 +9827,9 @@ class Handler(BaseHTTPRequestHandler):
           ?since_days=N — keep items with mtime within last N days
           ?library=og|wip|all
           ?limit= — max items after sort (default 800, max 8000)
+          ?offset= — skip this many filtered items (page with ``next_offset``)
+
+        Rows are paged out of the ``discovery_index.sqlite`` mirror; the JSON index is the export.
         """
         cfg = self.server.cfg
         refresh = False
@@ -9303,6 +9837,12 @@ class Handler(BaseHTTPRequestHandler):
             if str(v).strip().lower() in ("1", "true", "yes", "on"):
                 refresh = True
                 break
+        # full=1 ignores the scan manifest and re-hashes every file (verification / corruption recovery).
+        full_scan = False
+        for v in q.get("full", []):
+            if str(v).strip().lower() in ("1", "true", "yes", "on"):
+                full_scan = True
+                break
 
         qtext = (q.get("q") or [""])[0].strip().lower()
         since_days: Optional[float] = None
@@ -9324,17 +9864,27 @@ class Handler(BaseHTTPRequestHandler):
             if li is not None:
                 limit = max(1, min(8000, int(li)))
                 break
+        offset = 0
+        for v in q.get("offset", []):
+            oi = _safe_int(v)
+            if oi is not None:
+                offset = max(0, int(oi))
+                break
 
         idx_path = cfg.discovery_index_path
         health_path = _discovery_index_health_path(idx_path)
-        payload: Dict[str, Any]
+        # Full JSON document only when just built (or no SQLite mirror); otherwise index_meta
+        # comes from the store and rows are paged out of SQLite.
+        payload: Optional[Dict[str, Any]] = None
+        index_meta: Dict[str, Any]
+        store = None
         health: Optional[Dict[str, Any]] = None
         from_cache = False
         if refresh or not idx_path.exists():
             previous_payload = _load_discovery_index_disk(idx_path)
             try:
-                payload = _build_discovery_og_wip_index(cfg)
-                _atomic_write_json(idx_path, payload)
+                payload = _build_discovery_og_wip_index(cfg, incremental=not full_scan)
+                _discovery_write_index(cfg, payload)
                 health = _build_discovery_index_health(
                     cfg,
                     previous_index=previous_payload,
@@ -9346,31 +9896,37 @@ class Handler(BaseHTTPRequestHandler):
             except Exception as e:
                 return _json_response(self, 500, {"error": "discovery_scan_failed", "detail": str(e)})
         else:
-            loaded = _load_discovery_index_disk(idx_path)
-            if loaded is None:
-                try:
-                    payload = _build_discovery_og_wip_index(cfg)
-                    _atomic_write_json(idx_path, payload)
-                    health = _build_discovery_index_health(
-                        cfg,
-                        previous_index=None,
-                        current_index=payload,
-                        reason="rebuild_bad_cache",
-                        from_cache=False,
-                    )
-                    _atomic_write_json(health_path, health)
-                except Exception as e:
-                    return _json_response(self, 500, {"error": "discovery_scan_failed", "detail": str(e)})
-            else:
-                payload = loaded
+            store = _discovery_index_store_open(cfg)
+            store_meta = _discovery_index_store_meta(store) if store is not None else None
+            if store_meta is not None and int(store_meta.get("version") or 0) >= 5:
+                index_meta = store_meta
                 from_cache = True
+            else:
+                loaded = _load_discovery_index_disk(idx_path)
+                if loaded is None:
+                    try:
+                        payload = _build_discovery_og_wip_index(cfg, incremental=not full_scan)
+                        _discovery_write_index(cfg, payload)
+                        health = _build_discovery_index_health(
+                            cfg,
+                            previous_index=None,
+                            current_index=payload,
+                            reason="rebuild_bad_cache",
+                            from_cache=False,
+                        )
+                        _atomic_write_json(health_path, health)
+                    except Exception as e:
+                        return _json_response(self, 500, {"error": "discovery_scan_failed", "detail": str(e)})
+                else:
+                    payload = loaded
+                    from_cache = True
 
         # Regroup when on-disk index predates (lib, exact-stem) merge for mp4+png pairs.
         try:
-            if int(payload.get("version") or 0) < 5:
+            if payload is not None and int(payload.get("version") or 0) < 5:
                 previous_payload = payload
-                payload = _build_discovery_og_wip_index(cfg)
-                _atomic_write_json(idx_path, payload)
+                payload = _build_discovery_og_wip_index(cfg, incremental=not full_scan)
+                _discovery_write_index(cfg, payload)
                 health = _build_discovery_index_health(
                     cfg,
                     previous_index=previous_payload,
@@ -9382,14 +9938,19 @@ class Handler(BaseHTTPRequestHandler):
                 from_cache = False
         except Exception as e:
             return _json_response(self, 500, {"error": "discovery_scan_failed", "detail": str(e)})
+        if payload is not None:
+            index_meta = payload
+            if store is None:
+                store = _discovery_index_store_open(cfg)
 
         if health is None:
             health = _load_discovery_health_disk(health_path)
-            if not health or health.get("current_updated_at") != payload.get("updated_at"):
+            if not health or health.get("current_updated_at") != index_meta.get("updated_at"):
+                current = payload if payload is not None else _load_discovery_index_disk(idx_path)
                 health = _build_discovery_index_health(
                     cfg,
                     previous_index=None,
-                    current_index=payload,
+                    current_index=current or {},
                     reason="cache_validation",
                     from_cache=from_cache,
                 )
@@ -9398,58 +9959,81 @@ class Handler(BaseHTTPRequestHandler):
                 except Exception:
                     pass
 
-        items_in = payload.get("items")
-        if not isinstance(items_in, list):
-            items_in = []
-
         now = time.time()
         since_cut = None
         if since_days is not None and since_days > 0:
             since_cut = now - float(since_days) * 86400.0
 
         filtered: List[Dict[str, Any]] = []
-        for it in items_in:
-            if not isinstance(it, dict):
-                continue
-            lib = it.get("library")
-            if lib_filter != "all" and lib != lib_filter:
-                continue
-            rp = str(it.get("relpath") or "")
-            nm = str(it.get("name") or "")
-            if qtext:
-                blob_parts = [rp.lower(), nm.lower()]
-                mems = it.get("members")
-                if isinstance(mems, list):
-                    for mm in mems:
-                        if isinstance(mm, dict):
-                            blob_parts.append(str(mm.get("relpath") or "").lower())
-                            blob_parts.append(str(mm.get("name") or "").lower())
-                blob = " ".join(blob_parts)
-                if qtext not in blob:
+        total_after_filter = 0
+        if store is not None:
+            try:
+                from discovery_index_store import query_library  # type: ignore
+
+                filtered, total_after_filter = query_library(
+                    store,
+                    library=lib_filter,
+                    q=qtext,
+                    since_mtime=since_cut,
+                    limit=limit,
+                    offset=offset,
+                )
+            except Exception:
+                store.close()
+                store = None
+                if payload is None:
+                    payload = _load_discovery_index_disk(idx_path) or {}
+            else:
+                store.close()
+        if store is None:
+            items_in = (payload or {}).get("items")
+            if not isinstance(items_in, list):
+                items_in = []
+            for it in items_in:
+                if not isinstance(it, dict):
                     continue
-            if since_cut is not None:
-                try:
-                    mt = float(it.get("mtime") or 0)
-                except Exception:
-                    mt = 0.0
-                if mt < since_cut:
+                lib = it.get("library")
+                if lib_filter != "all" and lib != lib_filter:
                     continue
-            filtered.append(it)
+                rp = str(it.get("relpath") or "")
+                nm = str(it.get("name") or "")
+                if qtext:
+                    blob_parts = [rp.lower(), nm.lower()]
+                    mems = it.get("members")
+                    if isinstance(mems, list):
+                        for mm in mems:
+                            if isinstance(mm, dict):
+                                blob_parts.append(str(mm.get("relpath") or "").lower())
+                                blob_parts.append(str(mm.get("name") or "").lower())
+                    blob = " ".join(blob_parts)
+                    if qtext not in blob:
+                        continue
+                if since_cut is not None:
+                    try:
+                        mt = float(it.get("mtime") or 0)
+                    except Exception:
+                        mt = 0.0
+                    if mt < since_cut:
+                        continue
+                filtered.append(it)
+            total_after_filter = len(filtered)
+            filtered = filtered[offset : offset + limit]
 
-        total_after_filter = len(filtered)
-        truncated = total_after_filter > limit
-        filtered = filtered[:limit]
+        next_offset = offset + len(filtered)
+        truncated = total_after_filter > next_offset
 
         out = {
-            "version": payload.get("version", 1),
-            "updated_at": payload.get("updated_at"),
+            "version": index_meta.get("version", 1),
+            "updated_at": index_meta.get("updated_at"),
             "index_path": str(idx_path),
             "from_cache": from_cache,
-            "scan_ms": payload.get("scan_ms"),
-            "item_count_total": payload.get("item_count"),
+            "scan_ms": index_meta.get("scan_ms"),
+            "item_count_total": index_meta.get("item_count"),
             "item_count_filtered": total_after_filter,
             "truncated": truncated,
             "limit": limit,
+            "offset": offset,
+            "next_offset": next_offset if truncated else None,
             "health": health,
             "items": filtered,
         }
@@ -9491,16 +10075,32 @@ class Handler(BaseHTTPRequestHandler):
         if not gid and not rel:
             return _json_response(self, 400, {"ok": False, "error": "missing_group_id_or_relpath"})
         idx_path = cfg.discovery_index_path
-        idx = _load_discovery_index_disk(idx_path) if idx_path.exists() else None
-        if not isinstance(idx, dict):
-            return _json_response(self, 400, {"ok": False, "error": "discovery_index_missing", "detail": str(idx_path)})
         item: Optional[Dict[str, Any]] = None
-        if gid:
-            item = _discovery_index_items_by_group_id(idx).get(gid)
-        if item is None and rel:
-            norm = _normalize_rel_posix(rel)
-            if norm:
-                item = _discovery_item_for_relpath(idx, norm)
+        store = _discovery_index_store_open(cfg)
+        if store is not None:
+            try:
+                from discovery_index_store import lookup_by_group_id, lookup_by_relpath  # type: ignore
+
+                if gid:
+                    item = lookup_by_group_id(store, gid)
+                if item is None and rel:
+                    norm = _normalize_rel_posix(rel)
+                    if norm:
+                        item = lookup_by_relpath(store, norm)
+            finally:
+                store.close()
+        else:
+            idx = _load_discovery_index_disk(idx_path) if idx_path.exists() else None
+            if not isinstance(idx, dict):
+                return _json_response(
+                    self, 400, {"ok": False, "error": "discovery_index_missing", "detail": str(idx_path)}
+                )
+            if gid:
+                item = _discovery_index_items_by_group_id(idx).get(gid)
+            if item is None and rel:
+                norm = _normalize_rel_posix(rel)
+                if norm:
+                    item = _discovery_item_for_relpath(idx, norm)
         if not isinstance(item, dict) and rel:
             item = _discovery_synthetic_library_item_for_workspace_media(cfg, rel)
         if not isinstance(item, dict):
@@ -9836,21 +10436,34 @@ class Handler(BaseHTTPRequestHandler):
 
     def _handle_discovery_asset_ratings_get(self, q: Dict[str, List[str]]) -> None:
         """
-        GET /api/discovery/asset-ratings?relpath=...
+        GET /api/discovery/asset-ratings?relpath=...&contributors_limit=48&contributors_offset=0
 
         Per-asset ratings explorer: explicit XMP (with disk verification), source-inferred rollup,
-        workflow graph_hash rollup, cited sources, and contributor evidence lists.
+        workflow graph_hash rollup, cited sources, and contributor evidence lists. Rollups come
+        from the aggregate tables in ratings.sqlite; contributor lists page with
+        ``contributors_offset`` (``contributors_next_offset`` on each lens).
         """
         cfg = self.server.cfg
         rel = (q.get("relpath") or [""])[0].strip()
         if not rel:
             return _json_response(self, 400, {"ok": False, "error": "missing_relpath"})
+        try:
+            contributors_limit = max(0, min(500, int((q.get("contributors_limit") or ["48"])[0])))
+            contributors_offset = max(0, int((q.get("contributors_offset") or ["0"])[0]))
+        except ValueError:
+            return _json_response(self, 400, {"ok": False, "error": "bad_contributors_page"})
         idx_path = cfg.discovery_index_path
         idx = _load_discovery_index_disk(idx_path) if idx_path.exists() else None
         if not isinstance(idx, dict):
             return _json_response(self, 400, {"ok": False, "error": "discovery_index_missing", "detail": str(idx_path)})
         try:
-            payload = _discovery_compute_asset_ratings(cfg, idx, rel)
+            payload = _discovery_compute_asset_ratings(
+                cfg,
+                idx,
+                rel,
+                contributors_limit=contributors_limit,
+                contributors_offset=contributors_offset,
+            )
         except Exception as e:
             return _json_response(self, 500, {"ok": False, "error": "asset_ratings_failed", "detail": str(e)})
         status = 200 if payload.get("ok") else 404 if payload.get("error") == "ratings_index_missing" else 400
@@ -10071,7 +10684,11 @@ class Handler(BaseHTTPRequestHandler):
         except Exception as e:
             return _json_response(self, 500, {"ok": False, "error": "rating_set_failed", "detail": str(e)})
         _invalidate_ratings_caches(cfg)
-        return _json_response(self, 200, {"ok": True, "saved": saved})
+        payload: Dict[str, Any] = {"ok": True, "saved": saved}
+        heuristics = _refresh_heuristics_for_output(cfg, saved if isinstance(saved, dict) else {})
+        if heuristics is not None:
+            payload["heuristics"] = heuristics
+        return _json_response(self, 200, payload)
 
     def _handle_discovery_asset_appetite_set_post(self) -> None:
         """
@@ -10095,7 +10712,11 @@ class Handler(BaseHTTPRequestHandler):
         except Exception as e:
             return _json_response(self, 500, {"ok": False, "error": "appetite_set_failed", "detail": str(e)})
         _invalidate_ratings_caches(cfg)
-        return _json_response(self, 200, {"ok": True, "saved": saved})
+        payload: Dict[str, Any] = {"ok": True, "saved": saved}
+        heuristics = _refresh_heuristics_for_output(cfg, saved if isinstance(saved, dict) else {})
+        if heuristics is not None:
+            payload["heuristics"] = heuristics
+        return _json_response(self, 200, payload)
 
     def _handle_discovery_disposition_catalog_get(self, q: Dict[str, List[str]]) -> None:
         """GET /api/discovery/disposition-catalog — merged marker catalog."""
@@ -11246,6 +11867,18 @@ class ExperimentsServer(ThreadingHTTPServer):
         self.cfg = cfg
 
 
+def _env_number(name: str, default: Any, cast: Callable[[str], Any]) -> Any:
+    """``cast(env[name])`` for argparse defaults; a malformed value warns and falls back."""
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return cast(raw)
+    except ValueError:
+        print(f"warning: ignoring {name}={raw!r} (expected {cast.__name__}); using {default}", file=sys.stderr)
+        return default
+
+
 def main() -> int:
     ap = argparse.ArgumentParser(description="Serve Experiments UI API + React static frontend")
     ap.add_argument("--host", default="0.0.0.0")
@@ -11260,6 +11893,20 @@ def main() -> int:
         help="Browse root for Create from WIP (default: <output>/output/wip). "
         "Relative to workspace unless absolute. Env: EXPERIMENTS_UI_WIP_ROOT.",
     )
+    ap.add_argument(
+        "--discovery-scan-workers",
+        type=int,
+        default=_env_number("EXPERIMENTS_UI_DISCOVERY_SCAN_WORKERS", 1, int),
+        help="Threads for discovery rescan hashing / PNG probes (1 = serial). "
+        "Env: EXPERIMENTS_UI_DISCOVERY_SCAN_WORKERS.",
+    )
+    ap.add_argument(
+        "--discovery-scan-io-mbps",
+        type=float,
+        default=_env_number("EXPERIMENTS_UI_DISCOVERY_SCAN_IO_MBPS", 0.0, float),
+        help="Cap discovery rescan hashing reads at this many MiB/s across workers so Comfy model "
+        "loads on the same disk are not starved (0 = unthrottled). Env: EXPERIMENTS_UI_DISCOVERY_SCAN_IO_MBPS.",
+    )
     args = ap.parse_args()
 
     base = Path(args.workspace_root) if args.workspace_root else Path(__file__).resolve().parent.parent
@@ -11299,6 +11946,8 @@ def main() -> int:
         discovery_index_path=discovery_index_path,
         factory_db_path=factory_db_path,
         factory_browse_roots=_factory_browse_roots(ws, output_root),
+        discovery_scan_workers=max(1, int(args.discovery_scan_workers)),
+        discovery_scan_io_mb_per_s=max(0.0, float(args.discovery_scan_io_mbps)),
     )
     server = ExperimentsServer((args.host, int(args.port)), cfg)
     try:
@@ -11319,6 +11968,10 @@ def main() -> int:
     print(f"[experiments-ui] orchestrator_state={cfg.orchestrator_state_path}")
     print(f"[experiments-ui] queue_ledger_state={cfg.queue_ledger_state_path}")
     print(f"[experiments-ui] discovery_index={cfg.discovery_index_path}")
+    print(
+        f"[experiments-ui] discovery_scan workers={cfg.discovery_scan_workers} "
+        f"io_mbps={cfg.discovery_scan_io_mb_per_s or 'unthrottled'}"
+    )
     print(f"[experiments-ui] factory_db={cfg.factory_db_path}")
     print(f"[experiments-ui] factory_browse_roots={cfg.factory_browse_roots}")
     print(
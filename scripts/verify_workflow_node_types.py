@@ -8,6 +8,11 @@ Usage:
 
 Optional: compare against a saved snapshot instead of live server:
   python verify_workflow_node_types.py --workflow wf.json --object-info-json snapshot.json
+
+Without --object-info-json the persistent snapshot store (workspace/scripts/comfy_object_info_store.py)
+is used: /object_info is only downloaded when the server's node-set fingerprint changed, and the
+newest stored snapshot is used when the server is down (or with --offline). Types missing from a
+stored snapshot are confirmed against a live /object_info before they are reported.
 """
 from __future__ import annotations
 
@@ -15,11 +20,16 @@ import argparse
 import json
 import os
 import sys
-import urllib.error
-import urllib.request
 from pathlib import Path
 from typing import Any, Dict, Set
 
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+_SCRIPTS = _REPO_ROOT / "workspace" / "scripts"
+if str(_SCRIPTS) not in sys.path:
+    sys.path.insert(0, str(_SCRIPTS))
+
+from comfy_object_info_store import ObjectInfoError, load_object_info, recheck_missing_node_types  # noqa: E402
+
 
 def collect_types(workflow: Dict[str, Any]) -> Set[str]:
     out: Set[str] = set()
@@ -32,18 +42,13 @@ def collect_types(workflow: Dict[str, Any]) -> Set[str]:
     return out
 
 
-def fetch_object_info(server: str) -> Dict[str, Any]:
-    url = server.rstrip("/") + "/object_info"
-    req = urllib.request.Request(url, method="GET")
-    with urllib.request.urlopen(req, timeout=60) as resp:
-        return json.loads(resp.read().decode("utf-8"))
-
-
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--workflow", "-w", required=True, help="UI workflow JSON path")
     ap.add_argument("--server", "-s", default=os.environ.get("COMFY_SERVER", "http://127.0.0.1:8188"))
     ap.add_argument("--object-info-json", help="Use this file instead of GET /object_info")
+    ap.add_argument("--offline", action="store_true", help="Use the newest stored snapshot; no HTTP")
+    ap.add_argument("--refresh", action="store_true", help="Re-download /object_info into the snapshot store")
     args = ap.parse_args()
 
     wf = json.loads(Path(args.workflow).read_text(encoding="utf-8"))
@@ -51,14 +56,19 @@ def main() -> int:
 
     if args.object_info_json:
         obj_info = json.loads(Path(args.object_info_json).read_text(encoding="utf-8"))
+        registered = set(obj_info.keys()) if isinstance(obj_info, dict) else set()
     else:
         try:
-            obj_info = fetch_object_info(args.server)
-        except urllib.error.URLError as e:
+            snap = load_object_info(args.server, offline=args.offline, refresh=args.refresh, timeout_s=60)
+        except ObjectInfoError as e:
             print(f"Failed to fetch {args.server}/object_info: {e}", file=sys.stderr)
             return 2
-
-    registered = set(obj_info.keys()) if isinstance(obj_info, dict) else set()
+        if not args.offline:
+            # Node packs that only add Python files do not move the fingerprint: confirm live.
+            snap = recheck_missing_node_types(snap, types, timeout_s=60)
+        if snap.source == "offline":
+            print(f"Using stored object_info snapshot {snap.fingerprint} (server unreachable or --offline)", file=sys.stderr)
+        registered = set(snap.node_types)
     missing = sorted(t for t in types if t not in registered)
 
     print(f"Workflow types: {len(types)}", file=sys.stderr)
@@ -226,11 +226,14 @@ export async function fetchShapeFactoryWorkProducts(opts?: {
   limit?: number;
   hourlyOnly?: boolean;
   family?: string;
+  /** Opaque ``next_cursor`` from the previous page. */
+  cursor?: string;
 }): Promise<WorkProductsResponse> {
   const sp = new URLSearchParams();
   if (opts?.limit != null) sp.set("limit", String(opts.limit));
   if (opts?.hourlyOnly === false) sp.set("hourly_only", "0");
   if (opts?.family) sp.set("family", opts.family);
+  if (opts?.cursor) sp.set("cursor", opts.cursor);
   const qs = sp.toString();
   const r = await fetch(`/api/shape-factory/work-products${qs ? `?${qs}` : ""}`);
   const j = (await r.json().catch(() => ({}))) as WorkProductsResponse;
@@ -1415,9 +1418,18 @@ export async function fetchDiscoveryAssetLineage(
   return j;
 }
 
-export async function fetchDiscoveryAssetRatings(relpath: string): Promise<DiscoveryAssetRatingsResponse> {
+export async function fetchDiscoveryAssetRatings(
+  relpath: string,
+  opts?: {
+    contributorsLimit?: number;
+    /** ``contributors_next_offset`` from a lens block of the previous response. */
+    contributorsOffset?: number;
+  },
+): Promise<DiscoveryAssetRatingsResponse> {
   const sp = new URLSearchParams();
   sp.set("relpath", relpath);
+  if (opts?.contributorsLimit != null) sp.set("contributors_limit", String(opts.contributorsLimit));
+  if (opts?.contributorsOffset) sp.set("contributors_offset", String(opts.contributorsOffset));
   const r = await fetch(`/api/discovery/asset-ratings?${sp.toString()}`);
   const j = (await r.json()) as DiscoveryAssetRatingsResponse & { error?: string; path?: string };
   if (!r.ok) {
@@ -484,6 +484,8 @@ export type DiscoveryAssetRatingsLensBlock = {
   n?: number;
   keepers_4plus?: number;
   contributors?: DiscoveryAssetRatingsContributor[];
+  /** Offset of the next contributors page; null when this page was the last. */
+  contributors_next_offset?: number | null;
   basename?: string;
   graph_hash?: string;
   catalog_slug?: string;
@@ -2010,6 +2012,10 @@ export type WorkProductsResponse = {
   family?: string | null;
   limit?: number;
   count?: number;
+  /** Cursor this page was requested with (null = first page). */
+  cursor?: string | null;
+  /** Pass as ``cursor`` to fetch the next page; null when this is the last page. */
+  next_cursor?: string | null;
   families?: WorkProductFamilyOption[];
   /** Source family → next pipeline-step family for Extend picker defaults. */
   extend_family_defaults?: Record<string, string>;
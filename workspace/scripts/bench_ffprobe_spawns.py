@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ffprobe subprocess spawns during ``shape_factory status --deposit``.
+
+Builds a throwaway data root with N completed jobs (two mp4 outputs each) and a fake
+``ffprobe`` on PATH that counts its invocations. Comfy is stubbed (empty queue, no
+history → filesystem output discovery). Runs ``--passes`` hourly-style status+deposit
+passes twice:
+
+- ``uncached`` — every probe spawns (pre-``media_probe`` behaviour)
+- ``cached``   — ``media_probe`` memo + SQLite cache (memo cleared between passes, as
+  each hourly run is a new process)
+
+A fraction of fake outputs omit ``nb_frames`` (like some webm/mkv muxes), so status keeps
+re-probing them every pass — the case the persistent cache is for.
+
+  python3 bench_ffprobe_spawns.py --jobs 40 --passes 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+from unittest import mock
+
+import media_probe
+import shape_factory as sf
+
+_FAKE_FFPROBE = """#!{python}
+import json, os, sys
+with open(os.environ["BENCH_FFPROBE_COUNTER"], "a") as fh:
+    fh.write("1\\n")
+path = sys.argv[-1]
+stream = {{"codec_type": "video", "width": 1280, "height": 720, "avg_frame_rate": "18/1", "duration": "4.0"}}
+if "nofc" not in os.path.basename(path):
+    stream["nb_frames"] = "72"
+print(json.dumps({{"streams": [stream], "format": {{"duration": "4.0", "format_name": "mov,mp4"}}}}))
+"""
+
+
+def _seed(root: Path, *, jobs: int, no_frame_count_every: int) -> Path:
+    fam = root / "shape_factory" / "jobs" / "BenchFam"
+    fam.mkdir(parents=True)
+    day = root / "output" / "og" / "2026-10-01"
+    day.mkdir(parents=True)
+    for i in range(jobs):
+        key = f"bench_{i:04d}" + ("_nofc" if no_frame_count_every and i % no_frame_count_every == 0 else "")
+        for n in (1, 2):
+            (day / f"{key}_{n:05d}.mp4").write_bytes(b"\0" * 64)
+        job = {
+            "job_key": key,
+            "family_slug": "BenchFam",
+            "output_prefix": f"og/2026-10-01/{key}",
+            "submit": {"status": "queued", "prompt_id": f"pid-{i}", "submitted_at": "2026-10-01T00:00:00Z"},
+        }
+        (fam / f"{key}.job.json").write_text(json.dumps(job), encoding="utf-8")
+    return fam
+
+
+def _run(*, cached: bool, jobs: int, passes: int, no_frame_count_every: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="bench_ffprobe_") as td:
+        root = Path(td)
+        fam = _seed(root, jobs=jobs, no_frame_count_every=no_frame_count_every)
+        bindir = root / "bin"
+        bindir.mkdir()
+        fake = bindir / "ffprobe"
+        fake.write_text(_FAKE_FFPROBE.format(python=sys.executable), encoding="utf-8")
+        fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+        counter = root / "spawns.txt"
+        counter.write_text("", encoding="utf-8")
+
+        env = {
+            "PATH": f"{bindir}{os.pathsep}{os.environ.get('PATH', '')}",
+            "BENCH_FFPROBE_COUNTER": str(counter),
+            media_probe.MEDIA_PROBE_CACHE_ENV: str(root / "probe.sqlite") if cached else "off",
+        }
+        real_probe = media_probe.probe_media
+
+        def uncached_probe(path: Any, **kw: Any) -> Dict[str, Any]:
+            return real_probe(path, **{**kw, "use_cache": False})
+
+        args = argparse.Namespace(
+            family="BenchFam",
+            job=None,
+            jobs_dir=None,
+            job_dir=str(fam.parent),
+            limit=None,
+            data_root=str(root),
+            server="http://comfy.invalid",
+            wait=False,
+            timeout=0,
+            poll=0,
+            deposit=True,
+            quiet=True,
+        )
+        patches = [
+            mock.patch.dict(os.environ, env),
+            mock.patch.object(sf, "fetch_comfy_queue", return_value={}),
+            mock.patch.object(sf, "fetch_comfy_history", return_value=None),
+            mock.patch.object(sf, "fetch_comfy_history_batch", return_value={}),
+            mock.patch.object(sf, "attach_model_io_timings", return_value=None),
+            mock.patch.object(sf, "DEFAULT_TIMINGS_LEDGER", root / "timings.jsonl"),
+        ]
+        if not cached:
+            patches += [
+                mock.patch.object(media_probe, "probe_media", uncached_probe),
+                mock.patch.object(sf, "probe_media", uncached_probe),
+            ]
+        per_pass = []
+        t0 = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for p in patches:
+                stack.enter_context(p)
+            for _ in range(passes):
+                media_probe.reset_probe_memo()
+                before = len(counter.read_text(encoding="utf-8").splitlines())
+                with contextlib.redirect_stdout(io.StringIO()):
+                    sf.cmd_status(args)
+                after = len(counter.read_text(encoding="utf-8").splitlines())
+                per_pass.append(after - before)
+        return {
+            "spawns": sum(per_pass),
+            "spawns_per_pass": per_pass,
+            "wall_s": round(time.perf_counter() - t0, 3),
+        }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Count ffprobe spawns saved by media_probe in status/deposit")
+    ap.add_argument("--jobs", type=int, default=40)
+    ap.add_argument("--passes", type=int, default=3, help="Hourly status+deposit passes")
+    ap.add_argument(
+        "--no-frame-count-every",
+        type=int,
+        default=4,
+        help="Every Nth job's outputs lack nb_frames (0 = none)",
+    )
+    args = ap.parse_args()
+    kw = {"jobs": args.jobs, "passes": args.passes, "no_frame_count_every": args.no_frame_count_every}
+    uncached = _run(cached=False, **kw)
+    cached = _run(cached=True, **kw)
+    print(
+        json.dumps(
+            {
+                "jobs": args.jobs,
+                "passes": args.passes,
+                "uncached": uncached,
+                "cached": cached,
+                "spawns_saved": uncached["spawns"] - cached["spawns"],
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
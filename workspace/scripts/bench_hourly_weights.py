@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-hour replay weighting + linear ``_weighted_choice`` vs ``hourly_weight_engine``.
+
+Builds a synthetic replay table (base rating weights plus the five multiplier columns
+hourly replay folds in) and draws one recipe per hour with ``random.Random(cursor)``:
+
+- ``legacy``   — the pre-engine planner: every hour re-folds the multipliers per recipe and
+  walks the weights linearly (timed over ``--legacy-hours`` and reported per hour)
+- ``prefix``   — ``WeightColumns`` folded once, ``PrefixSampler.choose`` per hour (bisect)
+- ``batch``    — same sampler, ``choose_many`` over all hours (one ``searchsorted`` with NumPy)
+
+Usage:
+  python3 bench_hourly_weights.py                       # 10k recipes, 50k hours
+  python3 bench_hourly_weights.py --recipes 2000 --hours 200000 --legacy-hours 500
+
+Every mode must pick the same recipe for the hours they share; the run aborts otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+from hourly_weight_engine import PrefixSampler, WeightColumns, engine_name
+
+FACTOR_NAMES = ("recent_five_star", "recent_combo", "recent_source", "source_promotion", "archive_age")
+
+
+def synth_columns(n_recipes: int, *, seed: int = 0) -> Tuple[List[float], List[Tuple[str, List[float]]]]:
+    """Base weights (some omitted → 0) and multiplier columns shaped like hourly's."""
+    rng = random.Random(seed)
+    base = [0.0 if rng.random() < 0.03 else 0.25 + rng.random() * 4.0 for _ in range(n_recipes)]
+    cols: List[Tuple[str, List[float]]] = []
+    for name in FACTOR_NAMES:
+        cols.append((name, [rng.choice((1.0, 1.0, 1.0, 0.35, 1.6, 2.0)) for _ in range(n_recipes)]))
+    return base, cols
+
+
+def _legacy_pick(base: List[float], cols: List[Tuple[str, List[float]]], rng: random.Random) -> int:
+    weights = list(base)
+    for _name, col in cols:
+        weights = [w * f for w, f in zip(weights, col)]
+    total = sum(max(0.0, w) for w in weights)
+    if total <= 0:
+        return rng.randrange(len(weights))
+    pick = rng.random() * total
+    acc = 0.0
+    for i, w in enumerate(weights):
+        acc += max(0.0, w)
+        if acc >= pick:
+            return i
+    return len(weights) - 1
+
+
+def run_bench(n_recipes: int, *, hours: int, legacy_hours: int, seed: int) -> Dict[str, Any]:
+    base, cols = synth_columns(n_recipes, seed=seed)
+    cursors = list(range(hours))
+    legacy_hours = max(1, min(legacy_hours, hours))
+    modes: Dict[str, Any] = {}
+
+    t0 = time.perf_counter()
+    expect = [_legacy_pick(base, cols, random.Random(c)) for c in cursors[:legacy_hours]]
+    legacy_s = time.perf_counter() - t0
+    modes["legacy"] = {"hours": legacy_hours, "per_hour_ms": legacy_s * 1000 / legacy_hours}
+    modes["legacy"]["projected_total_ms"] = modes["legacy"]["per_hour_ms"] * hours
+
+    t0 = time.perf_counter()
+    columns = WeightColumns(base)
+    for name, col in cols:
+        columns.multiply(name, col)
+    sampler = PrefixSampler(columns.fold())
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    picks = [sampler.choose(random.Random(c)) for c in cursors]
+    prefix_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    batch = sampler.choose_many([random.Random(c) for c in cursors])
+    batch_s = time.perf_counter() - t0
+
+    if picks[:legacy_hours] != expect:
+        raise SystemExit("prefix: picks differ from legacy linear scan")
+    if batch != picks:
+        raise SystemExit("batch: picks differ from prefix")
+
+    for name, elapsed in (("prefix", prefix_s), ("batch", batch_s)):
+        modes[name] = {
+            "hours": hours,
+            "build_ms": build_s * 1000,
+            "total_ms": elapsed * 1000,
+            "per_hour_ms": elapsed * 1000 / max(1, hours),
+        }
+    for row in modes.values():
+        row["speedup_vs_legacy"] = round(modes["legacy"]["per_hour_ms"] / max(1e-9, row["per_hour_ms"]), 1)
+        for k in ("build_ms", "total_ms", "per_hour_ms", "projected_total_ms"):
+            if k in row:
+                row[k] = round(row[k], 4)
+    return {
+        "engine": engine_name(),
+        "recipes": n_recipes,
+        "hours": hours,
+        "unique_picks": len(set(picks)),
+        "modes": modes,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark hourly replay weighted sampling: legacy loop vs columns")
+    ap.add_argument("--recipes", type=int, default=10_000)
+    ap.add_argument("--hours", type=int, default=50_000)
+    ap.add_argument("--legacy-hours", type=int, default=200, help="Hours timed on the legacy path (it is slow)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    result = run_bench(args.recipes, hours=args.hours, legacy_hours=args.legacy_hours, seed=args.seed)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dict-of-lists lineage BFS (``list.pop(0)``) vs ``lineage_csr.LineageCSR``.
+
+Builds a synthetic lineage forest shaped like Discovery output chains (each new output
+has 1–3 parents among the previous 64 outputs, so chains run deep) and reports build time
+plus ancestor / descendant query time for:
+
+- ``dict_lists``   — legacy ``LineageGraph``: string dict-of-lists, ``list.pop(0)`` BFS
+- ``csr``          — interned ids + CSR arrays, ``deque`` BFS, closure cache disabled
+- ``csr_cached``   — same graph, bounded closure LRU (seeds repeat like ratings + appetite passes)
+
+Usage:
+  python3 bench_lineage_graph.py                     # 500k edges
+  python3 bench_lineage_graph.py --edges 50000 --queries 2000 --max-depth 12
+  python3 bench_lineage_graph.py --memory             # + retained MiB per representation
+
+Node names are shared by both representations (same ``pairs`` list), so retained memory
+is the adjacency structure plus the CSR's intern table.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from lineage_csr import LineageCSR
+
+
+def synth_edges(n_edges: int, *, seed: int = 0) -> List[Tuple[str, str]]:
+    """``(child, parent)`` pairs; parents are drawn from a recent window so chains get deep."""
+    rng = random.Random(seed)
+    pairs: List[Tuple[str, str]] = []
+    node = 1
+    while len(pairs) < n_edges:
+        child = f"og:stem:out_{node:07d}"
+        lo = max(0, node - 64)
+        for _ in range(rng.choice((1, 1, 1, 2, 3))):
+            parent_n = rng.randint(lo, node - 1)
+            pairs.append((child, f"og:stem:out_{parent_n:07d}"))
+            if len(pairs) >= n_edges:
+                break
+        node += 1
+    return pairs
+
+
+class _DictListsGraph:
+    """The pre-CSR ``LineageGraph`` traversal, kept here as the baseline."""
+
+    def __init__(self, pairs: List[Tuple[str, str]]) -> None:
+        self.parents_of: Dict[str, List[str]] = {}
+        self.children_of: Dict[str, List[str]] = {}
+        for child, parent in pairs:
+            self.parents_of.setdefault(child, []).append(parent)
+            self.children_of.setdefault(parent, []).append(child)
+
+    def _bfs(self, adj: Dict[str, List[str]], gid: str, max_depth: int) -> List[Tuple[str, int]]:
+        out: List[Tuple[str, int]] = []
+        seen: Set[str] = {gid}
+        frontier: List[Tuple[str, int]] = [(gid, 0)]
+        while frontier:
+            cur, depth = frontier.pop(0)
+            if depth >= max_depth:
+                continue
+            for nxt in adj.get(cur, []):
+                if nxt in seen:
+                    continue
+                seen.add(nxt)
+                out.append((nxt, depth + 1))
+                frontier.append((nxt, depth + 1))
+        return out
+
+    def ancestors(self, gid: str, *, max_depth: int) -> List[Tuple[str, int]]:
+        return self._bfs(self.parents_of, gid, max_depth)
+
+    def descendants(self, gid: str, *, max_depth: int) -> List[Tuple[str, int]]:
+        return self._bfs(self.children_of, gid, max_depth)
+
+
+def _time_queries(fn: Callable[[str], List[Tuple[str, int]]], seeds: List[str]) -> Tuple[float, int]:
+    t0 = time.perf_counter()
+    reached = 0
+    for s in seeds:
+        reached += len(fn(s))
+    return time.perf_counter() - t0, reached
+
+
+def _build_measured(build: Callable[[], Any], memory: bool) -> Tuple[Any, float, Any]:
+    """(graph, build seconds, retained MiB or None); tracemalloc slows the build, so timing is separate."""
+    t0 = time.perf_counter()
+    graph = build()
+    elapsed = time.perf_counter() - t0
+    if not memory:
+        return graph, elapsed, None
+    del graph
+    tracemalloc.start()
+    graph = build()
+    retained = tracemalloc.get_traced_memory()[0] / (1024 * 1024)
+    tracemalloc.stop()
+    return graph, elapsed, round(retained, 1)
+
+
+def run_bench(n_edges: int, *, queries: int, max_depth: int, seed: int, memory: bool = False) -> Dict[str, Any]:
+    pairs = synth_edges(n_edges, seed=seed)
+    rng = random.Random(seed + 1)
+    nodes = sorted({c for c, _ in pairs})
+    # Half the seeds repeat (ratings + appetite passes ask for the same outputs' ancestors).
+    uniq = [rng.choice(nodes) for _ in range(max(1, queries // 2))]
+    seeds = uniq + [rng.choice(uniq) for _ in range(queries - len(uniq))]
+    desc_seeds = [rng.choice(nodes[: max(1, len(nodes) // 50)]) for _ in range(max(1, queries // 20))]
+
+    out: Dict[str, Any] = {"edges": len(pairs), "nodes": len({n for p in pairs for n in p}), "max_depth": max_depth}
+    modes: Dict[str, Any] = {}
+
+    legacy, build, mib = _build_measured(lambda: _DictListsGraph(pairs), memory)
+    anc_s, anc_n = _time_queries(lambda g: legacy.ancestors(g, max_depth=max_depth), seeds)
+    desc_s, desc_n = _time_queries(lambda g: legacy.descendants(g, max_depth=max_depth), desc_seeds)
+    modes["dict_lists"] = {
+        "build_ms": build * 1000,
+        "retained_mib": mib,
+        "ancestors_ms": anc_s * 1000,
+        "descendants_ms": desc_s * 1000,
+    }
+    expect = (anc_n, desc_n)
+
+    for name, cache in (("csr", 0), ("csr_cached", 4096)):
+        csr, build, mib = _build_measured(lambda: LineageCSR.from_pairs(pairs, closure_cache_size=cache), memory)
+        anc_s, anc_n = _time_queries(lambda g: csr.ancestors(g, max_depth=max_depth), seeds)
+        desc_s, desc_n = _time_queries(lambda g: csr.descendants(g, max_depth=max_depth), desc_seeds)
+        if (anc_n, desc_n) != expect:
+            raise SystemExit(f"{name}: reached {(anc_n, desc_n)} nodes, dict_lists reached {expect}")
+        modes[name] = {
+            "build_ms": build * 1000,
+            "retained_mib": mib,
+            "ancestors_ms": anc_s * 1000,
+            "descendants_ms": desc_s * 1000,
+            "closure_hits": csr.closure_hits,
+        }
+
+    base = modes["dict_lists"]
+    for row in modes.values():
+        row["query_speedup_vs_dict_lists"] = round(
+            (base["ancestors_ms"] + base["descendants_ms"]) / max(1e-6, row["ancestors_ms"] + row["descendants_ms"]), 1
+        )
+        for k in ("build_ms", "ancestors_ms", "descendants_ms"):
+            row[k] = round(row[k], 2)
+    out["ancestor_queries"] = len(seeds)
+    out["descendant_queries"] = len(desc_seeds)
+    out["reached"] = {"ancestors": expect[0], "descendants": expect[1]}
+    out["modes"] = modes
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark lineage BFS: dict-of-lists vs CSR")
+    ap.add_argument("--edges", type=int, default=500_000)
+    ap.add_argument("--queries", type=int, default=4000, help="Ancestor queries (descendant queries = 1/20)")
+    ap.add_argument("--max-depth", type=int, default=8)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--memory", action="store_true", help="Also report retained graph memory (tracemalloc rebuild)")
+    args = ap.parse_args()
+    result = run_bench(args.edges, queries=args.queries, max_depth=args.max_depth, seed=args.seed, memory=args.memory)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: whole-file PNG text-chunk parse vs streaming / header-only reads.
+
+Builds (or reuses) a corpus of 4K PNGs laid out like Comfy SaveImage output
+(prompt + workflow tEXt ahead of many 64 KiB IDAT chunks), then reports bytes read
+and wall time for:
+
+- ``read_bytes``   — legacy: ``Path.read_bytes()`` + walk in memory
+- ``stream``       — ``read_png_text_chunks`` (seeks over image data, walks to IEND)
+- ``header_only``  — ``read_png_header_text_chunks`` (stops at first IDAT)
+
+Usage:
+  python3 bench_png_text_chunks.py                    # synthetic corpus in a temp dir
+  python3 bench_png_text_chunks.py --count 16 --repeat 5
+  python3 bench_png_text_chunks.py --corpus /path/to/og/2026-08-01   # real PNGs
+
+Timings are warm page cache after the first pass; bytes read is the honest cold-cache proxy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import struct
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from comfy_meta_lib import PNG_MAGIC, read_png_text_chunks_from_stream
+
+_IDAT_BLOCK = 65536
+
+
+def _chunk(ctype: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + ctype + data + struct.pack(">I", zlib.crc32(ctype + data) & 0xFFFFFFFF)
+
+
+def synth_comfy_png(path: Path, *, width: int = 3840, height: int = 2160, seed: int = 0) -> None:
+    """RGB PNG with Comfy-sized prompt/workflow tEXt chunks before IDAT."""
+    prompt = {str(i): {"class_type": "KSampler", "inputs": {"seed": seed + i, "steps": 20}} for i in range(120)}
+    workflow = {"nodes": [{"id": i, "type": "KSampler", "widgets_values": [seed + i] * 8} for i in range(120)], "links": []}
+    # Noise in part of each row so the image data compresses like a real render (~several MB).
+    noisy = width
+    pad = bytes(width * 3 - noisy)
+    raw = b"".join(b"\x00" + os.urandom(noisy) + pad for _ in range(height))
+    comp = zlib.compress(raw, 1)
+    parts: List[bytes] = [PNG_MAGIC, _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))]
+    parts.append(_chunk(b"tEXt", b"prompt\x00" + json.dumps(prompt).encode()))
+    parts.append(_chunk(b"tEXt", b"workflow\x00" + json.dumps(workflow).encode()))
+    for off in range(0, len(comp), _IDAT_BLOCK):
+        parts.append(_chunk(b"IDAT", comp[off : off + _IDAT_BLOCK]))
+    parts.append(_chunk(b"IEND", b""))
+    path.write_bytes(b"".join(parts))
+
+
+class _CountingReader(io.RawIOBase):
+    """Binary file wrapper that counts bytes actually read (seeks are free)."""
+
+    def __init__(self, fh: Any) -> None:
+        self._fh = fh
+        self.bytes_read = 0
+
+    def read(self, n: int = -1) -> bytes:  # type: ignore[override]
+        data = self._fh.read(n)
+        self.bytes_read += len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._fh.seek(offset, whence)
+
+    def readable(self) -> bool:
+        return True
+
+
+def _legacy_read_bytes(path: Path) -> int:
+    data = path.read_bytes()
+    read_png_text_chunks_from_stream(io.BytesIO(data), include_trailing=True)
+    return len(data)
+
+
+def _streamed(include_trailing: bool) -> Callable[[Path], int]:
+    def run(path: Path) -> int:
+        with path.open("rb") as fh:
+            counted = _CountingReader(fh)
+            read_png_text_chunks_from_stream(counted, include_trailing=include_trailing)  # type: ignore[arg-type]
+            return counted.bytes_read
+
+    return run
+
+
+def run_bench(paths: List[Path], *, repeat: int) -> Dict[str, Any]:
+    modes: Dict[str, Callable[[Path], int]] = {
+        "read_bytes": _legacy_read_bytes,
+        "stream": _streamed(True),
+        "header_only": _streamed(False),
+    }
+    out: Dict[str, Any] = {"files": len(paths), "bytes_on_disk": sum(p.stat().st_size for p in paths), "modes": {}}
+    for name, fn in modes.items():
+        best = float("inf")
+        bytes_read = 0
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            bytes_read = sum(fn(p) for p in paths)
+            best = min(best, time.perf_counter() - t0)
+        out["modes"][name] = {
+            "bytes_read": bytes_read,
+            "best_wall_ms": round(best * 1000, 2),
+            "per_file_ms": round(best * 1000 / max(1, len(paths)), 3),
+        }
+    base = out["modes"]["read_bytes"]
+    for name, row in out["modes"].items():
+        row["bytes_vs_read_bytes"] = round(row["bytes_read"] / max(1, base["bytes_read"]), 6)
+        row["speedup_vs_read_bytes"] = round(base["best_wall_ms"] / max(1e-6, row["best_wall_ms"]), 1)
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark PNG text-chunk readers on 4K PNGs")
+    ap.add_argument("--corpus", default=None, help="Directory of PNGs to read (default: synthesize)")
+    ap.add_argument("--count", type=int, default=8, help="Synthetic 4K PNGs to build")
+    ap.add_argument("--repeat", type=int, default=3, help="Passes per mode (best wall time kept)")
+    args = ap.parse_args()
+
+    if args.corpus:
+        paths = sorted(Path(args.corpus).expanduser().rglob("*.png"))
+        if not paths:
+            print(json.dumps({"ok": False, "error": "no_pngs", "corpus": args.corpus}))
+            return 1
+        print(json.dumps({"ok": True, "corpus": args.corpus, **run_bench(paths, repeat=args.repeat)}, indent=2))
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="bench_png_") as td:
+        paths = []
+        for i in range(max(1, args.count)):
+            p = Path(td) / f"ComfyUI_{i:05d}_.png"
+            synth_comfy_png(p, seed=i)
+            paths.append(p)
+        print(json.dumps({"ok": True, "corpus": "synthetic-3840x2160", **run_bench(paths, repeat=args.repeat)}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark: rating-sampler draws from the full discovery index vs the persisted pool.
+
+Writes a synthetic og/ ``_status`` tree (discovery index, lineage edges, heuristics,
+ratings.sqlite) of ``--items`` videos and times ``sample_rating_queue`` per mode:
+
+- ``uncached`` — ``use_pool=False``: filter + ``score_unrated_candidate`` every item
+- ``build``    — first pooled draw (scores every item into ``rating_sampler_pool.sqlite``)
+- ``warm``     — pooled draw with no input change (stamp check + in-memory pool rows)
+- ``event``    — pooled draw after one output is rated (re-scores it and its siblings)
+
+Usage:
+  python3 bench_rating_sampler.py                  # 20k videos
+  python3 bench_rating_sampler.py --items 50000 --limit 100
+
+Every pooled draw must return the same session candidates as ``uncached``; the run
+aborts otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from shape_factory_rating_sampler import sample_rating_queue
+from shape_factory_ratings import open_ratings_db, upsert_appetite_row, upsert_rating_row
+
+
+def synth_tree(root: Path, n_items: int, *, seed: int = 0) -> Path:
+    """``<root>/output/og`` with its ``_status`` indexes; returns the og root."""
+    rng = random.Random(seed)
+    og = root / "output" / "og"
+    status = og.parent / "_status"
+    status.mkdir(parents=True)
+    n_parents = max(1, n_items // 8)
+    workflows = [f"{rng.getrandbits(64):016x}" for _ in range(24)]
+    items: List[Dict[str, Any]] = []
+    edges: List[Dict[str, Any]] = []
+    for i in range(n_items):
+        gid = f"og:stem:fam_{i:06d}"
+        items.append(
+            {
+                "library": "og",
+                "relpath": f"output/og/2026-04-{1 + i % 28:02d}/FAM_{i:06d}.mp4",
+                "group_id": gid,
+                "mtime": 1_700_000_000 + i,
+                "workflow_fingerprint": rng.choice(workflows),
+                "has_embedded_prompt": rng.random() < 0.6,
+            }
+        )
+        edges.append({"child_group_id": gid, "parent_group_id": f"og:stem:src_{rng.randrange(n_parents)}"})
+    (status / "discovery_og_wip_index.json").write_text(json.dumps({"items": items}), encoding="utf-8")
+    (status / "discovery_lineage_edges.json").write_text(json.dumps({"edges": edges}), encoding="utf-8")
+    heuristics = {
+        "by_group_lineage": {f"og:stem:src_{p}": {"inferred": 1 + rng.random() * 4} for p in range(0, n_parents, 3)},
+        "by_pattern": {
+            f"FAM+p{j}": {"graph_hash": wf + "00", "inferred": 1 + rng.random() * 4, "n": rng.randrange(1, 9)}
+            for j, wf in enumerate(workflows[:16])
+        },
+    }
+    (status / "heuristics_index.json").write_text(json.dumps(heuristics), encoding="utf-8")
+    con = open_ratings_db(status / "ratings.sqlite", ratings_json=status / "ratings_index.json")
+    try:
+        for i in range(0, n_items, 7):
+            stars = rng.randrange(1, 6)
+            upsert_rating_row(
+                con,
+                asset_key=items[i]["relpath"],
+                row={"short_key": items[i]["relpath"][len("output/") : -len(".mp4")], "explicit": stars},
+                commit=False,
+            )
+        con.commit()
+    finally:
+        con.close()
+    return og
+
+
+def _rate(og: Path, relpath: str) -> None:
+    status = og.parent / "_status"
+    short_key = relpath[len("output/") : -len(".mp4")]
+    con = open_ratings_db(status / "ratings.sqlite", ratings_json=status / "ratings_index.json")
+    try:
+        axes = {"subject_beauty": 5, "render_quality": 4, "action_quality": 5}
+        upsert_rating_row(con, asset_key=relpath, row={"short_key": short_key, "explicit": 5, "axes": axes})
+        upsert_appetite_row(con, asset_key=relpath, short_key=short_key, appetite="more", facet="both")
+    finally:
+        con.close()
+
+
+def run_bench(n_items: int, *, limit: int, seed: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as td:
+        og = synth_tree(Path(td), n_items, seed=seed)
+        kwargs = dict(og_root=og, limit=limit, seed=seed, min_predicted=0.0, mode="mixed")
+        modes: Dict[str, float] = {}
+        pool_stats: Dict[str, Any] = {}
+
+        def timed(name: str, use_pool: bool) -> Dict[str, Any]:
+            t0 = time.perf_counter()
+            session = sample_rating_queue(use_pool=use_pool, **kwargs)
+            modes[name] = time.perf_counter() - t0
+            if use_pool:
+                pool_stats[name] = session["candidate_pool"]
+            return session
+
+        def check(name: str, session: Dict[str, Any], expect: Dict[str, Any]) -> None:
+            if session["candidates"] != expect["candidates"] or session["stats"] != expect["stats"]:
+                raise SystemExit(f"{name}: session differs from the uncached draw")
+
+        expect = timed("uncached", False)
+        check("build", timed("build", True), expect)
+        check("warm", timed("warm", True), expect)
+        _rate(og, expect["candidates"][0]["relpath"])
+        session = timed("event", True)
+        check("event", session, sample_rating_queue(use_pool=False, **kwargs))
+
+    out: Dict[str, Any] = {}
+    for name, elapsed in modes.items():
+        out[name] = {
+            "total_ms": round(elapsed * 1000, 3),
+            "speedup_vs_uncached": round(modes["uncached"] / max(1e-9, elapsed), 1),
+        }
+    return {"items": n_items, "limit": limit, "modes": out, "pool": pool_stats}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark rating-sampler draws: uncached vs persisted pool")
+    ap.add_argument("--items", type=int, default=20_000)
+    ap.add_argument("--limit", type=int, default=100)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    result = run_bench(args.items, limit=args.limit, seed=args.seed)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
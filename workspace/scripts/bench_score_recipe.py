@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call ``score_recipe`` vs the compiled ``RecipeScorer`` over one recipe pool.
+
+Builds synthetic ratings / heuristics / appetite docs and a replay pool whose recipes
+share a limited set of (prompt profile, source picks) combinations, as hourly pools do:
+
+- ``legacy``  — ``score_recipe`` per recipe (tables and group ids re-resolved per call)
+- ``compiled`` — ``recipe_scorer(...).score_many`` (partials cached per prompt + sources)
+- ``warm``     — the same scorer again (every partial is a cache hit)
+
+Usage:
+  python3 bench_score_recipe.py                    # 10k recipes
+  python3 bench_score_recipe.py --recipes 50000 --sources 400
+
+All modes must return identical ``(weight, meta)`` pairs; the run aborts otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+from shape_factory_heuristics import RecipeScorer, score_recipe
+
+SHAPE = {"graph_hash": "f00d" * 16, "family": "FB9_GEX2"}
+
+
+def synth_pool(
+    n_recipes: int, *, n_sources: int, n_prompts: int, seed: int = 0
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], List[dict[str, Any]]]:
+    """Docs plus a recipe pool shaped like ``collect_replay_recipes`` output."""
+    rng = random.Random(seed)
+    sources = [f"X-Src-{i:04d}_OG_{i:05d}.mp4" for i in range(n_sources)]
+    prompts = [f"/catalog/prompt-{i:03d}.json" for i in range(n_prompts)]
+    outputs = [f"og/2026-04-{1 + i % 28:02d}/FB9_GEX2_{i:05d}" for i in range(n_recipes)]
+    heuristics = {
+        "updated_at": "2026-04-30T00:00:00Z",
+        "by_pattern": {f"FB9_GEX2+prompt-{i:03d}": {"inferred": 1 + rng.random() * 4, "n": 5} for i in range(n_prompts)},
+        "by_group_lineage": {
+            **{f"input:{s}": {"inferred": 1 + rng.random() * 4, "n": 2} for s in sources if rng.random() < 0.5},
+            **{f"og:stem:{o.rsplit('/', 1)[-1].lower()}": {"inferred": 4.0, "n": 1} for o in outputs if rng.random() < 0.1},
+        },
+        "by_pattern_appetite": {f"FB9_GEX2+prompt-{i:03d}": {"inferred": 3.5} for i in range(0, n_prompts, 3)},
+        "by_group_lineage_appetite": {f"input:{s}": {"inferred": 4.0} for s in sources if rng.random() < 0.2},
+    }
+    ratings = {
+        "by_output_relpath": {o: {"explicit": rng.choice((0, 3, 4, 5)), "short_key": o} for o in outputs if rng.random() < 0.2},
+        "by_source_basename": {s: {"inferred": 1 + rng.random() * 4, "n": 3} for s in sources if rng.random() < 0.3},
+        "by_graph_hash": {SHAPE["graph_hash"]: {"inferred": 3.1, "n": 40}},
+    }
+    appetite = {"by_output_relpath": {o: {"appetite": "more", "facet": "both"} for o in outputs if rng.random() < 0.05}}
+    recipes = [
+        {
+            "output_path": f"/data/output/{o}.mp4",
+            "family": "FB9_GEX2",
+            "picks": {"prompt_profile": rng.choice(prompts), "source_video": f"/in/{rng.choice(sources)}"},
+        }
+        for o in outputs
+    ]
+    return ratings, heuristics, appetite, recipes
+
+
+def run_bench(n_recipes: int, *, n_sources: int, n_prompts: int, seed: int) -> Dict[str, Any]:
+    ratings, heuristics, appetite, recipes = synth_pool(n_recipes, n_sources=n_sources, n_prompts=n_prompts, seed=seed)
+    docs = {"ratings_doc": ratings, "heuristics_doc": heuristics, "appetite_doc": appetite}
+    modes: Dict[str, Any] = {}
+
+    t0 = time.perf_counter()
+    expect = [score_recipe(r, shape=SHAPE, **docs) for r in recipes]
+    modes["legacy"] = time.perf_counter() - t0
+
+    scorer = RecipeScorer(**docs)
+    t0 = time.perf_counter()
+    got = scorer.score_many(recipes, shape=SHAPE)
+    modes["compiled"] = time.perf_counter() - t0
+    misses = scorer.partial_misses
+
+    t0 = time.perf_counter()
+    warm = scorer.score_many(recipes, shape=SHAPE)
+    modes["warm"] = time.perf_counter() - t0
+
+    if got != expect:
+        raise SystemExit("compiled: scores differ from score_recipe")
+    if warm != expect:
+        raise SystemExit("warm: scores differ from score_recipe")
+
+    out: Dict[str, Any] = {}
+    for name, elapsed in modes.items():
+        out[name] = {
+            "total_ms": round(elapsed * 1000, 3),
+            "per_recipe_us": round(elapsed * 1e6 / max(1, n_recipes), 3),
+            "speedup_vs_legacy": round(modes["legacy"] / max(1e-9, elapsed), 1),
+        }
+    return {
+        "recipes": n_recipes,
+        "sources": n_sources,
+        "prompts": n_prompts,
+        "partials": misses,
+        "omitted": sum(1 for _w, meta in expect if meta.get("omit")),
+        "modes": out,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark score_recipe per call vs compiled RecipeScorer batch")
+    ap.add_argument("--recipes", type=int, default=10_000)
+    ap.add_argument("--sources", type=int, default=200)
+    ap.add_argument("--prompts", type=int, default=12)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    result = run_bench(args.recipes, n_sources=args.sources, n_prompts=args.prompts, seed=args.seed)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vision-slice frame quality — list-of-rows metrics vs the ndarray engine.
+
+Synthesizes ``--frames`` 8-bit gray frames of one asset (smooth gradient, drifting
+blocks, sensor noise) at ``--side`` px on the long edge and times decode + scoring:
+
+- ``python`` — ``VISION_QUALITY_ENGINE=python``: byte-by-byte rows, ``score_frame`` per frame
+- ``numpy``  — ``frombuffer`` into float32, ``score_frames`` on the stacked asset
+
+Usage:
+  python3 bench_vision_quality_metrics.py                  # 16 frames, 384 px
+  python3 bench_vision_quality_metrics.py --frames 64 --side 512
+
+Both modes must agree within ``--tolerance`` on every metric; the run aborts otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+import vision_slice_quality_metrics as qm
+
+
+def synth_rasters(n_frames: int, side: int, *, seed: int = 0) -> List[bytes]:
+    """16:9 gray rasters (``side`` wide) whose content drifts a little per frame."""
+    rng = random.Random(seed)
+    w, h = side, max(16, side * 9 // 16)
+    out: List[bytes] = []
+    for i in range(n_frames):
+        buf = bytearray(w * h)
+        for y in range(h):
+            base = y * w
+            for x in range(w):
+                v = 60 + (x + 2 * i) * 120 // w + (40 if ((x + i) // 24 + y // 24) % 2 else 0)
+                buf[base + x] = max(0, min(255, v + rng.randrange(-12, 13)))
+        out.append(bytes(buf))
+    return out
+
+
+def _decode_and_score(rasters: List[bytes], w: int, h: int) -> List[Dict[str, Any]]:
+    frames = [qm.gray_from_bytes(r, w, h) for r in rasters]
+    return qm.score_frames(frames)
+
+
+def run_bench(n_frames: int, side: int, *, seed: int, tolerance: float) -> Dict[str, Any]:
+    w, h = side, max(16, side * 9 // 16)
+    rasters = synth_rasters(n_frames, side, seed=seed)
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    timings: Dict[str, float] = {}
+    modes = ["python"] + (["numpy"] if qm._np is not None else [])
+    prior = os.environ.get("VISION_QUALITY_ENGINE")
+    try:
+        for mode in modes:
+            os.environ["VISION_QUALITY_ENGINE"] = mode
+            t0 = time.perf_counter()
+            results[mode] = _decode_and_score(rasters, w, h)
+            timings[mode] = time.perf_counter() - t0
+    finally:
+        if prior is None:
+            os.environ.pop("VISION_QUALITY_ENGINE", None)
+        else:
+            os.environ["VISION_QUALITY_ENGINE"] = prior
+
+    max_diff = 0.0
+    for mode in modes[1:]:
+        for a, b in zip(results["python"], results[mode]):
+            for k in qm.QUALITY_KEYS:
+                if a[k] is None or b[k] is None:
+                    if a[k] != b[k]:
+                        raise SystemExit(f"{mode}: {k} None mismatch")
+                    continue
+                max_diff = max(max_diff, abs(a[k] - b[k]))
+    if max_diff > tolerance:
+        raise SystemExit(f"engines differ by {max_diff} > {tolerance}")
+
+    out: Dict[str, Any] = {}
+    for mode, elapsed in timings.items():
+        out[mode] = {
+            "total_ms": round(elapsed * 1000, 3),
+            "per_frame_ms": round(elapsed * 1000 / max(1, n_frames), 3),
+            "speedup_vs_python": round(timings["python"] / max(1e-9, elapsed), 1),
+        }
+    return {"frames": n_frames, "width": w, "height": h, "max_abs_diff": max_diff, "modes": out}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark vision-slice quality metrics: list rows vs ndarray")
+    ap.add_argument("--frames", type=int, default=16)
+    ap.add_argument("--side", type=int, default=384)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--tolerance", type=float, default=2e-4)
+    args = ap.parse_args()
+    result = run_bench(args.frames, args.side, seed=args.seed, tolerance=args.tolerance)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -547,6 +547,9 @@ class LivePreviewBridge:
             pass
         self._run_websocket_client(ws_url, client_id)
 
+    def _on_connected(self, client_id: str) -> None:
+        """Hook: socket (re)connected; subclasses resync state missed while offline."""
+
     def _handle_text(self, raw: str, current_pid: Optional[str]) -> Optional[str]:
         try:
             obj = json.loads(raw)
@@ -586,6 +589,7 @@ class LivePreviewBridge:
                     except Exception:
                         pass
                     print(f"[comfy-live-preview] connected client={client_id} url={ws_url}")
+                    self._on_connected(client_id)
                     current_pid: Optional[str] = None
                     async for msg in ws:
                         if self._stop.is_set():
@@ -616,6 +620,7 @@ class LivePreviewBridge:
                 ws.send(json.dumps({"type": "feature_flags", "data": CLIENT_FEATURE_FLAGS}))
             except Exception:
                 pass
+            self._on_connected(client_id)
 
         def on_message(_ws: Any, message: Any) -> None:
             if isinstance(message, bytes):
@@ -3,7 +3,7 @@ Shared helpers for ComfyUI workflow/media metadata utilities.
 
 This module exists to keep our scripts small and consistent:
 - PNG text chunk parsing (tEXt / zTXt / iTXt)
-- ffprobe format/tags retrieval
+- ffprobe format/tags retrieval (cached, see media_probe)
 - JSON parsing for double-encoded muxer tags
 - extracting ComfyUI prompt/workflow JSON from tags/chunks
 - compact preset extraction from resolved prompt JSON
@@ -15,10 +15,11 @@ from __future__ import annotations
 import hashlib
 import json
 import struct
-import subprocess
 import zlib
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from media_probe import ProbeError, probe_media
 
 PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
 
@@ -47,69 +48,107 @@ def maybe_json(s: Any) -> Any:
     return None
 
 
-def read_png_text_chunks(png_path: Path) -> Dict[str, str]:
-    data = png_path.read_bytes()
-    if data[:8] != PNG_MAGIC:
-        raise ValueError(f"Not a PNG: {png_path}")
-
-    off = 8
-    out: Dict[str, str] = {}
-    while off + 8 <= len(data):
-        length = struct.unpack(">I", data[off : off + 4])[0]
-        ctype = data[off + 4 : off + 8]
-        cdata = data[off + 8 : off + 8 + length]
-        off = off + 12 + length
-
-        if ctype == b"tEXt":
-            k, v = cdata.split(b"\x00", 1)
-            out[k.decode("latin1", "replace")] = v.decode("utf-8", "replace")
-        elif ctype == b"zTXt":
-            k, rest = cdata.split(b"\x00", 1)
-            compressed = rest[1:]
+def _decode_png_text_chunk(ctype: bytes, cdata: bytes) -> Optional[Tuple[str, str]]:
+    """(keyword, text) for one tEXt / zTXt / iTXt chunk body; None for other or malformed chunks."""
+    if ctype == b"tEXt":
+        k, v = cdata.split(b"\x00", 1)
+        return k.decode("latin1", "replace"), v.decode("utf-8", "replace")
+    if ctype == b"zTXt":
+        k, rest = cdata.split(b"\x00", 1)
+        compressed = rest[1:]
+        try:
+            v = zlib.decompress(compressed).decode("utf-8", "replace")
+        except Exception:
+            v = ""
+        return k.decode("latin1", "replace"), v
+    if ctype == b"iTXt":
+        i = cdata.find(b"\x00")
+        if i == -1:
+            return None
+        keyword = cdata[:i].decode("latin1", "replace")
+        comp_flag = cdata[i + 1]
+        j = i + 3
+        k0 = cdata.find(b"\x00", j)
+        if k0 == -1:
+            return None
+        j = k0 + 1
+        k1 = cdata.find(b"\x00", j)
+        if k1 == -1:
+            return None
+        text_bytes = cdata[k1 + 1 :]
+        if comp_flag == 1:
             try:
-                v = zlib.decompress(compressed).decode("utf-8", "replace")
+                text_bytes = zlib.decompress(text_bytes)
             except Exception:
-                v = ""
-            out[k.decode("latin1", "replace")] = v
-        elif ctype == b"iTXt":
-            i = cdata.find(b"\x00")
-            if i == -1:
-                continue
-            keyword = cdata[:i].decode("latin1", "replace")
-            comp_flag = cdata[i + 1]
-            j = i + 3
-            k0 = cdata.find(b"\x00", j)
-            if k0 == -1:
-                continue
-            j = k0 + 1
-            k1 = cdata.find(b"\x00", j)
-            if k1 == -1:
-                continue
-            text_bytes = cdata[k1 + 1 :]
-            if comp_flag == 1:
-                try:
-                    text_bytes = zlib.decompress(text_bytes)
-                except Exception:
-                    text_bytes = b""
-            out[keyword] = text_bytes.decode("utf-8", "replace")
+                text_bytes = b""
+        return keyword, text_bytes.decode("utf-8", "replace")
+    return None
+
+
+_PNG_TEXT_CTYPES = (b"tEXt", b"zTXt", b"iTXt")
+
 
+def read_png_text_chunks_from_stream(fh: BinaryIO, *, include_trailing: bool = False) -> Dict[str, str]:
+    """
+    Walk PNG chunks on an open binary stream, reading only chunk headers and text bodies.
+
+    Image data is skipped with ``seek``. Comfy writes prompt/workflow before the image
+    data, so by default the walk stops at the first ``IDAT``; ``include_trailing`` keeps
+    going to ``IEND`` for tools that append text chunks after the image.
+    """
+    if fh.read(8) != PNG_MAGIC:
+        raise ValueError("not_png")
+    out: Dict[str, str] = {}
+    while True:
+        head = fh.read(8)
+        if len(head) < 8:
+            break
+        length = struct.unpack(">I", head[:4])[0]
+        ctype = head[4:8]
+        if ctype == b"IEND":
+            break
+        if ctype == b"IDAT" and not include_trailing:
+            break
+        if ctype in _PNG_TEXT_CTYPES:
+            cdata = fh.read(length)
+            fh.seek(4, 1)  # CRC
+            decoded = _decode_png_text_chunk(ctype, cdata)
+            if decoded is not None:
+                out[decoded[0]] = decoded[1]
+        else:
+            fh.seek(length + 4, 1)
     return out
 
 
+def read_png_text_chunks(png_path: Path, *, include_trailing: bool = True) -> Dict[str, str]:
+    """
+    PNG tEXt / zTXt / iTXt chunks as {keyword: text}. Raises ValueError if not a PNG.
+
+    Streams chunk-by-chunk (image data is seeked over, never read). Pass
+    ``include_trailing=False`` (or use :func:`read_png_header_text_chunks`) to stop at
+    the first ``IDAT``.
+    """
+    with Path(png_path).open("rb") as fh:
+        try:
+            return read_png_text_chunks_from_stream(fh, include_trailing=include_trailing)
+        except ValueError as e:
+            if str(e) == "not_png":
+                raise ValueError(f"Not a PNG: {png_path}") from None
+            raise
+
+
+def read_png_header_text_chunks(png_path: Path) -> Dict[str, str]:
+    """Text chunks ahead of the image data only (where Comfy writes prompt/workflow)."""
+    return read_png_text_chunks(png_path, include_trailing=False)
+
+
 def ffprobe_show_format(media_path: Path) -> Dict[str, Any]:
-    cmd = ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", str(media_path)]
-    # ffprobe may emit UTF-8 even on Windows consoles; force utf-8 to avoid decode crashes.
-    proc = subprocess.run(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-    )
-    if proc.returncode != 0:
-        raise RuntimeError(f"ffprobe failed:\n{proc.stderr.strip()}")
-    return json.loads(proc.stdout)
+    """Container format (``{"format": ...}``) via the cached combined probe."""
+    try:
+        obj = probe_media(media_path)
+    except ProbeError as exc:
+        raise RuntimeError(f"ffprobe failed:\n{exc}") from exc
+    return {"format": obj.get("format") or {}}
 
 
 def ffprobe_format_tags(media_path: Path) -> Dict[str, Any]:
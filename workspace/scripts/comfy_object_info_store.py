@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Persistent ComfyUI ``/object_info`` snapshots keyed by server + custom-nodes fingerprint.
+
+``/object_info`` is several MB and only changes when the node set changes (custom node
+install / update, Comfy upgrade). Each snapshot is stored once per
+``(server, fingerprint)`` with a precomputed ``class_type → input schema`` index, so
+``shape_factory validate / submit / repair`` and ``verify_workflow_node_types.py``:
+
+- skip the download when the fingerprint (``GET /extensions`` + ``GET /system_stats`` +
+  optional local ``custom_nodes/`` listing — a few KB) matches a stored snapshot;
+- re-check the fingerprint at most every ``fingerprint_ttl_s`` per server;
+- fall back to the newest snapshot for the server when Comfy is unreachable (offline
+  validation).
+
+Store path: ``$COMFY_OBJECT_INFO_STORE`` (``off`` disables), else
+``<output bind>/_status/object_info.sqlite`` beside the other output stores (shared by host and
+containers; see ``output_path_lib.default_status_dir``), else
+``$XDG_CACHE_HOME/shape_factory/object_info.sqlite`` when no output bind is configured.
+``$COMFYUI_CUSTOM_NODES_DIR`` adds the
+local custom_nodes listing (entry names + mtimes) to the fingerprint. Without it, a node pack
+that only adds Python files keeps the fingerprint, so callers pass the classes they could not
+find to :func:`recheck_missing_node_types`, which re-downloads before they are reported missing.
+
+  python3 shape_factory.py object-info refresh [--server URL]
+  python3 shape_factory.py object-info show KSampler
+  python3 shape_factory.py object-info list
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+import zlib
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from output_path_lib import default_status_dir
+
+OBJECT_INFO_STORE_BASENAME = "object_info.sqlite"
+OBJECT_INFO_STORE_SCHEMA_VERSION = 1
+OBJECT_INFO_STORE_ENV = "COMFY_OBJECT_INFO_STORE"
+CUSTOM_NODES_DIR_ENV = "COMFYUI_CUSTOM_NODES_DIR"
+
+DEFAULT_FINGERPRINT_TTL_S = 600.0
+DEFAULT_SNAPSHOT_MAX_AGE_S = 86400.0
+MISSING_RECHECK_MIN_AGE_S = 5.0
+
+
+class ObjectInfoError(RuntimeError):
+    """No usable ``/object_info``: server unreachable and no stored snapshot."""
+
+
+_LOCK = threading.Lock()
+_MEMO: Dict[str, tuple[float, "ObjectInfoSnapshot"]] = {}
+
+
+class ObjectInfoSnapshot:
+    """One ``/object_info`` payload plus its class → input schema index."""
+
+    def __init__(
+        self,
+        *,
+        server: str,
+        fingerprint: str,
+        fetched_at: float,
+        source: str,
+        object_info: Optional[Dict[str, Any]] = None,
+        index: Optional[Dict[str, Dict[str, Any]]] = None,
+        store_path: Optional[Path] = None,
+    ) -> None:
+        self.server = server
+        self.fingerprint = fingerprint
+        self.fetched_at = fetched_at
+        self.source = source
+        self._object_info = object_info
+        self._index = index if index is not None else (build_input_index(object_info) if object_info is not None else None)
+        self._store_path = store_path
+        self._node_types: Optional[FrozenSet[str]] = None
+
+    @property
+    def index(self) -> Dict[str, Dict[str, Any]]:
+        if self._index is None:
+            self._index = _load_index(self._store_path, self.server, self.fingerprint)
+        return self._index
+
+    @property
+    def object_info(self) -> Dict[str, Any]:
+        """Raw payload (decompressed from the store on first access)."""
+        if self._object_info is None:
+            self._object_info = _load_payload(self._store_path, self.server, self.fingerprint)
+        return self._object_info
+
+    @property
+    def node_types(self) -> FrozenSet[str]:
+        if self._node_types is None:
+            self._node_types = frozenset(self.index)
+        return self._node_types
+
+    def __contains__(self, class_type: object) -> bool:
+        return class_type in self.node_types
+
+    def input_schema(self, class_type: str) -> Optional[Dict[str, Any]]:
+        return self.index.get(class_type)
+
+    def input_names(self, class_type: str) -> List[str]:
+        schema = self.index.get(class_type) or {}
+        return [*(schema.get("required") or {}), *(schema.get("optional") or {})]
+
+
+def build_input_index(object_info: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """``{class_type: {"required", "optional", "hidden", "output", "category"}}``."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for class_type, info in (object_info or {}).items():
+        info = info if isinstance(info, dict) else {}
+        inputs = info.get("input") if isinstance(info.get("input"), dict) else {}
+        out[str(class_type)] = {
+            "required": inputs.get("required") if isinstance(inputs.get("required"), dict) else {},
+            "optional": inputs.get("optional") if isinstance(inputs.get("optional"), dict) else {},
+            "hidden": inputs.get("hidden") if isinstance(inputs.get("hidden"), dict) else {},
+            "output": info.get("output") if isinstance(info.get("output"), list) else [],
+            "category": str(info.get("category") or ""),
+        }
+    return out
+
+
+def default_object_info_store_path() -> Optional[Path]:
+    raw = os.environ.get(OBJECT_INFO_STORE_ENV, "").strip()
+    if raw.lower() in {"off", "0", "none", "false"}:
+        return None
+    if raw:
+        return Path(raw).expanduser()
+    status_dir = default_status_dir()
+    if status_dir is not None:
+        return status_dir / OBJECT_INFO_STORE_BASENAME
+    base = os.environ.get("XDG_CACHE_HOME", "").strip() or str(Path.home() / ".cache")
+    return Path(base).expanduser() / "shape_factory" / OBJECT_INFO_STORE_BASENAME
+
+
+def open_object_info_store(path: Path) -> sqlite3.Connection:
+    path = Path(path).expanduser().resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(path), timeout=30)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS snapshots (
+            server TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            node_count INTEGER NOT NULL,
+            payload BLOB NOT NULL,
+            PRIMARY KEY (server, fingerprint)
+        );
+        CREATE TABLE IF NOT EXISTS nodes (
+            server TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            class_type TEXT NOT NULL,
+            schema_json TEXT NOT NULL,
+            PRIMARY KEY (server, fingerprint, class_type)
+        );
+        CREATE TABLE IF NOT EXISTS servers (
+            server TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            checked_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """
+    )
+    con.execute(
+        "INSERT OR REPLACE INTO meta(key, value) VALUES('schema_version', ?)",
+        (str(OBJECT_INFO_STORE_SCHEMA_VERSION),),
+    )
+    con.commit()
+    return con
+
+
+def _http_get_json(url: str, *, timeout_s: float) -> Any:
+    req = urllib.request.Request(url, method="GET", headers={"Accept": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+
+def _custom_nodes_listing(custom_nodes_dir: Optional[Path]) -> List[List[Any]]:
+    if custom_nodes_dir is None:
+        raw = os.environ.get(CUSTOM_NODES_DIR_ENV, "").strip()
+        custom_nodes_dir = Path(raw).expanduser() if raw else None
+    if custom_nodes_dir is None or not custom_nodes_dir.is_dir():
+        return []
+    rows = []
+    for entry in sorted(custom_nodes_dir.iterdir(), key=lambda p: p.name):
+        if entry.name.startswith(".") or entry.name == "__pycache__":
+            continue
+        try:
+            rows.append([entry.name, entry.stat().st_mtime_ns])
+        except OSError:
+            continue
+    return rows
+
+
+def server_fingerprint(server: str, *, timeout_s: float = 10.0, custom_nodes_dir: Optional[Path] = None) -> str:
+    """
+    Cheap node-set fingerprint: ``/extensions`` list + Comfy version/argv + local custom_nodes.
+
+    Raises :class:`ObjectInfoError` when the server cannot be reached.
+    """
+    server = server.rstrip("/")
+    parts: Dict[str, Any] = {}
+    for name in ("extensions", "system_stats"):
+        try:
+            parts[name] = _http_get_json(f"{server}/{name}", timeout_s=timeout_s)
+        except urllib.error.HTTPError:
+            parts[name] = None  # reachable, endpoint missing (older Comfy); snapshot age still bounds staleness
+        except (urllib.error.URLError, OSError, ValueError) as exc:
+            raise ObjectInfoError(f"cannot reach {server}: {exc}") from exc
+    extensions, stats = parts["extensions"], parts["system_stats"]
+    system = stats.get("system") if isinstance(stats, dict) and isinstance(stats.get("system"), dict) else {}
+    doc = {
+        "extensions": sorted(str(e) for e in extensions) if isinstance(extensions, list) else [],
+        "comfyui_version": system.get("comfyui_version"),
+        "python_version": system.get("python_version"),
+        "argv": system.get("argv"),
+        "custom_nodes": _custom_nodes_listing(custom_nodes_dir),
+    }
+    return hashlib.sha256(json.dumps(doc, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+
+def _with_store(store_path: Optional[Path], fn: Any) -> Any:
+    if store_path is None:
+        return None
+    con = open_object_info_store(store_path)
+    try:
+        return fn(con)
+    finally:
+        con.close()
+
+
+def _load_payload(store_path: Optional[Path], server: str, fingerprint: str) -> Dict[str, Any]:
+    row = _with_store(
+        store_path,
+        lambda con: con.execute(
+            "SELECT payload FROM snapshots WHERE server = ? AND fingerprint = ?", (server, fingerprint)
+        ).fetchone(),
+    )
+    if not row:
+        raise ObjectInfoError(f"object_info snapshot missing for {server} ({fingerprint})")
+    return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+
+def _load_index(store_path: Optional[Path], server: str, fingerprint: str) -> Dict[str, Dict[str, Any]]:
+    rows = _with_store(
+        store_path,
+        lambda con: con.execute(
+            "SELECT class_type, schema_json FROM nodes WHERE server = ? AND fingerprint = ?", (server, fingerprint)
+        ).fetchall(),
+    )
+    return {str(ct): json.loads(js) for ct, js in rows or []}
+
+
+def _stored_snapshot(
+    con: sqlite3.Connection, store_path: Path, server: str, fingerprint: Optional[str], *, source: str
+) -> Optional[ObjectInfoSnapshot]:
+    if fingerprint is None:
+        row = con.execute(
+            "SELECT fingerprint, fetched_at FROM snapshots WHERE server = ? ORDER BY fetched_at DESC LIMIT 1",
+            (server,),
+        ).fetchone()
+    else:
+        row = con.execute(
+            "SELECT fingerprint, fetched_at FROM snapshots WHERE server = ? AND fingerprint = ?",
+            (server, fingerprint),
+        ).fetchone()
+    if not row:
+        return None
+    return ObjectInfoSnapshot(server=server, fingerprint=row[0], fetched_at=float(row[1]), source=source, store_path=store_path)
+
+
+def store_snapshot(
+    con: sqlite3.Connection, *, server: str, fingerprint: str, object_info: Dict[str, Any], fetched_at: Optional[float] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Write payload + input index for ``(server, fingerprint)``; returns the index."""
+    ts = float(fetched_at if fetched_at is not None else time.time())
+    index = build_input_index(object_info)
+    payload = zlib.compress(json.dumps(object_info, separators=(",", ":")).encode("utf-8"), 6)
+    with con:
+        con.execute("DELETE FROM nodes WHERE server = ? AND fingerprint = ?", (server, fingerprint))
+        con.execute(
+            "INSERT OR REPLACE INTO snapshots(server, fingerprint, fetched_at, node_count, payload) VALUES (?, ?, ?, ?, ?)",
+            (server, fingerprint, ts, len(index), payload),
+        )
+        con.executemany(
+            "INSERT INTO nodes(server, fingerprint, class_type, schema_json) VALUES (?, ?, ?, ?)",
+            [(server, fingerprint, ct, json.dumps(schema, separators=(",", ":"))) for ct, schema in index.items()],
+        )
+        con.execute(
+            "INSERT OR REPLACE INTO servers(server, fingerprint, checked_at) VALUES (?, ?, ?)",
+            (server, fingerprint, ts),
+        )
+    return index
+
+
+def reset_object_info_memo() -> None:
+    with _LOCK:
+        _MEMO.clear()
+
+
+def load_object_info(
+    server: str,
+    *,
+    timeout_s: float = 120.0,
+    refresh: bool = False,
+    offline: bool = False,
+    fingerprint_ttl_s: float = DEFAULT_FINGERPRINT_TTL_S,
+    snapshot_max_age_s: float = DEFAULT_SNAPSHOT_MAX_AGE_S,
+    custom_nodes_dir: Optional[Path] = None,
+) -> ObjectInfoSnapshot:
+    """
+    Current ``/object_info`` snapshot for ``server``.
+
+    Order: in-process memo (``fingerprint_ttl_s``) → stored fingerprint still fresh →
+    fingerprint match in the store (younger than ``snapshot_max_age_s``) → download + store.
+    ``offline`` (or an unreachable server) returns the newest stored snapshot;
+    :class:`ObjectInfoError` when there is none. ``refresh`` always downloads.
+    """
+    server = server.rstrip("/")
+    now = time.time()
+    if not refresh and not offline:
+        with _LOCK:
+            hit = _MEMO.get(server)
+        if hit is not None and (now - hit[0]) < fingerprint_ttl_s:
+            return hit[1]
+
+    store_path = default_object_info_store_path()
+    con = open_object_info_store(store_path) if store_path is not None else None
+    try:
+        snap: Optional[ObjectInfoSnapshot] = None
+        if con is not None and offline:
+            snap = _stored_snapshot(con, store_path, server, None, source="offline")
+            if snap is None:
+                raise ObjectInfoError(f"no stored object_info snapshot for {server}")
+            return snap
+
+        if con is not None and not refresh:
+            row = con.execute("SELECT fingerprint, checked_at FROM servers WHERE server = ?", (server,)).fetchone()
+            if row and (now - float(row[1])) < fingerprint_ttl_s:
+                snap = _stored_snapshot(con, store_path, server, row[0], source="store")
+
+        if snap is None:
+            try:
+                fingerprint = server_fingerprint(server, timeout_s=min(10.0, timeout_s), custom_nodes_dir=custom_nodes_dir)
+            except ObjectInfoError:
+                if con is None:
+                    raise
+                snap = _stored_snapshot(con, store_path, server, None, source="offline")
+                if snap is None:
+                    raise
+                return snap
+            if con is not None and not refresh:
+                snap = _stored_snapshot(con, store_path, server, fingerprint, source="store")
+                if snap is not None and (now - snap.fetched_at) >= snapshot_max_age_s:
+                    snap = None
+                if snap is not None:
+                    with con:
+                        con.execute(
+                            "INSERT OR REPLACE INTO servers(server, fingerprint, checked_at) VALUES (?, ?, ?)",
+                            (server, fingerprint, now),
+                        )
+            if snap is None:
+                try:
+                    obj = _http_get_json(f"{server}/object_info", timeout_s=timeout_s)
+                except (urllib.error.URLError, OSError, ValueError) as exc:
+                    raise ObjectInfoError(f"GET {server}/object_info failed: {exc}") from exc
+                if not isinstance(obj, dict):
+                    raise ObjectInfoError("Comfy /object_info returned non-object")
+                index = store_snapshot(con, server=server, fingerprint=fingerprint, object_info=obj, fetched_at=now) if con is not None else None
+                snap = ObjectInfoSnapshot(
+                    server=server,
+                    fingerprint=fingerprint,
+                    fetched_at=now,
+                    source="fetched",
+                    object_info=obj,
+                    index=index,
+                    store_path=store_path,
+                )
+    finally:
+        if con is not None:
+            con.close()
+    with _LOCK:
+        _MEMO[server] = (now, snap)
+    return snap
+
+
+def recheck_missing_node_types(
+    snap: ObjectInfoSnapshot,
+    class_types: Iterable[str],
+    *,
+    timeout_s: float = 120.0,
+    min_age_s: float = MISSING_RECHECK_MIN_AGE_S,
+) -> ObjectInfoSnapshot:
+    """
+    Live ``/object_info`` when any of ``class_types`` is absent from ``snap``.
+
+    Skipped for snapshots fetched in the last ``min_age_s`` and for offline snapshots; when
+    the server cannot be reached the original ``snap`` is returned.
+    """
+    if not any(str(t) not in snap.node_types for t in class_types):
+        return snap
+    if snap.source == "offline" or (time.time() - snap.fetched_at) < min_age_s:
+        return snap
+    try:
+        fresh = load_object_info(snap.server, timeout_s=timeout_s, refresh=True)
+    except ObjectInfoError:
+        return snap
+    return snap if fresh.source == "offline" else fresh
+
+
+def add_object_info_subparser(sub: Any) -> None:
+    from shape_factory import DEFAULT_COMFY_SERVER
+
+    p = sub.add_parser("object-info", help="Persistent /object_info snapshot store")
+    osub = p.add_subparsers(dest="object_info_cmd", required=True)
+    for name, help_text in (
+        ("refresh", "Download /object_info and store it under the current fingerprint"),
+        ("show", "Input schema for one node class"),
+        ("list", "Stored snapshots"),
+    ):
+        sp = osub.add_parser(name, help=help_text)
+        sp.add_argument("--server", default=DEFAULT_COMFY_SERVER, help="ComfyUI base URL")
+        sp.add_argument("--offline", action="store_true", help="Use the newest stored snapshot; no HTTP")
+        if name == "show":
+            sp.add_argument("class_type")
+        sp.set_defaults(func=cmd_object_info)
+
+
+def cmd_object_info(args: argparse.Namespace) -> int:
+    server = str(args.server).rstrip("/")
+    if args.object_info_cmd == "list":
+        path = default_object_info_store_path()
+        rows = _with_store(
+            path,
+            lambda con: con.execute(
+                "SELECT server, fingerprint, fetched_at, node_count, length(payload) FROM snapshots ORDER BY fetched_at DESC"
+            ).fetchall(),
+        )
+        out = [
+            {"server": r[0], "fingerprint": r[1], "fetched_at": r[2], "node_count": r[3], "payload_bytes": r[4]}
+            for r in rows or []
+        ]
+        print(json.dumps({"store_path": str(path) if path else None, "snapshots": out}, indent=2))
+        return 0
+    try:
+        snap = load_object_info(server, refresh=args.object_info_cmd == "refresh", offline=bool(args.offline))
+    except ObjectInfoError as exc:
+        print(f"error: {exc}")
+        return 1
+    if args.object_info_cmd == "show":
+        schema = snap.input_schema(args.class_type)
+        if schema is None:
+            print(f"error: {args.class_type} not in object_info ({snap.fingerprint})")
+            return 1
+        print(json.dumps({"class_type": args.class_type, "fingerprint": snap.fingerprint, **schema}, indent=2))
+        return 0
+    print(
+        json.dumps(
+            {"server": snap.server, "fingerprint": snap.fingerprint, "source": snap.source, "node_count": len(snap.node_types)},
+            indent=2,
+        )
+    )
+    return 0
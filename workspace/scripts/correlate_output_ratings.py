@@ -27,7 +27,7 @@ import subprocess
 import sys
 from collections import defaultdict
 from dataclasses import asdict, dataclass, fields
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -58,11 +58,11 @@ def _mx_slider_value(node: Dict[str, Any]) -> Optional[float]:
 
 def extract_prompt_png(png_path: Path) -> Optional[Dict[str, Any]]:
     try:
-        from comfy_meta_lib import extract_prompt_workflow_from_png_chunks, read_png_text_chunks
+        from comfy_meta_lib import extract_prompt_workflow_from_png_chunks, read_png_header_text_chunks
     except ImportError:
         return _extract_prompt_png_pil(png_path)
     try:
-        chunks = read_png_text_chunks(png_path)
+        chunks = read_png_header_text_chunks(png_path)
         prompt_obj, _workflow_obj = extract_prompt_workflow_from_png_chunks(chunks)
         if isinstance(prompt_obj, dict):
             return prompt_obj
@@ -89,11 +89,11 @@ def _extract_prompt_png_pil(png_path: Path) -> Optional[Dict[str, Any]]:
 
 def extract_workflow_png(png_path: Path) -> Optional[Dict[str, Any]]:
     try:
-        from comfy_meta_lib import extract_prompt_workflow_from_png_chunks, read_png_text_chunks
+        from comfy_meta_lib import extract_prompt_workflow_from_png_chunks, read_png_header_text_chunks
     except ImportError:
         return None
     try:
-        chunks = read_png_text_chunks(png_path)
+        chunks = read_png_header_text_chunks(png_path)
         _prompt_obj, workflow_obj = extract_prompt_workflow_from_png_chunks(chunks)
         if isinstance(workflow_obj, dict):
             return workflow_obj
@@ -219,49 +219,52 @@ def iter_rated_og_records(
     name_glob: str = "*.XMP",
     days: int = 0,
     ffprobe: Optional[str] = None,
+    scan: Optional[bool] = None,
 ) -> List[Dict[str, Any]]:
-    """Scan og/ for rated XMPs; attach prompt + source paths when available."""
+    """
+    Rated XMPs under og/; attach prompt + source paths when available.
+
+    Sidecars come from the XMP catalog (``xmp_catalog.list_xmps``) when it has synced this
+    root, else from a walk; ``scan=True`` forces the walk (and reconciles the catalog).
+    """
     root = root.resolve()
     if not root.is_dir():
         return []
 
-    cut = None
-    if days and days > 0:
-        cut = datetime.now() - timedelta(days=days)
+    from xmp_catalog import list_xmps
 
-    records: List[Dict[str, Any]] = []
-    for xmp in sorted(root.glob(f"**/{name_glob}")):
-        try:
-            mtime = datetime.fromtimestamp(xmp.stat().st_mtime)
-        except OSError:
-            continue
-        if cut and mtime < cut:
-            continue
-        rating = parse_xmp_rating(xmp)
-        if rating is None:
-            continue
+    entries, _source = list_xmps(root, name_glob=name_glob, days=days, rated_only=True, scan=scan)
+    return [
+        rated_og_record(e.path, root, rating=int(e.rating), mtime=datetime.fromtimestamp(e.mtime), ffprobe=ffprobe)
+        for e in entries
+        if e.rating is not None
+    ]
 
-        stem_name = xmp.stem
-        stem_dir = xmp.parent
-        pr, src = extract_prompt_media(stem_dir, stem_name, ffprobe=ffprobe)
-        sources = extract_source_paths_from_prompt(pr) if pr else []
-        short_key, discovery_key = output_relpath_keys_from_xmp(xmp, root)
 
-        records.append(
-            {
-                "xmp_path": str(xmp),
-                "rating": rating,
-                "mtime_iso": mtime.strftime("%Y-%m-%dT%H:%M:%S"),
-                "prompt_source": src,
-                "prompt": pr,
-                "sources": sources,
-                "source_basenames": [normalize_source_basename(s) for s in sources if normalize_source_basename(s)],
-                "output_short_key": short_key,
-                "output_discovery_key": discovery_key,
-                "error": "" if pr else "no_prompt",
-            }
-        )
-    return records
+def rated_og_record(
+    xmp: Path,
+    root: Path,
+    *,
+    rating: int,
+    mtime: datetime,
+    ffprobe: Optional[str] = None,
+) -> Dict[str, Any]:
+    """One ``iter_rated_og_records`` entry: prompt from the sibling PNG / MP4 + source paths."""
+    pr, src = extract_prompt_media(xmp.parent, xmp.stem, ffprobe=ffprobe)
+    sources = extract_source_paths_from_prompt(pr) if pr else []
+    short_key, discovery_key = output_relpath_keys_from_xmp(xmp, root)
+    return {
+        "xmp_path": str(xmp),
+        "rating": rating,
+        "mtime_iso": mtime.strftime("%Y-%m-%dT%H:%M:%S"),
+        "prompt_source": src,
+        "prompt": pr,
+        "sources": sources,
+        "source_basenames": [normalize_source_basename(s) for s in sources if normalize_source_basename(s)],
+        "output_short_key": short_key,
+        "output_discovery_key": discovery_key,
+        "error": "" if pr else "no_prompt",
+    }
 
 
 def collect_settings(prompt: Dict[str, Any]) -> Tuple[Optional[float], ...]:
@@ -317,6 +320,11 @@ def main() -> int:
         default=None,
         help="Path to ffprobe executable (default: search PATH)",
     )
+    ap.add_argument(
+        "--rescan",
+        action="store_true",
+        help="Walk the tree even when the XMP catalog (ratings.sqlite) has synced it",
+    )
     args = ap.parse_args()
 
     root: Path = args.root.resolve()
@@ -337,19 +345,15 @@ def main() -> int:
     out_dir = (args.out_dir or (root / "_status")).resolve()
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    cut = None
-    if args.days and args.days > 0:
-        cut = datetime.now() - timedelta(days=args.days)
+    from xmp_catalog import list_xmps
+
+    entries, _source = list_xmps(root, name_glob=args.name_glob, days=args.days, scan=True if args.rescan else None)
 
     rows: List[Row] = []
-    for xmp in sorted(root.glob(f"**/{args.name_glob}")):
-        try:
-            mtime = datetime.fromtimestamp(xmp.stat().st_mtime)
-        except OSError:
-            continue
-        if cut and mtime < cut:
-            continue
-        rating = parse_xmp_rating(xmp)
+    for entry in entries:
+        xmp = entry.path
+        mtime = datetime.fromtimestamp(entry.mtime)
+        rating = entry.rating
         stem_name = xmp.stem
         stem_dir = xmp.parent
 
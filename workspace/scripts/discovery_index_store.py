@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+SQLite mirror of the Discovery og/wip index (rebuildable).
+
+``discovery_og_wip_index.json`` stays the compatibility export; this store under
+``output/_status/`` answers the library list (filter + pagination) and single-row
+lookups by group id / relpath / basename / sha256 without loading the whole JSON
+document. See docs/SCALE_INDEX_ARCHITECTURE.md.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import posixpath
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DISCOVERY_INDEX_STORE_BASENAME = "discovery_index.sqlite"
+DISCOVERY_INDEX_STORE_SCHEMA_VERSION = 1
+
+# Same extension strip as the server's relpath/stem matcher.
+_STEM_STRIP_EXTS = (".mp4", ".png", ".jpg", ".jpeg", ".webp", ".gif", ".xmp")
+_META_KEYS = ("version", "updated_at", "item_count", "scan_ms", "skipped_raw_files")
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def default_discovery_index_store_path(index_json_path: Path) -> Path:
+    return Path(index_json_path).with_name(DISCOVERY_INDEX_STORE_BASENAME)
+
+
+def normalize_rel(raw: str) -> str:
+    p = str(raw or "").replace("\\", "/").strip().lstrip("/")
+    p2 = posixpath.normpath(p) if p else ""
+    if p2 in ("", ".") or p2 == ".." or p2.startswith("../"):
+        return ""
+    return p2
+
+
+def relpath_stem_key(raw: str) -> str:
+    """Relpath with one known media/sidecar extension stripped (case-insensitive)."""
+    rel = normalize_rel(raw)
+    low = rel.lower()
+    for ext in _STEM_STRIP_EXTS:
+        if low.endswith(ext):
+            return rel[: -len(ext)]
+    return rel
+
+
+def open_discovery_index_store(path: Path) -> sqlite3.Connection:
+    path = Path(path).expanduser().resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(path), timeout=30)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS items (
+            group_id TEXT PRIMARY KEY,
+            ord INTEGER NOT NULL,
+            library TEXT,
+            relpath TEXT,
+            name TEXT,
+            stem TEXT,
+            mtime REAL,
+            size INTEGER,
+            sha256 TEXT,
+            video_relpath TEXT,
+            thumb_relpath TEXT,
+            ident_blob TEXT NOT NULL,
+            search_blob TEXT NOT NULL,
+            item_json TEXT NOT NULL
+        )
+        """
+    )
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS item_keys (
+            group_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            value TEXT NOT NULL,
+            UNIQUE(group_id, kind, value)
+        )
+        """
+    )
+    con.execute("CREATE INDEX IF NOT EXISTS idx_di_ord ON items(ord)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_di_relpath ON items(relpath)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_di_stem ON items(stem)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_di_sha256 ON items(sha256)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_di_mtime ON items(mtime)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_di_lib_ord ON items(library, ord)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_dik_value ON item_keys(kind, value)")
+    con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    found = con.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    if found is None or found[0] != str(DISCOVERY_INDEX_STORE_SCHEMA_VERSION):
+        # Only on change: every Discovery GET opens the store and must not write to it.
+        con.execute(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES('schema_version', ?)",
+            (str(DISCOVERY_INDEX_STORE_SCHEMA_VERSION),),
+        )
+    con.commit()
+    return con
+
+
+def _item_paths(item: Dict[str, Any]) -> List[str]:
+    paths: List[str] = []
+    for k in ("relpath", "video_relpath", "thumb_relpath"):
+        v = item.get(k)
+        if isinstance(v, str) and v.strip():
+            paths.append(v.strip())
+    mems = item.get("members")
+    if isinstance(mems, list):
+        for mm in mems:
+            if isinstance(mm, dict):
+                rv = mm.get("relpath")
+                if isinstance(rv, str) and rv.strip():
+                    paths.append(rv.strip())
+    return paths
+
+
+def _item_keys(item: Dict[str, Any]) -> Iterable[Tuple[str, str]]:
+    for p in _item_paths(item):
+        stem = relpath_stem_key(p)
+        if stem:
+            yield ("path_stem", stem)
+        bn = Path(p).name.lower()
+        if bn:
+            yield ("basename", bn)
+    names = [item.get("name")]
+    mems = item.get("members")
+    if isinstance(mems, list):
+        names.extend(mm.get("name") for mm in mems if isinstance(mm, dict))
+    for nm in names:
+        s = str(nm or "").lower()
+        if s:
+            yield ("basename", s)
+
+
+def _search_blob(item: Dict[str, Any]) -> str:
+    """Same text the library ``q`` filter matched in Python: relpath, name, member relpaths/names."""
+    parts = [str(item.get("relpath") or "").lower(), str(item.get("name") or "").lower()]
+    mems = item.get("members")
+    if isinstance(mems, list):
+        for mm in mems:
+            if isinstance(mm, dict):
+                parts.append(str(mm.get("relpath") or "").lower())
+                parts.append(str(mm.get("name") or "").lower())
+    return " ".join(parts)
+
+
+def _ident_blob(item: Dict[str, Any]) -> str:
+    return " ".join(
+        str(item.get(k) or "") for k in ("name", "relpath", "video_relpath", "thumb_relpath", "group_id")
+    ).lower()
+
+
+def replace_from_index(
+    con: sqlite3.Connection,
+    doc: Dict[str, Any],
+    *,
+    source_stat: Optional[Tuple[float, int]] = None,
+) -> int:
+    """Replace all rows with ``doc["items"]`` in one transaction. Returns rows written."""
+    items = doc.get("items") if isinstance(doc, dict) else None
+    if not isinstance(items, list):
+        items = []
+    rows: List[Tuple[Any, ...]] = []
+    keys: List[Tuple[str, str, str]] = []
+    for it in items:
+        if not isinstance(it, dict):
+            continue
+        gid = str(it.get("group_id") or "").strip()
+        if not gid:
+            continue
+        stem = gid.split(":stem:", 1)[1] if ":stem:" in gid else Path(str(it.get("name") or "")).stem.lower()
+        rows.append(
+            (
+                gid,
+                len(rows),
+                it.get("library"),
+                it.get("relpath"),
+                it.get("name"),
+                stem,
+                float(it.get("mtime") or 0),
+                int(it.get("size") or 0),
+                it.get("sha256"),
+                it.get("video_relpath"),
+                it.get("thumb_relpath"),
+                _ident_blob(it),
+                _search_blob(it),
+                json.dumps(it, ensure_ascii=False, separators=(",", ":")),
+            )
+        )
+        keys.extend((gid, kind, value) for kind, value in _item_keys(it))
+    with con:
+        con.execute("DELETE FROM items")
+        con.execute("DELETE FROM item_keys")
+        con.executemany(
+            """
+            INSERT OR REPLACE INTO items (
+                group_id, ord, library, relpath, name, stem, mtime, size, sha256,
+                video_relpath, thumb_relpath, ident_blob, search_blob, item_json
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        con.executemany("INSERT OR IGNORE INTO item_keys(group_id, kind, value) VALUES (?, ?, ?)", keys)
+        meta = {k: doc.get(k) for k in _META_KEYS}
+        meta["synced_at"] = utc_now()
+        if source_stat is not None:
+            meta["source_mtime"], meta["source_size"] = source_stat
+        con.execute("DELETE FROM meta WHERE key != 'schema_version'")
+        con.executemany(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES(?, ?)",
+            [(k, json.dumps(v)) for k, v in meta.items()],
+        )
+    return len(rows)
+
+
+def read_meta(con: sqlite3.Connection) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for row in con.execute("SELECT key, value FROM meta"):
+        try:
+            out[row["key"]] = json.loads(row["value"])
+        except (TypeError, ValueError):
+            out[row["key"]] = row["value"]
+    return out
+
+
+def is_in_sync(con: sqlite3.Connection, index_json_path: Path) -> bool:
+    """True when the store was last synced from the JSON export at its current (mtime, size)."""
+    try:
+        st = Path(index_json_path).stat()
+    except OSError:
+        return False
+    meta = read_meta(con)
+    try:
+        return float(meta.get("source_mtime")) == float(st.st_mtime) and int(meta.get("source_size")) == int(
+            st.st_size
+        )
+    except (TypeError, ValueError):
+        return False
+
+
+def sync_from_json(con: sqlite3.Connection, index_json_path: Path, *, force: bool = False) -> bool:
+    """Reload rows from the JSON export when it changed since the last sync. Returns True if reloaded."""
+    index_json_path = Path(index_json_path)
+    if not force and is_in_sync(con, index_json_path):
+        return False
+    try:
+        st = index_json_path.stat()
+        doc = json.loads(index_json_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return False
+    if not isinstance(doc, dict):
+        return False
+    replace_from_index(con, doc, source_stat=(float(st.st_mtime), int(st.st_size)))
+    return True
+
+
+def _items_from_rows(rows: Iterable[sqlite3.Row]) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for row in rows:
+        try:
+            obj = json.loads(row["item_json"])
+        except (TypeError, ValueError):
+            continue
+        if isinstance(obj, dict):
+            out.append(obj)
+    return out
+
+
+def _like_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def query_library(
+    con: sqlite3.Connection,
+    *,
+    library: str = "all",
+    q: str = "",
+    since_mtime: Optional[float] = None,
+    limit: int = 800,
+    offset: int = 0,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Filtered page of items in index order (newest first). Returns (items, total_after_filter)."""
+    where: List[str] = []
+    args: List[Any] = []
+    if library and library != "all":
+        where.append("library = ?")
+        args.append(library)
+    needle = str(q or "").strip().lower()
+    if needle:
+        where.append("search_blob LIKE ? ESCAPE '\\'")
+        args.append(f"%{_like_escape(needle)}%")
+    if since_mtime is not None:
+        where.append("mtime >= ?")
+        args.append(float(since_mtime))
+    clause = (" WHERE " + " AND ".join(where)) if where else ""
+    total = int(con.execute(f"SELECT COUNT(*) FROM items{clause}", args).fetchone()[0])
+    rows = con.execute(
+        f"SELECT item_json FROM items{clause} ORDER BY ord LIMIT ? OFFSET ?",
+        [*args, max(0, int(limit)), max(0, int(offset))],
+    ).fetchall()
+    return _items_from_rows(rows), total
+
+
+def lookup_by_group_id(con: sqlite3.Connection, group_id: str) -> Optional[Dict[str, Any]]:
+    rows = con.execute("SELECT item_json FROM items WHERE group_id = ?", (str(group_id or ""),)).fetchall()
+    hits = _items_from_rows(rows)
+    return hits[0] if hits else None
+
+
+def lookup_by_relpath(con: sqlite3.Connection, relpath: str) -> Optional[Dict[str, Any]]:
+    """First item (index order) with any path whose extension-stripped form matches ``relpath``."""
+    stem = relpath_stem_key(relpath)
+    if not stem:
+        return None
+    rows = con.execute(
+        """
+        SELECT i.item_json FROM item_keys k JOIN items i ON i.group_id = k.group_id
+        WHERE k.kind = 'path_stem' AND k.value = ? ORDER BY i.ord LIMIT 1
+        """,
+        (stem,),
+    ).fetchall()
+    hits = _items_from_rows(rows)
+    return hits[0] if hits else None
+
+
+def lookup_by_basename(con: sqlite3.Connection, basename: str) -> Optional[Dict[str, Any]]:
+    """Newest item whose name / member names / paths end in ``basename`` (case-insensitive)."""
+    bn = Path(str(basename or "").strip()).name.lower().strip()
+    if not bn:
+        return None
+    rows = con.execute(
+        """
+        SELECT i.item_json FROM item_keys k JOIN items i ON i.group_id = k.group_id
+        WHERE k.kind = 'basename' AND k.value = ? ORDER BY i.mtime DESC, i.ord LIMIT 1
+        """,
+        (bn,),
+    ).fetchall()
+    hits = _items_from_rows(rows)
+    return hits[0] if hits else None
+
+
+def lookup_by_sha256(con: sqlite3.Connection, sha256: str) -> List[Dict[str, Any]]:
+    rows = con.execute("SELECT item_json FROM items WHERE sha256 = ? ORDER BY ord", (str(sha256 or ""),)).fetchall()
+    return _items_from_rows(rows)
+
+
+def items_matching_stem(
+    con: sqlite3.Connection,
+    stem: str,
+    *,
+    exclude_group_id: str = "",
+    limit: int = 300,
+) -> List[Dict[str, Any]]:
+    """Rows whose name/relpath/group id embeds ``stem`` (substring; index order)."""
+    needle = str(stem or "").strip().lower()
+    if len(needle) < 8:
+        return []
+    sql = "SELECT item_json FROM items WHERE ident_blob LIKE ? ESCAPE '\\' AND group_id != ? ORDER BY ord"
+    args: List[Any] = [f"%{_like_escape(needle)}%", str(exclude_group_id or "")]
+    if limit > 0:
+        sql += " LIMIT ?"
+        args.append(int(limit))
+    return _items_from_rows(con.execute(sql, args).fetchall())
+
+
+def newest_items(con: sqlite3.Connection, limit: int) -> List[Dict[str, Any]]:
+    rows = con.execute(
+        "SELECT item_json FROM items ORDER BY mtime DESC, ord LIMIT ?",
+        (max(1, int(limit)),),
+    ).fetchall()
+    return _items_from_rows(rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Rebuild / query the Discovery index SQLite mirror")
+    ap.add_argument("index_json", help="Path to discovery_og_wip_index.json")
+    ap.add_argument("--store", default=None, help="SQLite path (default: discovery_index.sqlite beside the JSON)")
+    sp = ap.add_subparsers(dest="cmd", required=True)
+    sp.add_parser("rebuild", help="Force reload from the JSON export")
+    look = sp.add_parser("lookup", help="Lookup one item by relpath, basename or group id")
+    look.add_argument("key")
+    args = ap.parse_args(argv)
+
+    index_json = Path(args.index_json).expanduser().resolve()
+    store = Path(args.store).expanduser().resolve() if args.store else default_discovery_index_store_path(index_json)
+    con = open_discovery_index_store(store)
+    try:
+        if args.cmd == "rebuild":
+            ok = sync_from_json(con, index_json, force=True)
+            print(json.dumps({"ok": ok, "store": str(store), **read_meta(con)}, indent=2))
+            return 0 if ok else 1
+        sync_from_json(con, index_json)
+        key = str(args.key)
+        item = (
+            lookup_by_group_id(con, key)
+            or lookup_by_relpath(con, key)
+            or lookup_by_basename(con, key)
+        )
+        print(json.dumps({"ok": item is not None, "item": item}, indent=2))
+        return 0 if item is not None else 1
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Append-only SQLite store for Discovery lineage edges.
+
+``discovery_lineage_edges.sqlite`` beside ``discovery_lineage_edges.json`` under
+``output/_status/`` is the source of truth: one row per unique
+``(child_group_id, parent_group_id, via_source_raw)``, indexed on child and parent, so
+persisting a batch of edges is ``INSERT OR IGNORE`` instead of load + dedupe + rewrite of
+the whole JSON. The JSON stays an optional export (``export`` subcommand, or the
+server's periodic export) for tools that still read it; a JSON written by someone else
+is imported (unioned) on the next open. See docs/SCALE_INDEX_ARCHITECTURE.md.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+LINEAGE_STORE_BASENAME = "discovery_lineage_edges.sqlite"
+LINEAGE_STORE_SCHEMA_VERSION = 1
+LINEAGE_JSON_BASENAME = "discovery_lineage_edges.json"
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def default_lineage_store_path(edges_json_path: Path) -> Path:
+    return Path(edges_json_path).with_name(LINEAGE_STORE_BASENAME)
+
+
+def open_lineage_store(path: Path) -> sqlite3.Connection:
+    path = Path(path).expanduser().resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(path), timeout=30)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS edges (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            child_group_id TEXT NOT NULL,
+            parent_group_id TEXT NOT NULL,
+            via_source_raw TEXT NOT NULL DEFAULT '',
+            evidence TEXT,
+            edge_json TEXT NOT NULL,
+            added_at TEXT NOT NULL,
+            UNIQUE(child_group_id, parent_group_id, via_source_raw)
+        )
+        """
+    )
+    con.execute("CREATE INDEX IF NOT EXISTS idx_le_child ON edges(child_group_id)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_le_parent ON edges(parent_group_id)")
+    con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    found = con.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    if found is None or found[0] != str(LINEAGE_STORE_SCHEMA_VERSION):
+        # Only on change: readers open the store too, and must not bump its mtime.
+        con.execute(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES('schema_version', ?)",
+            (str(LINEAGE_STORE_SCHEMA_VERSION),),
+        )
+    con.commit()
+    return con
+
+
+def edge_key(edge: Dict[str, Any]) -> Tuple[str, str, str]:
+    return (
+        str(edge.get("child_group_id") or "").strip(),
+        str(edge.get("parent_group_id") or "").strip(),
+        str(edge.get("via_source_raw") or "").strip(),
+    )
+
+
+def insert_edges(con: sqlite3.Connection, edges: Iterable[Any]) -> int:
+    """Append edges not already stored (by child / parent / via). Returns the number added."""
+    now = utc_now()
+    rows: List[Tuple[str, str, str, str, str, str]] = []
+    for edge in edges:
+        if not isinstance(edge, dict):
+            continue
+        child, parent, via = edge_key(edge)
+        if not child or not parent:
+            continue
+        rows.append(
+            (child, parent, via, str(edge.get("evidence") or ""), json.dumps(edge, ensure_ascii=False), now)
+        )
+    if not rows:
+        return 0
+    before = con.total_changes
+    with con:
+        con.executemany(
+            """
+            INSERT OR IGNORE INTO edges
+              (child_group_id, parent_group_id, via_source_raw, evidence, edge_json, added_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    return con.total_changes - before
+
+
+def _edges_from_rows(rows: Iterable[sqlite3.Row]) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for row in rows:
+        try:
+            obj = json.loads(row["edge_json"])
+        except (TypeError, ValueError):
+            continue
+        if isinstance(obj, dict):
+            out.append(obj)
+    return out
+
+
+def all_edges(con: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Every edge in insertion order (same order the JSON list had)."""
+    return _edges_from_rows(con.execute("SELECT edge_json FROM edges ORDER BY seq"))
+
+
+def edges_for_child(con: sqlite3.Connection, child_group_id: str) -> List[Dict[str, Any]]:
+    rows = con.execute("SELECT edge_json FROM edges WHERE child_group_id = ? ORDER BY seq", (str(child_group_id),))
+    return _edges_from_rows(rows)
+
+
+def edges_for_parent(con: sqlite3.Connection, parent_group_id: str) -> List[Dict[str, Any]]:
+    rows = con.execute("SELECT edge_json FROM edges WHERE parent_group_id = ? ORDER BY seq", (str(parent_group_id),))
+    return _edges_from_rows(rows)
+
+
+def store_version(con: sqlite3.Connection) -> Tuple[int, int]:
+    """``(max seq, edge count)`` — changes on every insert; cheap cache key for readers."""
+    row = con.execute("SELECT COALESCE(MAX(seq), 0), COUNT(*) FROM edges").fetchone()
+    return int(row[0]), int(row[1])
+
+
+def read_meta(con: sqlite3.Connection) -> Dict[str, Any]:
+    meta = {str(r["key"]): r["value"] for r in con.execute("SELECT key, value FROM meta")}
+    seq, count = store_version(con)
+    meta["edge_count"] = count
+    meta["max_seq"] = seq
+    return meta
+
+
+def _json_stamp(path: Path) -> Optional[str]:
+    try:
+        st = Path(path).stat()
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _set_meta(con: sqlite3.Connection, **values: Any) -> None:
+    with con:
+        con.executemany(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES(?, ?)",
+            [(k, None if v is None else str(v)) for k, v in values.items()],
+        )
+
+
+def import_json(con: sqlite3.Connection, edges_json_path: Path, *, force: bool = False) -> int:
+    """
+    Union edges from a JSON export into the store when the file changed since the last
+    import / export. Returns the number of edges added (0 when skipped).
+    """
+    path = Path(edges_json_path)
+    stamp = _json_stamp(path)
+    if stamp is None:
+        return 0
+    row = con.execute("SELECT value FROM meta WHERE key = 'json_stamp'").fetchone()
+    if not force and row is not None and row[0] == stamp:
+        return 0
+    try:
+        doc = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return 0
+    edges = doc.get("edges") if isinstance(doc, dict) else doc
+    added = insert_edges(con, edges) if isinstance(edges, list) else 0
+    _set_meta(con, json_stamp=stamp, json_imported_at=utc_now())
+    return added
+
+
+def export_json(con: sqlite3.Connection, edges_json_path: Path) -> int:
+    """Write every edge to the JSON export (atomic). Returns the edge count."""
+    path = Path(edges_json_path)
+    edges = all_edges(con)
+    doc = {"version": 1, "updated_at": utc_now(), "edges": edges}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + f".tmp.{os.getpid()}")
+    tmp.write_text(json.dumps(doc, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    tmp.replace(path)
+    _set_meta(con, json_stamp=_json_stamp(path), json_exported_at=doc["updated_at"])
+    return len(edges)
+
+
+def open_synced_lineage_store(edges_json_path: Path) -> sqlite3.Connection:
+    """Store beside ``edges_json_path`` with any newer JSON export folded in."""
+    con = open_lineage_store(default_lineage_store_path(edges_json_path))
+    try:
+        import_json(con, edges_json_path)
+    except Exception:
+        con.close()
+        raise
+    return con
+
+
+def lineage_edges_exist(edges_json_path: Path) -> bool:
+    path = Path(edges_json_path)
+    return path.is_file() or default_lineage_store_path(path).is_file()
+
+
+def load_lineage_edges(edges_json_path: Path) -> List[Dict[str, Any]]:
+    """
+    All edges for readers that take the (legacy) JSON path.
+
+    Reads the store beside it (importing a newer JSON first); falls back to parsing the
+    JSON when the store cannot be opened (read-only ``_status``).
+    """
+    path = Path(edges_json_path)
+    if not lineage_edges_exist(path):
+        return []
+    try:
+        con = open_synced_lineage_store(path)
+    except (OSError, sqlite3.Error):
+        con = None
+    if con is not None:
+        try:
+            return all_edges(con)
+        finally:
+            con.close()
+    try:
+        doc = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return []
+    edges = doc.get("edges") if isinstance(doc, dict) else doc
+    return [e for e in edges if isinstance(e, dict)] if isinstance(edges, list) else []
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Import / export / inspect the Discovery lineage edge store")
+    ap.add_argument("edges_json", help=f"Path to {LINEAGE_JSON_BASENAME} (store lives beside it)")
+    sp = ap.add_subparsers(dest="cmd", required=True)
+    sp.add_parser("import", help="Force-union the JSON export into the store")
+    sp.add_parser("export", help="Rewrite the JSON export from the store")
+    sp.add_parser("stats", help="Edge count + import/export stamps")
+    look = sp.add_parser("lookup", help="Edges touching one group id")
+    look.add_argument("group_id")
+    args = ap.parse_args(argv)
+
+    edges_json = Path(args.edges_json).expanduser().resolve()
+    con = open_lineage_store(default_lineage_store_path(edges_json))
+    try:
+        if args.cmd == "import":
+            added = import_json(con, edges_json, force=True)
+            print(json.dumps({"ok": True, "added": added, **read_meta(con)}, indent=2))
+        elif args.cmd == "export":
+            n = export_json(con, edges_json)
+            print(json.dumps({"ok": True, "exported": n, "path": str(edges_json)}, indent=2))
+        elif args.cmd == "stats":
+            import_json(con, edges_json)
+            print(json.dumps({"ok": True, **read_meta(con)}, indent=2))
+        else:
+            import_json(con, edges_json)
+            gid = str(args.group_id)
+            print(
+                json.dumps(
+                    {"ok": True, "parents": edges_for_child(con, gid), "children": edges_for_parent(con, gid)},
+                    indent=2,
+                )
+            )
+        return 0
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Columnar weighted sampling for hourly selection (NumPy when installed, pure Python otherwise).
+
+Hourly replay folds a chain of multipliers into each recipe's weight (rating blend →
+recent 5★ → recent combo → recent source → source promotion → archive age) and then
+draws with ``_weighted_choice``. :class:`WeightColumns` keeps the base weights and each
+multiplier as its own column and folds them in the order they were added, elementwise,
+so the folded weights are bit-identical to the per-recipe loop. :class:`PrefixSampler`
+reproduces ``_weighted_choice`` exactly for a given ``random.Random`` — negative
+weights clipped to 0, ``rng.random() * total``, first prefix sum ``>= pick`` — using
+``bisect`` / ``searchsorted`` instead of a linear walk, and draws a whole batch of
+cursors with one search (``simulate_replay_selection``).
+
+``HOURLY_WEIGHT_ENGINE=python`` forces the pure-Python columns even when NumPy is
+installed (both paths give the same picks).
+
+  python3 bench_hourly_weights.py --recipes 10000 --hours 50000
+"""
+
+from __future__ import annotations
+
+import os
+import random
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Any, List, Sequence, Tuple
+
+try:
+    import numpy as _np
+except ImportError:  # optional: the list path gives the same picks
+    _np = None
+
+
+def numpy_enabled() -> bool:
+    if _np is None:
+        return False
+    return os.environ.get("HOURLY_WEIGHT_ENGINE", "").strip().lower() not in {"python", "py", "off"}
+
+
+def engine_name() -> str:
+    return "numpy" if numpy_enabled() else "python"
+
+
+class WeightColumns:
+    """Base weights times named multiplier columns, folded left to right."""
+
+    def __init__(self, base: Sequence[float]) -> None:
+        self.base: List[float] = [float(w) for w in base]
+        self.factors: List[Tuple[str, List[float]]] = []
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+    def multiply(self, name: str, factors: Sequence[float]) -> "WeightColumns":
+        if len(factors) != len(self.base):
+            raise ValueError(f"{name}: {len(factors)} factors for {len(self.base)} rows")
+        self.factors.append((name, [float(f) for f in factors]))
+        return self
+
+    def factor(self, name: str) -> List[float]:
+        for key, col in self.factors:
+            if key == name:
+                return col
+        return [1.0] * len(self.base)
+
+    def fold(self) -> List[float]:
+        if numpy_enabled() and self.base:
+            out = _np.asarray(self.base, dtype=_np.float64)
+            for _name, col in self.factors:
+                out = out * _np.asarray(col, dtype=_np.float64)
+            return out.tolist()
+        out_l = list(self.base)
+        for _name, col in self.factors:
+            out_l = [w * f for w, f in zip(out_l, col)]
+        return out_l
+
+
+class PrefixSampler:
+    """``_weighted_choice`` over a fixed weight vector: prefix sums once, binary search per draw."""
+
+    __slots__ = ("n", "total", "_cum", "_np_cum")
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        clipped = [max(0.0, w) for w in weights]
+        self.n = len(clipped)
+        # Builtin ``sum`` — the same total the linear scan used (compensated on 3.12+).
+        self.total = sum(clipped)
+        self._cum: List[float] = list(accumulate(clipped))
+        self._np_cum: Any = _np.asarray(self._cum, dtype=_np.float64) if numpy_enabled() and self._cum else None
+
+    def _locate(self, pick: float) -> int:
+        return min(bisect_left(self._cum, pick), self.n - 1)
+
+    def choose(self, rng: random.Random) -> int:
+        """Index drawn with ``rng`` (consumes exactly what ``_weighted_choice`` consumed)."""
+        if self.total <= 0:
+            return rng.randrange(self.n)
+        return self._locate(rng.random() * self.total)
+
+    def choose_many(self, rngs: Sequence[random.Random]) -> List[int]:
+        """One draw per rng; a single ``searchsorted`` over the batch when NumPy is on."""
+        if self.total <= 0:
+            return [r.randrange(self.n) for r in rngs]
+        picks = [r.random() * self.total for r in rngs]
+        if self._np_cum is not None:
+            found = _np.searchsorted(self._np_cum, _np.asarray(picks, dtype=_np.float64), side="left")
+            return _np.minimum(found, self.n - 1).tolist()
+        return [self._locate(p) for p in picks]
+
+
+def weighted_index(weights: Sequence[float], rng: random.Random) -> int:
+    """Single draw; equals ``PrefixSampler(weights).choose(rng)``."""
+    return PrefixSampler(weights).choose(rng)
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Shared ffprobe layer with a persistent probe cache.
+
+One combined probe (``-show_format -show_streams``) per media file version; results are
+memoized in-process and in SQLite keyed by ``(abs path, size, mtime_ns)`` so hourly
+status / deposit passes and the vision / inventory tools stop re-spawning ffprobe for
+files that have not changed. Callers keep their own return shapes:
+
+- ``shape_factory.ffprobe_video_info`` / ``shape_factory_queue._probe_media_frame_meta``
+- ``snowflake_inventory.ffprobe_media_info``
+- ``comfy_meta_lib.ffprobe_show_format``
+- ``vision_slice_sample.probe_duration_sec`` / ``video_companion_thumbs.probe_duration_sec``
+
+Cache path: ``$MEDIA_PROBE_CACHE`` (``off`` disables the SQLite tier), else
+``<output bind>/_status/media_probe.sqlite`` beside the other output stores (shared by host and
+containers, wiped with the outputs it describes; see ``output_path_lib.default_status_dir``),
+else ``$XDG_CACHE_HOME/shape_factory/media_probe.sqlite`` when no output bind is configured.
+
+  python3 media_probe.py probe clip.mp4 [--count-frames]
+  python3 media_probe.py stats
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from output_path_lib import default_status_dir
+
+MEDIA_PROBE_CACHE_BASENAME = "media_probe.sqlite"
+MEDIA_PROBE_CACHE_SCHEMA_VERSION = 1
+MEDIA_PROBE_CACHE_ENV = "MEDIA_PROBE_CACHE"
+
+_MEMO_MAX = 4096
+
+
+class ProbeError(RuntimeError):
+    """ffprobe could not run or rejected the file."""
+
+
+_LOCK = threading.Lock()
+_MEMO: Dict[Tuple[str, str], Tuple[int, int, Dict[str, Any]]] = {}
+_CON: Optional[sqlite3.Connection] = None
+_CON_PATH: Optional[str] = None
+_STATS = {"spawned": 0, "memory_hits": 0, "cache_hits": 0}
+
+
+def default_probe_cache_path() -> Optional[Path]:
+    raw = os.environ.get(MEDIA_PROBE_CACHE_ENV, "").strip()
+    if raw.lower() in {"off", "0", "none", "false"}:
+        return None
+    if raw:
+        return Path(raw).expanduser()
+    status_dir = default_status_dir()
+    if status_dir is not None:
+        return status_dir / MEDIA_PROBE_CACHE_BASENAME
+    base = os.environ.get("XDG_CACHE_HOME", "").strip() or str(Path.home() / ".cache")
+    return Path(base).expanduser() / "shape_factory" / MEDIA_PROBE_CACHE_BASENAME
+
+
+def open_probe_cache(path: Path) -> sqlite3.Connection:
+    path = Path(path).expanduser().resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS probes (
+            path TEXT NOT NULL,
+            variant TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            ok INTEGER NOT NULL,
+            result_json TEXT NOT NULL,
+            probed_at REAL NOT NULL,
+            PRIMARY KEY (path, variant)
+        )
+        """
+    )
+    con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    con.execute(
+        "INSERT OR REPLACE INTO meta(key, value) VALUES('schema_version', ?)",
+        (str(MEDIA_PROBE_CACHE_SCHEMA_VERSION),),
+    )
+    con.commit()
+    return con
+
+
+def _cache_con() -> Optional[sqlite3.Connection]:
+    """Process-wide connection (caller holds ``_LOCK``); None when disabled or unusable."""
+    global _CON, _CON_PATH
+    path = default_probe_cache_path()
+    key = str(path) if path is not None else None
+    if key != _CON_PATH:
+        if _CON is not None:
+            _CON.close()
+        _CON, _CON_PATH = None, key
+        if path is not None:
+            try:
+                _CON = open_probe_cache(path)
+            except (OSError, sqlite3.Error):
+                _CON = None
+    return _CON
+
+
+def probe_stats() -> Dict[str, int]:
+    with _LOCK:
+        return dict(_STATS)
+
+
+def reset_probe_memo(*, stats: bool = True) -> None:
+    """Drop the in-process memo (and counters); the SQLite tier is untouched."""
+    with _LOCK:
+        _MEMO.clear()
+        if stats:
+            for k in _STATS:
+                _STATS[k] = 0
+
+
+def _run_ffprobe(path: Path, *, ffprobe: str, count_frames: bool, timeout: float) -> Tuple[bool, Dict[str, Any]]:
+    """``(ok, payload)``: payload is ffprobe JSON, or ``{"error": ...}`` for a non-zero exit."""
+    cmd = [ffprobe, "-v", "error", "-print_format", "json", "-show_format", "-show_streams"]
+    if count_frames:
+        cmd.append("-count_frames")
+    cmd.append(str(path))
+    with _LOCK:
+        _STATS["spawned"] += 1
+    try:
+        # ffprobe may emit UTF-8 even on Windows consoles; force utf-8 to avoid decode crashes.
+        proc = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=timeout,
+            check=False,
+        )
+    except FileNotFoundError as exc:
+        raise ProbeError(f"ffprobe not found ({ffprobe})") from exc
+    except subprocess.TimeoutExpired as exc:
+        raise ProbeError(f"ffprobe timed out after {timeout:g}s for {path}") from exc
+    if proc.returncode != 0:
+        return False, {"error": (proc.stderr or proc.stdout or "ffprobe failed").strip()[:2000]}
+    try:
+        obj = json.loads(proc.stdout or "{}")
+    except json.JSONDecodeError as exc:
+        raise ProbeError(f"ffprobe returned invalid JSON for {path}") from exc
+    if not isinstance(obj, dict):
+        obj = {}
+    obj.setdefault("streams", [])
+    obj.setdefault("format", {})
+    return True, obj
+
+
+def probe_media(
+    path: Union[str, Path],
+    *,
+    ffprobe: str = "ffprobe",
+    count_frames: bool = False,
+    timeout: float = 60.0,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    Combined ``{"streams": [...], "format": {...}}`` for ``path``.
+
+    Cached per ``(path, size, mtime_ns)``; a non-zero ffprobe exit is cached too (same
+    file version fails the same way) and raised as :class:`ProbeError`. Missing binary /
+    timeouts raise without caching.
+    """
+    p = Path(path).expanduser()
+    try:
+        st = p.stat()
+        abs_s = str(p.resolve())
+    except OSError as exc:
+        raise ProbeError(f"media not found: {p}") from exc
+    variant = "count_frames" if count_frames else "default"
+    memo_key = (abs_s, variant)
+    if use_cache:
+        with _LOCK:
+            hit = _MEMO.get(memo_key)
+            if hit is not None and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+                _STATS["memory_hits"] += 1
+                return _unwrap(hit[2], p)
+            con = _cache_con()
+            row = None
+            if con is not None:
+                try:
+                    row = con.execute(
+                        "SELECT ok, result_json FROM probes WHERE path = ? AND variant = ? AND size = ? AND mtime_ns = ?",
+                        (abs_s, variant, st.st_size, st.st_mtime_ns),
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+            if row is not None:
+                entry = {"ok": bool(row[0]), "result": json.loads(row[1])}
+                _remember(memo_key, st, entry)
+                _STATS["cache_hits"] += 1
+                return _unwrap(entry, p)
+
+    ok, payload = _run_ffprobe(p, ffprobe=ffprobe, count_frames=count_frames, timeout=timeout)
+    entry = {"ok": ok, "result": payload}
+    if use_cache:
+        with _LOCK:
+            _remember(memo_key, st, entry)
+            con = _cache_con()
+            if con is not None:
+                try:
+                    con.execute(
+                        "INSERT OR REPLACE INTO probes(path, variant, size, mtime_ns, ok, result_json, probed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (abs_s, variant, st.st_size, st.st_mtime_ns, int(ok), json.dumps(payload), time.time()),
+                    )
+                    con.commit()
+                except sqlite3.Error:
+                    pass
+    return _unwrap(entry, p)
+
+
+def _remember(key: Tuple[str, str], st: os.stat_result, entry: Dict[str, Any]) -> None:
+    if len(_MEMO) >= _MEMO_MAX:
+        _MEMO.pop(next(iter(_MEMO)))
+    _MEMO[key] = (st.st_size, st.st_mtime_ns, entry)
+
+
+def _unwrap(entry: Dict[str, Any], path: Path) -> Dict[str, Any]:
+    if not entry["ok"]:
+        raise ProbeError(str(entry["result"].get("error") or f"ffprobe failed for {path}"))
+    return json.loads(json.dumps(entry["result"]))
+
+
+def probe_many(
+    paths: Iterable[Union[str, Path]],
+    *,
+    workers: int = 4,
+    **kwargs: Any,
+) -> Dict[str, Union[Dict[str, Any], ProbeError]]:
+    """
+    Probe a batch with at most ``workers`` ffprobe processes in flight.
+
+    Returns ``{str(path): probe | ProbeError}`` in input order; cache hits never spawn.
+    """
+    items = list(dict.fromkeys(str(p) for p in paths))
+
+    def one(raw: str) -> Union[Dict[str, Any], ProbeError]:
+        try:
+            return probe_media(raw, **kwargs)
+        except ProbeError as exc:
+            return exc
+
+    if len(items) <= 1 or workers <= 1:
+        return {raw: one(raw) for raw in items}
+    with ThreadPoolExecutor(max_workers=min(int(workers), len(items))) as pool:
+        return dict(zip(items, pool.map(one, items)))
+
+
+def video_stream(probe: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    for stream in probe.get("streams") or []:
+        if isinstance(stream, dict) and stream.get("codec_type") == "video":
+            return stream
+    return None
+
+
+def format_duration_sec(probe: Dict[str, Any]) -> Optional[float]:
+    fmt = probe.get("format") if isinstance(probe.get("format"), dict) else {}
+    try:
+        return float(fmt["duration"]) if fmt.get("duration") is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    pp = sub.add_parser("probe", help="Probe one or more files (cached)")
+    pp.add_argument("paths", nargs="+")
+    pp.add_argument("--count-frames", action="store_true")
+    pp.add_argument("--workers", type=int, default=4)
+    pp.add_argument("--ffprobe", default="ffprobe")
+    sub.add_parser("stats", help="Cache path and row count")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "stats":
+        path = default_probe_cache_path()
+        rows = None
+        if path is not None and path.is_file():
+            con = open_probe_cache(path)
+            try:
+                rows = con.execute("SELECT COUNT(*) FROM probes").fetchone()[0]
+            finally:
+                con.close()
+        print(json.dumps({"cache_path": str(path) if path else None, "rows": rows}, indent=2))
+        return 0
+
+    results = probe_many(args.paths, workers=args.workers, ffprobe=args.ffprobe, count_frames=args.count_frames)
+    out = {k: ({"error": str(v)} if isinstance(v, ProbeError) else v) for k, v in results.items()}
+    print(json.dumps({"results": out, "stats": probe_stats()}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
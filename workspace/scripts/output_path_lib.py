@@ -186,6 +186,25 @@ def read_bind_output_dir(repo_root: Optional[Path] = None) -> Optional[Path]:
     return Path(raw).expanduser().resolve()
 
 
+CONTAINER_OUTPUT_DIR = Path("/workspace/output")
+
+
+def default_status_dir(repo_root: Optional[Path] = None) -> Optional[Path]:
+    """
+    ``<output bind>/_status`` — where the shared stores (discovery index, job catalog,
+    lineage edges, caches) live, visible to both the host and the containers.
+
+    Host: ``COMFYUI_BIND_OUTPUT_DIR`` (env or repo ``.env``); container: ``/workspace/output``.
+    None when neither is configured (dev checkout without a bind).
+    """
+    if repo_root is None:
+        repo_root = Path(__file__).resolve().parents[2]
+    out = read_bind_output_dir(repo_root)
+    if out is None and CONTAINER_OUTPUT_DIR.is_dir():
+        out = CONTAINER_OUTPUT_DIR
+    return out / "_status" if out is not None else None
+
+
 def stray_scan_roots(
     repo_root: Path,
     *,
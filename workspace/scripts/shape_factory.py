@@ -30,7 +30,6 @@ import json
 import os
 import re
 import shutil
-import subprocess
 import sys
 import time
 from pathlib import Path
@@ -45,6 +44,13 @@ from comfyui_submit import (
     submit_prompt_to_comfyui,
 )
 from comfy_meta_lib import extract_prompt_workflow_from_png_chunks, read_png_text_chunks
+from comfy_object_info_store import (
+    ObjectInfoSnapshot,
+    add_object_info_subparser,
+    load_object_info,
+    recheck_missing_node_types,
+)
+from media_probe import ProbeError, probe_many, probe_media, video_stream as media_video_stream
 from snowflake_factory import strip_video_previews_and_redirect_outputs
 from snowflake_inventory import is_litegraph_workflow, read_json
 from output_path_lib import (
@@ -54,6 +60,7 @@ from output_path_lib import (
     normalize_prompt_output_prefixes,
 )
 from workflow_repair import (
+    ObjectInfoLike,
     RepairContext,
     RepairFix,
     default_repair_rules,
@@ -71,6 +78,17 @@ from shape_factory_rating_sampler import add_rating_sampler_subparser
 from shape_factory_tags import add_tags_subparser
 from shape_factory_source_facets import add_source_facets_subparser
 from shape_factory_job_output_index import add_job_output_index_subparser
+from shape_factory_job_catalog import (
+    add_job_catalog_subparser,
+    jobs_root_for_path,
+    lookup_by_job_key,
+    lookup_by_prompt_id,
+    note_job_written,
+    open_synced_job_catalog,
+    pending_candidates,
+    sync_job_catalog,
+    upsert_job,
+)
 from shape_factory_seed_sources import add_seed_sources_subparser
 from shape_factory_backfill import add_backfill_subparser
 
@@ -1817,7 +1835,7 @@ def generate_job_for_picks(
         },
     )
     capture_job_workload(job_meta, workflow)
-    job_path.write_text(json.dumps(job_meta, ensure_ascii=False, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    atomic_write_json(job_path, job_meta)
     persist_timings(job_path, job_meta)
 
     return {
@@ -1971,6 +1989,28 @@ def atomic_write_json(path: Path, value: Any) -> None:
     tmp = path.with_name(path.name + ".tmp")
     tmp.write_text(json.dumps(value, ensure_ascii=False, indent=2, sort_keys=True) + "\n", encoding="utf-8")
     tmp.replace(path)
+    if path.name.endswith(".job.json") and isinstance(value, dict):
+        try:
+            note_job_written(path, value)
+        except Exception as exc:
+            print(f"  job_catalog_warn: {exc}", file=sys.stderr)
+
+
+def _open_job_catalog(jobs_root: Path) -> Any:
+    """Synced job catalog connection for ``jobs_root`` (None → callers fall back to a tree walk)."""
+    try:
+        return open_synced_job_catalog(jobs_root)
+    except Exception as exc:
+        print(f"  job_catalog_warn: {exc}", file=sys.stderr)
+        return None
+
+
+def _load_job_file(path: Path) -> Optional[dict[str, Any]]:
+    try:
+        job = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    return job if isinstance(job, dict) else None
 
 
 def iter_job_paths(args: argparse.Namespace, *, apply_limit: bool = True) -> list[Path]:
@@ -2006,6 +2046,55 @@ def iter_pending_submit_job_paths(args: argparse.Namespace) -> list[Path]:
     consume the budget (hourly used to truncate alphabetically and never reach
     true pending jobs).
     """
+    paths = _pending_submit_paths_from_catalog(args)
+    if paths is None:
+        paths = _pending_submit_paths_scan(args)
+    limit = getattr(args, "limit", None)
+    if isinstance(limit, int) and limit > 0 and len(paths) > limit:
+        paths = paths[:limit]
+    return paths
+
+
+def _pending_submit_paths_from_catalog(args: argparse.Namespace) -> Optional[list[Path]]:
+    """Catalog-backed pending scan for ``--jobs-dir`` / ``--family`` (None → walk the tree)."""
+    if getattr(args, "job", None):
+        return None
+    scopes: list[tuple[str, Path]] = []
+    if getattr(args, "jobs_dir", None):
+        scopes.append(("under", Path(args.jobs_dir).expanduser().resolve()))
+    if getattr(args, "family", None):
+        scopes.append(("direct", Path(args.job_dir).expanduser().resolve() / args.family))
+    if not scopes:
+        return []
+    rows: dict[str, float] = {}
+    for kind, scope in scopes:
+        if not scope.is_dir():
+            continue
+        con = _open_job_catalog(jobs_root_for_path(scope))
+        if con is None:
+            return None
+        try:
+            found = (
+                pending_candidates(con, under=scope)
+                if kind == "under"
+                else pending_candidates(con, direct_children_of=scope)
+            )
+        finally:
+            con.close()
+        for row in found:
+            rows.setdefault(row["job_path"], float(row["sort_ts"] or 0.0))
+    ordered = sorted(rows.items(), key=lambda kv: (-kv[1], kv[0]))
+    out: list[Path] = []
+    for path_s, _ts in ordered:
+        path = Path(path_s)
+        job = _load_job_file(path)
+        # Attempt caps (env) and any write the catalog has not seen yet are checked live.
+        if job is not None and job_pending_submit(job):
+            out.append(path)
+    return out
+
+
+def _pending_submit_paths_scan(args: argparse.Namespace) -> list[Path]:
     candidates: list[tuple[float, Path]] = []
     for path in iter_job_paths(args, apply_limit=False):
         try:
@@ -2032,11 +2121,7 @@ def iter_pending_submit_job_paths(args: argparse.Namespace) -> list[Path]:
                 created = 0.0
         candidates.append((max(created, mtime), path))
     candidates.sort(key=lambda row: row[0], reverse=True)
-    paths = [p for _, p in candidates]
-    limit = getattr(args, "limit", None)
-    if isinstance(limit, int) and limit > 0 and len(paths) > limit:
-        paths = paths[:limit]
-    return paths
+    return [p for _, p in candidates]
 
 
 def job_already_submitted(job: dict[str, Any]) -> bool:
@@ -2660,59 +2745,49 @@ def comfy_node_errors(submit_body: dict[str, Any]) -> dict[str, Any]:
     return errors if isinstance(errors, dict) and errors else {}
 
 
-def ffprobe_video_info(path: Path) -> dict[str, Any]:
-    if not path.is_file():
-        return {}
+def _ffprobe_count_frames() -> bool:
     # ``-count_frames`` decodes the whole file and can take minutes per clip; hourly
     # status would then block the systemd timer for hours. Prefer container metadata.
-    count_frames = os.environ.get("SHAPE_FACTORY_FFPROBE_COUNT_FRAMES", "").strip().lower() in {
+    return os.environ.get("SHAPE_FACTORY_FFPROBE_COUNT_FRAMES", "").strip().lower() in {
         "1",
         "true",
         "yes",
         "on",
     }
-    cmd = [
-        "ffprobe",
-        "-v",
-        "quiet",
-        "-print_format",
-        "json",
-        "-show_streams",
-        str(path),
-    ]
-    if count_frames:
-        cmd.insert(-1, "-count_frames")
+
+
+def _probe_error_info(exc: ProbeError) -> dict[str, Any]:
+    text = str(exc)
+    return {"error": "ffprobe not installed" if text.startswith("ffprobe not found") else text[:200]}
+
+
+def _video_info_from_probe(obj: dict[str, Any]) -> dict[str, Any]:
+    video = media_video_stream(obj)
+    if not isinstance(video, dict):
+        return {}
+    info: dict[str, Any] = {}
+    for key in ("nb_read_frames", "nb_frames", "duration", "avg_frame_rate", "width", "height"):
+        if video.get(key) is not None:
+            info[key] = video.get(key)
     try:
-        proc = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60,
-            check=False,
-        )
-        if proc.returncode != 0:
-            return {"error": (proc.stderr or proc.stdout or "ffprobe failed").strip()[:200]}
-        obj = json.loads(proc.stdout or "{}")
-        streams = obj.get("streams") if isinstance(obj.get("streams"), list) else []
-        video = next((s for s in streams if isinstance(s, dict) and s.get("codec_type") == "video"), None)
-        if not isinstance(video, dict):
-            return {}
-        info: dict[str, Any] = {}
-        for key in ("nb_read_frames", "nb_frames", "duration", "avg_frame_rate", "width", "height"):
-            if video.get(key) is not None:
-                info[key] = video.get(key)
         if "nb_read_frames" in info:
             info["frame_count"] = int(info["nb_read_frames"])
         elif "nb_frames" in info:
-            try:
-                info["frame_count"] = int(str(info["nb_frames"]))
-            except Exception:
-                pass
-        return info
-    except FileNotFoundError:
-        return {"error": "ffprobe not installed"}
-    except Exception as exc:
-        return {"error": str(exc)}
+            info["frame_count"] = int(str(info["nb_frames"]))
+    except (TypeError, ValueError):
+        pass
+    return info
+
+
+def ffprobe_video_info(path: Path) -> dict[str, Any]:
+    """Video stream summary (frame_count, fps, size) from the cached combined probe."""
+    if not path.is_file():
+        return {}
+    try:
+        obj = probe_media(path, count_frames=_ffprobe_count_frames(), timeout=60)
+    except ProbeError as exc:
+        return _probe_error_info(exc)
+    return _video_info_from_probe(obj)
 
 
 def probe_job_output_media(job: dict[str, Any], data_root: Path) -> list[dict[str, Any]]:
@@ -2723,10 +2798,23 @@ def probe_job_output_media(job: dict[str, Any], data_root: Path) -> list[dict[st
         paths = [Path(str(p)).expanduser() for p in outputs if str(p).lower().endswith(".mp4")]
     if not paths:
         paths = discover_job_outputs(job, data_root)
+    # One batch with bounded concurrency; unchanged files come from the probe cache.
+    probes = probe_many(
+        [p for p in paths if p.is_file()],
+        workers=4,
+        count_frames=_ffprobe_count_frames(),
+        timeout=60,
+    )
     out: list[dict[str, Any]] = []
     for path in paths:
-        rec = {"path": str(path.resolve()), "probe": ffprobe_video_info(path)}
-        out.append(rec)
+        res = probes.get(str(path))
+        if res is None:
+            info: dict[str, Any] = {}
+        elif isinstance(res, ProbeError):
+            info = _probe_error_info(res)
+        else:
+            info = _video_info_from_probe(res)
+        out.append({"path": str(path.resolve()), "probe": info})
     return out
 
 
@@ -2916,7 +3004,6 @@ def cmd_jobs_repair(args: argparse.Namespace) -> int:
     return 0
 
 
-_OBJECT_INFO_CACHE: dict[str, tuple[float, dict[str, Any]]] = {}
 _VALIDATE_UI_NODE_TYPES = {
     "PrimitiveNode",
     "Note",
@@ -2929,20 +3016,16 @@ _VALIDATE_UI_NODE_TYPES = {
 }
 
 
+def fetch_object_info_snapshot(server: str, *, timeout_s: int = 120, cache_ttl_s: float = 300.0) -> ObjectInfoSnapshot:
+    """Stored ``/object_info`` snapshot (fingerprint-checked at most every ``cache_ttl_s``; offline fallback)."""
+    return load_object_info(server, timeout_s=timeout_s, fingerprint_ttl_s=cache_ttl_s)
+
+
 def fetch_object_info(server: str, *, timeout_s: int = 120, cache_ttl_s: float = 300.0) -> dict[str, Any]:
-    server = server.rstrip("/")
-    now = time.time()
-    cached = _OBJECT_INFO_CACHE.get(server)
-    if cached and (now - cached[0]) < cache_ttl_s:
-        return cached[1]
-    obj = _http_json("GET", f"{server}/object_info", timeout_s=timeout_s)
-    if not isinstance(obj, dict):
-        raise RuntimeError("Comfy /object_info returned non-object")
-    _OBJECT_INFO_CACHE[server] = (now, obj)
-    return obj
+    return fetch_object_info_snapshot(server, timeout_s=timeout_s, cache_ttl_s=cache_ttl_s).object_info
 
 
-def missing_node_types(workflow: dict[str, Any], object_info: dict[str, Any]) -> list[dict[str, Any]]:
+def missing_node_types(workflow: dict[str, Any], object_info: ObjectInfoLike) -> list[dict[str, Any]]:
     missing: list[dict[str, Any]] = []
     seen: set[str] = set()
     for node in workflow.get("nodes") or []:
@@ -2978,13 +3061,13 @@ def maybe_auto_patch_workflow(
     auto_patch: bool,
     write_patches: bool,
     map_path: Path,
-    object_info: Optional[dict[str, Any]] = None,
+    object_info: Optional[ObjectInfoLike] = None,
 ) -> tuple[dict[str, Any], list[dict[str, Any]], Optional[Path]]:
     if not auto_patch:
         return workflow, [], None
     if object_info is None:
         try:
-            object_info = fetch_object_info(server)
+            object_info = fetch_object_info_snapshot(server)
         except Exception:
             object_info = None
     ctx = RepairContext(workflow=workflow, object_info=object_info, map_path=map_path)
@@ -3029,9 +3112,18 @@ def validate_workflow_document(
         "repair_round": repair_round,
     }
     try:
-        object_info = fetch_object_info(server)
+        object_info = fetch_object_info_snapshot(server)
         missing = missing_node_types(workflow, object_info)
         required_missing = [m for m in missing if str(m.get("class_type") or "") not in _VALIDATE_UI_NODE_TYPES]
+        if required_missing:
+            # A stored snapshot predates node packs the fingerprint cannot see: confirm live.
+            fresh = recheck_missing_node_types(object_info, [str(m["class_type"]) for m in required_missing])
+            if fresh is not object_info:
+                object_info = fresh
+                missing = missing_node_types(workflow, object_info)
+                required_missing = [m for m in missing if str(m.get("class_type") or "") not in _VALIDATE_UI_NODE_TYPES]
+        report["object_info_source"] = object_info.source
+        report["object_info_fingerprint"] = object_info.fingerprint
         ui_missing = [m for m in missing if str(m.get("class_type") or "") in _VALIDATE_UI_NODE_TYPES]
         report["missing_node_types"] = missing
         report["missing_required_node_types"] = required_missing
@@ -3109,9 +3201,15 @@ def validate_with_repair_loop(
 ) -> tuple[dict[str, Any], dict[str, Any], list[dict[str, Any]], Optional[Path]]:
     map_path = (map_path or DEFAULT_NODE_TYPE_MAP).expanduser().resolve()
     repair_rules_path = (repair_rules_path or DEFAULT_REPAIR_RULES_PATH).expanduser().resolve()
-    object_info: Optional[dict[str, Any]] = None
+    object_info: Optional[ObjectInfoSnapshot] = None
     try:
-        object_info = fetch_object_info(server)
+        object_info = fetch_object_info_snapshot(server)
+        required = [
+            m["class_type"]
+            for m in missing_node_types(workflow, object_info)
+            if str(m.get("class_type") or "") not in _VALIDATE_UI_NODE_TYPES
+        ]
+        object_info = recheck_missing_node_types(object_info, required)
     except Exception:
         object_info = None
 
@@ -4050,7 +4148,7 @@ def cmd_quarantine(args: argparse.Namespace) -> int:
             print("error: no workflows to patch (use --catalog or --workflow)", file=sys.stderr)
             return 1
         try:
-            object_info = fetch_object_info(server)
+            object_info = fetch_object_info_snapshot(server)
         except Exception as exc:
             print(f"warning: could not fetch object_info ({exc}); patching from map only", file=sys.stderr)
             object_info = None
@@ -4614,6 +4712,49 @@ def submit_job_file(
     quarantine_path: Optional[Path] = None,
 ) -> dict[str, Any]:
     """Generate prompt + submit one shape-factory job to ComfyUI."""
+    prepared = prepare_job_submit(
+        job_path,
+        server=server,
+        data_root=data_root,
+        dry_run=dry_run,
+        force=force,
+        pending_only=pending_only,
+        convert_timeout=convert_timeout,
+        ignore_quarantine=ignore_quarantine,
+        quarantine_path=quarantine_path,
+    )
+    if not prepared.get("prepared"):
+        return prepared
+    return post_prepared_job_submit(
+        prepared,
+        server=server,
+        client_id=client_id,
+        front=front,
+        timeout=timeout,
+    )
+
+
+def prepare_job_submit(
+    job_path: Path,
+    *,
+    server: str,
+    data_root: Path,
+    dry_run: bool = False,
+    force: bool = False,
+    pending_only: bool = False,
+    convert_timeout: int = 90,
+    ignore_quarantine: bool = False,
+    quarantine_path: Optional[Path] = None,
+    check_comfy_busy: bool = True,
+) -> dict[str, Any]:
+    """
+    CPU-side half of :func:`submit_job_file`: gates, workflow rebuild/repair, prompt conversion.
+
+    Returns the final result for skipped / dry-run jobs, else ``{"prepared": True, ...}`` for
+    :func:`post_prepared_job_submit`. ``check_comfy_busy=False`` leaves the pending-drain
+    ``/queue`` check to the caller (the submit pipeline runs it right before each POST).
+    """
+    t_load0 = time.time()
     job_path = job_path.expanduser().resolve()
     job = json.loads(job_path.read_text(encoding="utf-8"))
     if hostify_job_paths(job):
@@ -4676,18 +4817,10 @@ def submit_job_file(
         }
 
     # Pending drain: only feed Comfy when its waiting queue is empty (running OK).
-    if pending_only and not force and not dry_run:
-        empty, run_n, pend_n = comfy_waiting_queue_empty(server, timeout_s=min(15, int(timeout) or 15))
-        if not empty:
-            return {
-                "ok": True,
-                "skipped": True,
-                "reason": "comfy_pending_busy",
-                "job_key": job_key,
-                "job_path": str(job_path),
-                "comfy_running": run_n,
-                "comfy_pending": pend_n,
-            }
+    if pending_only and not force and not dry_run and check_comfy_busy:
+        busy = comfy_pending_busy_result(server, job_key=job_key, job_path=job_path)
+        if busy is not None:
+            return busy
 
     queued_prefix = apply_queue_date_to_prefix(str(job.get("output_prefix") or ""))
     if queued_prefix and queued_prefix != str(job.get("output_prefix") or "") and not dry_run:
@@ -4751,7 +4884,6 @@ def submit_job_file(
             out["prompt_seed_png"] = str(seed)
         return out
 
-    t0 = time.time()
     t_prep0 = time.time()
     prompt_obj, prompt_source, prep_warnings = resolve_prompt_for_job(
         job,
@@ -4767,10 +4899,64 @@ def submit_job_file(
 
     prompt_path = job_path.with_name(job_path.stem.replace(".job", "") + ".prompt.json")
     atomic_write_json(prompt_path, prompt_obj)
+    return {
+        "prepared": True,
+        "job_key": job_key,
+        "job_path": job_path,
+        "job": job,
+        "workflow": workflow,
+        "workflow_path": workflow_path,
+        "prompt_obj": prompt_obj,
+        "prompt_path": prompt_path,
+        "prompt_source": prompt_source,
+        "prep_warnings": prep_warnings,
+        "load_started_ts": t_load0,
+        "prompt_started_ts": t_prep0,
+        "prompt_finished_ts": t_prep1,
+        "prepared_ts": time.time(),
+    }
+
+
+def comfy_pending_busy_result(server: str, *, job_key: str, job_path: Path) -> Optional[dict[str, Any]]:
+    """``comfy_pending_busy`` skip result when Comfy's waiting queue is non-empty, else None."""
+    empty, run_n, pend_n = comfy_waiting_queue_empty(server, timeout_s=15)
+    if empty:
+        return None
+    return {
+        "ok": True,
+        "skipped": True,
+        "reason": "comfy_pending_busy",
+        "job_key": job_key,
+        "job_path": str(job_path),
+        "comfy_running": run_n,
+        "comfy_pending": pend_n,
+    }
+
 
+def post_prepared_job_submit(
+    prepared: dict[str, Any],
+    *,
+    server: str,
+    client_id: str = "shape_factory",
+    front: bool = False,
+    timeout: int = 120,
+) -> dict[str, Any]:
+    """POST a :func:`prepare_job_submit` result to ``/prompt`` and record submit/timings on the job."""
+    job = prepared["job"]
+    job_path: Path = prepared["job_path"]
+    job_key = str(prepared["job_key"])
+    workflow = prepared["workflow"]
+    workflow_path: Path = prepared["workflow_path"]
+    prompt_path: Path = prepared["prompt_path"]
+    prompt_source = prepared["prompt_source"]
+    prep_warnings = prepared["prep_warnings"]
+    t0 = float(prepared["prompt_started_ts"])
+    t_prep1 = float(prepared["prompt_finished_ts"])
+
+    t_post0 = time.time()
     submit_body = submit_prompt_to_comfyui(
         server,
-        prompt_obj,
+        prepared["prompt_obj"],
         workflow_ui=workflow,
         workflow_name=job_key,
         client_id=client_id,
@@ -4783,8 +4969,14 @@ def submit_job_file(
     if node_errors:
         raise RuntimeError(f"Comfy rejected prompt (node_errors): {json.dumps(node_errors, ensure_ascii=False)[:500]}")
 
-    prompt_prepare_sec = round(t_prep1 - t_prep0, 3)
-    submit_http_sec = round(t1 - t_prep1, 3)
+    prompt_prepare_sec = round(t_prep1 - t0, 3)
+    submit_http_sec = round(t1 - t_post0, 3)
+    stage_sec = {
+        "load": round(t0 - float(prepared["load_started_ts"]), 3),
+        "prompt": prompt_prepare_sec,
+        "wait": round(max(0.0, t_post0 - float(prepared["prepared_ts"])), 3),
+        "post": submit_http_sec,
+    }
 
     submit_record = {
         "schema_version": "comfyui-runpod.shape-submit.v0",
@@ -4799,6 +4991,7 @@ def submit_job_file(
         "prompt_prepare_sec": prompt_prepare_sec,
         "submit_http_sec": submit_http_sec,
         "submit_http_sec_total": round(t1 - t0, 3),
+        "stage_sec": stage_sec,
         "prompt_path": str(prompt_path),
         "workflow_path": str(workflow_path),
         "prep_warnings": prep_warnings,
@@ -4823,6 +5016,7 @@ def submit_job_file(
         "prompt_prepare_sec": prompt_prepare_sec,
         "submit_http_sec": submit_http_sec,
         "total_sec": round(t1 - t0, 3),
+        "stage_sec": stage_sec,
     }
     timings["queue"] = {
         "submitted_ts": t1,
@@ -4840,9 +5034,76 @@ def submit_job_file(
         "prompt_path": str(prompt_path),
         "submit_path": str(submit_path),
         "prep_warnings": prep_warnings,
+        "stage_sec": stage_sec,
     }
 
 
+def iter_submit_pipeline(
+    job_paths: list[Path],
+    *,
+    workers: int,
+    prepare_kwargs: dict[str, Any],
+    post_kwargs: dict[str, Any],
+    gate_pending: bool = False,
+) -> Any:
+    """
+    Yield ``(job_path, result, exc)`` per job in input order.
+
+    With ``workers > 1`` the next job's :func:`prepare_job_submit` (rebuild / repair / convert)
+    runs on a helper thread while the current job is handled; POST ``/prompt`` stays serial on
+    the calling thread so Comfy sees jobs in the same order as the sequential loop. Prepare
+    writes job / prompt files and calls ``/workflow/convert``, so the look-ahead is one job.
+
+    With ``gate_pending`` (pending drain) the ``/queue`` busy check runs before a job is
+    prepared, never after: before the head job, and after each POST before the next job's
+    look-ahead is started. A busy Comfy therefore costs no writes and no convert calls.
+    """
+    server = str(post_kwargs["server"])
+    kw = {**prepare_kwargs, "check_comfy_busy": not gate_pending}
+
+    def busy_before_prepare(job_path: Path) -> Optional[dict[str, Any]]:
+        if not gate_pending:
+            return None
+        return comfy_pending_busy_result(server, job_key=job_path.stem.replace(".job", ""), job_path=job_path)
+
+    pool = None
+    if workers > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="submit-prep")
+    ahead = None  # prepare future for the next job, started once it passed the busy check
+    gated: Optional[dict[str, Any]] = None  # busy result already fetched for the next job
+    try:
+        for i, job_path in enumerate(job_paths):
+            nxt = job_paths[i + 1] if pool is not None and i + 1 < len(job_paths) else None
+            try:
+                fut, ahead = ahead, None
+                busy, gated = gated, None
+                if fut is None and busy is None:
+                    busy = busy_before_prepare(job_path)
+                if busy is not None:
+                    result = busy
+                else:
+                    prepared = fut.result() if fut is not None else prepare_job_submit(job_path, **kw)
+                    if nxt is not None and not gate_pending:
+                        ahead = pool.submit(prepare_job_submit, nxt, **kw)
+                    if prepared.get("prepared"):
+                        result = post_prepared_job_submit(prepared, **post_kwargs)
+                    else:
+                        result = prepared
+                    if nxt is not None and gate_pending:
+                        gated = busy_before_prepare(nxt)
+                        if gated is None:
+                            ahead = pool.submit(prepare_job_submit, nxt, **kw)
+            except Exception as exc:
+                yield job_path, None, exc
+                continue
+            yield job_path, result, None
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
 def cmd_submit(args: argparse.Namespace) -> int:
     pending_only = bool(getattr(args, "pending_only", False))
     job_paths = (
@@ -4860,10 +5121,15 @@ def cmd_submit(args: argparse.Namespace) -> int:
     failed = 0
     data_root = Path(args.data_root).expanduser().resolve()
     quarantine_path = Path(getattr(args, "quarantine_path", DEFAULT_QUARANTINE_PATH)).expanduser().resolve()
+    workers = max(1, int(getattr(args, "workers", None) or 1))
+    if workers > 2:
+        print(f"warning: --workers {workers}: submit prepares at most one job ahead; using 2", file=sys.stderr)
+        workers = 2
 
     print(f"# Shape factory queue submit\n")
     print(f"- Comfy server: `{server}`")
     print(f"- Jobs: {len(job_paths)}")
+    print(f"- prepare workers: {workers}")
     if pending_only:
         print(f"- pending_only: True (limit after pending filter)")
     print(f"- dry_run: {args.dry_run}\n")
@@ -4873,24 +5139,51 @@ def cmd_submit(args: argparse.Namespace) -> int:
     if isinstance(max_attempts_override, int) and max_attempts_override > 0:
         os.environ["SHAPE_FACTORY_SUBMIT_MAX_ATTEMPTS"] = str(max_attempts_override)
     print(f"- max_attempts: {submit_max_attempts()}\n")
-    for job_path in job_paths:
-        job_key = job_path.stem.replace(".job", "")
-        try:
-            result = submit_job_file(
-                job_path,
-                server=server,
-                data_root=data_root,
-                dry_run=bool(args.dry_run),
-                force=bool(args.force),
-                pending_only=bool(getattr(args, "pending_only", False)),
-                client_id=str(args.client_id),
-                front=bool(args.front),
-                timeout=int(args.timeout),
-                convert_timeout=int(args.convert_timeout),
-                ignore_quarantine=bool(getattr(args, "ignore_quarantine", False)),
-                quarantine_path=quarantine_path,
-            )
-            if result.get("skipped"):
+    stage_totals = {"load": 0.0, "prompt": 0.0, "wait": 0.0, "post": 0.0}
+    t_wall0 = time.time()
+    pipeline = iter_submit_pipeline(
+        job_paths,
+        workers=workers,
+        prepare_kwargs={
+            "server": server,
+            "data_root": data_root,
+            "dry_run": bool(args.dry_run),
+            "force": bool(args.force),
+            "pending_only": pending_only,
+            "convert_timeout": int(args.convert_timeout),
+            "ignore_quarantine": bool(getattr(args, "ignore_quarantine", False)),
+            "quarantine_path": quarantine_path,
+        },
+        post_kwargs={
+            "server": server,
+            "client_id": str(args.client_id),
+            "front": bool(args.front),
+            "timeout": int(args.timeout),
+        },
+        gate_pending=pending_only and not bool(args.force) and not bool(args.dry_run),
+    )
+    try:
+        for job_path, result, exc in pipeline:
+            job_key = job_path.stem.replace(".job", "")
+            if exc is not None:
+                print(f"## {job_key}")
+                print(f"error: {exc}", file=sys.stderr)
+                try:
+                    job = json.loads(job_path.read_text(encoding="utf-8"))
+                    outcome = record_submit_failure(job, error=str(exc), server=server)
+                    atomic_write_json(job_path, job)
+                    if quiet and outcome == "abandoned":
+                        pass
+                    elif not quiet:
+                        attempts = submit_attempt_count(job)
+                        print(
+                            f"  submit_{outcome} attempts={attempts}/{submit_max_attempts()}",
+                            file=sys.stderr,
+                        )
+                except Exception:
+                    pass
+                failed += 1
+            elif result.get("skipped"):
                 skipped += 1
                 reason = str(result.get("reason") or "skipped")
                 if not (quiet and reason in {"already_submitted", "submit_error", "abandoned", "comfy_pending_busy"}):
@@ -4901,7 +5194,7 @@ def cmd_submit(args: argparse.Namespace) -> int:
                     else:
                         print(f"skip ({reason})")
                 # One busy signal means the whole pending drain should wait.
-                if reason == "comfy_pending_busy" and bool(getattr(args, "pending_only", False)):
+                if reason == "comfy_pending_busy" and pending_only:
                     if not quiet:
                         print(
                             f"# comfy waiting queue busy "
@@ -4920,32 +5213,22 @@ def cmd_submit(args: argparse.Namespace) -> int:
                 print(f"queued prompt_id={result.get('prompt_id')} source={result.get('prompt_source')}")
                 print(f"  prompt={result.get('prompt_path')}")
                 print(f"  submit={result.get('submit_path')}")
+                stages = result.get("stage_sec") if isinstance(result.get("stage_sec"), dict) else {}
+                for name in stage_totals:
+                    stage_totals[name] += float(stages.get(name) or 0.0)
                 submitted += 1
-        except Exception as exc:
-            print(f"## {job_key}")
-            print(f"error: {exc}", file=sys.stderr)
-            try:
-                job = json.loads(job_path.read_text(encoding="utf-8"))
-                outcome = record_submit_failure(job, error=str(exc), server=server)
-                atomic_write_json(job_path, job)
-                if quiet and outcome == "abandoned":
-                    pass
-                elif not quiet:
-                    attempts = submit_attempt_count(job)
-                    print(
-                        f"  submit_{outcome} attempts={attempts}/{submit_max_attempts()}",
-                        file=sys.stderr,
-                    )
-            except Exception:
-                pass
-            failed += 1
 
-        if args.delay and not args.dry_run:
-            time.sleep(args.delay)
+            if args.delay and not args.dry_run:
+                time.sleep(args.delay)
+    finally:
+        pipeline.close()
 
     print(f"\nsubmit_ok={submitted}")
     print(f"submit_skipped={skipped}")
     print(f"submit_failed={failed}")
+    stage_out = {k: round(v, 3) for k, v in stage_totals.items()}
+    stage_out["wall"] = round(time.time() - t_wall0, 3)
+    print(f"submit_stage_sec={json.dumps(stage_out, sort_keys=True)}")
     return 0 if failed == 0 else 1
 
 
@@ -4965,6 +5248,22 @@ def fetch_comfy_history(server: str, prompt_id: str, *, timeout_s: int = 30) ->
     return rec if isinstance(rec, dict) else None
 
 
+def fetch_comfy_history_batch(server: str, *, max_items: int = 256, timeout_s: int = 30) -> dict[str, dict[str, Any]]:
+    """
+    Most recent ``max_items`` history entries in one request (``GET /history?max_items=``).
+
+    Keyed by prompt_id; ``{}`` when Comfy is unreachable. Callers fall back to
+    :func:`fetch_comfy_history` for prompt ids older than the window.
+    """
+    try:
+        obj = _http_json("GET", f"{server.rstrip('/')}/history?max_items={int(max_items)}", timeout_s=timeout_s)
+    except Exception:
+        return {}
+    if not isinstance(obj, dict):
+        return {}
+    return {str(pid): rec for pid, rec in obj.items() if isinstance(rec, dict)}
+
+
 def queue_prompt_ids(server: str, *, timeout_s: int = 15) -> set[str]:
     running, pending = queue_prompt_id_buckets(server, timeout_s=timeout_s)
     return running | pending
@@ -5000,10 +5299,36 @@ def comfy_waiting_queue_empty(server: str, *, timeout_s: int = 15) -> tuple[bool
 
 
 def find_job_by_prompt_id(jobs_root: Path, prompt_id: str) -> tuple[Optional[Path], Optional[dict[str, Any]]]:
-    """Locate a shape-factory ``.job.json`` whose submit.prompt_id matches."""
+    """
+    Locate a shape-factory ``.job.json`` whose submit.prompt_id matches (job catalog, then tree walk).
+
+    A catalog miss re-syncs with ``stat_files=True`` before giving up, so in-place writes that
+    kept the directory mtime are still found. The tree walk covers an unavailable catalog or a stale row.
+    """
     pid = str(prompt_id or "").strip()
     if not pid or not jobs_root.is_dir():
         return None, None
+    con = _open_job_catalog(jobs_root)
+    if con is not None:
+        try:
+            row = lookup_by_prompt_id(con, pid)
+            if row is None:
+                sync_job_catalog(con, jobs_root, stat_files=True)
+                row = lookup_by_prompt_id(con, pid)
+            if row is None:
+                return None, None
+            path = Path(row["job_path"])
+            job = _load_job_file(path)
+            submit = job.get("submit") if job and isinstance(job.get("submit"), dict) else {}
+            if str(submit.get("prompt_id") or "").strip() == pid:
+                return path, job
+            upsert_job(con, path)
+        finally:
+            con.close()
+    return _find_job_by_prompt_id_scan(jobs_root, pid)
+
+
+def _find_job_by_prompt_id_scan(jobs_root: Path, pid: str) -> tuple[Optional[Path], Optional[dict[str, Any]]]:
     for path in jobs_root.rglob("*.job.json"):
         try:
             text = path.read_text(encoding="utf-8")
@@ -5030,6 +5355,18 @@ def find_job_by_key(data_root: Path, job_key: str) -> tuple[Optional[Path], Opti
     jobs_root = Path(data_root) / "shape_factory" / "jobs"
     if not jobs_root.is_dir():
         return None, None
+    con = _open_job_catalog(jobs_root)
+    if con is not None:
+        try:
+            row = lookup_by_job_key(con, key)
+        finally:
+            con.close()
+        if row is None:
+            return None, None
+        path = Path(row["job_path"])
+        job = _load_job_file(path)
+        if job is not None:
+            return path, job
     for path in jobs_root.glob(f"**/{key}.job.json"):
         try:
             job = json.loads(path.read_text(encoding="utf-8"))
@@ -6530,7 +6867,15 @@ def update_job_status_from_comfy(
     running_ids: Optional[set[str]] = None,
     pending_ids: Optional[set[str]] = None,
     now: Optional[float] = None,
+    history_batch: Optional[dict[str, dict[str, Any]]] = None,
 ) -> str:
+    """
+    Refresh ``job["submit"]`` status/outputs/timings from Comfy queue + history.
+
+    ``history_batch`` (from :func:`fetch_comfy_history_batch`, or synthesized from
+    ``/ws`` events by the status daemon) is consulted before a per-prompt
+    ``/history/<prompt_id>`` request.
+    """
     submit = job.get("submit") if isinstance(job.get("submit"), dict) else {}
     prompt_id = str(submit.get("prompt_id") or "").strip()
     if not prompt_id:
@@ -6558,7 +6903,9 @@ def update_job_status_from_comfy(
         update_job_timings_on_status(job, status="queued", history=None, now=now_ts, data_root=data_root)
         return "queued"
 
-    history = fetch_comfy_history(server, prompt_id)
+    history = (history_batch or {}).get(prompt_id)
+    if history is None:
+        history = fetch_comfy_history(server, prompt_id)
     if history is None:
         outputs = discover_job_outputs(job, data_root)
         if outputs:
@@ -6643,6 +6990,8 @@ def cmd_status(args: argparse.Namespace) -> int:
     quiet = bool(getattr(args, "quiet", False))
     while True:
         running_ids, pending_ids = queue_prompt_id_buckets(server)
+        # One /history request per pass instead of one per job (older prompts still fall back).
+        history_batch = fetch_comfy_history_batch(server, max_items=max(64, 2 * len(job_paths)))
         counts = {
             "pending": 0,
             "queued": 0,
@@ -6675,6 +7024,7 @@ def cmd_status(args: argparse.Namespace) -> int:
                 data_root=data_root,
                 running_ids=running_ids,
                 pending_ids=pending_ids,
+                history_batch=history_batch,
             )
             if status == "completed":
                 status = "complete"
@@ -6861,6 +7211,15 @@ def cmd_deposit(args: argparse.Namespace) -> int:
             if not quiet:
                 print(f"  job_output_index_warn: {exc}", file=sys.stderr)
 
+        # Keep the hourly replay recipe catalog warm for the next plan.
+        try:
+            from shape_factory_recipe_catalog import note_job_deposited
+
+            note_job_deposited(job_path, job, data_root=data_root)
+        except Exception as exc:
+            if not quiet:
+                print(f"  recipe_catalog_warn: {exc}", file=sys.stderr)
+
     print(f"\ndeposit_added={deposited}")
     print(f"deposit_skipped={skipped}")
     return 0
@@ -7073,6 +7432,13 @@ def build_parser() -> argparse.ArgumentParser:
     sub_p.add_argument("--timeout", type=int, default=60, help="HTTP timeout for /prompt")
     sub_p.add_argument("--convert-timeout", type=int, default=180, help="HTTP timeout for /workflow/convert")
     sub_p.add_argument("--delay", type=float, default=0.0, help="Seconds between submits")
+    sub_p.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="1 = serial; 2 = prepare the next job (rebuild / repair / convert) while the current one posts. "
+        "The look-ahead is one job, so values above 2 warn and act as 2; POST /prompt stays serial in job order",
+    )
     sub_p.add_argument("--quarantine-path", default=str(DEFAULT_QUARANTINE_PATH), help="Workflow quarantine registry JSON")
     sub_p.add_argument(
         "--ignore-quarantine",
@@ -7354,6 +7720,8 @@ def build_parser() -> argparse.ArgumentParser:
     add_tags_subparser(sub)
     add_source_facets_subparser(sub)
     add_job_output_index_subparser(sub)
+    add_job_catalog_subparser(sub)
+    add_object_info_subparser(sub)
     add_seed_sources_subparser(sub)
     add_backfill_subparser(sub)
 
@@ -397,33 +397,25 @@ def _append_lineage_edge(edges: List[Dict[str, Any]], *, output_relpath: str, bi
 
 
 def _merge_lineage_edges(path: Path, new_edges: List[Dict[str, Any]]) -> int:
-    doc: Dict[str, Any] = {}
-    if path.is_file():
-        try:
-            loaded = json.loads(path.read_text(encoding="utf-8"))
-            if isinstance(loaded, dict):
-                doc = loaded
-        except (OSError, json.JSONDecodeError):
-            doc = {}
-    edges = doc.get("edges")
-    if not isinstance(edges, list):
-        edges = []
-    have = {(str(e.get("child_group_id")), str(e.get("parent_group_id"))) for e in edges if isinstance(e, dict)}
-    added = 0
-    for e in new_edges:
-        key = (str(e.get("child_group_id")), str(e.get("parent_group_id")))
-        if key in have:
-            continue
-        edges.append(e)
-        have.add(key)
-        added += 1
-    doc["edges"] = edges
-    doc.setdefault("schema_version", "comfyui-runpod.discovery-lineage.v0")
-    doc["updated_at"] = _utc_now()
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(doc, indent=2), encoding="utf-8")
-    tmp.replace(path)
+    """Append edges to the lineage store beside ``path`` (one per child/parent pair), then re-export ``path``."""
+    from discovery_lineage_store import edges_for_child, export_json, insert_edges, open_synced_lineage_store
+
+    con = open_synced_lineage_store(path)
+    try:
+        have: Dict[str, set] = {}
+        fresh: List[Dict[str, Any]] = []
+        for e in new_edges:
+            child, parent = str(e.get("child_group_id")), str(e.get("parent_group_id"))
+            if child not in have:
+                have[child] = {str(x.get("parent_group_id")) for x in edges_for_child(con, child)}
+            if parent in have[child]:
+                continue
+            have[child].add(parent)
+            fresh.append(e)
+        added = insert_edges(con, fresh)
+        export_json(con, path)
+    finally:
+        con.close()
     return added
 
 
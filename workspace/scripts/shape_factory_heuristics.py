@@ -15,12 +15,14 @@ from __future__ import annotations
 import argparse
 import json
 import statistics
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
 
+from discovery_lineage_store import load_lineage_edges
+from lineage_csr import LineageCSR
 from shape_factory_ratings import (
     APPETITE_SCORE,
     AggBucket,
@@ -32,6 +34,10 @@ from shape_factory_ratings import (
     utc_now,
     _lookup_job_meta,
     _norm_path_key,
+    _path_name,
+    _path_stem,
+    lookup_output_row,
+    output_lookup_keys,
 )
 
 HEURISTICS_SCHEMA_VERSION = 1
@@ -59,10 +65,10 @@ def _og_group_id_from_relpath(relpath: str, *, library: str = "og") -> Optional[
     raw = str(relpath or "").strip().replace("\\", "/")
     if not raw:
         return None
-    name = Path(raw).name
+    name = _path_name(raw)
     if not name:
         return None
-    stem = Path(name).stem.lower()
+    stem = _path_stem(name).lower()
     if not stem:
         return None
     lib = library.strip().lower() or "og"
@@ -70,7 +76,7 @@ def _og_group_id_from_relpath(relpath: str, *, library: str = "og") -> Optional[
 
 
 def _input_group_id_from_basename(basename: str) -> Optional[str]:
-    bn = Path(str(basename or "").strip()).name
+    bn = _path_name(str(basename or "").strip())
     if not bn:
         return None
     return f"input:{bn}"
@@ -78,7 +84,7 @@ def _input_group_id_from_basename(basename: str) -> Optional[str]:
 
 def _source_group_ids(basename: str) -> List[str]:
     """Candidate lineage group ids for a source pick basename."""
-    bn = Path(str(basename or "").strip()).name
+    bn = _path_name(str(basename or "").strip())
     if not bn:
         return []
     gids: List[str] = []
@@ -91,7 +97,7 @@ def _source_group_ids(basename: str) -> List[str]:
 
     add(_input_group_id_from_basename(bn))
     add(_og_group_id_from_relpath(bn))
-    stem = Path(bn).stem.lower()
+    stem = _path_stem(bn).lower()
     add(f"og:stem:{stem}")
     add(f"input:{stem}")
     return gids
@@ -132,81 +138,35 @@ def _edge_weight(edge: dict[str, Any]) -> float:
 @dataclass
 class LineageGraph:
     edges: List[dict[str, Any]] = field(default_factory=list)
-    parents_of: Dict[str, List[str]] = field(default_factory=dict)
-    children_of: Dict[str, List[str]] = field(default_factory=dict)
+    csr: LineageCSR = field(default_factory=lambda: LineageCSR.from_pairs(()))
     edge_weight_by_pair: Dict[Tuple[str, str], float] = field(default_factory=dict)
 
     @classmethod
     def load(cls, path: Path) -> "LineageGraph":
-        doc: dict[str, Any] = {}
-        if path.is_file():
-            try:
-                loaded = json.loads(path.read_text(encoding="utf-8"))
-                if isinstance(loaded, dict):
-                    doc = loaded
-            except (OSError, json.JSONDecodeError):
-                pass
-        edges = doc.get("edges")
-        if not isinstance(edges, list):
-            edges = []
-        return cls.from_edges(edges)
+        """Graph from the lineage edge store beside ``path`` (``discovery_lineage_edges.json``)."""
+        return cls.from_edges(load_lineage_edges(path))
 
     @classmethod
     def from_edges(cls, edges: Iterable[Any]) -> "LineageGraph":
-        g = cls()
-        for edge in edges:
-            if not isinstance(edge, dict):
-                continue
-            parent = str(edge.get("parent_group_id") or "").strip()
-            child = str(edge.get("child_group_id") or "").strip()
-            if not parent or not child:
-                continue
-            g.edges.append(edge)
-            g.parents_of.setdefault(child, []).append(parent)
-            g.children_of.setdefault(parent, []).append(child)
-            w = _edge_weight(edge)
-            pair = (child, parent)
-            g.edge_weight_by_pair[pair] = max(g.edge_weight_by_pair.get(pair, 0.0), w)
+        csr = LineageCSR.from_edges(edges)
+        g = cls(edges=csr.edges, csr=csr)
+        for edge in csr.edges:
+            pair = (str(edge.get("child_group_id") or "").strip(), str(edge.get("parent_group_id") or "").strip())
+            g.edge_weight_by_pair[pair] = max(g.edge_weight_by_pair.get(pair, 0.0), _edge_weight(edge))
         return g
 
+    def parents(self, gid: str) -> List[str]:
+        return self.csr.parents(gid)
+
+    def children(self, gid: str) -> List[str]:
+        return self.csr.children(gid)
+
     def ancestors(self, gid: str, *, max_depth: int = 8) -> List[Tuple[str, int]]:
-        """Return (ancestor_group_id, hop_distance) BFS upstream."""
-        if not gid:
-            return []
-        out: List[Tuple[str, int]] = []
-        seen: Set[str] = {gid}
-        frontier: List[Tuple[str, int]] = [(gid, 0)]
-        while frontier:
-            cur, depth = frontier.pop(0)
-            if depth >= max_depth:
-                continue
-            for parent in self.parents_of.get(cur, []):
-                if parent in seen:
-                    continue
-                seen.add(parent)
-                hop = depth + 1
-                out.append((parent, hop))
-                frontier.append((parent, hop))
-        return out
+        """Return (ancestor_group_id, hop_distance) BFS upstream (memoized per seed / depth)."""
+        return self.csr.ancestors(gid, max_depth=max_depth)
 
     def descendants(self, gid: str, *, max_depth: int = 8) -> List[Tuple[str, int]]:
-        if not gid:
-            return []
-        out: List[Tuple[str, int]] = []
-        seen: Set[str] = {gid}
-        frontier: List[Tuple[str, int]] = [(gid, 0)]
-        while frontier:
-            cur, depth = frontier.pop(0)
-            if depth >= max_depth:
-                continue
-            for child in self.children_of.get(cur, []):
-                if child in seen:
-                    continue
-                seen.add(child)
-                hop = depth + 1
-                out.append((child, hop))
-                frontier.append((child, hop))
-        return out
+        return self.csr.descendants(gid, max_depth=max_depth)
 
 
 def _shape_recipe_key(family: str, prompt_profile: str) -> Optional[str]:
@@ -246,6 +206,202 @@ def _rating_to_weight(rating: float, *, explore_floor: float = 0.35) -> float:
     return max(explore_floor, ((normalized - 1.0) / 4.0) ** 1.6 * 4.0 + 0.15)
 
 
+# Heuristics tables a contribution can land in (see :class:`HeuristicsAccumulator`).
+TABLE_PATTERN = "by_pattern"
+TABLE_LINEAGE = "by_group_lineage"
+TABLE_PATTERN_APPETITE = "by_pattern_appetite"
+TABLE_LINEAGE_APPETITE = "by_group_lineage_appetite"
+TABLE_TAG_APPETITE = "by_tag_appetite"
+HEURISTICS_TABLES = (
+    TABLE_PATTERN,
+    TABLE_LINEAGE,
+    TABLE_PATTERN_APPETITE,
+    TABLE_LINEAGE_APPETITE,
+    TABLE_TAG_APPETITE,
+)
+# stats counter per table.
+_TABLE_STATS = {
+    TABLE_PATTERN: "patterns",
+    TABLE_LINEAGE: "lineage_groups",
+    TABLE_PATTERN_APPETITE: "pattern_appetite",
+    TABLE_LINEAGE_APPETITE: "lineage_appetite",
+    TABLE_TAG_APPETITE: "tag_appetite",
+}
+
+
+class HeuristicsContribution(NamedTuple):
+    """One value one output adds to one heuristics bucket."""
+
+    table: str
+    key: str
+    value: float
+    rating: Optional[int] = None  # explicit star behind a quality contribution
+    meta: Optional[dict[str, Any]] = None  # pattern meta carried by a by_pattern contribution
+
+
+def _pattern_key(recipe: Optional[str], gh: Optional[str]) -> Tuple[Optional[str], Optional[dict[str, Any]]]:
+    """``(by_pattern key, pattern meta)`` — shape_recipe when known, else the graph_hash prefix."""
+    if recipe:
+        return recipe, {"kind": "shape_recipe", "shape_recipe": recipe}
+    if gh:
+        return f"graph:{gh[:16]}", {"kind": "graph_hash", "graph_hash": gh}
+    return None, None
+
+
+def _ancestor_credits(
+    lineage: Any,
+    key: str,
+    row: dict[str, Any],
+    base: float,
+    *,
+    ancestor_decay: float,
+    max_lineage_hops: int,
+) -> Iterator[Tuple[str, float]]:
+    """``(ancestor group id, credit)`` for every lineage ancestor of an output's seed groups."""
+    seed_gids = _output_group_ids(str(key), row)
+    if not seed_gids and row.get("short_key"):
+        seed_gids = _output_group_ids(str(row["short_key"]), row)
+    for seed_gid in seed_gids:
+        for ancestor_gid, hop in lineage.ancestors(seed_gid, max_depth=max_lineage_hops):
+            edge_w = lineage.edge_weight_by_pair.get((seed_gid, ancestor_gid), 0.85)
+            credit = base * (ancestor_decay ** hop) * edge_w
+            if credit > 0:
+                yield ancestor_gid, credit
+
+
+def rating_contributions(
+    key: str,
+    row: dict[str, Any],
+    lineage: Any,
+    *,
+    ancestor_decay: float = 0.85,
+    max_lineage_hops: int = 6,
+) -> List[HeuristicsContribution]:
+    """
+    Quality ("do more OF") buckets one rated output lands in: its pattern and the lineage
+    credit of its ancestors. Empty for unrated (None) and omit (explicit <= 0) rows.
+    ``lineage`` is a :class:`LineageGraph` or anything with the same ``ancestors`` /
+    ``edge_weight_by_pair``.
+    """
+    if not is_usable_quality_rating(row.get("explicit")):
+        return []
+    rating = int(row["explicit"])
+    out: List[HeuristicsContribution] = []
+    pattern, meta = _pattern_key(
+        str(row.get("shape_recipe") or "").strip(), str(row.get("graph_hash") or "").strip()
+    )
+    if pattern:
+        out.append(HeuristicsContribution(TABLE_PATTERN, pattern, float(rating), rating, meta))
+    for ancestor_gid, credit in _ancestor_credits(
+        lineage, key, row, float(rating), ancestor_decay=ancestor_decay, max_lineage_hops=max_lineage_hops
+    ):
+        out.append(HeuristicsContribution(TABLE_LINEAGE, ancestor_gid, credit, rating))
+    return out
+
+
+def appetite_contributions(
+    key: str,
+    row: dict[str, Any],
+    lineage: Any,
+    *,
+    pattern_for: Callable[[str, dict[str, Any]], Tuple[Optional[str], Optional[str]]],
+    tags_by: Optional[dict[str, Any]] = None,
+    ancestor_decay: float = 0.85,
+    max_lineage_hops: int = 6,
+) -> Optional[List[HeuristicsContribution]]:
+    """
+    Appetite ("do more WITH") buckets one output lands in, routed by facet: processing →
+    its pattern (``pattern_for`` resolves ``(shape_recipe, graph_hash)``), source → its
+    ancestors' lineage credit, plus its tags. None when the row carries no positive score.
+    """
+    appetite = str(row.get("appetite") or "").strip()
+    score = float(row.get("score") or APPETITE_SCORE.get(appetite, 0.0))
+    if score <= 0:
+        return None
+    out: List[HeuristicsContribution] = []
+    facet = str(row.get("facet") or "both").strip().lower() or "both"
+
+    if facet in ("processing", "both"):
+        pattern, _meta = _pattern_key(*pattern_for(str(key), row))
+        if pattern:
+            out.append(HeuristicsContribution(TABLE_PATTERN_APPETITE, pattern, score))
+
+    if facet in ("source", "both"):
+        for ancestor_gid, credit in _ancestor_credits(
+            lineage, key, row, score, ancestor_decay=ancestor_decay, max_lineage_hops=max_lineage_hops
+        ):
+            out.append(HeuristicsContribution(TABLE_LINEAGE_APPETITE, ancestor_gid, credit))
+
+    # Tag affinity (Slice 6): credit appetite to the output's tags.
+    if isinstance(tags_by, dict) and tags_by:
+        gid = str(row.get("group_id") or _og_group_id_from_relpath(str(row.get("short_key") or key)) or "")
+        tag_row = tags_by.get(gid) if gid else None
+        if isinstance(tag_row, dict):
+            for tag in tag_row.get("tags") or []:
+                t = str(tag).strip().lower()
+                if t:
+                    out.append(HeuristicsContribution(TABLE_TAG_APPETITE, t, score))
+    return out
+
+
+class HeuristicsAccumulator:
+    """Buckets per heuristics table; rows come out in build order (mean desc, then n desc)."""
+
+    def __init__(self) -> None:
+        self.patterns: Dict[str, AggBucket] = defaultdict(AggBucket)
+        self.floats: Dict[str, Dict[str, _FloatAgg]] = {
+            table: defaultdict(_FloatAgg) for table in HEURISTICS_TABLES if table != TABLE_PATTERN
+        }
+        self.lineage_meta: Dict[str, dict[str, Any]] = defaultdict(
+            lambda: {"descendant_rated_outputs": 0, "max_descendant_explicit": None}
+        )
+
+    def add(self, c: HeuristicsContribution) -> None:
+        if c.table == TABLE_PATTERN:
+            self.patterns[c.key].add(int(c.value))
+            return
+        self.floats[c.table][c.key].add(c.value)
+        if c.table == TABLE_LINEAGE and c.rating is not None:
+            meta = self.lineage_meta[c.key]
+            meta["descendant_rated_outputs"] = int(meta.get("descendant_rated_outputs") or 0) + 1
+            prev_max = meta.get("max_descendant_explicit")
+            if prev_max is None or c.rating > int(prev_max):
+                meta["max_descendant_explicit"] = c.rating
+
+    def row(self, table: str, key: str, *, pattern_meta: Dict[str, dict[str, Any]]) -> dict[str, Any]:
+        """The index row for one bucket ({} when it holds nothing)."""
+        if table == TABLE_PATTERN:
+            bucket = self.patterns.get(key)
+            return bucket.to_inferred(extra=pattern_meta.get(key)) if bucket else {}
+        agg = self.floats[table].get(key)
+        if agg is None:
+            return {}
+        if table == TABLE_LINEAGE:
+            extra = dict(self.lineage_meta.get(key) or {})
+            extra["group_id"] = key
+            return agg.to_row(extra=extra)
+        if table == TABLE_PATTERN_APPETITE:
+            return agg.to_row(extra=dict(pattern_meta.get(key) or {}) or None)
+        if table == TABLE_LINEAGE_APPETITE:
+            return agg.to_row(extra={"group_id": key})
+        return agg.to_row(extra={"tag": key})
+
+    def rows(self, table: str, *, pattern_meta: Dict[str, dict[str, Any]]) -> Dict[str, dict[str, Any]]:
+        if table == TABLE_PATTERN:
+            keys = sorted(
+                self.patterns, key=lambda k: (-statistics.mean(self.patterns[k].ratings), -len(self.patterns[k].ratings))
+            )
+        else:
+            aggs = self.floats[table]
+            keys = sorted(aggs, key=lambda k: (-statistics.mean(aggs[k].values), -len(aggs[k].values)))
+        out: Dict[str, dict[str, Any]] = {}
+        for key in keys:
+            row = self.row(table, key, pattern_meta=pattern_meta)
+            if row:
+                out[key] = row
+        return out
+
+
 def build_heuristics_index(
     *,
     ratings_doc: dict[str, Any],
@@ -257,6 +413,7 @@ def build_heuristics_index(
     out_path: Optional[Path] = None,
     ancestor_decay: float = 0.85,
     max_lineage_hops: int = 6,
+    state_path: Optional[Path] = None,
 ) -> dict[str, Any]:
     """
     Derive graph heuristics from ratings + lineage (+ appetite + tags).
@@ -269,17 +426,18 @@ def build_heuristics_index(
       by_pattern_appetite: fed by outputs with facet processing/both.
       by_group_lineage_appetite: fed by outputs with facet source/both.
       by_tag_appetite: appetite-weighted tag affinity (Slice 6, when tags_doc present).
+
+    ``state_path`` also records every output's contributions (and the job joins) in
+    ``heuristics_state.sqlite`` so single rating / appetite events can be applied as
+    deltas (``shape_factory_heuristics_incremental``).
     """
     by_output = ratings_doc.get("by_output_relpath") or {}
     if not isinstance(by_output, dict):
         by_output = {}
 
-    pattern_buckets: Dict[str, AggBucket] = defaultdict(AggBucket)
+    acc = HeuristicsAccumulator()
     pattern_meta: Dict[str, dict[str, Any]] = {}
-    lineage_buckets: Dict[str, _FloatAgg] = defaultdict(_FloatAgg)
-    lineage_meta: Dict[str, dict[str, Any]] = defaultdict(
-        lambda: {"descendant_rated_outputs": 0, "max_descendant_explicit": None}
-    )
+    rating_by_output: Dict[str, Tuple[str, List[HeuristicsContribution]]] = {}
 
     seen_outputs: Set[str] = set()
     for key, row in by_output.items():
@@ -293,36 +451,17 @@ def build_heuristics_index(
             continue
         seen_outputs.add(dedupe)
 
-        rating = int(row["explicit"])
-        gh = str(row.get("graph_hash") or "").strip()
-        recipe = str(row.get("shape_recipe") or "").strip()
-
-        if recipe:
-            pattern_buckets[recipe].add(rating)
-            pattern_meta.setdefault(recipe, {"kind": "shape_recipe", "shape_recipe": recipe})
-        elif gh:
-            pattern_key = f"graph:{gh[:16]}"
-            pattern_buckets[pattern_key].add(rating)
-            pattern_meta.setdefault(pattern_key, {"kind": "graph_hash", "graph_hash": gh})
-
-        seed_gids = _output_group_ids(str(key), row)
-        if not seed_gids and row.get("short_key"):
-            seed_gids = _output_group_ids(str(row["short_key"]), row)
-        for seed_gid in seed_gids:
-            for ancestor_gid, hop in lineage_graph.ancestors(seed_gid, max_depth=max_lineage_hops):
-                pair = (seed_gid, ancestor_gid)
-                edge_w = lineage_graph.edge_weight_by_pair.get(pair, 0.85)
-                credit = float(rating) * (ancestor_decay ** hop) * edge_w
-                if credit <= 0:
-                    continue
-                lineage_buckets[ancestor_gid].add(credit)
-                meta = lineage_meta[ancestor_gid]
-                meta["descendant_rated_outputs"] = int(meta.get("descendant_rated_outputs") or 0) + 1
-                prev_max = meta.get("max_descendant_explicit")
-                if prev_max is None or rating > int(prev_max):
-                    meta["max_descendant_explicit"] = rating
+        contribs = rating_contributions(
+            str(key), row, lineage_graph, ancestor_decay=ancestor_decay, max_lineage_hops=max_lineage_hops
+        )
+        for c in contribs:
+            acc.add(c)
+            if c.meta is not None:
+                pattern_meta.setdefault(c.key, c.meta)
+        rating_by_output[dedupe] = (str(key), contribs)
 
     # Enrich patterns from factory jobs (even when outputs are not yet rated).
+    job_pattern_meta: Dict[str, dict[str, Any]] = {}
     if jobs_root and jobs_root.is_dir():
         for job_path in sorted(jobs_root.rglob("*.job.json")):
             try:
@@ -337,27 +476,28 @@ def build_heuristics_index(
             recipe = _shape_recipe_key(family, str(prompt_raw or ""))
             gh = str(job.get("graph_hash") or "").strip()
             if recipe and gh:
-                pattern_meta.setdefault(
+                job_pattern_meta.setdefault(
                     recipe,
                     {"kind": "shape_recipe", "shape_recipe": recipe, "graph_hash": gh},
                 )
+    for recipe, meta in job_pattern_meta.items():
+        pattern_meta.setdefault(recipe, meta)
 
     # --- Appetite ("do more WITH") rollups, facet-routed ---
-    pattern_appetite: Dict[str, _FloatAgg] = defaultdict(_FloatAgg)
-    lineage_appetite: Dict[str, _FloatAgg] = defaultdict(_FloatAgg)
-    tag_appetite: Dict[str, _FloatAgg] = defaultdict(_FloatAgg)
     appetite_outputs_used = 0
+    appetite_by_output: Dict[str, Tuple[str, List[HeuristicsContribution]]] = {}
+    job_index: Dict[str, Any] = {}
 
     app_by_output = (appetite_doc or {}).get("by_output_relpath") or {}
-    if isinstance(app_by_output, dict) and app_by_output:
+    if jobs_root and data_root and ((isinstance(app_by_output, dict) and app_by_output) or state_path):
         # Resolve appetite outputs -> pattern via the job output index (appetite-marked
         # outputs are frequently unrated, so ratings_doc alone will not have them).
-        job_index: Dict[str, Any] = {}
-        if jobs_root and data_root:
-            try:
-                job_index = build_job_output_index(Path(jobs_root), Path(data_root))
-            except Exception:
-                job_index = {}
+        try:
+            job_index = build_job_output_index(Path(jobs_root), Path(data_root))
+        except Exception:
+            job_index = {}
+
+    if isinstance(app_by_output, dict) and app_by_output:
 
         def _pattern_for_appetite(key: str, row: dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
             # Prefer a rated row (carries graph_hash/shape_recipe), else the job index.
@@ -386,39 +526,21 @@ def build_heuristics_index(
             if dedupe in seen_appetite:
                 continue
             seen_appetite.add(dedupe)
-            score = float(row.get("score") or APPETITE_SCORE.get(appetite, 0.0))
-            if score <= 0:
+            contribs = appetite_contributions(
+                str(key),
+                row,
+                lineage_graph,
+                pattern_for=_pattern_for_appetite,
+                tags_by=tags_by,
+                ancestor_decay=ancestor_decay,
+                max_lineage_hops=max_lineage_hops,
+            )
+            if contribs is None:
                 continue
             appetite_outputs_used += 1
-            facet = str(row.get("facet") or "both").strip().lower() or "both"
-
-            if facet in ("processing", "both"):
-                recipe, gh = _pattern_for_appetite(str(key), row)
-                if recipe:
-                    pattern_appetite[recipe].add(score)
-                elif gh:
-                    pattern_appetite[f"graph:{gh[:16]}"].add(score)
-
-            if facet in ("source", "both"):
-                seed_gids = _output_group_ids(str(key), row)
-                if not seed_gids and row.get("short_key"):
-                    seed_gids = _output_group_ids(str(row["short_key"]), row)
-                for seed_gid in seed_gids:
-                    for ancestor_gid, hop in lineage_graph.ancestors(seed_gid, max_depth=max_lineage_hops):
-                        edge_w = lineage_graph.edge_weight_by_pair.get((seed_gid, ancestor_gid), 0.85)
-                        credit = score * (ancestor_decay ** hop) * edge_w
-                        if credit > 0:
-                            lineage_appetite[ancestor_gid].add(credit)
-
-            # Tag affinity (Slice 6): credit appetite to the output's tags.
-            if isinstance(tags_by, dict) and tags_by:
-                gid = str(row.get("group_id") or _og_group_id_from_relpath(str(row.get("short_key") or key)) or "")
-                tag_row = tags_by.get(gid) if gid else None
-                if isinstance(tag_row, dict):
-                    for tag in tag_row.get("tags") or []:
-                        t = str(tag).strip().lower()
-                        if t:
-                            tag_appetite[t].add(score)
+            for c in contribs:
+                acc.add(c)
+            appetite_by_output[dedupe] = (str(key), contribs)
 
     doc: dict[str, Any] = {
         "version": HEURISTICS_SCHEMA_VERSION,
@@ -433,61 +555,31 @@ def build_heuristics_index(
             "lineage_appetite": 0,
             "tag_appetite": 0,
         },
-        "by_pattern": {},
-        "by_group_lineage": {},
-        "by_pattern_appetite": {},
-        "by_group_lineage_appetite": {},
-        "by_tag_appetite": {},
     }
-
-    for pattern_key, bucket in sorted(
-        pattern_buckets.items(), key=lambda kv: (-statistics.mean(kv[1].ratings), -len(kv[1].ratings))
-    ):
-        row = bucket.to_inferred(extra=pattern_meta.get(pattern_key))
-        doc["by_pattern"][pattern_key] = row
-
-    for gid, bucket in sorted(
-        lineage_buckets.items(),
-        key=lambda kv: (-statistics.mean(kv[1].values), -len(kv[1].values)),
-    ):
-        extra = dict(lineage_meta.get(gid) or {})
-        extra["group_id"] = gid
-        row = bucket.to_row(extra=extra)
-        if row:
-            doc["by_group_lineage"][gid] = row
-
-    for pattern_key, bucket in sorted(
-        pattern_appetite.items(), key=lambda kv: (-statistics.mean(kv[1].values), -len(kv[1].values))
-    ):
-        extra = dict(pattern_meta.get(pattern_key) or {})
-        row = bucket.to_row(extra=extra or None)
-        if row:
-            doc["by_pattern_appetite"][pattern_key] = row
-
-    for gid, bucket in sorted(
-        lineage_appetite.items(), key=lambda kv: (-statistics.mean(kv[1].values), -len(kv[1].values))
-    ):
-        row = bucket.to_row(extra={"group_id": gid})
-        if row:
-            doc["by_group_lineage_appetite"][gid] = row
-
-    for tag, bucket in sorted(
-        tag_appetite.items(), key=lambda kv: (-statistics.mean(kv[1].values), -len(kv[1].values))
-    ):
-        row = bucket.to_row(extra={"tag": tag})
-        if row:
-            doc["by_tag_appetite"][tag] = row
-
-    doc["stats"]["patterns"] = len(doc["by_pattern"])
-    doc["stats"]["lineage_groups"] = len(doc["by_group_lineage"])
-    doc["stats"]["pattern_appetite"] = len(doc["by_pattern_appetite"])
-    doc["stats"]["lineage_appetite"] = len(doc["by_group_lineage_appetite"])
-    doc["stats"]["tag_appetite"] = len(doc["by_tag_appetite"])
+    for table in HEURISTICS_TABLES:
+        doc[table] = acc.rows(table, pattern_meta=pattern_meta)
+        doc["stats"][_TABLE_STATS[table]] = len(doc[table])
 
     if out_path:
         out_path = out_path.expanduser().resolve()
         out_path.parent.mkdir(parents=True, exist_ok=True)
         out_path.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    if state_path:
+        from shape_factory_heuristics_incremental import write_heuristics_state
+
+        write_heuristics_state(
+            state_path,
+            rating_by_output=rating_by_output,
+            appetite_by_output=appetite_by_output,
+            job_pattern_meta=job_pattern_meta,
+            job_index=job_index,
+            params={
+                "ancestor_decay": float(ancestor_decay),
+                "max_lineage_hops": int(max_lineage_hops),
+                "data_root": str(Path(data_root).resolve()) if data_root else "",
+                "lineage_edges": len(lineage_graph.edges),
+            },
+        )
     return doc
 
 
@@ -503,6 +595,320 @@ def _appetite_light_mult(value: float) -> float:
     return max(0.5, min(1.8, 1.0 + (float(value) - 2.5) * 0.28))
 
 
+_SOURCE_SLOTS = ("source_video", "source_still", "source_video_ref")
+
+
+class _RecipePartial(NamedTuple):
+    """Signals that depend only on (family, prompt profile, source picks, graph hash)."""
+
+    recipe_key: Optional[str]
+    lineage: Optional[Tuple[float, str]]  # best source-side (inferred, group id)
+    pattern: Optional[float]
+    source_inferred: Optional[Tuple[str, float, Any]]  # (basename, inferred, n)
+    graph: Optional[Tuple[float, Any]]  # (inferred, n)
+    pattern_appetite: Optional[float]
+    lineage_appetite: Optional[float]  # best source-side
+
+
+class RecipeScorer:
+    """
+    ``score_recipe`` with the docs bound once: tables resolved up front, source group ids
+    interned, and the per-(family, prompt profile, sources, graph hash) part of the score
+    kept in an LRU so a pool of recipes sharing picks only pays the per-output lookups.
+
+    Docs are treated as immutable for the scorer's lifetime; get one per index version
+    with :func:`recipe_scorer`.
+    """
+
+    def __init__(
+        self,
+        *,
+        ratings_doc: Optional[dict[str, Any]] = None,
+        heuristics_doc: Optional[dict[str, Any]] = None,
+        appetite_doc: Optional[dict[str, Any]] = None,
+        explore_floor: Optional[float] = None,
+        partial_cache_size: int = 4096,
+    ) -> None:
+        import os
+
+        self.ratings_doc = ratings_doc
+        self.heuristics_doc = heuristics_doc
+        self.appetite_doc = appetite_doc
+        self.floor = float(
+            explore_floor if explore_floor is not None else os.environ.get("HOURLY_RATING_EXPLORE_FLOOR", "0.35")
+        )
+        h = heuristics_doc or {}
+        r = ratings_doc or {}
+        self._by_lineage = _dict_or_none(h.get("by_group_lineage") or {})
+        self._by_pattern = _dict_or_none(h.get("by_pattern") or {})
+        self._by_pat_app = _dict_or_none(h.get("by_pattern_appetite") or {})
+        self._by_lin_app = _dict_or_none(h.get("by_group_lineage_appetite") or {})
+        self._by_source = _dict_or_none(r.get("by_source_basename") or {})
+        self._by_graph = _dict_or_none(r.get("by_graph_hash") or {})
+        self._rated_outputs = r.get("by_output_relpath") or {}
+        self._wanted_outputs = (appetite_doc or {}).get("by_output_relpath") or {}
+        self._source_gids: Dict[str, List[str]] = {}
+        self._partials: "OrderedDict[Tuple[Any, ...], _RecipePartial]" = OrderedDict()
+        self.partial_cache_size = int(partial_cache_size)
+        self.partial_hits = 0
+        self.partial_misses = 0
+        if ratings_doc:
+            try:
+                from correlate_output_ratings import normalize_source_basename
+            except ImportError:
+                normalize_source_basename = lambda s: Path(str(s)).name  # type: ignore
+            self._normalize_source = normalize_source_basename
+
+    def _gids_for_source(self, basename: str) -> List[str]:
+        gids = self._source_gids.get(basename)
+        if gids is None:
+            gids = self._source_gids[basename] = _source_group_ids(basename)
+        return gids
+
+    def _partial(self, family: str, prompt_raw: str, sources: Tuple[Optional[str], ...], gh: str) -> _RecipePartial:
+        key = (family, prompt_raw, sources, gh)
+        cached = self._partials.get(key)
+        if cached is not None:
+            self.partial_hits += 1
+            self._partials.move_to_end(key)
+            return cached
+        self.partial_misses += 1
+        recipe_key = _shape_recipe_key(family, prompt_raw)
+        source_gids: List[str] = []
+        for bn in sources:
+            if bn is not None:
+                source_gids.extend(self._gids_for_source(bn))
+
+        lineage: Optional[Tuple[float, str]] = None
+        pattern: Optional[float] = None
+        pattern_appetite: Optional[float] = None
+        lineage_appetite: Optional[float] = None
+        if self.heuristics_doc:
+            lineage = _best_lineage_row(self._by_lineage, source_gids, None)
+            row = _pattern_row(self._by_pattern, recipe_key, gh)
+            if row and row.get("inferred") is not None:
+                pattern = float(row["inferred"])
+            row = _pattern_row(self._by_pat_app, recipe_key, gh)
+            if row and row.get("inferred") is not None:
+                pattern_appetite = float(row["inferred"])
+            if self._by_lin_app is not None:
+                best = _best_lineage_row(self._by_lin_app, source_gids, None)
+                lineage_appetite = best[0] if best else None
+
+        source_inferred: Optional[Tuple[str, float, Any]] = None
+        graph: Optional[Tuple[float, Any]] = None
+        if self.ratings_doc:
+            for bn in sources:
+                if bn is None:
+                    continue
+                norm = self._normalize_source(bn)
+                row = self._by_source.get(norm) if self._by_source is not None else None
+                if isinstance(row, dict) and row.get("inferred") is not None:
+                    source_inferred = (norm, float(row["inferred"]), row.get("n"))
+                    break
+            row = self._by_graph.get(gh) if self._by_graph is not None else None
+            if isinstance(row, dict) and row.get("inferred") is not None:
+                graph = (float(row["inferred"]), row.get("n"))
+
+        partial = _RecipePartial(recipe_key, lineage, pattern, source_inferred, graph, pattern_appetite, lineage_appetite)
+        if self.partial_cache_size > 0:
+            self._partials[key] = partial
+            if len(self._partials) > self.partial_cache_size:
+                self._partials.popitem(last=False)
+        return partial
+
+    def score(self, recipe: dict[str, Any], *, shape: dict[str, Any]) -> Tuple[float, dict[str, Any]]:
+        """Same ``(weight, meta)`` as :func:`score_recipe` for these docs."""
+        floor = self.floor
+        meta: dict[str, Any] = {"rating_effective": None, "evidence": [], "signals": {}}
+        ratings_doc = self.ratings_doc
+        heuristics_doc = self.heuristics_doc
+        if not ratings_doc and not heuristics_doc:
+            return floor, meta
+
+        rating_value: Optional[float] = None
+        best_weight = floor
+
+        def consider(value: Optional[float], evidence: str, *, signal: str) -> None:
+            nonlocal rating_value, best_weight
+            if not is_usable_quality_rating(value):
+                return
+            numeric = float(value)
+            meta["evidence"].append(evidence)
+            meta["signals"][signal] = numeric
+            w = _rating_to_weight(numeric, explore_floor=floor)
+            if rating_value is None or w > best_weight:
+                rating_value = numeric
+                best_weight = w
+
+        output_path = str(recipe.get("output_path") or "")
+        # Path variants once for both the ratings and the appetite table.
+        output_keys = output_lookup_keys(output_path) if (ratings_doc or self.appetite_doc) else []
+        # Explicit output rating (ratings index).
+        # ``explicit: 0`` = omit from consideration (hard exclude), not explore-floor.
+        out_row: Optional[dict[str, Any]] = None
+        if ratings_doc:
+            out_row = lookup_output_row(self._rated_outputs, output_keys)
+            if out_row is not None and is_omit_quality_rating(out_row.get("explicit")):
+                try:
+                    meta["explicit"] = int(out_row["explicit"])
+                except (TypeError, ValueError):
+                    meta["explicit"] = 0
+                meta["omit"] = True
+                meta["rating_kind"] = "omit"
+                meta["evidence"].append("output_omit")
+                return 0.0, meta
+            if out_row and is_usable_quality_rating(out_row.get("explicit")):
+                consider(float(out_row["explicit"]), "output_explicit", signal="output_explicit")
+                meta["explicit"] = int(out_row["explicit"])
+
+        picks = recipe.get("picks") if isinstance(recipe.get("picks"), dict) else {}
+        family = str(recipe.get("family") or shape.get("family") or shape.get("id") or "").strip()
+        prompt_raw = picks.get("prompt_profile") or picks.get("gex2_prompt")
+        sources = tuple(_path_name(str(picks.get(slot))) if picks.get(slot) else None for slot in _SOURCE_SLOTS)
+        gh = str(shape.get("graph_hash") or "")
+        part = self._partial(family, str(prompt_raw or ""), sources, gh)
+        recipe_key = part.recipe_key
+
+        output_gids: List[str] = []
+        if heuristics_doc:
+            output_gids = _output_group_ids(output_path, None)
+            # Lineage ancestor credit (feeds highly rated descendants); sources before outputs.
+            lineage_gids = _output_group_ids(output_path, out_row) if out_row else output_gids
+            best = _best_lineage_row(self._by_lineage, lineage_gids, part.lineage)
+            if best is not None:
+                consider(best[0], f"lineage_ancestor:{best[1]}", signal="lineage_ancestor")
+                meta["lineage_group_id"] = best[1]
+            # Workflow + prompt pattern.
+            if part.pattern is not None:
+                consider(part.pattern, f"pattern:{recipe_key or 'graph'}", signal="pattern")
+
+        # Source basename aggregate.
+        if part.source_inferred is not None:
+            bn, inferred, n = part.source_inferred
+            consider(inferred, f"source_inferred:{bn}", signal="source_inferred")
+            meta["source_inferred"] = inferred
+            meta["source_n"] = n
+
+        # Graph hash fallback.
+        if rating_value is None and part.graph is not None:
+            consider(part.graph[0], "graph_inferred", signal="graph_inferred")
+            meta["graph_inferred"] = part.graph[0]
+            meta["graph_n"] = part.graph[1]
+
+        # --- Appetite ("do more WITH") as a light multiplier ---
+        appetite_value: Optional[float] = None
+        appetite_state: Optional[str] = None
+        appetite_facet: Optional[str] = None
+
+        if self.appetite_doc:
+            app_row = lookup_output_row(self._wanted_outputs, output_keys)
+            if isinstance(app_row, dict) and app_row.get("appetite"):
+                appetite_state = str(app_row.get("appetite"))
+                appetite_facet = str(app_row.get("facet") or "both")
+                appetite_value = float(app_row.get("score") or APPETITE_SCORE.get(appetite_state, 0.0))
+                meta["appetite_evidence"] = f"output_appetite:{appetite_state}"
+
+        if appetite_value is None and part.pattern_appetite is not None:
+            appetite_value = part.pattern_appetite
+            meta["appetite_evidence"] = f"pattern_appetite:{recipe_key or 'graph'}"
+
+        if appetite_value is None and heuristics_doc and self._by_lin_app is not None:
+            start = (part.lineage_appetite, "") if part.lineage_appetite is not None else None
+            best = _best_lineage_row(self._by_lin_app, output_gids, start)
+            if best is not None:
+                appetite_value = best[0]
+                meta["appetite_evidence"] = "lineage_appetite"
+
+        if appetite_value is not None:
+            meta["appetite"] = appetite_state
+            meta["appetite_facet"] = appetite_facet
+            meta["appetite_value"] = round(appetite_value, 3)
+            if appetite_state == "fast_track":
+                meta["fast_track"] = True
+            best_weight = best_weight * _appetite_light_mult(appetite_value)
+
+        if rating_value is None and appetite_value is None:
+            return floor, meta
+
+        meta["rating_effective"] = rating_value
+        if meta.get("signals", {}).get("output_explicit") is not None:
+            meta["rating_kind"] = "explicit"
+        elif rating_value is not None:
+            meta["rating_kind"] = "predicted"
+        else:
+            meta["rating_kind"] = "none"
+        return best_weight, meta
+
+    def score_many(
+        self, recipes: Iterable[dict[str, Any]], *, shape: dict[str, Any]
+    ) -> List[Tuple[float, dict[str, Any]]]:
+        """``score`` for a whole candidate pool (one shape)."""
+        return [self.score(recipe, shape=shape) for recipe in recipes]
+
+
+def _dict_or_none(table: Any) -> Optional[dict[str, Any]]:
+    return table if isinstance(table, dict) else None
+
+
+def _pattern_row(table: Optional[dict[str, Any]], recipe_key: Optional[str], gh: str) -> Optional[dict[str, Any]]:
+    if table is None:
+        return None
+    row = _lookup_table_row(table, recipe_key) if recipe_key else None
+    if row is None and gh:
+        row = _lookup_table_row(table, f"graph:{gh[:16]}")
+    return row
+
+
+def _best_lineage_row(
+    table: Optional[dict[str, Any]], gids: Iterable[str], best: Optional[Tuple[float, str]]
+) -> Optional[Tuple[float, str]]:
+    """Highest ``inferred`` over ``gids`` continuing from ``best``; earlier wins ties."""
+    if table is None:
+        return best
+    for gid in gids:
+        row = _lookup_table_row(table, gid)
+        if row and row.get("inferred") is not None:
+            val = float(row["inferred"])
+            if best is None or val > best[0]:
+                best = (val, gid)
+    return best
+
+
+_SCORER_CACHE: "OrderedDict[Tuple[Any, ...], RecipeScorer]" = OrderedDict()
+_SCORER_CACHE_SIZE = 2
+
+
+def recipe_scorer(
+    *,
+    ratings_doc: Optional[dict[str, Any]] = None,
+    heuristics_doc: Optional[dict[str, Any]] = None,
+    appetite_doc: Optional[dict[str, Any]] = None,
+    explore_floor: Optional[float] = None,
+) -> RecipeScorer:
+    """
+    Shared :class:`RecipeScorer` for these doc objects and heuristics index version
+    (``updated_at``). Reloading any index yields new objects and so a fresh scorer.
+    """
+    import os
+
+    floor = float(explore_floor if explore_floor is not None else os.environ.get("HOURLY_RATING_EXPLORE_FLOOR", "0.35"))
+    h = heuristics_doc or {}
+    key = (id(ratings_doc), id(heuristics_doc), id(appetite_doc), h.get("version"), h.get("updated_at"), floor)
+    scorer = _SCORER_CACHE.get(key)
+    # The cache holds the docs, so a hit on ids is the same objects.
+    if scorer is not None:
+        _SCORER_CACHE.move_to_end(key)
+        return scorer
+    scorer = RecipeScorer(
+        ratings_doc=ratings_doc, heuristics_doc=heuristics_doc, appetite_doc=appetite_doc, explore_floor=floor
+    )
+    _SCORER_CACHE[key] = scorer
+    while len(_SCORER_CACHE) > _SCORER_CACHE_SIZE:
+        _SCORER_CACHE.popitem(last=False)
+    return scorer
+
+
 def score_recipe(
     recipe: dict[str, Any],
     *,
@@ -519,190 +925,17 @@ def score_recipe(
       output_explicit → lineage_ancestor → pattern → source_inferred → graph_inferred
     Appetite ("do more WITH") is applied as a light multiplier on top; the Derive pass
     (plan_hourly_derive) is where appetite dominates.
-    """
-    import os
-
-    floor = float(explore_floor if explore_floor is not None else os.environ.get("HOURLY_RATING_EXPLORE_FLOOR", "0.35"))
-    meta: dict[str, Any] = {"rating_effective": None, "evidence": [], "signals": {}}
-
-    if not ratings_doc and not heuristics_doc:
-        return floor, meta
-
-    rating_value: Optional[float] = None
-    best_weight = floor
 
-    def consider(value: Optional[float], evidence: str, *, signal: str) -> None:
-        nonlocal rating_value, best_weight
-        if not is_usable_quality_rating(value):
-            return
-        numeric = float(value)
-        meta["evidence"].append(evidence)
-        meta["signals"][signal] = numeric
-        w = _rating_to_weight(numeric, explore_floor=floor)
-        if rating_value is None or w > best_weight:
-            rating_value = numeric
-            best_weight = w
-
-    # Explicit output rating (ratings index).
-    # ``explicit: 0`` = omit from consideration (hard exclude), not explore-floor.
-    if ratings_doc:
-        from shape_factory_ratings import lookup_output_rating
-
-        out_row = lookup_output_rating(str(recipe.get("output_path") or ""), ratings_doc)
-        if out_row is not None and is_omit_quality_rating(out_row.get("explicit")):
-            try:
-                meta["explicit"] = int(out_row["explicit"])
-            except (TypeError, ValueError):
-                meta["explicit"] = 0
-            meta["omit"] = True
-            meta["rating_kind"] = "omit"
-            meta["evidence"].append("output_omit")
-            return 0.0, meta
-        if out_row and is_usable_quality_rating(out_row.get("explicit")):
-            consider(float(out_row["explicit"]), "output_explicit", signal="output_explicit")
-            meta["explicit"] = int(out_row["explicit"])
-
-    picks = recipe.get("picks") if isinstance(recipe.get("picks"), dict) else {}
-    family = str(recipe.get("family") or shape.get("family") or shape.get("id") or "").strip()
-    prompt_raw = picks.get("prompt_profile") or picks.get("gex2_prompt")
-    recipe_key = _shape_recipe_key(family, str(prompt_raw or ""))
-
-    # Lineage ancestor credit (feeds highly rated descendants).
-    if heuristics_doc:
-        by_lineage = heuristics_doc.get("by_group_lineage") or {}
-        lineage_candidates: List[str] = []
-        for slot in ("source_video", "source_still", "source_video_ref"):
-            raw = picks.get(slot)
-            if raw:
-                lineage_candidates.extend(_source_group_ids(Path(str(raw)).name))
-        if ratings_doc:
-            out_row = lookup_output_rating(str(recipe.get("output_path") or ""), ratings_doc)
-        else:
-            out_row = None
-        lineage_candidates.extend(_output_group_ids(str(recipe.get("output_path") or ""), out_row))
-
-        best_lineage: Optional[float] = None
-        best_gid: Optional[str] = None
-        for gid in lineage_candidates:
-            row = _lookup_table_row(by_lineage, gid) if isinstance(by_lineage, dict) else None
-            if row and row.get("inferred") is not None:
-                val = float(row["inferred"])
-                if best_lineage is None or val > best_lineage:
-                    best_lineage = val
-                    best_gid = gid
-        if best_lineage is not None:
-            consider(best_lineage, f"lineage_ancestor:{best_gid}", signal="lineage_ancestor")
-            meta["lineage_group_id"] = best_gid
-
-        # Workflow + prompt pattern.
-        by_pattern = heuristics_doc.get("by_pattern") or {}
-        pattern_row = None
-        if recipe_key and isinstance(by_pattern, dict):
-            pattern_row = _lookup_table_row(by_pattern, recipe_key)
-        if pattern_row is None and isinstance(by_pattern, dict):
-            gh = str(shape.get("graph_hash") or "")
-            if gh:
-                pattern_row = _lookup_table_row(by_pattern, f"graph:{gh[:16]}")
-        if pattern_row and pattern_row.get("inferred") is not None:
-            consider(float(pattern_row["inferred"]), f"pattern:{recipe_key or 'graph'}", signal="pattern")
-
-    # Source basename aggregate.
-    if ratings_doc:
-        try:
-            from correlate_output_ratings import normalize_source_basename
-        except ImportError:
-            normalize_source_basename = lambda s: Path(str(s)).name  # type: ignore
-
-        by_source = ratings_doc.get("by_source_basename") or {}
-        for slot in ("source_video", "source_still", "source_video_ref"):
-            raw = picks.get(slot)
-            if not raw:
-                continue
-            bn = normalize_source_basename(Path(str(raw)).name)
-            row = by_source.get(bn) if isinstance(by_source, dict) else None
-            if isinstance(row, dict) and row.get("inferred") is not None:
-                consider(float(row["inferred"]), f"source_inferred:{bn}", signal="source_inferred")
-                meta["source_inferred"] = float(row["inferred"])
-                meta["source_n"] = row.get("n")
-                break
-
-    # Graph hash fallback.
-    if ratings_doc and rating_value is None:
-        gh = str(shape.get("graph_hash") or "")
-        by_graph = ratings_doc.get("by_graph_hash") or {}
-        row = by_graph.get(gh) if isinstance(by_graph, dict) else None
-        if isinstance(row, dict) and row.get("inferred") is not None:
-            consider(float(row["inferred"]), "graph_inferred", signal="graph_inferred")
-            meta["graph_inferred"] = float(row["inferred"])
-            meta["graph_n"] = row.get("n")
-
-    # --- Appetite ("do more WITH") as a light multiplier ---
-    appetite_value: Optional[float] = None
-    appetite_state: Optional[str] = None
-    appetite_facet: Optional[str] = None
-
-    if appetite_doc:
-        from shape_factory_ratings import lookup_output_appetite
-
-        app_row = lookup_output_appetite(str(recipe.get("output_path") or ""), appetite_doc)
-        if isinstance(app_row, dict) and app_row.get("appetite"):
-            appetite_state = str(app_row.get("appetite"))
-            appetite_facet = str(app_row.get("facet") or "both")
-            appetite_value = float(app_row.get("score") or APPETITE_SCORE.get(appetite_state, 0.0))
-            meta["appetite_evidence"] = f"output_appetite:{appetite_state}"
-
-    if appetite_value is None and heuristics_doc:
-        by_pat_app = heuristics_doc.get("by_pattern_appetite") or {}
-        pat_row = None
-        if recipe_key and isinstance(by_pat_app, dict):
-            pat_row = _lookup_table_row(by_pat_app, recipe_key)
-        if pat_row is None and isinstance(by_pat_app, dict):
-            gh = str(shape.get("graph_hash") or "")
-            if gh:
-                pat_row = _lookup_table_row(by_pat_app, f"graph:{gh[:16]}")
-        if pat_row and pat_row.get("inferred") is not None:
-            appetite_value = float(pat_row["inferred"])
-            meta["appetite_evidence"] = f"pattern_appetite:{recipe_key or 'graph'}"
-
-    if appetite_value is None and heuristics_doc:
-        by_lin_app = heuristics_doc.get("by_group_lineage_appetite") or {}
-        if isinstance(by_lin_app, dict):
-            lin_candidates: List[str] = []
-            for slot in ("source_video", "source_still", "source_video_ref"):
-                raw = picks.get(slot)
-                if raw:
-                    lin_candidates.extend(_source_group_ids(Path(str(raw)).name))
-            lin_candidates.extend(_output_group_ids(str(recipe.get("output_path") or ""), None))
-            best_lin_app: Optional[float] = None
-            for gid in lin_candidates:
-                row = _lookup_table_row(by_lin_app, gid)
-                if row and row.get("inferred") is not None:
-                    val = float(row["inferred"])
-                    if best_lin_app is None or val > best_lin_app:
-                        best_lin_app = val
-            if best_lin_app is not None:
-                appetite_value = best_lin_app
-                meta["appetite_evidence"] = "lineage_appetite"
-
-    if appetite_value is not None:
-        meta["appetite"] = appetite_state
-        meta["appetite_facet"] = appetite_facet
-        meta["appetite_value"] = round(appetite_value, 3)
-        if appetite_state == "fast_track":
-            meta["fast_track"] = True
-        best_weight = best_weight * _appetite_light_mult(appetite_value)
-
-    if rating_value is None and appetite_value is None:
-        return floor, meta
-
-    meta["rating_effective"] = rating_value
-    if meta.get("signals", {}).get("output_explicit") is not None:
-        meta["rating_kind"] = "explicit"
-    elif rating_value is not None:
-        meta["rating_kind"] = "predicted"
-    else:
-        meta["rating_kind"] = "none"
-    return best_weight, meta
+    One-off call (docs may change between calls); pools should use :func:`recipe_scorer`.
+    """
+    scorer = RecipeScorer(
+        ratings_doc=ratings_doc,
+        heuristics_doc=heuristics_doc,
+        appetite_doc=appetite_doc,
+        explore_floor=explore_floor,
+        partial_cache_size=0,
+    )
+    return scorer.score(recipe, shape=shape)
 
 
 def _default_asset_tags_path(og_root: Path) -> Path:
@@ -719,7 +952,8 @@ def _load_json_doc(path: Path) -> Optional[dict[str, Any]]:
         return None
 
 
-def cmd_heuristics_build(args: argparse.Namespace) -> int:
+def _heuristics_build_inputs(args: argparse.Namespace) -> Optional[Dict[str, Any]]:
+    """``build_heuristics_index`` keyword arguments from ``heuristics build`` / ``verify`` args (None: no ratings)."""
     og_root = Path(args.root).expanduser().resolve()
     ratings_path = Path(args.ratings_index or default_ratings_index_path(og_root)).expanduser().resolve()
     lineage_path = Path(args.lineage_edges or default_lineage_edges_path(og_root)).expanduser().resolve()
@@ -727,14 +961,13 @@ def cmd_heuristics_build(args: argparse.Namespace) -> int:
     appetite_path = Path(args.appetite_index or default_appetite_index_path(og_root)).expanduser().resolve()
     tags_path = Path(args.asset_tags or _default_asset_tags_path(og_root)).expanduser().resolve()
     data_root = Path(args.data_root).expanduser().resolve() if getattr(args, "data_root", None) else None
-    out_path = Path(args.out or default_heuristics_index_path(og_root)).expanduser().resolve()
 
     from shape_factory_ratings import load_appetite_doc, load_ratings_doc, ratings_db_path_for_index
 
     ratings_db = ratings_db_path_for_index(ratings_path)
     if not ratings_path.is_file() and not ratings_db.is_file():
         print(f"error: ratings index not found: {ratings_path}", file=__import__("sys").stderr)
-        return 1
+        return None
 
     ratings_doc = load_ratings_doc(ratings_path)
     graph = LineageGraph.load(lineage_path)
@@ -744,17 +977,28 @@ def cmd_heuristics_build(args: argparse.Namespace) -> int:
         else _load_json_doc(appetite_path)
     )
     tags_doc = _load_json_doc(tags_path)
-    doc = build_heuristics_index(
+    return dict(
         ratings_doc=ratings_doc,
         lineage_graph=graph,
         jobs_root=jobs_root,
         appetite_doc=appetite_doc,
         tags_doc=tags_doc,
         data_root=data_root,
-        out_path=out_path,
         ancestor_decay=float(args.ancestor_decay),
         max_lineage_hops=int(args.max_lineage_hops),
     )
+
+
+def cmd_heuristics_build(args: argparse.Namespace) -> int:
+    og_root = Path(args.root).expanduser().resolve()
+    out_path = Path(args.out or default_heuristics_index_path(og_root)).expanduser().resolve()
+    inputs = _heuristics_build_inputs(args)
+    if inputs is None:
+        return 1
+
+    from shape_factory_heuristics_incremental import default_heuristics_state_path
+
+    doc = build_heuristics_index(out_path=out_path, state_path=default_heuristics_state_path(out_path), **inputs)
     stats = doc.get("stats") or {}
     print(f"Wrote {out_path}")
     print(
@@ -769,6 +1013,42 @@ def cmd_heuristics_build(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_heuristics_verify(args: argparse.Namespace) -> int:
+    """Diff the current index (full build + applied events) against a fresh full build; nothing written."""
+    og_root = Path(args.root).expanduser().resolve()
+    path = Path(args.out or default_heuristics_index_path(og_root)).expanduser().resolve()
+    current = _load_json_doc(path)
+    if current is None:
+        print(f"error: heuristics index not found: {path}", file=__import__("sys").stderr)
+        return 1
+    inputs = _heuristics_build_inputs(args)
+    if inputs is None:
+        return 1
+
+    from shape_factory_heuristics_incremental import diff_heuristics_docs
+
+    diffs = diff_heuristics_docs(current, build_heuristics_index(**inputs))
+    print(json.dumps({"ok": not diffs, "path": str(path), "diffs": diffs}, indent=2))
+    return 0 if not diffs else 1
+
+
+def cmd_heuristics_apply(args: argparse.Namespace) -> int:
+    """Apply one output's current rating / appetite rows to the index as a delta."""
+    og_root = Path(args.root).expanduser().resolve()
+    from shape_factory_heuristics_incremental import apply_output_event
+
+    out = apply_output_event(
+        heuristics_index_path=Path(args.index or default_heuristics_index_path(og_root)),
+        ratings_index_path=Path(args.ratings_index or default_ratings_index_path(og_root)),
+        lineage_edges_path=Path(args.lineage_edges or default_lineage_edges_path(og_root)),
+        asset_tags_path=Path(args.asset_tags or _default_asset_tags_path(og_root)),
+        discovery_key=str(args.key or ""),
+        short_key=str(args.short_key or ""),
+    )
+    print(json.dumps(out, indent=2))
+    return 0 if out.get("ok") else 1
+
+
 def cmd_heuristics_show(args: argparse.Namespace) -> int:
     og_root = Path(args.root).expanduser().resolve()
     path = Path(args.index or default_heuristics_index_path(og_root)).expanduser().resolve()
@@ -815,6 +1095,26 @@ def add_heuristics_subparser(sub: argparse._SubParsersAction) -> None:
     build.add_argument("--max-lineage-hops", type=int, default=6)
     build.set_defaults(func=cmd_heuristics_build)
 
+    verify = heuristics_sub.add_parser(
+        "verify", help="Diff heuristics_index.json (incl. applied rating events) against a full rebuild"
+    )
+    for action in build._actions:
+        if action.option_strings and action.dest != "help":
+            verify._add_action(action)
+    verify.set_defaults(func=cmd_heuristics_verify)
+
+    apply = heuristics_sub.add_parser(
+        "apply", help="Apply one output's rating / appetite change to heuristics_index.json (delta)"
+    )
+    apply.add_argument("--root", default="/home/yuji/comfyui-runpod-data/output/og")
+    apply.add_argument("--key", required=True, help="Output discovery key e.g. output/og/2026-04-01/X_00001.mp4")
+    apply.add_argument("--short-key", dest="short_key", default="", help="Output short key (og/<date>/<stem>)")
+    apply.add_argument("--index", default=None)
+    apply.add_argument("--ratings-index", default=None)
+    apply.add_argument("--lineage-edges", default=None)
+    apply.add_argument("--asset-tags", default=None)
+    apply.set_defaults(func=cmd_heuristics_apply)
+
     show = heuristics_sub.add_parser("show", help="Look up pattern or lineage group scores")
     show.add_argument("--root", default="/home/yuji/comfyui-runpod-data/output/og")
     show.add_argument("--index", default=None)
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Apply single rating / appetite events to ``heuristics_index.json`` as deltas.
+
+``heuristics build`` walks every rated output's lineage ancestors; until the next build,
+hourly planning scores recipes against a stale index. The full build also records, in
+``heuristics_state.sqlite`` beside the index, every output's contributions (its pattern
+star, each ancestor's lineage credit bounded by ``max_lineage_hops``, its appetite
+pattern / ancestor / tag credits) plus the job joins the appetite pass used
+(job output path → shape_recipe / graph_hash, job-only pattern meta).
+
+After a star or appetite click, :func:`apply_output_event` drops that output's old
+contributions, recomputes its new ones (ancestors walked through the lineage edge store
+with per-node SQL lookups, not a full graph load), re-aggregates only the buckets either
+set touched and patches those rows in the JSON index. The bucket rows equal a full
+rebuild's (``heuristics verify``); row order inside a table is re-sorted by the rounded
+score, and lineage edges or jobs added since the last full build only reach other
+outputs on the next build (``lineage_drift`` flags the former).
+
+  python3 shape_factory.py heuristics apply --key output/og/2026-04-01/X_00001.mp4
+  python3 shape_factory.py heuristics verify   # current index vs full rebuild; exit 1 on diff
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from discovery_lineage_store import edges_for_child, lineage_edges_exist, open_synced_lineage_store, store_version
+from shape_factory_heuristics import (
+    HEURISTICS_TABLES,
+    TABLE_PATTERN,
+    TABLE_PATTERN_APPETITE,
+    _TABLE_STATS,
+    HeuristicsAccumulator,
+    HeuristicsContribution,
+    _edge_weight,
+    appetite_contributions,
+    rating_contributions,
+)
+from shape_factory_ratings import (
+    _appetite_row_to_doc,
+    _norm_path_key,
+    _rating_row_to_doc,
+    is_usable_quality_rating,
+    open_ratings_db,
+    ratings_db_path_for_index,
+    utc_now,
+)
+
+HEURISTICS_STATE_BASENAME = "heuristics_state.sqlite"
+HEURISTICS_STATE_SCHEMA_VERSION = 1
+
+SOURCE_RATING = "rating"
+SOURCE_APPETITE = "appetite"
+
+_STATE_TABLES = ("contrib", "outputs", "job_pattern_meta", "job_lookup")
+
+
+def default_heuristics_state_path(heuristics_index_path: Path) -> Path:
+    return Path(heuristics_index_path).expanduser().resolve().with_name(HEURISTICS_STATE_BASENAME)
+
+
+def open_heuristics_state(path: Path) -> sqlite3.Connection:
+    path = Path(path).expanduser().resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(path), timeout=30)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    found = con.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    if found is not None and found[0] != str(HEURISTICS_STATE_SCHEMA_VERSION):
+        for table in _STATE_TABLES:
+            con.execute(f"DROP TABLE IF EXISTS {table}")
+        con.execute("DELETE FROM meta")
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS contrib (
+            source TEXT NOT NULL,
+            output_key TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            tbl TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            value REAL NOT NULL,
+            rating INTEGER,
+            meta_json TEXT,
+            PRIMARY KEY (source, output_key, seq)
+        )
+        """
+    )
+    con.execute("CREATE INDEX IF NOT EXISTS idx_hs_bucket ON contrib(tbl, bucket)")
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS outputs (
+            source TEXT NOT NULL,
+            output_key TEXT NOT NULL,
+            asset_key TEXT NOT NULL,
+            PRIMARY KEY (source, output_key)
+        )
+        """
+    )
+    con.execute("CREATE INDEX IF NOT EXISTS idx_hs_outputs_asset ON outputs(asset_key)")
+    con.execute("CREATE TABLE IF NOT EXISTS job_pattern_meta (pattern TEXT PRIMARY KEY, meta_json TEXT NOT NULL)")
+    con.execute(
+        "CREATE TABLE IF NOT EXISTS job_lookup (path_key TEXT PRIMARY KEY, shape_recipe TEXT, graph_hash TEXT)"
+    )
+    con.execute(
+        "INSERT OR REPLACE INTO meta(key, value) VALUES('schema_version', ?)",
+        (str(HEURISTICS_STATE_SCHEMA_VERSION),),
+    )
+    con.commit()
+    return con
+
+
+def _meta(con: sqlite3.Connection, key: str) -> Optional[str]:
+    row = con.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return None if row is None else row[0]
+
+
+def _contrib_rows(source: str, output_key: str, contribs: Iterable[HeuristicsContribution]) -> List[Tuple[Any, ...]]:
+    return [
+        (
+            source,
+            output_key,
+            seq,
+            c.table,
+            c.key,
+            float(c.value),
+            c.rating,
+            json.dumps(c.meta) if c.meta is not None else None,
+        )
+        for seq, c in enumerate(contribs)
+    ]
+
+
+def _insert_output(
+    con: sqlite3.Connection, source: str, output_key: str, asset_key: str, contribs: List[HeuristicsContribution]
+) -> None:
+    con.execute(
+        "INSERT OR REPLACE INTO outputs(source, output_key, asset_key) VALUES(?, ?, ?)",
+        (source, output_key, asset_key),
+    )
+    con.executemany(
+        "INSERT OR REPLACE INTO contrib(source, output_key, seq, tbl, bucket, value, rating, meta_json) "
+        "VALUES(?, ?, ?, ?, ?, ?, ?, ?)",
+        _contrib_rows(source, output_key, contribs),
+    )
+
+
+def write_heuristics_state(
+    path: Path,
+    *,
+    rating_by_output: Dict[str, Tuple[str, List[HeuristicsContribution]]],
+    appetite_by_output: Dict[str, Tuple[str, List[HeuristicsContribution]]],
+    job_pattern_meta: Dict[str, dict[str, Any]],
+    job_index: Dict[str, Dict[str, Any]],
+    params: Dict[str, Any],
+) -> None:
+    """Replace the state with one full build's contributions (``build_heuristics_index(state_path=...)``)."""
+    con = open_heuristics_state(path)
+    try:
+        with con:
+            for table in _STATE_TABLES:
+                con.execute(f"DELETE FROM {table}")
+            for output_key, (asset_key, contribs) in rating_by_output.items():
+                _insert_output(con, SOURCE_RATING, output_key, asset_key, contribs)
+            for output_key, (asset_key, contribs) in appetite_by_output.items():
+                _insert_output(con, SOURCE_APPETITE, output_key, asset_key, contribs)
+            con.executemany(
+                "INSERT OR REPLACE INTO job_pattern_meta(pattern, meta_json) VALUES(?, ?)",
+                [(k, json.dumps(v)) for k, v in job_pattern_meta.items()],
+            )
+            con.executemany(
+                "INSERT OR IGNORE INTO job_lookup(path_key, shape_recipe, graph_hash) VALUES(?, ?, ?)",
+                [
+                    (k, meta.get("shape_recipe"), meta.get("graph_hash"))
+                    for k, meta in job_index.items()
+                    if meta
+                ],
+            )
+            con.execute(
+                "INSERT OR REPLACE INTO meta(key, value) VALUES('params', ?)", (json.dumps(params, sort_keys=True),)
+            )
+            con.execute("INSERT OR REPLACE INTO meta(key, value) VALUES('built_at', ?)", (utc_now(),))
+    finally:
+        con.close()
+
+
+class StoreLineage:
+    """
+    ``LineageGraph`` stand-in for one output's ancestors: BFS over ``edges_for_child``
+    point lookups in the lineage edge store instead of loading every edge.
+    """
+
+    def __init__(self, con: Optional[sqlite3.Connection]) -> None:
+        self.con = con
+        self.edge_weight_by_pair: Dict[Tuple[str, str], float] = {}
+        self._parents: Dict[str, List[str]] = {}
+
+    def parents(self, gid: str) -> List[str]:
+        cached = self._parents.get(gid)
+        if cached is not None:
+            return cached
+        out: List[str] = []
+        if self.con is not None and gid:
+            for edge in edges_for_child(self.con, gid):
+                parent = str(edge.get("parent_group_id") or "").strip()
+                if not parent:
+                    continue
+                pair = (gid, parent)
+                self.edge_weight_by_pair[pair] = max(self.edge_weight_by_pair.get(pair, 0.0), _edge_weight(edge))
+                out.append(parent)
+        self._parents[gid] = out
+        return out
+
+    def ancestors(self, gid: str, *, max_depth: int = 8) -> List[Tuple[str, int]]:
+        """Same ``(ancestor, hop)`` set as ``LineageCSR.ancestors`` (level BFS, first hop wins)."""
+        seen = {gid}
+        found: List[Tuple[str, int]] = []
+        frontier = [gid]
+        hop = 0
+        while frontier and hop < max_depth:
+            hop += 1
+            nxt: List[str] = []
+            for cur in frontier:
+                for parent in self.parents(cur):
+                    if parent not in seen:
+                        seen.add(parent)
+                        nxt.append(parent)
+                        found.append((parent, hop))
+            frontier = nxt
+        return found
+
+
+def _fetch_output_row(
+    con: sqlite3.Connection, table: str, keys: Iterable[str]
+) -> Optional[Tuple[str, sqlite3.Row]]:
+    """``(asset_key, row)`` from ``rating_row`` / ``appetite_row``, discovery key first."""
+    for key in keys:
+        if not key:
+            continue
+        row = con.execute(f"SELECT * FROM {table} WHERE asset_key = ? OR short_key = ? LIMIT 1", (key, key)).fetchone()
+        if row is not None:
+            return str(row["asset_key"] or ""), row
+    return None
+
+
+def _job_pattern(
+    con: sqlite3.Connection, key: str, row: dict[str, Any], data_root: str
+) -> Tuple[Optional[str], Optional[str]]:
+    """The full build's job-index join for an appetite output, from the recorded lookups."""
+    if not data_root:
+        return (None, None)
+    for k in (key, str(row.get("short_key") or "")):
+        if not k:
+            continue
+        for path_key in _norm_path_key(k, Path(data_root)):
+            hit = con.execute(
+                "SELECT shape_recipe, graph_hash FROM job_lookup WHERE path_key = ?", (path_key,)
+            ).fetchone()
+            if hit is not None:
+                return (hit["shape_recipe"], hit["graph_hash"])
+    return (None, None)
+
+
+def _pattern_meta(con: sqlite3.Connection, pattern: str) -> Optional[dict[str, Any]]:
+    """Rated meta (first recorded by_pattern contribution) wins over job-only meta, as in the build."""
+    row = con.execute(
+        "SELECT meta_json FROM contrib WHERE tbl = ? AND bucket = ? AND meta_json IS NOT NULL "
+        "ORDER BY rowid LIMIT 1",
+        (TABLE_PATTERN, pattern),
+    ).fetchone()
+    if row is None:
+        row = con.execute("SELECT meta_json FROM job_pattern_meta WHERE pattern = ?", (pattern,)).fetchone()
+    return json.loads(row["meta_json"]) if row is not None else None
+
+
+def _bucket_row(con: sqlite3.Connection, table: str, bucket: str) -> dict[str, Any]:
+    acc = HeuristicsAccumulator()
+    for r in con.execute(
+        "SELECT value, rating FROM contrib WHERE tbl = ? AND bucket = ? ORDER BY rowid", (table, bucket)
+    ):
+        acc.add(HeuristicsContribution(table, bucket, float(r["value"]), r["rating"]))
+    pattern_meta: Dict[str, dict[str, Any]] = {}
+    if table in (TABLE_PATTERN, TABLE_PATTERN_APPETITE):
+        meta = _pattern_meta(con, bucket)
+        if meta is not None:
+            pattern_meta[bucket] = meta
+    return acc.row(table, bucket, pattern_meta=pattern_meta)
+
+
+def _sort_table(rows: Dict[str, dict[str, Any]]) -> Dict[str, dict[str, Any]]:
+    ordered = sorted(rows.items(), key=lambda kv: (-float(kv[1].get("inferred") or 0.0), -int(kv[1].get("n") or 0)))
+    return dict(ordered)
+
+
+def _atomic_write_json(path: Path, doc: dict[str, Any]) -> None:
+    tmp = path.with_suffix(path.suffix + f".tmp.{os.getpid()}")
+    tmp.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def apply_output_event(
+    *,
+    heuristics_index_path: Path,
+    ratings_index_path: Path,
+    lineage_edges_path: Path,
+    discovery_key: str = "",
+    short_key: str = "",
+    asset_tags_path: Optional[Path] = None,
+    state_path: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """
+    Re-derive one output's heuristics contributions from ratings.sqlite (its rating and
+    appetite rows) and patch the touched bucket rows in ``heuristics_index.json``.
+
+    A no-op (``ok: False``) until a full ``heuristics build`` has written the state.
+    """
+    index_path = Path(heuristics_index_path).expanduser().resolve()
+    state_path = Path(state_path) if state_path else default_heuristics_state_path(index_path)
+    if not index_path.is_file() or not state_path.is_file():
+        return {"ok": False, "error": "no_heuristics_state", "path": str(state_path)}
+
+    keys = [k for k in (discovery_key, short_key) if k]
+    if not keys:
+        raise ValueError("missing output key")
+
+    con = open_heuristics_state(state_path)
+    lineage_con: Optional[sqlite3.Connection] = None
+    try:
+        params_raw = _meta(con, "params")
+        if params_raw is None:
+            return {"ok": False, "error": "no_heuristics_state", "path": str(state_path)}
+        params = json.loads(params_raw)
+        decay = float(params.get("ancestor_decay", 0.85))
+        hops = int(params.get("max_lineage_hops", 6))
+
+        rcon = open_ratings_db(ratings_db_path_for_index(ratings_index_path), ratings_json=Path(ratings_index_path))
+        try:
+            rated = _fetch_output_row(rcon, "rating_row", keys)
+            wanted = _fetch_output_row(rcon, "appetite_row", keys)
+        finally:
+            rcon.close()
+
+        if lineage_edges_exist(lineage_edges_path):
+            lineage_con = open_synced_lineage_store(lineage_edges_path)
+        lineage = StoreLineage(lineage_con)
+
+        # Write lock first: concurrent clicks serialize on the state, and the JSON patch below.
+        con.execute("BEGIN IMMEDIATE")
+        stale_keys: Set[str] = set(keys)
+        touched: Set[Tuple[str, str]] = set()
+        rating_row: Optional[dict[str, Any]] = None
+        if rated is not None:
+            asset_key, raw = rated
+            rating_row = _rating_row_to_doc(raw)
+            stale_keys.update(k for k in (asset_key, rating_row.get("short_key")) if k)
+        appetite_row: Optional[dict[str, Any]] = None
+        if wanted is not None:
+            app_key, raw = wanted
+            appetite_row = _appetite_row_to_doc(raw)
+            stale_keys.update(k for k in (app_key, appetite_row.get("short_key")) if k)
+
+        # A deleted row no longer names its short key; the build recorded asset key → output key.
+        marks = ",".join("?" for _ in stale_keys)
+        for r in con.execute(f"SELECT output_key FROM outputs WHERE asset_key IN ({marks})", tuple(stale_keys)).fetchall():
+            stale_keys.add(str(r["output_key"]))
+        marks = ",".join("?" for _ in stale_keys)
+        for r in con.execute(f"SELECT DISTINCT tbl, bucket FROM contrib WHERE output_key IN ({marks})", tuple(stale_keys)):
+            touched.add((r["tbl"], r["bucket"]))
+        con.execute(f"DELETE FROM contrib WHERE output_key IN ({marks})", tuple(stale_keys))
+        con.execute(f"DELETE FROM outputs WHERE output_key IN ({marks})", tuple(stale_keys))
+
+        added: Dict[str, int] = {SOURCE_RATING: 0, SOURCE_APPETITE: 0}
+        if rated is not None and rating_row is not None and is_usable_quality_rating(rating_row.get("explicit")):
+            asset_key = rated[0]
+            contribs = rating_contributions(
+                asset_key, rating_row, lineage, ancestor_decay=decay, max_lineage_hops=hops
+            )
+            _insert_output(con, SOURCE_RATING, str(rating_row.get("short_key") or asset_key), asset_key, contribs)
+            touched.update((c.table, c.key) for c in contribs)
+            added[SOURCE_RATING] = len(contribs)
+
+        if wanted is not None and appetite_row is not None and str(appetite_row.get("appetite") or "").strip():
+            app_key = wanted[0]
+
+            def pattern_for(key: str, row: dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+                # A rating row (any star) carries the pattern; otherwise the build's job join.
+                if rating_row is not None:
+                    return (
+                        str(rating_row.get("shape_recipe") or "") or None,
+                        str(rating_row.get("graph_hash") or "") or None,
+                    )
+                return _job_pattern(con, key, row, str(params.get("data_root") or ""))
+
+            tags_by = None
+            if asset_tags_path is not None and Path(asset_tags_path).is_file():
+                try:
+                    tags_by = (json.loads(Path(asset_tags_path).read_text(encoding="utf-8")) or {}).get("by_group_id")
+                except (OSError, json.JSONDecodeError, AttributeError):
+                    tags_by = None
+            contribs_or_none = appetite_contributions(
+                app_key,
+                appetite_row,
+                lineage,
+                pattern_for=pattern_for,
+                tags_by=tags_by,
+                ancestor_decay=decay,
+                max_lineage_hops=hops,
+            )
+            if contribs_or_none is not None:
+                _insert_output(
+                    con, SOURCE_APPETITE, str(appetite_row.get("short_key") or app_key), app_key, contribs_or_none
+                )
+                touched.update((c.table, c.key) for c in contribs_or_none)
+                added[SOURCE_APPETITE] = len(contribs_or_none)
+
+        # A pattern's meta depends on whether it is rated, so both pattern tables move together.
+        for table, bucket in list(touched):
+            if table in (TABLE_PATTERN, TABLE_PATTERN_APPETITE):
+                touched.update({(TABLE_PATTERN, bucket), (TABLE_PATTERN_APPETITE, bucket)})
+
+        doc = json.loads(index_path.read_text(encoding="utf-8"))
+        changed_tables: Set[str] = set()
+        for table, bucket in sorted(touched):
+            rows = doc.setdefault(table, {})
+            row = _bucket_row(con, table, bucket)
+            if row:
+                if rows.get(bucket) != row:
+                    rows[bucket] = row
+                    changed_tables.add(table)
+            elif bucket in rows:
+                del rows[bucket]
+                changed_tables.add(table)
+        for table in changed_tables:
+            doc[table] = _sort_table(doc[table])
+
+        stats = doc.setdefault("stats", {})
+        for table in HEURISTICS_TABLES:
+            stats[_TABLE_STATS[table]] = len(doc.get(table) or {})
+        for source, stat in ((SOURCE_RATING, "rated_outputs_used"), (SOURCE_APPETITE, "appetite_outputs_used")):
+            stats[stat] = int(con.execute("SELECT COUNT(*) FROM outputs WHERE source = ?", (source,)).fetchone()[0])
+        doc["updated_at"] = utc_now()
+        _atomic_write_json(index_path, doc)
+        con.commit()
+
+        lineage_drift = False
+        if lineage_con is not None:
+            lineage_drift = store_version(lineage_con)[1] != int(params.get("lineage_edges") or 0)
+        return {
+            "ok": True,
+            "touched_buckets": len(touched),
+            "changed_tables": sorted(changed_tables),
+            "rating_contributions": added[SOURCE_RATING],
+            "appetite_contributions": added[SOURCE_APPETITE],
+            "lineage_drift": lineage_drift,
+        }
+    except Exception:
+        if con.in_transaction:
+            con.rollback()
+        raise
+    finally:
+        if lineage_con is not None:
+            lineage_con.close()
+        con.close()
+
+
+def diff_heuristics_docs(a: Dict[str, Any], b: Dict[str, Any], *, limit: int = 20) -> List[str]:
+    """Differences between two heuristics documents (``updated_at`` and row order ignored)."""
+    from shape_factory_ratings_incremental import diff_ratings_docs
+
+    return diff_ratings_docs(a, b, limit=limit)
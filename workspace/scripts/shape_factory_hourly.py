@@ -7,17 +7,22 @@ Used by scripts/shape_factory_hourly.sh and shape_factory_map hourly preview.
 
 from __future__ import annotations
 
+import functools
 import hashlib
 import json
 import math
 import os
 import random
 import re
+import sys
 import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
+from hourly_weight_engine import PrefixSampler, WeightColumns, engine_name, weighted_index
 from shape_factory import load_yaml, requires_by_slot
 from shape_factory_heuristics import _og_group_id_from_relpath
 from shape_factory_map import _combo_key_from_job_bindings, _combo_key_from_slot_paths, normalize_combo_key
@@ -36,6 +41,40 @@ from shape_factory_ratings import (
     lookup_output_rating,
 )
 
+_DRY_RUN_MEMO: Optional[Dict[Tuple[Any, ...], Any]] = None
+
+
+@contextmanager
+def dry_run_memo() -> Iterator[None]:
+    """
+    Reuse recipe catalogs, loaded indexes and replay weight tables for the duration of a
+    dry run (``simulate_hourly_picks``): nothing is submitted, so on-disk state is static.
+    """
+    global _DRY_RUN_MEMO
+    outer = _DRY_RUN_MEMO
+    if outer is None:
+        _DRY_RUN_MEMO = {}
+    try:
+        yield
+    finally:
+        if outer is None:
+            _DRY_RUN_MEMO = None
+
+
+def _dry_run_memoized(fn: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        memo = _DRY_RUN_MEMO
+        if memo is None:
+            return fn(*args, **kwargs)
+        key = (fn.__name__, tuple(repr(a) for a in args), tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+        if key not in memo:
+            memo[key] = fn(*args, **kwargs)
+        return memo[key]
+
+    return wrapper
+
+
 _OG_DATE_RE = re.compile(r"(?:^|/)og/(\d{4}-\d{2}-\d{2})(?:/|$)")
 _KNEEL_SOURCE_RE = re.compile(r"(?i)(?:^|[/_\-])x-?kneel|kneel-fb9|x-kneel")
 _Y2025_FOLDER_RE = re.compile(r"(?:^|/)og/2025-\d{2}-\d{2}(?:/|$)")
@@ -364,22 +403,35 @@ def _recipe_promotion_mult(recipe: dict[str, Any], *, family: str = "") -> float
     return mult
 
 
-def _apply_source_promotion(
+def _scale_weights(weights: List[float], factors: List[float]) -> List[float]:
+    return [float(w) * f for w, f in zip(weights, factors)]
+
+
+def _source_promotion_factors(
     recipes: List[dict[str, Any]],
-    weights: List[float],
     weight_meta: Optional[List[dict[str, Any]]] = None,
     *,
     family: str = "",
 ) -> List[float]:
-    """Amplify Kneel / 2025-era / fresh-still recipes in weighted selection."""
-    out: List[float] = []
-    for i, (recipe, weight) in enumerate(zip(recipes, weights)):
+    factors: List[float] = []
+    for i, recipe in enumerate(recipes):
         mult = _recipe_promotion_mult(recipe, family=family)
-        out.append(float(weight) * mult)
+        factors.append(mult)
         if weight_meta is not None and i < len(weight_meta) and isinstance(weight_meta[i], dict) and mult != 1.0:
             weight_meta[i] = dict(weight_meta[i])
             weight_meta[i]["source_promotion_mult"] = round(mult, 3)
-    return out
+    return factors
+
+
+def _apply_source_promotion(
+    recipes: List[dict[str, Any]],
+    weights: List[float],
+    weight_meta: Optional[List[dict[str, Any]]] = None,
+    *,
+    family: str = "",
+) -> List[float]:
+    """Amplify Kneel / 2025-era / fresh-still recipes in weighted selection."""
+    return _scale_weights(weights, _source_promotion_factors(recipes, weight_meta, family=family))
 
 
 def _default_data_root() -> Path:
@@ -743,14 +795,14 @@ def _load_workflow_json(path: Path) -> Optional[dict[str, Any]]:
 
 def _png_workflow_for_output(output_mp4: Path) -> Optional[dict[str, Any]]:
     try:
-        from comfy_meta_lib import extract_prompt_workflow_from_png_chunks, read_png_text_chunks
+        from comfy_meta_lib import extract_prompt_workflow_from_png_chunks, read_png_header_text_chunks
     except ImportError:
         return None
     png = output_mp4.with_suffix(".png")
     if not png.is_file():
         return None
     try:
-        chunks = read_png_text_chunks(png)
+        chunks = read_png_header_text_chunks(png)
         _prompt, workflow = extract_prompt_workflow_from_png_chunks(chunks)
     except Exception:
         return None
@@ -1010,6 +1062,7 @@ def _default_og_root(data_root: Path) -> Path:
     return candidates[0]
 
 
+@_dry_run_memoized
 def _load_ratings_index(data_root: Path) -> Optional[dict[str, Any]]:
     try:
         from shape_factory_ratings import default_ratings_index_path, load_ratings_doc, ratings_db_path_for_index
@@ -1026,6 +1079,7 @@ def _load_ratings_index(data_root: Path) -> Optional[dict[str, Any]]:
         return None
 
 
+@_dry_run_memoized
 def _load_heuristics_index(data_root: Path) -> Optional[dict[str, Any]]:
     try:
         from shape_factory_heuristics import default_heuristics_index_path
@@ -1041,6 +1095,7 @@ def _load_heuristics_index(data_root: Path) -> Optional[dict[str, Any]]:
         return None
 
 
+@_dry_run_memoized
 def _load_appetite_index(data_root: Path) -> Optional[dict[str, Any]]:
     try:
         from shape_factory_ratings import load_appetite_doc, ratings_db_path_for_index
@@ -1057,6 +1112,7 @@ def _load_appetite_index(data_root: Path) -> Optional[dict[str, Any]]:
         return None
 
 
+@_dry_run_memoized
 def _load_asset_tags(data_root: Path) -> Optional[dict[str, Any]]:
     path = _default_og_root(data_root).parent / "_status" / "asset_tags.json"
     if not path.is_file():
@@ -1107,15 +1163,10 @@ def _recipe_selection_weight(
 ) -> Tuple[float, dict[str, Any]]:
     """Weight for weighted random replay selection (ratings + graph heuristics + light appetite)."""
     try:
-        from shape_factory_heuristics import score_recipe
+        from shape_factory_heuristics import recipe_scorer
 
-        return score_recipe(
-            recipe,
-            shape=shape,
-            ratings_doc=ratings_doc,
-            heuristics_doc=heuristics_doc,
-            appetite_doc=appetite_doc,
-        )
+        scorer = recipe_scorer(ratings_doc=ratings_doc, heuristics_doc=heuristics_doc, appetite_doc=appetite_doc)
+        return scorer.score(recipe, shape=shape)
     except ImportError:
         pass
 
@@ -1145,22 +1196,35 @@ def _recipe_selection_weight(
     return explore_floor, meta
 
 
+def _recipe_selection_weights(
+    recipes: List[dict[str, Any]],
+    *,
+    ratings_doc: Optional[dict[str, Any]],
+    shape: dict[str, Any],
+    heuristics_doc: Optional[dict[str, Any]] = None,
+    appetite_doc: Optional[dict[str, Any]] = None,
+) -> List[Tuple[float, dict[str, Any]]]:
+    """``_recipe_selection_weight`` for a whole pool (one compiled scorer, batch call)."""
+    try:
+        from shape_factory_heuristics import recipe_scorer
+    except ImportError:
+        return [
+            _recipe_selection_weight(
+                r, ratings_doc=ratings_doc, shape=shape, heuristics_doc=heuristics_doc, appetite_doc=appetite_doc
+            )
+            for r in recipes
+        ]
+    scorer = recipe_scorer(ratings_doc=ratings_doc, heuristics_doc=heuristics_doc, appetite_doc=appetite_doc)
+    return scorer.score_many(recipes, shape=shape)
+
+
 def _weighted_choice(
     recipes: List[dict[str, Any]],
     weights: List[float],
     rng: random.Random,
 ) -> Tuple[dict[str, Any], int]:
-    total = sum(max(0.0, w) for w in weights)
-    if total <= 0:
-        idx = rng.randrange(len(recipes))
-        return recipes[idx], idx
-    pick = rng.random() * total
-    acc = 0.0
-    for idx, weight in enumerate(weights):
-        acc += max(0.0, weight)
-        if pick <= acc:
-            return recipes[idx], idx
-    return recipes[-1], len(recipes) - 1
+    idx = weighted_index(weights, rng)
+    return recipes[idx], idx
 
 
 def _is_top_of_hour(
@@ -1301,17 +1365,16 @@ def _archive_age_spread_mult(recipe_or_path: Any, *, now_ts: Optional[float] = N
     return min(2.0, 1.0 + math.log2(1.0 + age / max(1.0, archive_min_age_days())))
 
 
-def _apply_archive_age_spread(
+def _archive_age_factors(
     recipes: List[dict[str, Any]],
-    weights: List[float],
     weight_meta: Optional[List[dict[str, Any]]] = None,
     *,
     now_ts: Optional[float] = None,
 ) -> List[float]:
-    out: List[float] = []
-    for i, (recipe, weight) in enumerate(zip(recipes, weights)):
+    factors: List[float] = []
+    for i, recipe in enumerate(recipes):
         mult = _archive_age_spread_mult(recipe, now_ts=now_ts)
-        out.append(float(weight) * mult)
+        factors.append(mult)
         if (
             weight_meta is not None
             and i < len(weight_meta)
@@ -1321,7 +1384,17 @@ def _apply_archive_age_spread(
             weight_meta[i] = dict(weight_meta[i])
             weight_meta[i]["archive_age_mult"] = round(mult, 3)
             weight_meta[i]["archive_og"] = True
-    return out
+    return factors
+
+
+def _apply_archive_age_spread(
+    recipes: List[dict[str, Any]],
+    weights: List[float],
+    weight_meta: Optional[List[dict[str, Any]]] = None,
+    *,
+    now_ts: Optional[float] = None,
+) -> List[float]:
+    return _scale_weights(weights, _archive_age_factors(recipes, weight_meta, now_ts=now_ts))
 
 
 def _want_archive_og_sample(cursor: int, *, salt: int = 0xA0C6) -> bool:
@@ -1398,35 +1471,50 @@ def _recent_five_star_multiplier(
     return 1.0 + (boost - 1.0) * max(0.0, min(1.0, frac))
 
 
-def _apply_recent_five_star_bias(
+def _recent_five_star_factors(
     recipes: List[dict[str, Any]],
-    weights: List[float],
     weight_meta: List[dict[str, Any]],
     ratings_doc: Optional[dict[str, Any]],
     *,
     now: Optional[datetime] = None,
 ) -> Tuple[List[float], dict[str, Any]]:
-    """Amplify recent 5★ recipes near the top of the hour; returns weights + bias stats."""
     top_of_hour = _is_top_of_hour(now)
     stats: dict[str, Any] = {
         "top_of_hour": top_of_hour,
         "recent_five_star_boosted": 0,
         "recent_five_star_max_mult": 1.0,
     }
+    factors = [1.0] * len(recipes)
     if not ratings_doc or not recipes:
-        return list(weights), stats
-    out = list(weights)
+        return factors, stats
     for i, recipe in enumerate(recipes):
         out_path = str(recipe.get("output_path") or "")
         row = lookup_output_rating(out_path, ratings_doc) if out_path else None
         mult = _recent_five_star_multiplier(row, output_path=out_path, now=now, top_of_hour=top_of_hour)
         if mult > 1.0 + 1e-9:
-            out[i] = float(out[i]) * mult
+            factors[i] = mult
             stats["recent_five_star_boosted"] += 1
             stats["recent_five_star_max_mult"] = max(float(stats["recent_five_star_max_mult"]), mult)
             if i < len(weight_meta) and isinstance(weight_meta[i], dict):
                 weight_meta[i] = dict(weight_meta[i])
                 weight_meta[i]["recent_five_star_mult"] = round(mult, 3)
+    return factors, stats
+
+
+def _apply_recent_five_star_bias(
+    recipes: List[dict[str, Any]],
+    weights: List[float],
+    weight_meta: List[dict[str, Any]],
+    ratings_doc: Optional[dict[str, Any]],
+    *,
+    now: Optional[datetime] = None,
+) -> Tuple[List[float], dict[str, Any]]:
+    """Amplify recent 5★ recipes near the top of the hour; returns weights + bias stats."""
+    factors, stats = _recent_five_star_factors(recipes, weight_meta, ratings_doc, now=now)
+    out = list(weights)
+    for i, mult in enumerate(factors):
+        if mult != 1.0:
+            out[i] = float(out[i]) * mult
     return out, stats
 
 
@@ -1462,6 +1550,7 @@ def collect_pool_slot_members(
         return []
 
 
+@_dry_run_memoized
 def collect_pool_source_videos(
     family: str,
     *,
@@ -1478,124 +1567,295 @@ def collect_pool_source_videos(
     return collect_pool_slot_members(family, "source_still", data_root=data_root)
 
 
+def _job_replay_recipe(
+    job_path: Path,
+    *,
+    family: str,
+    shape: dict[str, Any],
+    data_root: Path,
+) -> Tuple[str, Optional[dict[str, Any]]]:
+    """``(job_key, recipe)`` for one ``.job.json``; recipe is None when unreadable / not replayable."""
+    try:
+        job = json.loads(job_path.read_text(encoding="utf-8"))
+    except Exception:
+        return "", None
+    if not isinstance(job, dict) or not _job_is_replayable(job):
+        return "", None
+    picks = _picks_from_job(job, shape=shape, data_root=data_root)
+    if not picks:
+        return "", None
+    job_key = str(job.get("job_key") or job_path.stem)
+    recipe = _recipe_from_picks(
+        family=family,
+        picks=picks,
+        source=job_key,
+        output_path=(job.get("deposit") or {}).get("videos", [None])[0]
+        if isinstance(job.get("deposit"), dict)
+        else None,
+    )
+    return job_key, recipe
+
+
+def _resolve_og_member_output(out_mp4: str, *, data_root: Path) -> Optional[Path]:
+    out_path = Path(out_mp4)
+    if out_path.is_file():
+        return out_path
+    return _resolve_media_path(out_mp4, data_root=data_root)
+
+
+def _og_replay_recipe(
+    out_path: Path,
+    *,
+    family: str,
+    shape: dict[str, Any],
+    data_root: Path,
+) -> Optional[dict[str, Any]]:
+    """Recipe re-extracted from the workflow embedded in an OG output's companion PNG."""
+    workflow = _png_workflow_for_output(out_path)
+    if workflow is None:
+        return None
+    picks = _picks_from_ui_workflow(workflow, shape=shape, data_root=data_root, label=out_path.stem)
+    if picks is None:
+        return None
+    return _recipe_from_picks(
+        family=family,
+        picks=picks,
+        source=f"og:{out_path}",
+        output_path=str(out_path),
+    )
+
+
+def _pool_index_mp4_members(family: str, *, data_root: Path) -> List[Tuple[str, str]]:
+    """``(mp4 path as recorded, job_key)`` for every deposit-pool index member, in index order."""
+    index_path = data_root / "pools" / family / "index.json"
+    if not index_path.is_file():
+        return []
+    try:
+        index_doc = json.loads(index_path.read_text(encoding="utf-8"))
+    except Exception:
+        return []
+    out: List[Tuple[str, str]] = []
+    for _pool_id, pool in (index_doc.get("pools") or {}).items():
+        if not isinstance(pool, dict):
+            continue
+        for member in pool.get("members") or []:
+            if not isinstance(member, dict):
+                continue
+            out_mp4 = str(member.get("path") or "")
+            if out_mp4.lower().endswith(".mp4"):
+                out.append((out_mp4, str(member.get("job_key") or "")))
+    return out
+
+
+def merge_replay_recipes(
+    job_recipes: Iterable[Tuple[str, Optional[dict[str, Any]]]],
+    og_members: Iterable[Tuple[str, str]],
+    og_recipe: Callable[[str], Optional[dict[str, Any]]],
+) -> List[dict[str, Any]]:
+    """
+    Dedupe recipes by ``combo_key`` (later wins, first position kept).
+
+    OG members whose ``job_key`` was already ingested from a job are skipped before
+    ``og_recipe`` is called, so the PNG is never read for them.
+    """
+    by_combo: Dict[str, dict[str, Any]] = {}
+    ingested_job_keys: Set[str] = set()
+
+    def add_recipe(recipe: Optional[dict[str, Any]]) -> None:
+        ck = str((recipe or {}).get("combo_key") or "")
+        if ck:
+            by_combo[ck] = recipe  # type: ignore[assignment]
+
+    for job_key, recipe in job_recipes:
+        if recipe is None:
+            continue
+        ingested_job_keys.add(job_key)
+        add_recipe(recipe)
+    for out_mp4, job_key in og_members:
+        if job_key and job_key in ingested_job_keys:
+            continue  # already ingested from jobs
+        add_recipe(og_recipe(out_mp4))
+    return list(by_combo.values())
+
+
+def _recipe_catalog_enabled() -> bool:
+    raw = os.environ.get("HOURLY_RECIPE_CATALOG", "").strip().lower()
+    return raw not in {"off", "0", "none", "false"}
+
+
+def scan_replay_recipes(
+    family: str,
+    *,
+    data_root: Path,
+    shape: dict[str, Any],
+    job_dir: Optional[Path] = None,
+) -> List[dict[str, Any]]:
+    """Uncached :func:`collect_replay_recipes`: parse every job and every pool member's PNG."""
+    jobs_root = job_dir or (_default_job_dir(data_root) / family)
+    job_paths = sorted(jobs_root.glob("*.job.json")) if jobs_root.is_dir() else []
+
+    def og_recipe(out_mp4: str) -> Optional[dict[str, Any]]:
+        out_path = _resolve_og_member_output(out_mp4, data_root=data_root)
+        if out_path is None:
+            return None
+        return _og_replay_recipe(out_path, family=family, shape=shape, data_root=data_root)
+
+    return merge_replay_recipes(
+        (_job_replay_recipe(p, family=family, shape=shape, data_root=data_root) for p in job_paths),
+        _pool_index_mp4_members(family, data_root=data_root),
+        og_recipe,
+    )
+
+
+@_dry_run_memoized
 def collect_replay_recipes(
     family: str,
     *,
     data_root: Optional[Path] = None,
     job_dir: Optional[Path] = None,
+    use_catalog: Optional[bool] = None,
 ) -> List[dict[str, Any]]:
     """
     Gather replay recipes from:
     - completed / deposited shape_factory jobs
     - historical OG outputs indexed in deposit pools (e.g. early April FB9_GEX2 seeds)
+
+    Served from the persisted per-family recipe catalog
+    (``shape_factory/_status/hourly_recipe_catalog.sqlite``): only jobs / OG outputs whose
+    mtimes moved are re-parsed. ``HOURLY_RECIPE_CATALOG=off`` (or ``use_catalog=False``)
+    forces the full scan; a catalog error falls back to it.
     """
     data_root = (data_root or _default_data_root()).resolve()
     shape_path = data_root / "shapes" / f"{family}.shape.yaml"
     if not shape_path.is_file():
         raise FileNotFoundError(f"missing shape for family {family!r}")
-    shape = load_yaml(shape_path)
+    if use_catalog is None:
+        use_catalog = _recipe_catalog_enabled()
+    if use_catalog:
+        try:
+            from shape_factory_recipe_catalog import catalog_replay_recipes
 
-    by_combo: Dict[str, dict[str, Any]] = {}
-    ingested_job_keys: Set[str] = set()
+            recipes, _stats = catalog_replay_recipes(family, data_root=data_root, job_dir=job_dir)
+            return recipes
+        except Exception as exc:
+            print(f"  recipe_catalog_warn: {exc}", file=sys.stderr)
+    return scan_replay_recipes(family, data_root=data_root, shape=load_yaml(shape_path), job_dir=job_dir)
 
-    def add_recipe(recipe: dict[str, Any]) -> None:
-        ck = str(recipe.get("combo_key") or "")
-        if not ck:
-            return
-        by_combo[ck] = recipe
 
-    # 1) Factory jobs (recent replays)
-    jobs_root = job_dir or (_default_job_dir(data_root) / family)
-    if jobs_root.is_dir():
-        for path in sorted(jobs_root.glob("*.job.json")):
-            try:
-                job = json.loads(path.read_text(encoding="utf-8"))
-            except Exception:
-                continue
-            if not _job_is_replayable(job):
-                continue
-            picks = _picks_from_job(job, shape=shape, data_root=data_root)
-            if not picks:
-                continue
-            job_key = str(job.get("job_key") or path.stem)
-            ingested_job_keys.add(job_key)
-            add_recipe(
-                _recipe_from_picks(
-                    family=family,
-                    picks=picks,
-                    source=job_key,
-                    output_path=(job.get("deposit") or {}).get("videos", [None])[0]
-                    if isinstance(job.get("deposit"), dict)
-                    else None,
-                )
-            )
+@dataclass
+class ReplayWeightTable:
+    """
+    Replay candidates of one family as weight columns (``hourly_weight_engine``).
 
-    # 2) Deposit pool index — includes pre-factory OG runs (early April, etc.)
-    index_path = data_root / "pools" / family / "index.json"
-    if index_path.is_file():
-        try:
-            index_doc = json.loads(index_path.read_text(encoding="utf-8"))
-        except Exception:
-            index_doc = {}
-        for _pool_id, pool in (index_doc.get("pools") or {}).items():
-            if not isinstance(pool, dict):
-                continue
-            for member in pool.get("members") or []:
-                if not isinstance(member, dict):
-                    continue
-                out_mp4 = str(member.get("path") or "")
-                if not out_mp4.lower().endswith(".mp4"):
-                    continue
-                out_path = Path(out_mp4)
-                if not out_path.is_file():
-                    resolved = _resolve_media_path(out_mp4, data_root=data_root)
-                    if resolved is None:
-                        continue
-                    out_path = resolved
-
-                job_key = str(member.get("job_key") or "")
-                if job_key and job_key in ingested_job_keys:
-                    continue  # already ingested from jobs
-
-                workflow = _png_workflow_for_output(out_path)
-                if workflow is None:
-                    continue
-                label = out_path.stem
-                picks = _picks_from_ui_workflow(
-                    workflow,
-                    shape=shape,
-                    data_root=data_root,
-                    label=label,
-                )
-                if picks is None:
-                    continue
-                add_recipe(
-                    _recipe_from_picks(
-                        family=family,
-                        picks=picks,
-                        source=f"og:{out_path}",
-                        output_path=str(out_path),
-                    )
-                )
+    Built once per plan — or once per :func:`simulate_replay_selection` run — and then
+    sampled per cursor: archive-OG forcing, ``random.Random(cursor)`` and the prefix-sum
+    draw give the same pick ``plan_hourly_replay`` always made.
+    """
 
-    return list(by_combo.values())
+    recipes: List[dict[str, Any]]
+    weight_meta: List[dict[str, Any]]
+    columns: WeightColumns
+    weights: List[float]
+    eligible: List[int]
+    archive: List[int]
+    five_star_stats: dict[str, Any]
+    _samplers: Dict[str, PrefixSampler] = field(default_factory=dict, repr=False)
+
+    @property
+    def omit_count(self) -> int:
+        return len(self.recipes) - len(self.eligible)
+
+    def pool(self, cursor: int) -> Tuple[str, List[int]]:
+        if self.archive and _want_archive_og_sample(int(cursor)):
+            return "archive", self.archive
+        return "eligible", self.eligible
+
+    def _sampler(self, name: str, idxs: List[int]) -> PrefixSampler:
+        sampler = self._samplers.get(name)
+        if sampler is None:
+            sampler = self._samplers[name] = PrefixSampler([self.weights[i] for i in idxs])
+        return sampler
+
+    def choose(self, cursor: int) -> Tuple[int, int, bool]:
+        """``(recipe index, index within the drawn pool, archive forced)`` for ``cursor``."""
+        name, idxs = self.pool(cursor)
+        local = self._sampler(name, idxs).choose(random.Random(int(cursor)))
+        return idxs[local], local, name == "archive"
+
+    def choose_many(self, cursors: List[int]) -> List[Tuple[int, int, bool]]:
+        """:meth:`choose` for every cursor, one batched search per pool."""
+        by_pool: Dict[str, List[int]] = {}
+        for pos, cursor in enumerate(cursors):
+            by_pool.setdefault(self.pool(cursor)[0], []).append(pos)
+        out: List[Tuple[int, int, bool]] = [(0, 0, False)] * len(cursors)
+        for name, positions in by_pool.items():
+            idxs = self.archive if name == "archive" else self.eligible
+            rngs = [random.Random(int(cursors[pos])) for pos in positions]
+            for pos, local in zip(positions, self._sampler(name, idxs).choose_many(rngs)):
+                out[pos] = (idxs[local], local, name == "archive")
+        return out
 
 
-def plan_hourly_replay(
+def build_replay_weight_table(
+    recipes: List[dict[str, Any]],
     *,
-    cursor: int = 0,
-    data_root: Optional[Path] = None,
-    job_dir: Optional[Path] = None,
-    family: str = "FB9_GEX2",
-) -> Dict[str, Any]:
-    """Pick a previous run to reproduce, biased toward rated keepers when ratings_index exists."""
-    data_root = (data_root or _default_data_root()).resolve()
+    shape: dict[str, Any],
+    ratings_doc: Optional[dict[str, Any]],
+    heuristics_doc: Optional[dict[str, Any]],
+    appetite_doc: Optional[dict[str, Any]],
+    blend: float,
+    recent: Set[str],
+    recent_sources: Set[str],
+    family: str,
+    now: Optional[datetime] = None,
+) -> ReplayWeightTable:
+    """Score every recipe once and fold the replay multipliers as columns."""
+    base: List[float] = []
+    weight_meta: List[dict[str, Any]] = []
+    scored = _recipe_selection_weights(
+        recipes, ratings_doc=ratings_doc, shape=shape, heuristics_doc=heuristics_doc, appetite_doc=appetite_doc
+    )
+    for rated_w, meta in scored:
+        # Omit (explicit: 0) must not keep residual uniform blend weight.
+        if meta.get("omit"):
+            base.append(0.0)
+        else:
+            uniform_w = 1.0
+            base.append((1.0 - blend) * uniform_w + blend * rated_w)
+        weight_meta.append(meta)
+    columns = WeightColumns(base)
+    five_star, five_star_stats = _recent_five_star_factors(recipes, weight_meta, ratings_doc, now=now)
+    columns.multiply("recent_five_star", five_star)
+    columns.multiply("recent_combo", _recent_combo_factors(recipes, recent))
+    columns.multiply("recent_source", _recent_source_factors(recipes, recent_sources))
+    columns.multiply("source_promotion", _source_promotion_factors(recipes, weight_meta, family=family))
+    columns.multiply("archive_age", _archive_age_factors(recipes, weight_meta))
+    eligible = [i for i, meta in enumerate(weight_meta) if not meta.get("omit")]
+    return ReplayWeightTable(
+        recipes=recipes,
+        weight_meta=weight_meta,
+        columns=columns,
+        weights=columns.fold(),
+        eligible=eligible,
+        archive=[i for i in eligible if _is_archive_og_recipe(recipes[i])],
+        five_star_stats=five_star_stats,
+    )
+
+
+@_dry_run_memoized
+def _replay_weight_table_for_family(
+    family: str,
+    *,
+    data_root: Path,
+    job_dir: Optional[Path],
+) -> Tuple[Optional[ReplayWeightTable], Dict[str, Any]]:
+    """``(table, context)``; table is None (and context an error payload) when nothing is replayable."""
     shape_path = data_root / "shapes" / f"{family}.shape.yaml"
     shape = load_yaml(shape_path) if shape_path.is_file() else {}
 
     recipes = collect_replay_recipes(family, data_root=data_root, job_dir=job_dir)
     if not recipes:
-        return {
+        return None, {
             "ok": False,
             "error": "no_replay_recipes",
             "family": family,
@@ -1610,63 +1870,53 @@ def plan_hourly_replay(
     recent = _recent_combo_keys(data_root=data_root, family=family)
     recent_sources = _recent_source_basenames(recent)
 
-    weights: List[float] = []
-    weight_meta: List[dict[str, Any]] = []
-    for recipe in recipes:
-        rated_w, meta = _recipe_selection_weight(
-            recipe, ratings_doc=ratings_doc, shape=shape, heuristics_doc=heuristics_doc, appetite_doc=appetite_doc
-        )
-        # Omit (explicit: 0) must not keep residual uniform blend weight.
-        if meta.get("omit"):
-            final_w = 0.0
-        else:
-            uniform_w = 1.0
-            final_w = (1.0 - blend) * uniform_w + blend * rated_w
-        weights.append(final_w)
-        weight_meta.append(meta)
-    weights, five_star_stats = _apply_recent_five_star_bias(
-        recipes, weights, weight_meta, ratings_doc
+    table = build_replay_weight_table(
+        recipes,
+        shape=shape,
+        ratings_doc=ratings_doc,
+        heuristics_doc=heuristics_doc,
+        appetite_doc=appetite_doc,
+        blend=blend,
+        recent=recent,
+        recent_sources=recent_sources,
+        family=family,
     )
-    weights = _apply_recent_combo_penalty(recipes, weights, recent)
-    weights = _apply_recent_source_penalty(recipes, weights, recent_sources)
-    weights = _apply_source_promotion(recipes, weights, weight_meta, family=family)
-    weights = _apply_archive_age_spread(recipes, weights, weight_meta)
-
-    eligible_recipes: List[dict[str, Any]] = []
-    eligible_weights: List[float] = []
-    eligible_meta: List[dict[str, Any]] = []
-    omit_count = 0
-    for recipe, weight, meta in zip(recipes, weights, weight_meta):
-        if meta.get("omit"):
-            omit_count += 1
-            continue
-        eligible_recipes.append(recipe)
-        eligible_weights.append(weight)
-        eligible_meta.append(meta)
-
-    if not eligible_recipes:
-        return {
+    if not table.eligible:
+        return None, {
             "ok": False,
             "error": "no_eligible_replay_recipes",
             "family": family,
             "recipe_count": len(recipes),
-            "omit_excluded": omit_count,
+            "omit_excluded": table.omit_count,
         }
+    return table, {
+        "ratings_index_loaded": ratings_doc is not None,
+        "heuristics_index_loaded": heuristics_doc is not None,
+        "appetite_index_loaded": appetite_doc is not None,
+        "rating_blend": blend,
+        "recent_combo_penalty": bool(recent),
+        "recent_source_penalty": bool(recent_sources),
+    }
 
-    archive_idxs = [
-        i for i, r in enumerate(eligible_recipes) if _is_archive_og_recipe(r)
-    ]
-    archive_forced = False
-    if archive_idxs and _want_archive_og_sample(int(cursor)):
-        eligible_recipes = [eligible_recipes[i] for i in archive_idxs]
-        eligible_weights = [eligible_weights[i] for i in archive_idxs]
-        eligible_meta = [eligible_meta[i] for i in archive_idxs]
-        archive_forced = True
-
-    rng = random.Random(int(cursor))
-    recipe, recipe_index = _weighted_choice(eligible_recipes, eligible_weights, rng)
+
+def _replay_plan_from_table(
+    table: ReplayWeightTable,
+    ctx: Dict[str, Any],
+    *,
+    family: str,
+    cursor: int,
+    choice: Optional[Tuple[int, int, bool]] = None,
+) -> Dict[str, Any]:
+    recipe_i, recipe_index, archive_forced = choice if choice is not None else table.choose(int(cursor))
+    recipes = table.recipes
+    recipe = recipes[recipe_i]
     picks = recipe.get("picks") if isinstance(recipe.get("picks"), dict) else {}
-    sel_meta = eligible_meta[recipe_index] if recipe_index < len(eligible_meta) else {}
+    sel_meta = table.weight_meta[recipe_i]
+    five_star_stats = table.five_star_stats
+    archive_idxs = table.archive
+    omit_count = table.omit_count
+    eligible_count = len(archive_idxs) if archive_forced else len(table.eligible)
+    weight = table.weights[recipe_i]
 
     return {
         "ok": True,
@@ -1679,22 +1929,22 @@ def plan_hourly_replay(
         "output_path": recipe.get("output_path"),
         "cursor": int(cursor),
         "recipe_count": len(recipes),
-        "eligible_recipe_count": len(eligible_recipes),
+        "eligible_recipe_count": eligible_count,
         "omit_excluded": omit_count,
         "recipe_index": recipe_index,
-        "selection_weight": round(eligible_weights[recipe_index], 3),
+        "selection_weight": round(weight, 3),
         "rating_effective": sel_meta.get("rating_effective"),
         "rating_evidence": sel_meta.get("evidence"),
         "rating_kind": sel_meta.get("rating_kind") or ("explicit" if sel_meta.get("explicit") is not None else None),
-        "ratings_index_loaded": ratings_doc is not None,
-        "heuristics_index_loaded": heuristics_doc is not None,
-        "appetite_index_loaded": appetite_doc is not None,
+        "ratings_index_loaded": ctx["ratings_index_loaded"],
+        "heuristics_index_loaded": ctx["heuristics_index_loaded"],
+        "appetite_index_loaded": ctx["appetite_index_loaded"],
         "appetite": sel_meta.get("appetite"),
         "appetite_facet": sel_meta.get("appetite_facet"),
         "appetite_value": sel_meta.get("appetite_value"),
-        "rating_blend": blend,
-        "recent_combo_penalty": bool(recent),
-        "recent_source_penalty": bool(recent_sources),
+        "rating_blend": ctx["rating_blend"],
+        "recent_combo_penalty": ctx["recent_combo_penalty"],
+        "recent_source_penalty": ctx["recent_source_penalty"],
         "top_of_hour": bool(five_star_stats.get("top_of_hour")),
         "recent_five_star_boosted": int(five_star_stats.get("recent_five_star_boosted") or 0),
         "recent_five_star_max_mult": round(float(five_star_stats.get("recent_five_star_max_mult") or 1.0), 3),
@@ -1707,6 +1957,74 @@ def plan_hourly_replay(
     }
 
 
+def plan_hourly_replay(
+    *,
+    cursor: int = 0,
+    data_root: Optional[Path] = None,
+    job_dir: Optional[Path] = None,
+    family: str = "FB9_GEX2",
+) -> Dict[str, Any]:
+    """Pick a previous run to reproduce, biased toward rated keepers when ratings_index exists."""
+    data_root = (data_root or _default_data_root()).resolve()
+    table, ctx = _replay_weight_table_for_family(family, data_root=data_root, job_dir=job_dir)
+    if table is None:
+        return ctx
+    return _replay_plan_from_table(table, ctx, family=family, cursor=int(cursor))
+
+
+def simulate_replay_selection(
+    count: int = 10000,
+    *,
+    cursor: int = 0,
+    data_root: Optional[Path] = None,
+    job_dir: Optional[Path] = None,
+    family: str = "FB9_GEX2",
+    include_plans: bool = False,
+) -> Dict[str, Any]:
+    """
+    ``plan_hourly_replay`` for ``count`` consecutive cursors from one weight table.
+
+    Same picks as calling the planner per cursor (the on-disk state is read once), so
+    blend / penalty / promotion knobs can be tuned over tens of thousands of hours.
+    """
+    data_root = (data_root or _default_data_root()).resolve()
+    t0 = time.perf_counter()
+    table, ctx = _replay_weight_table_for_family(family, data_root=data_root, job_dir=job_dir)
+    if table is None:
+        return ctx
+    t1 = time.perf_counter()
+    cursors = list(range(int(cursor), int(cursor) + max(0, int(count))))
+    choices = table.choose_many(cursors)
+    t2 = time.perf_counter()
+    by_combo: Dict[str, int] = {}
+    archive_forced = 0
+    for recipe_i, _local, forced in choices:
+        ck = str(table.recipes[recipe_i].get("combo_key") or "")
+        by_combo[ck] = by_combo.get(ck, 0) + 1
+        archive_forced += int(forced)
+    top = sorted(by_combo.items(), key=lambda kv: (-kv[1], kv[0]))
+    out: Dict[str, Any] = {
+        "ok": True,
+        "family": family,
+        "engine": engine_name(),
+        "count": len(cursors),
+        "start_cursor": int(cursor),
+        "recipe_count": len(table.recipes),
+        "eligible_recipe_count": len(table.eligible),
+        "archive_og_candidate_count": len(table.archive),
+        "archive_og_forced": archive_forced,
+        "unique_combos": len(by_combo),
+        "top_combos": [{"combo_key": ck, "picks": n, "share": round(n / max(1, len(cursors)), 4)} for ck, n in top[:20]],
+        "table_ms": round((t1 - t0) * 1000, 2),
+        "sample_ms": round((t2 - t1) * 1000, 2),
+    }
+    if include_plans:
+        out["plans"] = [
+            _replay_plan_from_table(table, ctx, family=family, cursor=c, choice=ch) for c, ch in zip(cursors, choices)
+        ]
+    return out
+
+
 _SOURCE_SLOT_HINTS = ("source_video", "source_still", "source_video_ref")
 
 
@@ -1735,15 +2053,10 @@ def _recipe_appetite(
 ) -> dict[str, Any]:
     """Resolve appetite (state/facet/value/fast_track) for a recipe via score_recipe meta."""
     try:
-        from shape_factory_heuristics import score_recipe
+        from shape_factory_heuristics import recipe_scorer
 
-        _w, meta = score_recipe(
-            recipe,
-            shape=shape,
-            ratings_doc=ratings_doc,
-            heuristics_doc=heuristics_doc,
-            appetite_doc=appetite_doc,
-        )
+        scorer = recipe_scorer(ratings_doc=ratings_doc, heuristics_doc=heuristics_doc, appetite_doc=appetite_doc)
+        _w, meta = scorer.score(recipe, shape=shape)
     except ImportError:
         meta = {}
     return {
@@ -1777,6 +2090,7 @@ def _pick_preferring_non_recent(
     return picked
 
 
+@_dry_run_memoized
 def _load_source_facets_doc(data_root: Path) -> Optional[dict[str, Any]]:
     try:
         from shape_factory_source_facets import default_source_facets_path, load_source_facets
@@ -2011,6 +2325,7 @@ def _combo_key_from_job_key(job_key: str) -> str:
     return normalize_combo_key(raw)
 
 
+@_dry_run_memoized
 def _recent_combo_keys(
     *,
     data_root: Path,
@@ -2103,13 +2418,15 @@ def _apply_recent_combo_penalty(
     """Strongly downweight combos seen in recent hourly jobs."""
     if not recent:
         return weights
+    return _scale_weights(weights, _recent_combo_factors(recipes, recent, penalty=penalty))
+
+
+def _recent_combo_factors(recipes: List[dict[str, Any]], recent: Set[str], *, penalty: float = 0.08) -> List[float]:
+    if not recent:
+        return [1.0] * len(recipes)
     pen = max(0.01, min(1.0, float(penalty)))
     recent_n = {normalize_combo_key(x) for x in recent if str(x or "").strip()}
-    out: List[float] = []
-    for recipe, weight in zip(recipes, weights):
-        ck = normalize_combo_key(recipe.get("combo_key") or "")
-        out.append(float(weight) * (pen if ck in recent_n else 1.0))
-    return out
+    return [pen if normalize_combo_key(r.get("combo_key") or "") in recent_n else 1.0 for r in recipes]
 
 
 def _source_in_recent(path_or_stem: str, recent_sources: Set[str]) -> bool:
@@ -2131,14 +2448,21 @@ def _apply_recent_source_penalty(
     """Downweight recipes whose source_video was used in recent hourlies (even with a new prompt)."""
     if not recent_sources:
         return weights
+    return _scale_weights(weights, _recent_source_factors(recipes, recent_sources, penalty=penalty))
+
+
+def _recent_source_factors(
+    recipes: List[dict[str, Any]], recent_sources: Set[str], *, penalty: float = 0.12
+) -> List[float]:
+    if not recent_sources:
+        return [1.0] * len(recipes)
     pen = max(0.01, min(1.0, float(penalty)))
-    out: List[float] = []
-    for recipe, weight in zip(recipes, weights):
+    factors: List[float] = []
+    for recipe in recipes:
         picks = recipe.get("picks") if isinstance(recipe.get("picks"), dict) else {}
         src = str(picks.get("source_video") or picks.get("source_still") or "")
-        hit = _source_in_recent(src, recent_sources)
-        out.append(float(weight) * (pen if hit else 1.0))
-    return out
+        factors.append(pen if _source_in_recent(src, recent_sources) else 1.0)
+    return factors
 
 
 def plan_hourly_derive(
@@ -2726,32 +3050,18 @@ def summarize_hourly_picks(picks: List[Dict[str, Any]]) -> Dict[str, Any]:
     }
 
 
-def simulate_hourly_picks(
-    count: int = 32,
+def _simulate_hourly_ticks(
+    picks: List[Dict[str, Any]],
+    count: int,
     *,
-    hourly_state: Optional[Dict[str, Any]] = None,
-    data_root: Optional[Path] = None,
-    job_dir: Optional[Path] = None,
-    advance_cursor_every_tick: bool = True,
-) -> Dict[str, Any]:
-    """
-    Dry-run the next ``count`` hourly fill decisions (no generate/submit).
-
-    Mirrors ``predict_hourly_gex2`` + shell cursor policy: each tick re-rolls
-    seed-over-chain, drains facial then i2v→GEX when not seeding, otherwise
-    plans a seed family step. Consumes chain backlog in-memory so later picks
-    see the effect of earlier chain drains.
-    """
-    data_root = (data_root or _default_data_root()).resolve()
-    job_root = job_dir or _default_job_root(data_root)
-    state = dict(hourly_state or {})
-    cursor = int(state.get("sample_cursor") or 0)
-    facial_q = list_gex2_needing_facial(data_root=data_root, job_dir=job_root)
-    i2v_q = list_i2v_needing_gex(data_root=data_root, job_dir=job_root)
-    facial_start = len(facial_q)
-    i2v_start = len(i2v_q)
-
-    picks: List[Dict[str, Any]] = []
+    cursor: int,
+    facial_q: List[Dict[str, Any]],
+    i2v_q: List[Dict[str, Any]],
+    data_root: Path,
+    job_root: Path,
+    advance_cursor_every_tick: bool,
+) -> int:
+    """Append ``count`` simulated ticks to ``picks`` (draining the chain queues); returns the end cursor."""
     for i in range(max(0, int(count))):
         seed_over = want_seed_over_chain(cursor)
         pick: Dict[str, Any] = {
@@ -2823,6 +3133,46 @@ def simulate_hourly_picks(
             cursor += 1
         elif str(pick.get("pick_mode") or "") != "chain":
             cursor += 1
+    return cursor
+
+
+def simulate_hourly_picks(
+    count: int = 32,
+    *,
+    hourly_state: Optional[Dict[str, Any]] = None,
+    data_root: Optional[Path] = None,
+    job_dir: Optional[Path] = None,
+    advance_cursor_every_tick: bool = True,
+) -> Dict[str, Any]:
+    """
+    Dry-run the next ``count`` hourly fill decisions (no generate/submit).
+
+    Mirrors ``predict_hourly_gex2`` + shell cursor policy: each tick re-rolls
+    seed-over-chain, drains facial then i2v→GEX when not seeding, otherwise
+    plans a seed family step. Consumes chain backlog in-memory so later picks
+    see the effect of earlier chain drains.
+    """
+    data_root = (data_root or _default_data_root()).resolve()
+    job_root = job_dir or _default_job_root(data_root)
+    state = dict(hourly_state or {})
+    cursor = int(state.get("sample_cursor") or 0)
+    facial_q = list_gex2_needing_facial(data_root=data_root, job_dir=job_root)
+    i2v_q = list_i2v_needing_gex(data_root=data_root, job_dir=job_root)
+    facial_start = len(facial_q)
+    i2v_start = len(i2v_q)
+
+    picks: List[Dict[str, Any]] = []
+    with dry_run_memo():
+        cursor = _simulate_hourly_ticks(
+            picks,
+            count,
+            cursor=cursor,
+            facial_q=facial_q,
+            i2v_q=i2v_q,
+            data_root=data_root,
+            job_root=job_root,
+            advance_cursor_every_tick=advance_cursor_every_tick,
+        )
 
     summary = summarize_hourly_picks(picks)
     return {
@@ -3803,6 +4153,16 @@ def main() -> int:
         help="Legacy: only advance sample_cursor on seed ticks (not recommended)",
     )
 
+    sr = sub.add_parser(
+        "simulate-replay",
+        help="Batch-draw replay recipes for N consecutive cursors from one weight table (knob tuning)",
+    )
+    sr.add_argument("--family", default="FB9_GEX2")
+    sr.add_argument("--cursor", type=int, default=0, help="First cursor (default 0)")
+    sr.add_argument("--count", type=int, default=10000, help="How many cursors to draw (default 10000)")
+    sr.add_argument("--data-root", type=Path, default=None)
+    sr.add_argument("--json", action="store_true", help="Emit full JSON (default: compact summary)")
+
     l = sub.add_parser("list-recipes", help="List replay recipe count for a family")
     l.add_argument("--data-root", type=Path, default=None)
     l.add_argument("--family", default="FB9_GEX2")
@@ -3929,6 +4289,18 @@ def main() -> int:
             print(format_hourly_picks_table(result))
         return 0 if result.get("ok") else 1
 
+    if args.cmd == "simulate-replay":
+        result = simulate_replay_selection(
+            int(args.count), cursor=int(args.cursor), data_root=data_root, family=str(args.family)
+        )
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+        else:
+            summary = {k: v for k, v in result.items() if k != "top_combos"}
+            summary["top_combos"] = (result.get("top_combos") or [])[:5]
+            print(json.dumps(summary, ensure_ascii=False, default=str))
+        return 0 if result.get("ok") else 1
+
     if args.cmd == "need-facial":
         hit = find_gex2_needing_facial(data_root=data_root)
         print(json.dumps(hit or {}, ensure_ascii=False))
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Persisted ``.job.json`` catalog (rebuildable).
+
+Canonical jobs stay as ``.job.json`` under ``shape_factory/jobs/<family>/``; this SQLite
+beside the jobs tree (``shape_factory/_status/job_catalog.sqlite``) answers the hot
+lookups — job by ``prompt_id``, job by ``job_key``, pending-submit candidates, newest-first
+work-product pages (:func:`recent_jobs`) — without reading every job file. See
+docs/SCALE_INDEX_ARCHITECTURE.md.
+
+Freshness: ``atomic_write_json`` in ``shape_factory`` upserts the row for every job write
+(generate / submit / status / deposit). Writers that bypass it are caught by
+:func:`sync_job_catalog`, which stats only the known job directories and re-reads files
+in directories whose mtime moved (create / rename / delete all bump the parent).
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+JOB_CATALOG_BASENAME = "job_catalog.sqlite"
+JOB_CATALOG_SCHEMA_VERSION = 2
+JOB_SUFFIX = ".job.json"
+
+
+def utc_now() -> str:
+    return _dt.datetime.now(_dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def jobs_root_for_path(path: Path) -> Path:
+    """
+    Jobs tree root for a job file or jobs directory.
+
+    Nearest ancestor named ``jobs`` (``<data>/shape_factory/jobs``); otherwise the
+    directory itself so ad-hoc ``--jobs-dir`` trees still get a catalog.
+    """
+    p = Path(path).expanduser().resolve()
+    if p.name.endswith(JOB_SUFFIX):
+        p = p.parent
+    for cand in (p, *p.parents):
+        if cand.name == "jobs":
+            return cand
+    return p
+
+
+def default_job_catalog_path(jobs_root: Path) -> Path:
+    return Path(jobs_root).expanduser().resolve().parent / "_status" / JOB_CATALOG_BASENAME
+
+
+def open_job_catalog(path: Path) -> sqlite3.Connection:
+    path = Path(path).expanduser().resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(path), timeout=30)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    found = con.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    if found is not None and found[0] != str(JOB_CATALOG_SCHEMA_VERSION):
+        # Rebuildable: drop rows + dir stamps so the next sync re-reads every job.
+        con.execute("DROP TABLE IF EXISTS jobs")
+        con.execute("DROP TABLE IF EXISTS dirs")
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_path TEXT PRIMARY KEY,
+            file_key TEXT NOT NULL,
+            job_key TEXT NOT NULL,
+            family TEXT,
+            prompt_id TEXT,
+            status TEXT,
+            created_at TEXT,
+            submitted_at TEXT,
+            pending_candidate INTEGER NOT NULL DEFAULT 0,
+            sort_ts REAL NOT NULL DEFAULT 0,
+            recency_ts REAL NOT NULL DEFAULT 0,
+            hourly INTEGER NOT NULL DEFAULT 0,
+            outputs_json TEXT,
+            timings_json TEXT,
+            mtime REAL NOT NULL,
+            size INTEGER NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """
+    )
+    con.execute("CREATE INDEX IF NOT EXISTS idx_jc_file_key ON jobs(file_key)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_jc_prompt_id ON jobs(prompt_id)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_jc_pending ON jobs(pending_candidate, sort_ts)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_jc_recency ON jobs(hourly, recency_ts DESC, job_path)")
+    con.execute("CREATE TABLE IF NOT EXISTS dirs (dir_path TEXT PRIMARY KEY, mtime REAL NOT NULL)")
+    if found is None or found[0] != str(JOB_CATALOG_SCHEMA_VERSION):
+        # Only on change: every lookup opens the catalog and must not write to it.
+        con.execute(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES('schema_version', ?)",
+            (str(JOB_CATALOG_SCHEMA_VERSION),),
+        )
+    con.commit()
+    return con
+
+
+def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    return {k: row[k] for k in row.keys()}
+
+
+def _iso_ts(raw: Any) -> float:
+    if not isinstance(raw, str) or not raw.strip():
+        return 0.0
+    text = raw.strip()
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    try:
+        return _dt.datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def _recency_ts(job: Dict[str, Any], submit: Dict[str, Any], mtime: float) -> float:
+    """``created_at``, else ``submit.submitted_at``, else file mtime (work-products order)."""
+    for raw in (job.get("created_at"), submit.get("submitted_at")):
+        if isinstance(raw, (int, float)) and not isinstance(raw, bool):
+            return float(raw)
+        ts = _iso_ts(raw)
+        if ts:
+            return ts
+    return float(mtime)
+
+
+def _timings_brief(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    timings = job.get("timings") if isinstance(job.get("timings"), dict) else {}
+    out: Dict[str, Any] = {}
+    for block, key, name in (
+        ("execution", "sec", "exec_sec"),
+        ("queue", "wait_sec", "wait_sec"),
+        ("totals", "submit_to_complete_sec", "total_sec"),
+        ("execution", "terminal", "terminal"),
+    ):
+        src = timings.get(block) if isinstance(timings.get(block), dict) else {}
+        if src.get(key) is not None:
+            out[name] = src[key]
+    return out or None
+
+
+def job_key_for_path(job_path: Path) -> str:
+    name = Path(job_path).name
+    return name[: -len(JOB_SUFFIX)] if name.endswith(JOB_SUFFIX) else Path(job_path).stem
+
+
+def catalog_row_from_job(job: Dict[str, Any], job_path: Path, *, mtime: float, size: int) -> Dict[str, Any]:
+    """
+    Catalog columns for one job.
+
+    ``pending_candidate`` is the attempt-count-independent part of
+    ``shape_factory.job_pending_submit`` (no prompt_id, not abandoned, not editing);
+    callers re-check candidates against the live rule. ``recency_ts`` / ``hourly`` /
+    ``outputs_json`` / ``timings_json`` are the work-products list summary.
+    """
+    submit = job.get("submit") if isinstance(job.get("submit"), dict) else {}
+    pid = str(submit.get("prompt_id") or "").strip()
+    status = str(submit.get("status") or "").strip().lower()
+    created_at = str(job.get("created_at") or "").strip() or None
+    outputs = submit.get("outputs") if isinstance(submit.get("outputs"), list) else []
+    timings = _timings_brief(job)
+    return {
+        "job_path": str(job_path),
+        "file_key": job_key_for_path(job_path),
+        "job_key": str(job.get("job_key") or "").strip() or job_key_for_path(job_path),
+        "family": str(job.get("family_slug") or "").strip() or Path(job_path).parent.name,
+        "prompt_id": pid or None,
+        "status": status or None,
+        "created_at": created_at,
+        "submitted_at": str(submit.get("submitted_at") or "").strip() or None,
+        "pending_candidate": int(not pid and status not in ("abandoned", "editing")),
+        "sort_ts": max(_iso_ts(created_at), float(mtime)),
+        "recency_ts": _recency_ts(job, submit, mtime),
+        "hourly": int(job_key_for_path(job_path).startswith("hourly__")),
+        "outputs_json": json.dumps([str(o) for o in outputs]) if outputs else None,
+        "timings_json": json.dumps(timings, sort_keys=True) if timings else None,
+        "mtime": float(mtime),
+        "size": int(size),
+    }
+
+
+def upsert_job(
+    con: sqlite3.Connection,
+    job_path: Path,
+    job: Optional[Dict[str, Any]] = None,
+    *,
+    commit: bool = True,
+) -> bool:
+    """Insert/refresh one job row (reads the file when ``job`` is None). Drops the row if unreadable."""
+    job_path = Path(job_path)
+    try:
+        st = job_path.stat()
+        if job is None:
+            job = json.loads(job_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        job = None
+    if not isinstance(job, dict):
+        remove_job(con, job_path, commit=commit)
+        return False
+    row = catalog_row_from_job(job, job_path, mtime=st.st_mtime, size=st.st_size)
+    con.execute(
+        """
+        INSERT OR REPLACE INTO jobs (
+            job_path, file_key, job_key, family, prompt_id, status, created_at, submitted_at,
+            pending_candidate, sort_ts, recency_ts, hourly, outputs_json, timings_json,
+            mtime, size, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            row["job_path"],
+            row["file_key"],
+            row["job_key"],
+            row["family"],
+            row["prompt_id"],
+            row["status"],
+            row["created_at"],
+            row["submitted_at"],
+            row["pending_candidate"],
+            row["sort_ts"],
+            row["recency_ts"],
+            row["hourly"],
+            row["outputs_json"],
+            row["timings_json"],
+            row["mtime"],
+            row["size"],
+            utc_now(),
+        ),
+    )
+    if commit:
+        con.commit()
+    return True
+
+
+def remove_job(con: sqlite3.Connection, job_path: Path, *, commit: bool = True) -> None:
+    con.execute("DELETE FROM jobs WHERE job_path = ?", (str(job_path),))
+    if commit:
+        con.commit()
+
+
+def _scan_dir(con: sqlite3.Connection, d: Path, *, stats: Dict[str, int]) -> List[Path]:
+    """Reconcile rows for job files directly in ``d``; returns child directories."""
+    subdirs: List[Path] = []
+    on_disk: Dict[str, os.stat_result] = {}
+    try:
+        with os.scandir(d) as it:
+            for ent in it:
+                try:
+                    if ent.is_dir(follow_symlinks=False):
+                        subdirs.append(Path(ent.path))
+                    elif ent.name.endswith(JOB_SUFFIX) and ent.is_file():
+                        on_disk[ent.path] = ent.stat()
+                except OSError:
+                    continue
+    except OSError:
+        return subdirs
+    known = {
+        r["job_path"]: (r["mtime"], r["size"])
+        for r in con.execute(
+            "SELECT job_path, mtime, size FROM jobs WHERE job_path >= ? AND job_path < ?",
+            (str(d) + os.sep, str(d) + chr(ord(os.sep) + 1)),
+        )
+        if Path(r["job_path"]).parent == d
+    }
+    for path_s, st in on_disk.items():
+        if known.get(path_s) == (st.st_mtime, st.st_size):
+            continue
+        upsert_job(con, Path(path_s), commit=False)
+        stats["parsed"] += 1
+    for path_s in known.keys() - on_disk.keys():
+        remove_job(con, Path(path_s), commit=False)
+        stats["removed"] += 1
+    return subdirs
+
+
+def sync_job_catalog(con: sqlite3.Connection, jobs_root: Path, *, stat_files: bool = False) -> Dict[str, int]:
+    """
+    Bring the catalog up to date with ``jobs_root``.
+
+    Stats each known directory; only directories whose mtime changed (or that are new)
+    are listed and their changed files re-read. A fresh catalog costs one ``stat`` per
+    family directory. In-place rewrites that keep the directory mtime are only seen via
+    the write hook, ``stat_files=True`` (lists every directory and re-reads files whose
+    mtime / size moved — one ``stat`` per job, used on lookup misses) or ``job-catalog rebuild``.
+    Commits only when a row or directory stamp changed, so a no-op sync does not write.
+    """
+    root = Path(jobs_root).expanduser().resolve()
+    stats = {"dirs_checked": 0, "dirs_rescanned": 0, "dirs_stamped": 0, "parsed": 0, "removed": 0}
+    known_dirs = {r["dir_path"]: r["mtime"] for r in con.execute("SELECT dir_path, mtime FROM dirs")}
+    children: Dict[str, List[str]] = {}
+    for p in known_dirs:
+        children.setdefault(str(Path(p).parent), []).append(p)
+    stack = [root]
+    seen: set = set()
+    while stack:
+        d = stack.pop()
+        key = str(d)
+        if key in seen:
+            continue
+        seen.add(key)
+        stats["dirs_checked"] += 1
+        try:
+            mtime = d.stat().st_mtime
+        except OSError:
+            continue
+        if known_dirs.get(key) == mtime and not stat_files:
+            stack.extend(Path(p) for p in children.get(key, ()))
+            continue
+        stats["dirs_rescanned"] += 1
+        stack.extend(_scan_dir(con, d, stats=stats))
+        if known_dirs.get(key) != mtime:
+            con.execute("INSERT OR REPLACE INTO dirs(dir_path, mtime) VALUES(?, ?)", (key, mtime))
+            stats["dirs_stamped"] += 1
+    gone_dirs = known_dirs.keys() - seen
+    for gone in gone_dirs:
+        con.execute("DELETE FROM dirs WHERE dir_path = ?", (gone,))
+        cur = con.execute(
+            "DELETE FROM jobs WHERE job_path >= ? AND job_path < ?",
+            (gone + os.sep, gone + chr(ord(os.sep) + 1)),
+        )
+        stats["removed"] += max(0, cur.rowcount)
+    if stats["parsed"] or stats["removed"] or stats["dirs_stamped"] or gone_dirs:
+        con.execute("INSERT OR REPLACE INTO meta(key, value) VALUES('synced_at', ?)", (utc_now(),))
+        con.commit()
+    return stats
+
+
+def lookup_by_prompt_id(con: sqlite3.Connection, prompt_id: str) -> Optional[Dict[str, Any]]:
+    row = con.execute(
+        "SELECT * FROM jobs WHERE prompt_id = ? ORDER BY mtime DESC LIMIT 1",
+        (str(prompt_id or "").strip(),),
+    ).fetchone()
+    return _row_to_dict(row) if row else None
+
+
+def lookup_by_job_key(con: sqlite3.Connection, job_key: str) -> Optional[Dict[str, Any]]:
+    """Row whose file is ``<job_key>.job.json`` (same match as ``glob("**/<key>.job.json")``)."""
+    row = con.execute(
+        "SELECT * FROM jobs WHERE file_key = ? ORDER BY job_path LIMIT 1",
+        (str(job_key or "").strip(),),
+    ).fetchone()
+    return _row_to_dict(row) if row else None
+
+
+def pending_candidates(
+    con: sqlite3.Connection,
+    *,
+    under: Optional[Path] = None,
+    direct_children_of: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """Pending-submit candidates, newest ``sort_ts`` first, optionally scoped to a subtree or one directory."""
+    sql = "SELECT * FROM jobs WHERE pending_candidate = 1"
+    params: List[Any] = []
+    prefix = under if under is not None else direct_children_of
+    if prefix is not None:
+        base = str(Path(prefix).expanduser().resolve())
+        sql += " AND job_path >= ? AND job_path < ?"
+        params.extend([base + os.sep, base + chr(ord(os.sep) + 1)])
+    sql += " ORDER BY sort_ts DESC, job_path"
+    rows = [_row_to_dict(r) for r in con.execute(sql, params)]
+    if direct_children_of is not None:
+        parent = Path(direct_children_of).expanduser().resolve()
+        rows = [r for r in rows if Path(r["job_path"]).parent == parent]
+    return rows
+
+
+def recent_jobs(
+    con: sqlite3.Connection,
+    *,
+    limit: int,
+    hourly_only: bool = True,
+    family: Optional[str] = None,
+    after: Optional[tuple[float, str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Newest-first job rows (``recency_ts`` DESC, ``job_path``) for the work-products list.
+
+    ``after`` is the ``(recency_ts, job_path)`` of the last row of the previous page.
+    """
+    sql = "SELECT * FROM jobs WHERE 1 = 1"
+    params: List[Any] = []
+    if hourly_only:
+        sql += " AND hourly = 1"
+    if family:
+        sql += " AND family = ?"
+        params.append(family)
+    if after is not None:
+        sql += " AND (recency_ts < ? OR (recency_ts = ? AND job_path > ?))"
+        params.extend([float(after[0]), float(after[0]), str(after[1])])
+    sql += " ORDER BY recency_ts DESC, job_path LIMIT ?"
+    params.append(max(0, int(limit)))
+    return [_row_to_dict(r) for r in con.execute(sql, params)]
+
+
+IN_FLIGHT_STATUSES = ("submitted", "queued", "running", "unknown")
+
+
+def in_flight_jobs(con: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Jobs with a prompt_id whose last recorded status is not terminal (oldest first)."""
+    marks = ", ".join("?" for _ in IN_FLIGHT_STATUSES)
+    rows = con.execute(
+        f"SELECT * FROM jobs WHERE prompt_id IS NOT NULL AND (status IS NULL OR status IN ({marks})) ORDER BY sort_ts, job_path",
+        IN_FLIGHT_STATUSES,
+    )
+    return [_row_to_dict(r) for r in rows]
+
+
+def open_synced_job_catalog(jobs_root: Path, *, catalog_path: Optional[Path] = None) -> sqlite3.Connection:
+    root = Path(jobs_root).expanduser().resolve()
+    con = open_job_catalog(catalog_path or default_job_catalog_path(root))
+    try:
+        sync_job_catalog(con, root)
+    except Exception:
+        con.close()
+        raise
+    return con
+
+
+def note_job_written(job_path: Path, job: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Write hook: refresh one row after a ``.job.json`` write.
+
+    No-op (False) when the jobs tree has no catalog yet — the first lookup builds it.
+    """
+    job_path = Path(job_path).expanduser().resolve()
+    cat = default_job_catalog_path(jobs_root_for_path(job_path))
+    if not cat.is_file():
+        return False
+    con = open_job_catalog(cat)
+    try:
+        return upsert_job(con, job_path, job)
+    finally:
+        con.close()
+
+
+def rebuild_job_catalog(*, jobs_root: Path, catalog_path: Optional[Path] = None) -> Dict[str, Any]:
+    root = Path(jobs_root).expanduser().resolve()
+    path = Path(catalog_path).expanduser().resolve() if catalog_path else default_job_catalog_path(root)
+    for p in (path, path.with_name(path.name + "-wal"), path.with_name(path.name + "-shm")):
+        if p.is_file():
+            p.unlink()
+    con = open_job_catalog(path)
+    try:
+        stats = sync_job_catalog(con, root)
+        con.execute("INSERT OR REPLACE INTO meta(key, value) VALUES('rebuilt_at', ?)", (utc_now(),))
+        con.commit()
+        n = con.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+    finally:
+        con.close()
+    return {"ok": True, "catalog_path": str(path), "jobs_root": str(root), "jobs": int(n), "parsed": stats["parsed"]}
+
+
+def verify_job_catalog(*, jobs_root: Path, catalog_path: Optional[Path] = None) -> Dict[str, Any]:
+    """Compare every catalog row with a full read of the jobs tree (read-only)."""
+    root = Path(jobs_root).expanduser().resolve()
+    path = Path(catalog_path).expanduser().resolve() if catalog_path else default_job_catalog_path(root)
+    if not path.is_file():
+        return {"ok": False, "error": "catalog_missing", "catalog_path": str(path)}
+    expected: Dict[str, Dict[str, Any]] = {}
+    for job_path in sorted(root.rglob("*" + JOB_SUFFIX)):
+        try:
+            st = job_path.stat()
+            job = json.loads(job_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if isinstance(job, dict):
+            expected[str(job_path)] = catalog_row_from_job(job, job_path, mtime=st.st_mtime, size=st.st_size)
+    con = sqlite3.connect(str(path), timeout=30)
+    con.row_factory = sqlite3.Row
+    try:
+        actual = {r["job_path"]: _row_to_dict(r) for r in con.execute("SELECT * FROM jobs")}
+    finally:
+        con.close()
+    missing = sorted(expected.keys() - actual.keys())
+    orphaned = sorted(actual.keys() - expected.keys())
+    stale = sorted(
+        p
+        for p in expected.keys() & actual.keys()
+        if any(actual[p].get(k) != v for k, v in expected[p].items())
+    )
+    return {
+        "ok": not (missing or orphaned or stale),
+        "catalog_path": str(path),
+        "jobs_on_disk": len(expected),
+        "catalog_rows": len(actual),
+        "missing": missing[:50],
+        "orphaned": orphaned[:50],
+        "stale": stale[:50],
+        "counts": {"missing": len(missing), "orphaned": len(orphaned), "stale": len(stale)},
+    }
+
+
+def add_job_catalog_subparser(sub: Any) -> None:
+    p = sub.add_parser("job-catalog", help="Rebuild/verify persisted .job.json catalog (prompt_id / job_key / pending)")
+    sp = p.add_subparsers(dest="job_catalog_cmd", required=True)
+    for name, fn, help_text in (
+        ("rebuild", cmd_job_catalog_rebuild, "Drop and rebuild job_catalog.sqlite from all .job.json"),
+        ("verify", cmd_job_catalog_verify, "Diff job_catalog.sqlite against a full read of the jobs tree"),
+    ):
+        cp = sp.add_parser(name, help=help_text)
+        cp.add_argument("--data-root", default=None, help="Shape-factory data root (jobs under shape_factory/jobs)")
+        cp.add_argument("--jobs-root", default=None, help="Explicit jobs tree (overrides --data-root)")
+        cp.add_argument("--catalog", default=None, help="Explicit sqlite path")
+        cp.set_defaults(func=fn)
+
+
+def _jobs_root_from_args(args: argparse.Namespace) -> Path:
+    if getattr(args, "jobs_root", None):
+        return Path(args.jobs_root).expanduser().resolve()
+    from shape_factory_map import resolve_shape_factory_data_root
+
+    repo = Path(__file__).resolve().parents[2]
+    data_root = (
+        Path(args.data_root).expanduser().resolve()
+        if getattr(args, "data_root", None)
+        else resolve_shape_factory_data_root(repo_root=repo)
+    )
+    return data_root / "shape_factory" / "jobs"
+
+
+def cmd_job_catalog_rebuild(args: argparse.Namespace) -> int:
+    jobs_root = _jobs_root_from_args(args)
+    if not jobs_root.is_dir():
+        print(f"error: jobs root missing: {jobs_root}", flush=True)
+        return 1
+    catalog = Path(args.catalog).expanduser().resolve() if args.catalog else None
+    print(json.dumps(rebuild_job_catalog(jobs_root=jobs_root, catalog_path=catalog), indent=2))
+    return 0
+
+
+def cmd_job_catalog_verify(args: argparse.Namespace) -> int:
+    jobs_root = _jobs_root_from_args(args)
+    catalog = Path(args.catalog).expanduser().resolve() if args.catalog else None
+    result = verify_job_catalog(jobs_root=jobs_root, catalog_path=catalog)
+    print(json.dumps(result, indent=2))
+    return 0 if result.get("ok") else 1
@@ -0,0 +1,1066 @@
+#!/usr/bin/env python3
+"""
+Persisted scored candidate pool for rating-sampler sessions (rebuildable).
+
+``sample_rating_queue`` used to rebuild its pool from the full discovery index on every
+``/api/discovery/rating-sampler`` request: filter every og/ video against ratings,
+appetite and disposition, run ``score_unrated_candidate`` per item and look up jobs for
+extension ranges. This SQLite (``output/_status/rating_sampler_pool.sqlite``) keeps one
+row per rate-queue video: its discovery item, ``needs_rating`` flag, scored candidate and
+cached extension range, plus the tokens that candidate was scored from (output keys,
+group / parent ids, parent basenames, tags).
+
+Each source the pool depends on carries a version (``mtime_ns:size`` stamp):
+discovery index, ratings (``ratings.sqlite`` + JSON exports, appetite included),
+heuristics and vision scores; lineage uses the edge store's content version. When one moves, per-key digests of its tables are diffed
+and only items whose tokens hit a changed key — a rated output, the siblings of a newly
+rated group, the descendants of a re-inferred lineage node, items matching a changed
+pattern — are re-scored; discovery items are diffed by content. Lineage, disposition,
+triage and tag changes, or a new schema, rebuild the pool. A draw with no moved version
+is a stamp check plus a read of the pool rows, which stay in memory between draws; only
+the picked candidates are hydrated.
+
+Rating events are the common case, so they avoid whole-table work: ``ratings.sqlite``
+logs every row write (``row_change``), the pool remembers the log position it was synced
+to and digests only the outputs / groups written since. The scoring inputs themselves are
+kept in process (:func:`pool_sampler_docs`): a source is reloaded only when its stamp
+moved, and the rating / appetite tables are patched from the logged rows.
+
+  python3 shape_factory_rating_pool.py sync   --root /path/to/output/og
+  python3 shape_factory_rating_pool.py verify --root /path/to/output/og
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from shape_factory_heuristics import LineageGraph, _og_group_id_from_relpath
+from shape_factory_ratings import (
+    load_appetite_doc,
+    load_ratings_doc,
+    open_ratings_db,
+    output_lookup_keys,
+    output_rows_for_keys,
+    ratings_db_path_for_index,
+    row_change_seq,
+    row_changes_since,
+    utc_now as _ratings_utc_now,
+)
+from shape_factory_rating_sampler import (
+    SAMPLER_SCHEMA_VERSION,
+    RatingCandidate,
+    SamplerDocs,
+    SamplerInputs,
+    _build_rated_by_gid,
+    _hay_matches_query,
+    _item_search_hay,
+    _load_json,
+    _load_vision_scores,
+    _rated_output_keys,
+    enrich_candidates_extension_ranges,
+    is_rate_queue_video,
+    load_sampler_docs,
+    sampler_inputs,
+)
+
+RATING_POOL_BASENAME = "rating_sampler_pool.sqlite"
+RATING_POOL_SCHEMA_VERSION = 2
+
+# Versioned sources and the digested tables each one feeds.
+SOURCE_SECTIONS: Dict[str, Tuple[str, ...]] = {
+    "ratings": ("ratings_output", "appetite_output", "rated_group", "source_basename"),
+    "heuristics": ("lineage", "lineage_appetite", "tag_appetite", "pattern"),
+    "vision": ("vision",),
+}
+# Versions whose change rebuilds the pool; the rest are diffed.
+REBUILD_VERSIONS = ("static", "lineage", "annotations")
+DELTA_SOURCES = ("discovery", "ratings", "heuristics", "vision")
+
+
+def utc_now() -> str:
+    return _dt.datetime.now(_dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def default_rating_pool_path(og_root: Path) -> Path:
+    return Path(og_root).expanduser().resolve().parent / "_status" / RATING_POOL_BASENAME
+
+
+def _file_stamp(path: Path) -> str:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ""
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _stamp(paths: Iterable[Path]) -> str:
+    return "|".join(_file_stamp(p) for p in paths)
+
+
+def _with_wal(path: Path) -> List[Path]:
+    return [path, path.with_name(path.name + "-wal")]
+
+
+def _lineage_version(edges_json: Path) -> str:
+    """Edge-store content version (``max_seq:count``) after folding in a newer JSON export."""
+    from discovery_lineage_store import lineage_edges_exist, open_synced_lineage_store, store_version
+
+    if not lineage_edges_exist(edges_json):
+        return ""
+    try:
+        con = open_synced_lineage_store(edges_json)
+    except (OSError, sqlite3.Error):
+        return f"json:{_file_stamp(edges_json)}"
+    try:
+        seq, count = store_version(con)
+    finally:
+        con.close()
+    return f"{seq}:{count}"
+
+
+def input_versions(inputs: SamplerInputs) -> Dict[str, str]:
+    """Current version of every source; :data:`REBUILD_VERSIONS` rebuild the pool when they move."""
+    dbs = {ratings_db_path_for_index(inputs.ratings), ratings_db_path_for_index(inputs.appetite)}
+    static = [
+        str(RATING_POOL_SCHEMA_VERSION),
+        str(SAMPLER_SCHEMA_VERSION),
+        *(str(p) for p in (inputs.og_root, inputs.discovery, inputs.ratings, inputs.heuristics, inputs.vision)),
+    ]
+    return {
+        "static": "\n".join(static),
+        "lineage": _lineage_version(inputs.lineage),
+        "annotations": _stamp([inputs.disposition, inputs.triage, inputs.tags]),
+        "discovery": _file_stamp(inputs.discovery),
+        "ratings": _stamp([inputs.ratings, inputs.appetite, *(w for db in sorted(dbs) for w in _with_wal(db))]),
+        "ratings_exports": _stamp([inputs.ratings, inputs.appetite]),
+        "heuristics": _file_stamp(inputs.heuristics),
+        "vision": _file_stamp(inputs.vision),
+    }
+
+
+def _single_ratings_db(inputs: SamplerInputs) -> Optional[Path]:
+    """The one ``ratings.sqlite`` behind ratings and appetite (None when they are split or absent)."""
+    dbs = {ratings_db_path_for_index(inputs.ratings), ratings_db_path_for_index(inputs.appetite)}
+    db = next(iter(dbs)) if len(dbs) == 1 else None
+    return db if db is not None and db.is_file() else None
+
+
+def _open_ratings(inputs: SamplerInputs, db: Path) -> sqlite3.Connection:
+    return open_ratings_db(db, ratings_json=inputs.ratings, appetite_json=inputs.appetite)
+
+
+@dataclass
+class _LoadedDocs:
+    docs: SamplerDocs
+    stamps: Dict[str, str]
+    change_seq: Optional[int]
+
+
+# Scoring inputs kept between syncs, keyed on the input paths (see :func:`pool_sampler_docs`).
+_DOCS_CACHE: Dict[Tuple[str, ...], _LoadedDocs] = {}
+_DOCS_CACHE_MAX = 4
+_DOCS_LOCK = threading.Lock()
+
+
+def _doc_stamps(inputs: SamplerInputs, versions: Dict[str, str]) -> Dict[str, str]:
+    return {
+        "ratings": versions["ratings"],
+        "ratings_exports": versions["ratings_exports"],
+        "heuristics": versions["heuristics"],
+        "lineage": versions["lineage"],
+        "vision": versions["vision"],
+        "disposition": _file_stamp(inputs.disposition),
+        "triage": _file_stamp(inputs.triage),
+        "tags": _file_stamp(inputs.tags),
+    }
+
+
+def _patch_output_table(
+    con: sqlite3.Connection, tbl: str, table: Dict[str, Any], changes: List[Tuple[str, str]]
+) -> Optional[Dict[str, Any]]:
+    """
+    ``table`` (dual-keyed like ``ratings_output_table_from_db``) with the logged rows re-read,
+    in the same key order and winners as a full load. None when a row was deleted or
+    re-keyed: only a full load reproduces that key order.
+    """
+    logged: Dict[str, Set[str]] = {}
+    for asset_key, short_key in changes:
+        logged.setdefault(asset_key.strip(), set()).add(short_key.strip())
+    rows = output_rows_for_keys(con, tbl, logged)
+    current = {asset_key: short_key for asset_key, short_key, _doc in rows}
+    if any(a not in current or shorts != {current[a]} for a, shorts in logged.items()):
+        return None
+    out = dict(table)
+    for asset_key, short_key, doc in rows:
+        for key in (asset_key, short_key):
+            if not key:
+                continue
+            # The newest row carrying a key wins it (a full load assigns in rowid order).
+            last = con.execute(
+                f"SELECT asset_key FROM {tbl} WHERE asset_key = ? OR short_key = ? ORDER BY rowid DESC LIMIT 1",
+                (key, key),
+            ).fetchone()
+            if last is not None and str(last[0] or "").strip() == asset_key:
+                out[key] = doc
+    return out
+
+
+def _patched_rating_docs(
+    con: sqlite3.Connection, prev: SamplerDocs, changes: List[Tuple[str, str, str]]
+) -> Optional[Tuple[Optional[dict[str, Any]], Optional[dict[str, Any]]]]:
+    """``(ratings_doc, appetite_doc)`` of ``prev`` with the logged rows applied (None: reload)."""
+    ratings_doc, appetite_doc = prev.ratings_doc, prev.appetite_doc
+    for tbl in ("rating_row", "appetite_row"):
+        rows = [(a, sk) for t, a, sk in changes if t == tbl]
+        if not rows:
+            continue
+        doc = ratings_doc if tbl == "rating_row" else appetite_doc
+        if doc is None:
+            return None
+        table = _patch_output_table(con, tbl, doc.get("by_output_relpath") or {}, rows)
+        if table is None:
+            return None
+        doc = {**doc, "by_output_relpath": table}
+        if tbl == "rating_row":
+            if table:
+                doc["updated_at"] = _ratings_utc_now()
+            ratings_doc = doc
+        else:
+            stamps = [r.get("updated_at") for r in table.values()]
+            latest = max((ts for ts in stamps if isinstance(ts, str)), default=None)
+            if table:
+                doc["updated_at"] = latest or _ratings_utc_now()
+            appetite_doc = doc
+    return ratings_doc, appetite_doc
+
+
+def pool_sampler_docs(inputs: SamplerInputs, versions: Dict[str, str]) -> Tuple[SamplerDocs, Optional[int]]:
+    """
+    :func:`load_sampler_docs` for the pool, reusing every source whose stamp did not move
+    since the previous call in this process, and patching the rating / appetite tables from
+    the ``ratings.sqlite`` change log. Returns the docs and the log position they reflect
+    (None when ratings and appetite live in separate stores).
+    """
+    key = tuple(
+        str(p)
+        for p in (
+            inputs.ratings,
+            inputs.appetite,
+            inputs.heuristics,
+            inputs.lineage,
+            inputs.vision,
+            inputs.disposition,
+            inputs.triage,
+            inputs.tags,
+        )
+    )
+    stamps = _doc_stamps(inputs, versions)
+    with _DOCS_LOCK:
+        prev = _DOCS_CACHE.get(key)
+    if prev is None:
+        db = _single_ratings_db(inputs)
+        seq: Optional[int] = None
+        if db is not None:
+            con = _open_ratings(inputs, db)
+            try:
+                seq = row_change_seq(con)
+            finally:
+                con.close()
+        loaded = _LoadedDocs(docs=load_sampler_docs(inputs), stamps=stamps, change_seq=seq)
+    else:
+        loaded = _refresh_docs(inputs, prev, stamps)
+    with _DOCS_LOCK:
+        _DOCS_CACHE.pop(key, None)
+        while len(_DOCS_CACHE) >= _DOCS_CACHE_MAX:
+            _DOCS_CACHE.pop(next(iter(_DOCS_CACHE)))
+        _DOCS_CACHE[key] = loaded
+    return loaded.docs, loaded.change_seq
+
+
+def _load_rating_docs(inputs: SamplerInputs) -> Tuple[Optional[dict[str, Any]], Optional[dict[str, Any]]]:
+    """The ratings / appetite half of :func:`load_sampler_docs`."""
+    ratings_doc = (
+        load_ratings_doc(inputs.ratings)
+        if inputs.ratings.is_file() or ratings_db_path_for_index(inputs.ratings).is_file()
+        else None
+    )
+    appetite_doc = (
+        load_appetite_doc(inputs.appetite)
+        if inputs.appetite.is_file() or ratings_db_path_for_index(inputs.appetite).is_file()
+        else None
+    )
+    return ratings_doc, appetite_doc
+
+
+def _refresh_docs(inputs: SamplerInputs, prev: _LoadedDocs, stamps: Dict[str, str]) -> _LoadedDocs:
+    old = prev.docs
+    moved = {k for k, v in stamps.items() if prev.stamps.get(k) != v}
+    ratings_doc, appetite_doc = old.ratings_doc, old.appetite_doc
+    seq: Optional[int] = prev.change_seq
+    if moved & {"ratings", "ratings_exports"}:
+        patched = None
+        db = _single_ratings_db(inputs)
+        seq = None
+        if db is not None:
+            con = _open_ratings(inputs, db)
+            try:
+                seq = row_change_seq(con)
+                if "ratings_exports" not in moved and prev.change_seq is not None:
+                    changes = row_changes_since(con, prev.change_seq, upto=seq)
+                    if changes is not None:
+                        patched = _patched_rating_docs(con, old, changes)
+            finally:
+                con.close()
+        ratings_doc, appetite_doc = patched if patched is not None else _load_rating_docs(inputs)
+    ratings_moved = ratings_doc is not old.ratings_doc
+    docs = SamplerDocs(
+        ratings_doc=ratings_doc,
+        heuristics_doc=_load_json(inputs.heuristics) if "heuristics" in moved else old.heuristics_doc,
+        appetite_doc=appetite_doc,
+        disposition_doc=_load_json(inputs.disposition) if "disposition" in moved else old.disposition_doc,
+        triage_doc=_load_json(inputs.triage) if "triage" in moved else old.triage_doc,
+        tags_doc=_load_json(inputs.tags) if "tags" in moved else old.tags_doc,
+        lineage=LineageGraph.load(inputs.lineage) if "lineage" in moved else old.lineage,
+        vision_table=_load_vision_scores(inputs.vision) if "vision" in moved else old.vision_table,
+        rated_keys=_rated_output_keys(ratings_doc) if ratings_moved else old.rated_keys,
+        rated_by_gid=_build_rated_by_gid(ratings_doc) if ratings_moved else old.rated_by_gid,
+    )
+    return _LoadedDocs(docs=docs, stamps=stamps, change_seq=seq)
+
+
+def reset_pool_docs_cache() -> None:
+    with _DOCS_LOCK:
+        _DOCS_CACHE.clear()
+
+
+def open_rating_pool(path: Path) -> sqlite3.Connection:
+    path = Path(path).expanduser().resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(path), timeout=30)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    found = con.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    if found is not None and found[0] != str(RATING_POOL_SCHEMA_VERSION):
+        for table in ("pool", "deps", "digests"):
+            con.execute(f"DROP TABLE IF EXISTS {table}")
+        con.execute("DELETE FROM meta")
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pool (
+            item_key TEXT PRIMARY KEY,
+            ord INTEGER NOT NULL,
+            item_digest TEXT NOT NULL,
+            item_json TEXT NOT NULL,
+            item_group_id TEXT NOT NULL,
+            relpath TEXT NOT NULL,
+            group_id TEXT NOT NULL,
+            needs_rating INTEGER NOT NULL,
+            predicted REAL NOT NULL,
+            confidence REAL NOT NULL,
+            vision_recommended INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            hay TEXT NOT NULL,
+            workflow TEXT NOT NULL,
+            candidate_json TEXT NOT NULL,
+            extension_json TEXT,
+            updated_at TEXT
+        )
+        """
+    )
+    con.execute("CREATE INDEX IF NOT EXISTS idx_pool_draw ON pool(needs_rating, ord)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_pool_relpath ON pool(relpath)")
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS deps (
+            token TEXT NOT NULL,
+            item_key TEXT NOT NULL,
+            PRIMARY KEY (token, item_key)
+        ) WITHOUT ROWID
+        """
+    )
+    con.execute("CREATE INDEX IF NOT EXISTS idx_deps_item ON deps(item_key)")
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS digests (
+            section TEXT NOT NULL,
+            key TEXT NOT NULL,
+            digest TEXT NOT NULL,
+            aux TEXT,
+            PRIMARY KEY (section, key)
+        ) WITHOUT ROWID
+        """
+    )
+    con.execute(
+        "INSERT OR REPLACE INTO meta(key, value) VALUES('schema_version', ?)",
+        (str(RATING_POOL_SCHEMA_VERSION),),
+    )
+    con.commit()
+    return con
+
+
+def _meta_versions(con: sqlite3.Connection) -> Optional[Dict[str, str]]:
+    row = con.execute("SELECT value FROM meta WHERE key = 'versions'").fetchone()
+    if row is None:
+        return None
+    try:
+        doc = json.loads(row[0])
+    except ValueError:
+        return None
+    return doc if isinstance(doc, dict) else None
+
+
+def _digest(obj: Any) -> str:
+    raw = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _table(doc: Optional[dict[str, Any]], key: str) -> Dict[str, Any]:
+    table = (doc or {}).get(key) or {}
+    return table if isinstance(table, dict) else {}
+
+
+def section_digests(
+    section: str, docs: SamplerDocs, *, keys: Optional[Set[str]] = None
+) -> Dict[str, Tuple[str, Optional[str]]]:
+    """
+    ``{key: (digest, aux)}`` of one scoring table; ``aux`` is a pattern row's graph hash.
+    ``keys`` limits the rating sections to those keys (the ones the change log names).
+    """
+    if keys is not None:
+        if section == "rated_group":
+            table: Dict[str, Any] = docs.rated_by_gid
+            return {k: (str(table[k]), None) for k in keys if k in table}
+        if section in ("ratings_output", "appetite_output"):
+            doc = docs.ratings_doc if section == "ratings_output" else docs.appetite_doc
+            table = _table(doc, "by_output_relpath")
+            return {k: (_digest(table[k]), None) for k in keys if k in table}
+        raise ValueError(f"pool section {section!r} is not keyed by the ratings change log")
+    if section == "ratings_output":
+        return {k: (_digest(v), None) for k, v in _table(docs.ratings_doc, "by_output_relpath").items()}
+    if section == "appetite_output":
+        return {k: (_digest(v), None) for k, v in _table(docs.appetite_doc, "by_output_relpath").items()}
+    if section == "rated_group":
+        return {k: (str(v), None) for k, v in docs.rated_by_gid.items()}
+    if section == "source_basename":
+        return {k: (_digest(v), None) for k, v in _table(docs.ratings_doc, "by_source_basename").items()}
+    if section == "lineage":
+        return {k: (_digest(v), None) for k, v in _table(docs.heuristics_doc, "by_group_lineage").items()}
+    if section == "lineage_appetite":
+        return {k: (_digest(v), None) for k, v in _table(docs.heuristics_doc, "by_group_lineage_appetite").items()}
+    if section == "tag_appetite":
+        return {k: (_digest(v), None) for k, v in _table(docs.heuristics_doc, "by_tag_appetite").items()}
+    if section == "pattern":
+        # Pattern rows are scanned in order (first strictly-better match wins), so position counts.
+        out: Dict[str, Tuple[str, Optional[str]]] = {}
+        for pos, (k, v) in enumerate(_table(docs.heuristics_doc, "by_pattern").items()):
+            gh = str(v.get("graph_hash") or "") if isinstance(v, dict) else ""
+            out[k] = (_digest([pos, v]), gh)
+        return out
+    if section == "vision":
+        return {k: (_digest(v), None) for k, v in (docs.vision_table or {}).items()}
+    raise ValueError(f"unknown pool section {section!r}")
+
+
+def _parent_basename(parent: str) -> str:
+    return parent.split(":")[-1] if ":" in parent else parent
+
+
+def candidate_tokens(cand: RatingCandidate, docs: SamplerDocs) -> Set[str]:
+    """Keys ``score_unrated_candidate`` / ``needs_rating_item`` read for this candidate."""
+    tokens = {f"output:{k}" for k in output_lookup_keys(cand.relpath)}
+    tokens.add(f"vision:{cand.relpath}")
+    gid = cand.group_id
+    if gid:
+        tokens.update((f"lineage:{gid}", f"lineage_appetite:{gid}", f"vision:{gid}"))
+    for parent in docs.lineage.parents(gid):
+        tokens.update((f"lineage:{parent}", f"parent:{parent}", f"source_basename:{_parent_basename(parent)}"))
+    tokens.update(f"tag_appetite:{t}" for t in cand.tags)
+    return tokens
+
+
+def _section_tokens(section: str, keys: Iterable[str], docs: SamplerDocs) -> Set[str]:
+    if section in ("ratings_output", "appetite_output"):
+        return {f"output:{k}" for k in keys}
+    if section == "rated_group":
+        # A group's star feeds the sibling boost of every other child of its parents.
+        return {f"parent:{p}" for k in keys for p in docs.lineage.parents(k)}
+    return {f"{section}:{k}" for k in keys}
+
+
+def _pattern_matches(workflow: str, key: str, graph_hash: str) -> bool:
+    """Mirror of the row test in ``_graph_pattern_score``."""
+    if not workflow:
+        return False
+    gh = graph_hash or ""
+    return bool(gh and gh.lower().startswith(workflow[:16]) or workflow.startswith(str(key).replace("graph:", "")[:16]))
+
+
+def iter_pool_items(discovery_doc: dict[str, Any]) -> Iterator[Tuple[str, dict[str, Any]]]:
+    """``(item_key, item)`` for rate-queue videos in discovery order (repeat relpaths suffixed)."""
+    seen: Dict[str, int] = {}
+    for item in discovery_doc.get("items") or []:
+        if not is_rate_queue_video(item):
+            continue
+        rel = str(item.get("relpath") or "")
+        n = seen.get(rel, 0)
+        seen[rel] = n + 1
+        yield (rel if n == 0 else f"{rel}\x00{n}"), item
+
+
+def _put_item(
+    con: sqlite3.Connection,
+    *,
+    item_key: str,
+    ord_: int,
+    item: dict[str, Any],
+    item_digest: str,
+    docs: SamplerDocs,
+    extension_json: Optional[str],
+) -> None:
+    cand = docs.score(item)
+    workflow = str(item.get("workflow_fingerprint") or "").strip().lower()
+    con.execute(
+        """
+        INSERT OR REPLACE INTO pool(
+            item_key, ord, item_digest, item_json, item_group_id, relpath, group_id, needs_rating,
+            predicted, confidence, vision_recommended, mtime, hay, workflow, candidate_json,
+            extension_json, updated_at
+        ) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            item_key,
+            ord_,
+            item_digest,
+            json.dumps(item, ensure_ascii=False),
+            str(item.get("group_id") or ""),
+            cand.relpath,
+            cand.group_id,
+            1 if docs.needs_rating(item) else 0,
+            float(cand.predicted_score),
+            float(cand.heuristic_confidence),
+            1 if cand.vision_recommended else 0,
+            float(cand.mtime),
+            _item_search_hay(item),
+            workflow,
+            json.dumps(asdict(cand), ensure_ascii=False),
+            extension_json,
+            utc_now(),
+        ),
+    )
+    con.execute("DELETE FROM deps WHERE item_key = ?", (item_key,))
+    con.executemany(
+        "INSERT OR IGNORE INTO deps(token, item_key) VALUES(?, ?)",
+        ((t, item_key) for t in candidate_tokens(cand, docs)),
+    )
+
+
+def _write_section(con: sqlite3.Connection, section: str, digests: Dict[str, Tuple[str, Optional[str]]]) -> None:
+    con.execute("DELETE FROM digests WHERE section = ?", (section,))
+    con.executemany(
+        "INSERT INTO digests(section, key, digest, aux) VALUES(?, ?, ?, ?)",
+        ((section, k, d, aux) for k, (d, aux) in digests.items()),
+    )
+
+
+def _update_section(
+    con: sqlite3.Connection, section: str, keys: Set[str], digests: Dict[str, Tuple[str, Optional[str]]]
+) -> None:
+    con.executemany("DELETE FROM digests WHERE section = ? AND key = ?", ((section, k) for k in keys))
+    con.executemany(
+        "INSERT INTO digests(section, key, digest, aux) VALUES(?, ?, ?, ?)",
+        ((section, k, d, aux) for k, (d, aux) in digests.items()),
+    )
+
+
+def _stored_section(
+    con: sqlite3.Connection, section: str, *, keys: Optional[Set[str]] = None
+) -> Dict[str, Tuple[str, Optional[str]]]:
+    if keys is None:
+        rows: Iterable[sqlite3.Row] = con.execute(
+            "SELECT key, digest, aux FROM digests WHERE section = ?", (section,)
+        )
+    else:
+        rows = [
+            r
+            for k in keys
+            for r in con.execute("SELECT key, digest, aux FROM digests WHERE section = ? AND key = ?", (section, k))
+        ]
+    return {str(r["key"]): (str(r["digest"]), r["aux"]) for r in rows}
+
+
+def _logged_section_keys(changes: List[Tuple[str, str, str]]) -> Dict[str, Set[str]]:
+    """Rating-section keys the logged ``(table, asset_key, short_key)`` writes can have moved."""
+    rated = {k for t, a, sk in changes if t == "rating_row" for k in (a, sk) if k}
+    appetite = {k for t, a, sk in changes if t == "appetite_row" for k in (a, sk) if k}
+    groups = {g for g in (_og_group_id_from_relpath(k) for k in rated) if g}
+    # by_source_basename comes from the JSON export, which the log never moves.
+    return {"ratings_output": rated, "appetite_output": appetite, "rated_group": groups, "source_basename": set()}
+
+
+def _ratings_log_keys(
+    con: sqlite3.Connection, inputs: SamplerInputs, versions: Dict[str, str], docs_seq: Optional[int]
+) -> Optional[Dict[str, Set[str]]]:
+    """Section keys written since the pool's last sync, or None when only a full diff will do."""
+    prev = _meta_versions(con) or {}
+    row = con.execute("SELECT value FROM meta WHERE key = 'ratings_change_seq'").fetchone()
+    if row is None or docs_seq is None or prev.get("ratings_exports") != versions["ratings_exports"]:
+        return None
+    pool_seq = int(row[0])
+    db = _single_ratings_db(inputs)
+    if db is None or pool_seq > docs_seq:
+        return None
+    rcon = _open_ratings(inputs, db)
+    try:
+        changes = row_changes_since(rcon, pool_seq, upto=docs_seq)
+    finally:
+        rcon.close()
+    return None if changes is None else _logged_section_keys(changes)
+
+
+def _rebuild(con: sqlite3.Connection, inputs: SamplerInputs, docs: SamplerDocs, stats: Dict[str, Any]) -> None:
+    discovery_doc = _load_json(inputs.discovery)
+    if not discovery_doc:
+        raise FileNotFoundError(f"discovery index missing: {inputs.discovery}")
+    ranges = {
+        str(r["relpath"]): r["extension_json"]
+        for r in con.execute("SELECT relpath, extension_json FROM pool WHERE extension_json IS NOT NULL")
+    }
+    con.execute("DELETE FROM pool")
+    con.execute("DELETE FROM deps")
+    con.execute("DELETE FROM digests")
+    for ord_, (key, item) in enumerate(iter_pool_items(discovery_doc)):
+        _put_item(
+            con,
+            item_key=key,
+            ord_=ord_,
+            item=item,
+            item_digest=_digest(item),
+            docs=docs,
+            extension_json=ranges.get(str(item.get("relpath") or "")),
+        )
+        stats["scored"] += 1
+    for sections in SOURCE_SECTIONS.values():
+        for section in sections:
+            _write_section(con, section, section_digests(section, docs))
+    stats["rebuilt"] = True
+
+
+def _apply_deltas(
+    con: sqlite3.Connection,
+    inputs: SamplerInputs,
+    docs: SamplerDocs,
+    moved: List[str],
+    stats: Dict[str, Any],
+    *,
+    logged: Optional[Dict[str, Set[str]]] = None,
+    rescored: Optional[Set[str]] = None,
+) -> None:
+    tokens: Set[str] = set()
+    patterns: List[Tuple[str, str]] = []
+    for source in moved:
+        for section in SOURCE_SECTIONS.get(source, ()):
+            keys = logged.get(section) if source == "ratings" and logged is not None else None
+            if keys is not None and not keys:
+                continue
+            new = section_digests(section, docs, keys=keys)
+            old = _stored_section(con, section, keys=keys)
+            changed = {k for k in set(new) | set(old) if new.get(k) != old.get(k)}
+            if not changed:
+                continue
+            stats["changed_keys"] += len(changed)
+            if section == "pattern":
+                for k in changed:
+                    for row in (old.get(k), new.get(k)):
+                        if row is not None:
+                            patterns.append((k, str(row[1] or "")))
+            else:
+                tokens |= _section_tokens(section, changed, docs)
+            if keys is None:
+                _write_section(con, section, new)
+            else:
+                _update_section(con, section, keys, new)
+
+    affected: Dict[str, Optional[dict[str, Any]]] = {}
+    if tokens:
+        con.execute("CREATE TEMP TABLE IF NOT EXISTS changed_tokens (token TEXT PRIMARY KEY)")
+        con.execute("DELETE FROM changed_tokens")
+        con.executemany("INSERT OR IGNORE INTO changed_tokens(token) VALUES(?)", ((t,) for t in tokens))
+        # CROSS JOIN pins the loop order: probe deps' primary key per changed token, never scan deps.
+        for r in con.execute(
+            "SELECT DISTINCT d.item_key FROM changed_tokens c CROSS JOIN deps d ON d.token = c.token"
+        ):
+            affected[str(r[0])] = None
+    if patterns:
+        for r in con.execute("SELECT item_key, workflow FROM pool WHERE workflow != ''"):
+            if any(_pattern_matches(str(r["workflow"]), k, gh) for k, gh in patterns):
+                affected[str(r["item_key"])] = None
+
+    orders: Dict[str, int] = {}
+    if "discovery" in moved:
+        discovery_doc = _load_json(inputs.discovery)
+        if not discovery_doc:
+            raise FileNotFoundError(f"discovery index missing: {inputs.discovery}")
+        stored = {str(r["item_key"]): str(r["item_digest"]) for r in con.execute("SELECT item_key, item_digest FROM pool")}
+        for ord_, (key, item) in enumerate(iter_pool_items(discovery_doc)):
+            orders[key] = ord_
+            if stored.pop(key, None) != _digest(item):
+                affected[key] = item
+        for key in stored:
+            affected.pop(key, None)
+            con.execute("DELETE FROM pool WHERE item_key = ?", (key,))
+            con.execute("DELETE FROM deps WHERE item_key = ?", (key,))
+        stats["removed"] += len(stored)
+        con.executemany("UPDATE pool SET ord = ? WHERE item_key = ?", ((o, k) for k, o in orders.items()))
+
+    for key, item in affected.items():
+        row = con.execute("SELECT ord, item_json, extension_json FROM pool WHERE item_key = ?", (key,)).fetchone()
+        if item is None:
+            if row is None:
+                continue
+            item = json.loads(row["item_json"])
+        _put_item(
+            con,
+            item_key=key,
+            ord_=orders.get(key, int(row["ord"]) if row is not None else 0),
+            item=item,
+            item_digest=_digest(item),
+            docs=docs,
+            extension_json=row["extension_json"] if row is not None else None,
+        )
+        stats["scored"] += 1
+        if rescored is not None:
+            rescored.add(key)
+
+
+def sync_rating_pool(
+    con: sqlite3.Connection, inputs: SamplerInputs, *, rescored: Optional[Set[str]] = None
+) -> Dict[str, Any]:
+    """
+    Bring the pool up to the current input versions; returns what was (re)scored.
+    ``rescored`` collects the item keys a delta sync rewrote.
+    """
+    stats: Dict[str, Any] = {
+        "rebuilt": False,
+        "moved": [],
+        "changed_keys": 0,
+        "scored": 0,
+        "removed": 0,
+        "ratings_log": False,
+    }
+    # Versions are read before the docs, so a write racing this sync moves them again.
+    versions = input_versions(inputs)
+    prev = _meta_versions(con)
+    if prev is not None and prev == versions:
+        return stats
+    rebuild = prev is None or any(prev.get(k) != versions[k] for k in REBUILD_VERSIONS)
+    moved = [s for s in DELTA_SOURCES if rebuild or prev.get(s) != versions[s]]
+    stats["moved"] = moved
+    docs, docs_seq = pool_sampler_docs(inputs, versions)
+    logged = None if rebuild or "ratings" not in moved else _ratings_log_keys(con, inputs, versions, docs_seq)
+    stats["ratings_log"] = logged is not None
+    with con:
+        if rebuild:
+            _rebuild(con, inputs, docs, stats)
+        else:
+            _apply_deltas(con, inputs, docs, moved, stats, logged=logged, rescored=rescored)
+        con.execute(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES('versions', ?)", (json.dumps(versions, sort_keys=True),)
+        )
+        if docs_seq is None:
+            con.execute("DELETE FROM meta WHERE key = 'ratings_change_seq'")
+        else:
+            con.execute("INSERT OR REPLACE INTO meta(key, value) VALUES('ratings_change_seq', ?)", (str(docs_seq),))
+        con.execute("INSERT OR REPLACE INTO meta(key, value) VALUES('synced_at', ?)", (utc_now(),))
+    return stats
+
+
+class PoolCandidate:
+    """
+    The selection fields of a pooled :class:`RatingCandidate` (what ``_pick_by_mode`` reads);
+    compares like the light dataclass it stands in for. :meth:`RatingPoolDraw.hydrate` swaps
+    picks for full candidates.
+    """
+
+    __slots__ = (
+        "item_key",
+        "relpath",
+        "group_id",
+        "predicted_score",
+        "heuristic_confidence",
+        "vision_recommended",
+        "mtime",
+        "session_bucket",
+    )
+
+    def __init__(
+        self,
+        item_key: str,
+        relpath: str,
+        group_id: str,
+        predicted_score: float,
+        heuristic_confidence: float,
+        vision_recommended: bool,
+        mtime: float,
+    ) -> None:
+        self.item_key = item_key
+        self.relpath = relpath
+        self.group_id = group_id
+        self.predicted_score = predicted_score
+        self.heuristic_confidence = heuristic_confidence
+        self.vision_recommended = vision_recommended
+        self.mtime = mtime
+        self.session_bucket = "middle"
+
+    def _fields(self) -> Tuple[Any, ...]:
+        return (
+            self.relpath,
+            self.group_id,
+            self.predicted_score,
+            self.heuristic_confidence,
+            self.vision_recommended,
+            self.mtime,
+            self.session_bucket,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PoolCandidate):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+# Light pool rows kept between draws: pool path -> (meta versions, rows in discovery order).
+_LIGHT_SQL = (
+    "SELECT item_key, needs_rating, item_group_id, relpath, group_id, predicted, confidence,"
+    " vision_recommended, mtime, hay FROM pool"
+)
+_LIGHT_ROWS: Dict[str, Tuple[str, List[Tuple[Any, ...]]]] = {}
+_LIGHT_ROWS_MAX = 4
+_LIGHT_LOCK = threading.Lock()
+
+
+def _light_row(r: sqlite3.Row) -> Tuple[Any, ...]:
+    return (
+        str(r["item_key"]),
+        bool(r["needs_rating"]),
+        str(r["item_group_id"]),
+        str(r["relpath"]),
+        str(r["group_id"]),
+        float(r["predicted"]),
+        float(r["confidence"]),
+        bool(r["vision_recommended"]),
+        float(r["mtime"]),
+        str(r["hay"]),
+    )
+
+
+def _raw_versions(con: sqlite3.Connection) -> str:
+    row = con.execute("SELECT value FROM meta WHERE key = 'versions'").fetchone()
+    return str(row[0]) if row is not None else ""
+
+
+def _light_rows(
+    con: sqlite3.Connection, path: str, before: str, after: str, rescored: Optional[Set[str]]
+) -> List[Tuple[Any, ...]]:
+    """
+    Light rows at pool version ``after``. A memo taken at ``before`` is patched with the
+    ``rescored`` keys (None: the sync rebuilt or re-ordered the pool, so read every row).
+    """
+    with _LIGHT_LOCK:
+        memo = _LIGHT_ROWS.get(path)
+    rows: Optional[List[Tuple[Any, ...]]] = None
+    if memo is not None and memo[0] == after:
+        return memo[1]
+    if memo is not None and memo[0] == before and rescored is not None:
+        rows = list(memo[1])
+        index = {r[0]: i for i, r in enumerate(rows)}
+        keys = sorted(rescored)
+        for i in range(0, len(keys), 500):
+            chunk = keys[i : i + 500]
+            marks = ",".join("?" * len(chunk))
+            for r in con.execute(f"{_LIGHT_SQL} WHERE item_key IN ({marks})", chunk):
+                pos = index.get(str(r["item_key"]))
+                if pos is None:
+                    rows = None
+                    break
+                rows[pos] = _light_row(r)
+            if rows is None:
+                break
+    if rows is None:
+        rows = [_light_row(r) for r in con.execute(f"{_LIGHT_SQL} ORDER BY ord")]
+    with _LIGHT_LOCK:
+        _LIGHT_ROWS.pop(path, None)
+        while len(_LIGHT_ROWS) >= _LIGHT_ROWS_MAX:
+            _LIGHT_ROWS.pop(next(iter(_LIGHT_ROWS)))
+        _LIGHT_ROWS[path] = (after, rows)
+    return rows
+
+
+class RatingPoolDraw:
+    """One ``sample_rating_queue`` draw against a synced pool."""
+
+    def __init__(
+        self,
+        con: sqlite3.Connection,
+        inputs: SamplerInputs,
+        stats: Dict[str, Any],
+        rows: Optional[List[Tuple[Any, ...]]] = None,
+    ) -> None:
+        self.con = con
+        self.inputs = inputs
+        self.stats = stats
+        self._rows = rows
+        self._keys: Dict[int, str] = {}
+
+    @classmethod
+    def open(cls, inputs: SamplerInputs, *, path: Optional[Path] = None) -> "RatingPoolDraw":
+        pool_path = path or default_rating_pool_path(inputs.og_root)
+        con = open_rating_pool(pool_path)
+        try:
+            before = _raw_versions(con)
+            rescored: Set[str] = set()
+            stats = sync_rating_pool(con, inputs, rescored=rescored)
+            patchable = not stats["rebuilt"] and "discovery" not in stats["moved"]
+            rows = _light_rows(con, str(pool_path), before, _raw_versions(con), rescored if patchable else None)
+        except Exception:
+            con.close()
+            raise
+        return cls(con, inputs, stats, rows)
+
+    def close(self) -> None:
+        self.con.close()
+
+    def candidates(
+        self,
+        *,
+        include_done: bool,
+        query: Optional[str],
+        presented: Set[str],
+        min_predicted: float,
+    ) -> Tuple[int, List[RatingCandidate]]:
+        """
+        ``(needs_rating, candidates)`` exactly as the uncached pool builds them, in discovery
+        order. Candidates are :class:`PoolCandidate` (the fields selection reads); :meth:`hydrate`
+        the picks.
+        """
+        rows = self._rows
+        if rows is None:
+            rows = [_light_row(r) for r in self.con.execute(f"{_LIGHT_SQL} ORDER BY ord")]
+        q = str(query or "").strip()
+        n_needs = 0
+        out: List[PoolCandidate] = []
+        for key, needs, gid, relpath, group_id, predicted, confidence, vision, mtime, hay in rows:
+            if not (include_done or needs):
+                continue
+            if q and not _hay_matches_query(hay, q):
+                continue
+            n_needs += 1
+            if gid and gid in presented:
+                continue
+            if predicted < min_predicted:
+                continue
+            out.append(PoolCandidate(key, relpath, group_id, predicted, confidence, vision, mtime))
+        self.stats["pool_candidates"] = len(out)
+        return n_needs, out  # type: ignore[return-value]
+
+    def hydrate(self, picked: List[RatingCandidate]) -> List[RatingCandidate]:
+        """Full candidates (with cached extension ranges) for picks, keeping their session bucket."""
+        keys = [c.item_key if isinstance(c, PoolCandidate) else self._keys[id(c)] for c in picked]
+        rows: Dict[str, sqlite3.Row] = {}
+        for i in range(0, len(keys), 500):
+            chunk = keys[i : i + 500]
+            marks = ",".join("?" * len(chunk))
+            for r in self.con.execute(
+                f"SELECT item_key, candidate_json, extension_json FROM pool WHERE item_key IN ({marks})", chunk
+            ):
+                rows[str(r["item_key"])] = r
+        out: List[RatingCandidate] = []
+        for light, key in zip(picked, keys):
+            row = rows[key]
+            cand = RatingCandidate(**json.loads(row["candidate_json"]))
+            cand.session_bucket = light.session_bucket
+            if row["extension_json"]:
+                cand.extension_range = json.loads(row["extension_json"])
+            self._keys[id(cand)] = key
+            out.append(cand)
+        return out
+
+    def enrich_extension_ranges(self, picked: List[RatingCandidate], *, data_root: Path) -> int:
+        """Look up ranges the pool lacks for ``picked`` and cache the ones found."""
+        missing = [c for c in picked if not c.extension_range]
+        if not missing:
+            return 0
+        og_root = self.inputs.og_root
+        n = enrich_candidates_extension_ranges(
+            missing,
+            data_root=data_root,
+            og_root=og_root,
+            output_root=og_root.parent if og_root.name == "og" else None,
+        )
+        found = [(json.dumps(c.extension_range), self._keys[id(c)]) for c in missing if c.extension_range]
+        if found:
+            with self.con:
+                self.con.executemany("UPDATE pool SET extension_json = ? WHERE item_key = ?", found)
+        return n
+
+
+def verify_rating_pool(con: sqlite3.Connection, inputs: SamplerInputs) -> List[str]:
+    """Item keys whose pooled candidate / flag / order differ from a fresh score."""
+    sync_rating_pool(con, inputs)
+    docs = load_sampler_docs(inputs)
+    discovery_doc = _load_json(inputs.discovery) or {}
+    stored = {
+        str(r["item_key"]): r for r in con.execute("SELECT item_key, ord, needs_rating, candidate_json FROM pool")
+    }
+    diffs: List[str] = []
+    for ord_, (key, item) in enumerate(iter_pool_items(discovery_doc)):
+        row = stored.pop(key, None)
+        fresh = json.dumps(asdict(docs.score(item)), ensure_ascii=False)
+        if (
+            row is None
+            or int(row["ord"]) != ord_
+            or bool(row["needs_rating"]) != docs.needs_rating(item)
+            or row["candidate_json"] != fresh
+        ):
+            diffs.append(key)
+    diffs.extend(stored)
+    return diffs
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Rating-sampler scored candidate pool")
+    ap.add_argument("cmd", choices=("sync", "verify"))
+    ap.add_argument("--root", type=Path, required=True, help="og/ library root")
+    ap.add_argument("--discovery-index", type=Path, default=None)
+    ap.add_argument("--pool", type=Path, default=None, help=f"Pool SQLite (default: <og>/../_status/{RATING_POOL_BASENAME})")
+    args = ap.parse_args()
+    inputs = sampler_inputs(args.root, discovery_index=args.discovery_index)
+    con = open_rating_pool(args.pool or default_rating_pool_path(inputs.og_root))
+    try:
+        if args.cmd == "sync":
+            stats = sync_rating_pool(con, inputs)
+            stats["items"] = con.execute("SELECT COUNT(*) FROM pool").fetchone()[0]
+            stats["needs_rating"] = con.execute("SELECT COUNT(*) FROM pool WHERE needs_rating = 1").fetchone()[0]
+            print(json.dumps(stats, indent=2))
+            return 0
+        diffs = verify_rating_pool(con, inputs)
+        print(json.dumps({"ok": not diffs, "diffs": len(diffs), "sample": diffs[:20]}, indent=2))
+        return 1 if diffs else 0
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -20,6 +20,7 @@ from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from correlate_output_ratings import parse_xmp_rating
+from discovery_lineage_store import lineage_edges_exist
 from shape_factory_heuristics import (
     LineageGraph,
     _og_group_id_from_relpath,
@@ -228,12 +229,9 @@ def normalize_selection_mode(raw: Optional[str]) -> str:
     return "mixed"
 
 
-def _item_matches_query(item: dict[str, Any], query: str) -> bool:
-    q = str(query or "").strip().lower()
-    if not q:
-        return True
+def _item_search_hay(item: dict[str, Any]) -> str:
     rel = str(item.get("relpath") or "").replace("\\", "/")
-    hay = " ".join(
+    return " ".join(
         [
             rel,
             Path(rel).name,
@@ -242,9 +240,20 @@ def _item_matches_query(item: dict[str, Any], query: str) -> bool:
             " ".join(str(t) for t in (item.get("tags") or []) if str(t).strip()),
         ]
     ).lower()
+
+
+def _hay_matches_query(hay: str, query: str) -> bool:
+    q = str(query or "").strip().lower()
     return all(tok in hay for tok in q.split())
 
 
+def _item_matches_query(item: dict[str, Any], query: str) -> bool:
+    q = str(query or "").strip().lower()
+    if not q:
+        return True
+    return _hay_matches_query(_item_search_hay(item), q)
+
+
 def _discovery_href(relpath: str) -> str:
     norm = relpath.strip().replace("\\", "/").lstrip("/")
     return f"/discovery?relpath={norm}" if norm else "/discovery"
@@ -456,8 +465,8 @@ def _sibling_keeper_boost(
     """Unrated item shares a parent with an explicitly highly rated sibling."""
     boost = 0.0
     evidence: List[str] = []
-    for parent in lineage.parents_of.get(group_id, []):
-        siblings = lineage.children_of.get(parent, [])
+    for parent in lineage.parents(group_id):
+        siblings = lineage.children(parent)
         rated_high = [rated_by_gid[s] for s in siblings if s != group_id and rated_by_gid.get(s, 0) >= 4]
         if not rated_high:
             continue
@@ -531,7 +540,7 @@ def score_unrated_candidate(
             signals["lineage"] = lineage_score
 
     parent_uplift = 0.0
-    for parent in lineage.parents_of.get(group_id, []):
+    for parent in lineage.parents(group_id):
         row = by_lineage.get(parent) if isinstance(by_lineage, dict) else None
         if isinstance(row, dict) and row.get("inferred") is not None:
             val = float(row["inferred"])
@@ -560,7 +569,7 @@ def score_unrated_candidate(
     if ratings_doc:
         by_source = ratings_doc.get("by_source_basename") or {}
         # Use lineage parent basename hints when available
-        for parent in lineage.parents_of.get(group_id, []):
+        for parent in lineage.parents(group_id):
             bn = parent.split(":")[-1] if ":" in parent else parent
             for gid in _source_group_ids(bn):
                 _ = gid
@@ -1003,6 +1012,15 @@ def collect_needs_triage_video_items(
     return out
 
 
+def is_rate_queue_video(item: Any, *, library: str = "og") -> bool:
+    """Discovery item that can enter the rate queue at all (an ``.mp4`` in ``library``)."""
+    if not isinstance(item, dict):
+        return False
+    if str(item.get("library") or "") != library:
+        return False
+    return str(item.get("relpath") or "").lower().endswith(".mp4")
+
+
 def collect_needs_rating_video_items(
     discovery_doc: dict[str, Any],
     *,
@@ -1021,12 +1039,7 @@ def collect_needs_rating_video_items(
     out: List[dict[str, Any]] = []
     q = str(query or "").strip()
     for item in items:
-        if not isinstance(item, dict):
-            continue
-        if str(item.get("library") or "") != library:
-            continue
-        rel = str(item.get("relpath") or "")
-        if not rel.lower().endswith(".mp4"):
+        if not is_rate_queue_video(item, library=library):
             continue
         if not include_done:
             if not needs_rating_item(
@@ -1072,6 +1085,160 @@ def collect_unrated_video_items(
     )
 
 
+@dataclass(frozen=True)
+class SamplerInputs:
+    """Index files a rate-queue session is scored from."""
+
+    og_root: Path
+    discovery: Path
+    ratings: Path
+    heuristics: Path
+    lineage: Path
+    vision: Path
+    appetite: Path
+    disposition: Path
+    triage: Path
+    tags: Path
+
+
+def sampler_inputs(
+    og_root: Path,
+    *,
+    discovery_index: Optional[Path] = None,
+    ratings_index: Optional[Path] = None,
+    heuristics_index: Optional[Path] = None,
+    lineage_edges: Optional[Path] = None,
+    vision_scores: Optional[Path] = None,
+) -> SamplerInputs:
+    og_root = og_root.expanduser().resolve()
+    return SamplerInputs(
+        og_root=og_root,
+        discovery=(discovery_index or default_discovery_index_path(og_root)).resolve(),
+        ratings=(ratings_index or default_ratings_index_path(og_root)).resolve(),
+        heuristics=(heuristics_index or default_heuristics_index_path(og_root)).resolve(),
+        lineage=(lineage_edges or default_lineage_edges_path(og_root)).resolve(),
+        vision=(vision_scores or default_vision_scores_path(og_root)).resolve(),
+        appetite=default_appetite_index_path(og_root),
+        disposition=default_disposition_index_path(og_root),
+        triage=default_triage_index_path(og_root),
+        tags=og_root.parent / "_status" / "asset_tags.json",
+    )
+
+
+@dataclass
+class SamplerDocs:
+    """Loaded scoring inputs (everything but the discovery index)."""
+
+    ratings_doc: Optional[dict[str, Any]]
+    heuristics_doc: Optional[dict[str, Any]]
+    appetite_doc: Optional[dict[str, Any]]
+    disposition_doc: Optional[dict[str, Any]]
+    triage_doc: Optional[dict[str, Any]]
+    tags_doc: Optional[dict[str, Any]]
+    lineage: LineageGraph
+    vision_table: dict[str, Any]
+    rated_keys: Set[str]
+    rated_by_gid: Dict[str, int]
+
+    def needs_rating(self, item: dict[str, Any]) -> bool:
+        return needs_rating_item(
+            item,
+            ratings_doc=self.ratings_doc,
+            appetite_doc=self.appetite_doc,
+            disposition_doc=self.disposition_doc,
+            rated_keys=self.rated_keys,
+        )
+
+    def score(self, item: dict[str, Any]) -> RatingCandidate:
+        return score_unrated_candidate(
+            item,
+            lineage=self.lineage,
+            heuristics_doc=self.heuristics_doc,
+            ratings_doc=self.ratings_doc,
+            rated_by_gid=self.rated_by_gid,
+            vision_scores=self.vision_table,
+            appetite_doc=self.appetite_doc,
+            disposition_doc=self.disposition_doc,
+            triage_doc=self.triage_doc,
+            tags_doc=self.tags_doc,
+        )
+
+
+def load_sampler_docs(inputs: SamplerInputs) -> SamplerDocs:
+    ratings_db = ratings_db_path_for_index(inputs.ratings)
+    ratings_doc = load_ratings_doc(inputs.ratings) if (inputs.ratings.is_file() or ratings_db.is_file()) else None
+    appetite_db = ratings_db_path_for_index(inputs.appetite)
+    appetite_doc = (
+        load_appetite_doc(inputs.appetite) if (inputs.appetite.is_file() or appetite_db.is_file()) else None
+    )
+    return SamplerDocs(
+        ratings_doc=ratings_doc,
+        heuristics_doc=_load_json(inputs.heuristics),
+        appetite_doc=appetite_doc,
+        disposition_doc=_load_json(inputs.disposition),
+        triage_doc=_load_json(inputs.triage),
+        tags_doc=_load_json(inputs.tags),
+        lineage=LineageGraph.load(inputs.lineage),
+        vision_table=_load_vision_scores(inputs.vision),
+        rated_keys=_rated_output_keys(ratings_doc),
+        rated_by_gid=_build_rated_by_gid(ratings_doc),
+    )
+
+
+def _rating_pool_enabled() -> bool:
+    import os
+
+    raw = os.environ.get("RATING_SAMPLER_POOL", "").strip().lower()
+    return raw not in {"off", "0", "none", "false"}
+
+
+def _guess_data_root(og_root: Path) -> Path:
+    from shape_factory_map import resolve_shape_factory_data_root  # type: ignore
+
+    # og_root is typically <data>/output/og — walk up for a repo that owns .data
+    repo_guess = og_root
+    for _ in range(6):
+        if (repo_guess / ".data" / "shape_factory" / "jobs").is_dir() or (repo_guess / "shape_factory" / "jobs").is_dir():
+            break
+        if repo_guess.parent == repo_guess:
+            break
+        repo_guess = repo_guess.parent
+    return resolve_shape_factory_data_root(repo_root=repo_guess)
+
+
+def _scored_candidates(
+    inputs: SamplerInputs,
+    discovery_doc: dict[str, Any],
+    *,
+    include_done: bool,
+    pool_query: Optional[str],
+    presented: Set[str],
+    effective_min: float,
+) -> Tuple[int, List[RatingCandidate]]:
+    """Uncached pool: filter and score every discovery item (``(needs_rating, candidates)``)."""
+    docs = load_sampler_docs(inputs)
+    needs_rating = collect_unrated_video_items(
+        discovery_doc,
+        rated_keys=docs.rated_keys,
+        ratings_doc=docs.ratings_doc,
+        og_root=inputs.og_root,
+        disposition_doc=docs.disposition_doc,
+        triage_doc=docs.triage_doc,
+        appetite_doc=docs.appetite_doc,
+        include_done=include_done,
+        query=pool_query,
+    )
+    candidates: List[RatingCandidate] = []
+    for item in needs_rating:
+        gid = str(item.get("group_id") or "")
+        if gid and gid in presented:
+            continue
+        cand = docs.score(item)
+        if cand.predicted_score >= effective_min:
+            candidates.append(cand)
+    return len(needs_rating), candidates
+
+
 def sample_rating_queue(
     *,
     og_root: Path,
@@ -1088,13 +1255,25 @@ def sample_rating_queue(
     mode: str = "mixed",
     query: Optional[str] = None,
     include_done: bool = False,
+    use_pool: Optional[bool] = None,
 ) -> dict[str, Any]:
+    """
+    Score the rate-queue pool and draw one session from it.
+
+    Candidates come from the persisted scored pool (``rating_sampler_pool.sqlite``, see
+    :mod:`shape_factory_rating_pool`), which re-scores only items touched by discovery /
+    rating / heuristics changes since the last draw. ``RATING_SAMPLER_POOL=off`` (or
+    ``use_pool=False``) scores every discovery item; a pool error falls back to that.
+    """
     og_root = og_root.expanduser().resolve()
-    discovery_path = (discovery_index or default_discovery_index_path(og_root)).resolve()
-    ratings_path = (ratings_index or default_ratings_index_path(og_root)).resolve()
-    heuristics_path = (heuristics_index or default_heuristics_index_path(og_root)).resolve()
-    lineage_path = (lineage_edges or default_lineage_edges_path(og_root)).resolve()
-    vision_path = (vision_scores or default_vision_scores_path(og_root)).resolve()
+    inputs = sampler_inputs(
+        og_root,
+        discovery_index=discovery_index,
+        ratings_index=ratings_index,
+        heuristics_index=heuristics_index,
+        lineage_edges=lineage_edges,
+        vision_scores=vision_scores,
+    )
     state_path = (sampler_state or default_sampler_state_path(og_root)).resolve()
 
     selection_mode = normalize_selection_mode(mode)
@@ -1102,29 +1281,6 @@ def sample_rating_queue(
     # Score floor only applies to the stratified mix; other modes want the full pool.
     effective_min = float(min_predicted) if selection_mode == "mixed" else 0.0
 
-    discovery_doc = _load_json(discovery_path)
-    if not discovery_doc:
-        return {"ok": False, "error": "discovery_index_missing", "path": str(discovery_path)}
-
-    ratings_db = ratings_db_path_for_index(ratings_path)
-    ratings_doc = load_ratings_doc(ratings_path) if (ratings_path.is_file() or ratings_db.is_file()) else None
-    heuristics_doc = _load_json(heuristics_path)
-    appetite_path = default_appetite_index_path(og_root)
-    appetite_db = ratings_db_path_for_index(appetite_path)
-    appetite_doc = (
-        load_appetite_doc(appetite_path) if (appetite_path.is_file() or appetite_db.is_file()) else None
-    )
-    disposition_path = default_disposition_index_path(og_root)
-    disposition_doc = _load_json(disposition_path)
-    triage_path = default_triage_index_path(og_root)
-    triage_doc = _load_json(triage_path)
-    tags_path = og_root.parent / "_status" / "asset_tags.json"
-    tags_doc = _load_json(tags_path)
-    lineage = LineageGraph.load(lineage_path)
-    vision_table = _load_vision_scores(vision_path)
-    rated_keys = _rated_output_keys(ratings_doc)
-    rated_by_gid = _build_rated_by_gid(ratings_doc)
-
     presented: Set[str] = set()
     if exclude_presented:
         state = _load_json(state_path) or {}
@@ -1133,36 +1289,37 @@ def sample_rating_queue(
                 presented.add(gid)
 
     pool_query = query_s if selection_mode == "search" else None
-    needs_rating = collect_unrated_video_items(
-        discovery_doc,
-        rated_keys=rated_keys,
-        ratings_doc=ratings_doc,
-        og_root=og_root,
-        disposition_doc=disposition_doc,
-        triage_doc=triage_doc,
-        appetite_doc=appetite_doc,
-        include_done=include_done,
-        query=pool_query,
-    )
-    candidates: List[RatingCandidate] = []
-    for item in needs_rating:
-        gid = str(item.get("group_id") or "")
-        if exclude_presented and gid and gid in presented:
-            continue
-        cand = score_unrated_candidate(
-            item,
-            lineage=lineage,
-            heuristics_doc=heuristics_doc,
-            ratings_doc=ratings_doc,
-            rated_by_gid=rated_by_gid,
-            vision_scores=vision_table,
-            appetite_doc=appetite_doc,
-            disposition_doc=disposition_doc,
-            triage_doc=triage_doc,
-            tags_doc=tags_doc,
+    if use_pool is None:
+        use_pool = _rating_pool_enabled()
+    pool = None
+    if use_pool and inputs.discovery.is_file():
+        try:
+            from shape_factory_rating_pool import RatingPoolDraw
+
+            pool = RatingPoolDraw.open(inputs)
+            n_needs, candidates = pool.candidates(
+                include_done=include_done,
+                query=pool_query,
+                presented=presented,
+                min_predicted=effective_min,
+            )
+        except Exception as exc:
+            print(f"  rating_pool_warn: {exc}", file=__import__("sys").stderr)
+            if pool is not None:
+                pool.close()
+            pool = None
+    if pool is None:
+        discovery_doc = _load_json(inputs.discovery)
+        if not discovery_doc:
+            return {"ok": False, "error": "discovery_index_missing", "path": str(inputs.discovery)}
+        n_needs, candidates = _scored_candidates(
+            inputs,
+            discovery_doc,
+            include_done=include_done,
+            pool_query=pool_query,
+            presented=presented,
+            effective_min=effective_min,
         )
-        if cand.predicted_score >= effective_min:
-            candidates.append(cand)
 
     session_mix = _session_mix_from_env()
     picked = _pick_by_mode(
@@ -1173,6 +1330,20 @@ def sample_rating_queue(
         mix=session_mix,
         query=query_s,
     )
+    pool_stats: Optional[Dict[str, Any]] = None
+    ranges_enriched = False
+    if pool is not None:
+        try:
+            picked = pool.hydrate(picked)
+            # Cached ranges ride along; look up only the picks the pool has none for.
+            try:
+                pool.enrich_extension_ranges(picked, data_root=_guess_data_root(og_root))
+                ranges_enriched = True
+            except Exception:
+                pass
+            pool_stats = pool.stats
+        finally:
+            pool.close()
 
     bucket_counts = defaultdict(int)
     for c in picked:
@@ -1208,9 +1379,9 @@ def sample_rating_queue(
             "seed": int(seed),
         },
         "stats": {
-            "needs_rating_videos": len(needs_rating),
-            "needs_triage_videos": len(needs_rating),
-            "unrated_videos": len(needs_rating),
+            "needs_rating_videos": n_needs,
+            "needs_triage_videos": n_needs,
+            "unrated_videos": n_needs,
             "scored_pool": len(candidates),
             "selected": len(picked),
             "bucket_easy_down": bucket_counts.get("easy_down", 0),
@@ -1220,42 +1391,35 @@ def sample_rating_queue(
             "vision_priority_shortlist": len(vision_queue),
         },
         "inputs": {
-            "discovery_index": str(discovery_path),
-            "ratings_index": str(ratings_path) if ratings_path.is_file() else None,
-            "heuristics_index": str(heuristics_path) if heuristics_path.is_file() else None,
-            "lineage_edges": str(lineage_path) if lineage_path.is_file() else None,
-            "vision_scores": str(vision_path) if vision_path.is_file() else None,
-            "appetite_index": str(appetite_path) if appetite_path.is_file() else None,
-            "disposition_index": str(disposition_path) if disposition_path.is_file() else None,
-            "triage_index": str(triage_path) if triage_path.is_file() else None,
-            "asset_tags": str(tags_path) if tags_path.is_file() else None,
+            "discovery_index": str(inputs.discovery),
+            "ratings_index": str(inputs.ratings) if inputs.ratings.is_file() else None,
+            "heuristics_index": str(inputs.heuristics) if inputs.heuristics.is_file() else None,
+            "lineage_edges": str(inputs.lineage) if lineage_edges_exist(inputs.lineage) else None,
+            "vision_scores": str(inputs.vision) if inputs.vision.is_file() else None,
+            "appetite_index": str(inputs.appetite) if inputs.appetite.is_file() else None,
+            "disposition_index": str(inputs.disposition) if inputs.disposition.is_file() else None,
+            "triage_index": str(inputs.triage) if inputs.triage.is_file() else None,
+            "asset_tags": str(inputs.tags) if inputs.tags.is_file() else None,
         },
+        "candidate_pool": pool_stats,
         "candidates": [c.to_dict() for c in picked],
         "vision_priority": [c.to_dict() for c in vision_queue],
         "next_steps": next_steps,
     }
     # Best-effort: attach origin/generated band inputs for the rate scrubber.
-    try:
-        from shape_factory_map import resolve_shape_factory_data_root  # type: ignore
-
-        # og_root is typically <data>/output/og — walk up for a repo that owns .data
-        repo_guess = og_root
-        for _ in range(6):
-            if (repo_guess / ".data" / "shape_factory" / "jobs").is_dir() or (repo_guess / "shape_factory" / "jobs").is_dir():
-                break
-            if repo_guess.parent == repo_guess:
-                break
-            repo_guess = repo_guess.parent
-        data_root = resolve_shape_factory_data_root(repo_root=repo_guess)
-        out_root = og_root.parent if og_root.name == "og" else None
-        enrich_session_extension_ranges(
-            session,
-            data_root=data_root,
-            og_root=og_root,
-            output_root=out_root,
-        )
-    except Exception:
-        pass
+    if not ranges_enriched:
+        try:
+            out_root = og_root.parent if og_root.name == "og" else None
+            enrich_session_extension_ranges(
+                session,
+                data_root=_guess_data_root(og_root),
+                og_root=og_root,
+                output_root=out_root,
+            )
+            ranges_enriched = True
+        except Exception:
+            pass
+    session["extension_ranges_enriched"] = ranges_enriched
     return session
 
 
@@ -14,14 +14,17 @@ from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from correlate_output_ratings import extract_workflow_png, iter_rated_og_records, normalize_source_basename
+from xmp_catalog import ensure_xmp_catalog, record_xmp
+from discovery_lineage_store import lineage_edges_exist, load_lineage_edges
+from lineage_csr import LineageCSR
 from snowflake_inventory import graph_fingerprint, is_litegraph_workflow
 
 RATINGS_SCHEMA_VERSION = 1
 APPETITE_SCHEMA_VERSION = 1
-RATINGS_DB_SCHEMA_VERSION = 1
+RATINGS_DB_SCHEMA_VERSION = 5
 RATINGS_DB_FILENAME = "ratings.sqlite"
 
 # Appetite ("do more WITH this") is a second, direction axis distinct from the
@@ -207,10 +210,10 @@ def lineage_edge_weight(evidence: str) -> float:
 def default_lineage_edges_path(data_root: Path) -> Path:
     data_root = data_root.expanduser().resolve()
     primary = data_root / "output" / "_status" / "discovery_lineage_edges.json"
-    if primary.is_file():
+    if lineage_edges_exist(primary):
         return primary
     nested = data_root / "output" / "output" / "_status" / "discovery_lineage_edges.json"
-    return nested if nested.is_file() else primary
+    return nested if lineage_edges_exist(nested) else primary
 
 
 def _lineage_group_stem(group_id: str) -> str:
@@ -225,18 +228,9 @@ def _lineage_stem_from_path(path_like: str) -> str:
 
 
 def load_lineage_parent_index(edges_path: Path) -> Dict[str, List[Dict[str, Any]]]:
-    """Map child stem → parent candidates with edge weights."""
+    """Map child stem → parent candidates with edge weights (lineage edge store beside ``edges_path``)."""
     out: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-    if not edges_path.is_file():
-        return out
-    try:
-        doc = json.loads(edges_path.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError):
-        return out
-    edges = doc.get("edges") if isinstance(doc, dict) else doc
-    if not isinstance(edges, list):
-        return out
-    for edge in edges:
+    for edge in load_lineage_edges(edges_path):
         if not isinstance(edge, dict):
             continue
         child = _lineage_group_stem(str(edge.get("child_group_id") or ""))
@@ -259,6 +253,17 @@ def load_lineage_parent_index(edges_path: Path) -> Dict[str, List[Dict[str, Any]
     return out
 
 
+def lineage_csr_from_parent_index(parent_index: Dict[str, List[Dict[str, Any]]]) -> LineageCSR:
+    """CSR over child stem → ``parent_stem`` with the parent-index entries as edge payloads."""
+    pairs: List[Tuple[str, str]] = []
+    payloads: List[Dict[str, Any]] = []
+    for child, parents in parent_index.items():
+        for edge in parents:
+            pairs.append((child, str(edge["parent_stem"])))
+            payloads.append(edge)
+    return LineageCSR.from_pairs(pairs, edges=payloads)
+
+
 def apply_lineage_uplift(
     *,
     rated_outputs: List[Dict[str, Any]],
@@ -267,12 +272,20 @@ def apply_lineage_uplift(
     source_contributors: Dict[str, List[Dict[str, Any]]],
     max_hops: int = LINEAGE_MAX_HOPS,
     max_contributors: int = 48,
+    credits: Optional[List[Dict[str, Any]]] = None,
 ) -> Dict[str, Any]:
-    """Propagate usable explicit stars upstream along lineage edges (≤ max_hops)."""
+    """
+    Propagate usable explicit stars upstream along lineage edges (≤ max_hops).
+
+    ``credits`` (optional) receives every credit, uncapped, for the materialized
+    aggregates in ratings.sqlite.
+    """
     stats = {"lineage_edges_children": len(parent_index), "lineage_credits": 0, "lineage_sources_touched": 0}
     if not parent_index or not rated_outputs:
         return stats
     touched: set[str] = set()
+    graph = lineage_csr_from_parent_index(parent_index)
+    edges = graph.edges
 
     for rec in rated_outputs:
         rating = int(rec["rating"])
@@ -285,42 +298,51 @@ def apply_lineage_uplift(
             continue
         already = {str(bn) for bn in (rec.get("source_basenames") or []) if bn}
 
-        # BFS: (stem, path_weight, hop)
-        queue: List[Tuple[str, float, int]] = [(child_stem, 1.0, 0)]
-        seen_stems: set[str] = {child_stem}
-        while queue:
-            stem, path_w, hop = queue.pop(0)
-            if hop >= max_hops:
+        start = graph.ids.get(child_stem)
+        if start is None:
+            continue
+        # BFS over parent stems; a stem's path weight is fixed when it is first reached.
+        path_w_by_node: Dict[int, float] = {start: 1.0}
+        for src, edge_i, dst, hop, new in graph.walk(start, max_depth=max_hops):
+            edge = edges[edge_i]
+            path_w = path_w_by_node[src]
+            edge_w = float(edge["weight"])
+            if new:
+                path_w_by_node[dst] = path_w * edge_w
+            credit_w = path_w * edge_w * (LINEAGE_HOP_DECAY ** hop)
+            if credit_w <= 0:
                 continue
-            for edge in parent_index.get(stem) or []:
-                parent_stem = str(edge["parent_stem"])
-                parent_bn = str(edge["parent_basename"])
-                edge_w = float(edge["weight"])
-                credit_w = path_w * edge_w * (LINEAGE_HOP_DECAY ** hop)
-                if credit_w <= 0:
-                    continue
-                if parent_bn not in already:
-                    by_source_basename[parent_bn].add(rating, weight=credit_w)
-                    touched.add(parent_bn)
-                    stats["lineage_credits"] += 1
-                    arr = source_contributors[parent_bn]
-                    if len(arr) < max_contributors:
-                        arr.append(
-                            {
-                                "output_discovery_key": discovery_key,
-                                "rating": rating,
-                                "via_source": "lineage",
-                                "evidence": {
-                                    "source": "lineage",
-                                    "hop": hop + 1,
-                                    "weight": round(credit_w, 4),
-                                    "edge_evidence": edge.get("evidence"),
-                                },
-                            }
-                        )
-                if parent_stem not in seen_stems:
-                    seen_stems.add(parent_stem)
-                    queue.append((parent_stem, path_w * edge_w, hop + 1))
+            parent_bn = str(edge["parent_basename"])
+            if parent_bn not in already:
+                by_source_basename[parent_bn].add(rating, weight=credit_w)
+                touched.add(parent_bn)
+                stats["lineage_credits"] += 1
+                evidence = {
+                    "source": "lineage",
+                    "hop": hop + 1,
+                    "weight": round(credit_w, 4),
+                    "edge_evidence": edge.get("evidence"),
+                }
+                if credits is not None:
+                    credits.append(
+                        {
+                            "asset_key": discovery_key,
+                            "basename": parent_bn,
+                            "rating": rating,
+                            "weight": credit_w,
+                            "evidence": evidence,
+                        }
+                    )
+                arr = source_contributors[parent_bn]
+                if len(arr) < max_contributors:
+                    arr.append(
+                        {
+                            "output_discovery_key": discovery_key,
+                            "rating": rating,
+                            "via_source": "lineage",
+                            "evidence": evidence,
+                        }
+                    )
 
     stats["lineage_sources_touched"] = len(touched)
     return stats
@@ -451,32 +473,36 @@ def build_job_output_index(jobs_root: Path, data_root: Path) -> Dict[str, Dict[s
         if not isinstance(job, dict):
             continue
         meta = _job_meta_from(job)
-        paths: List[str] = []
-
-        submit = job.get("submit")
-        if isinstance(submit, dict):
-            outputs = submit.get("outputs")
-            if isinstance(outputs, list):
-                paths.extend(str(p) for p in outputs if p)
-
-        deposit = job.get("deposit")
-        if isinstance(deposit, dict):
-            videos = deposit.get("videos")
-            if isinstance(videos, list):
-                paths.extend(str(p) for p in videos if p)
-
-        prefix = str(job.get("output_prefix") or "").strip()
-        if prefix:
-            paths.append(prefix)
-
-        for raw in paths:
-            for key in _norm_path_key(raw, data_root):
-                index.setdefault(key, meta)
+        for key in _job_output_keys(job, data_root):
+            index.setdefault(key, meta)
     return index
 
 
-def _graph_hash_for_record(rec: Dict[str, Any], job_index: Dict[str, Dict[str, Any]], data_root: Path) -> Tuple[Optional[str], Optional[str], bool]:
-    """Return (graph_hash, shape_recipe, from_job)."""
+def _job_output_keys(job: Dict[str, Any], data_root: Path) -> List[str]:
+    """Normalized lookup keys for a job's outputs (submit outputs, deposit videos, output prefix)."""
+    paths: List[str] = []
+
+    submit = job.get("submit")
+    if isinstance(submit, dict):
+        outputs = submit.get("outputs")
+        if isinstance(outputs, list):
+            paths.extend(str(p) for p in outputs if p)
+
+    deposit = job.get("deposit")
+    if isinstance(deposit, dict):
+        videos = deposit.get("videos")
+        if isinstance(videos, list):
+            paths.extend(str(p) for p in videos if p)
+
+    prefix = str(job.get("output_prefix") or "").strip()
+    if prefix:
+        paths.append(prefix)
+
+    return [key for raw in paths for key in _norm_path_key(raw, data_root)]
+
+
+def _record_lookup_keys(rec: Dict[str, Any], data_root: Path) -> List[str]:
+    """Job-index lookup keys for a rated record (output keys + sibling .mp4 / .png paths)."""
     lookup_keys: List[str] = []
     for key_name in ("output_discovery_key", "output_short_key"):
         lookup_keys.extend(_norm_path_key(str(rec.get(key_name) or ""), data_root))
@@ -484,17 +510,28 @@ def _graph_hash_for_record(rec: Dict[str, Any], job_index: Dict[str, Dict[str, A
     if xmp_path.is_file():
         for ext in (".mp4", ".png"):
             lookup_keys.extend(_norm_path_key(str(xmp_path.with_suffix(ext)), data_root))
+    return lookup_keys
+
 
-    meta = _lookup_job_meta(lookup_keys, job_index)
+def _png_workflow_graph_hash(xmp_path: Path) -> Optional[str]:
+    """Litegraph fingerprint of the sibling PNG's embedded workflow (job-less fallback)."""
+    if not xmp_path.is_file():
+        return None
+    wf = extract_workflow_png(xmp_path.with_suffix(".png"))
+    if wf and is_litegraph_workflow(wf):
+        return graph_fingerprint(wf) or None
+    return None
+
+
+def _graph_hash_for_record(rec: Dict[str, Any], job_index: Dict[str, Dict[str, Any]], data_root: Path) -> Tuple[Optional[str], Optional[str], bool]:
+    """Return (graph_hash, shape_recipe, from_job)."""
+    meta = _lookup_job_meta(_record_lookup_keys(rec, data_root), job_index)
     if meta and meta.get("graph_hash"):
         return str(meta["graph_hash"]), meta.get("shape_recipe"), True
 
-    if xmp_path.is_file():
-        wf = extract_workflow_png(xmp_path.with_suffix(".png"))
-        if wf and is_litegraph_workflow(wf):
-            gh = graph_fingerprint(wf)
-            if gh:
-                return gh, None, False
+    gh = _png_workflow_graph_hash(Path(str(rec.get("xmp_path") or "")))
+    if gh:
+        return gh, None, False
     return None, None, False
 
 
@@ -506,45 +543,41 @@ def _lookup_job_meta(path_keys: Iterable[str], job_index: Dict[str, Dict[str, An
     return None
 
 
-def build_ratings_index(
-    *,
-    og_root: Path,
-    jobs_root: Path,
-    data_root: Path,
-    out_path: Path,
-    name_glob: str = "*.XMP",
-    days: int = 0,
-    ffprobe: Optional[str] = None,
-    join_lineage: bool = True,
-    lineage_edges_path: Optional[Path] = None,
-) -> Dict[str, Any]:
-    og_root = og_root.expanduser().resolve()
-    jobs_root = jobs_root.expanduser().resolve()
-    data_root = data_root.expanduser().resolve()
-    out_path = out_path.expanduser().resolve()
+RATINGS_MAX_CONTRIBUTORS = 48
 
-    job_index = build_job_output_index(jobs_root, data_root)
-    records = list(
-        iter_rated_og_records(
-            og_root,
-            name_glob=name_glob,
-            days=days,
-            ffprobe=ffprobe,
+# Aggregate tables a rated output contributes to (``_record_contributions`` kinds).
+AGG_GRAPH_HASH = "graph_hash"
+AGG_SHAPE_RECIPE = "shape_recipe"
+AGG_SOURCE_BASENAME = "source_basename"
+
+
+def _record_contributions(
+    rec: Dict[str, Any],
+    gh: Optional[str],
+    recipe: Optional[str],
+) -> List[Tuple[str, str, Optional[Dict[str, Any]]]]:
+    """
+    ``(kind, key, contributor row or None)`` for every aggregate bucket this record's
+    rating lands in, in build order. Empty for omit / unusable stars.
+    """
+    rating = int(rec["rating"])
+    if not is_usable_quality_rating(rating):
+        return []
+    discovery_key = str(rec["output_discovery_key"])
+    out: List[Tuple[str, str, Optional[Dict[str, Any]]]] = []
+    for bn, raw in zip(rec.get("source_basenames") or [], rec.get("sources") or []):
+        out.append(
+            (AGG_SOURCE_BASENAME, bn, {"output_discovery_key": discovery_key, "rating": rating, "via_source": raw})
         )
-    )
+    if gh:
+        out.append((AGG_GRAPH_HASH, gh, {"output_discovery_key": discovery_key, "rating": rating}))
+        if recipe:
+            out.append((AGG_SHAPE_RECIPE, str(recipe), None))
+    return out
 
-    by_graph_hash: Dict[str, AggBucket] = defaultdict(AggBucket)
-    graph_meta: Dict[str, Dict[str, Any]] = {}
-    by_shape_recipe: Dict[str, AggBucket] = defaultdict(AggBucket)
-    by_source_basename: Dict[str, AggBucket] = defaultdict(AggBucket)
-    by_output_relpath: Dict[str, Dict[str, Any]] = {}
-    source_contributors: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-    graph_contributors: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-    _MAX_CONTRIBUTORS = 48
-    lineage_basenames: set[str] = set()
 
-    # Preserve operator-stamped fields across XMP rebuilds (rated_at, axes).
-    # Prefer live SQLite; fall back to JSON export when DB is absent.
+def _load_prior_rating_rows(out_path: Path) -> Dict[str, Dict[str, Any]]:
+    """Operator-stamped rows (rated_at, axes) to carry across rebuilds; SQLite first, JSON fallback."""
     prior_rows: Dict[str, Dict[str, Any]] = {}
     try:
         prior_doc = load_ratings_doc(out_path)
@@ -564,70 +597,87 @@ def build_ratings_index(
                 for key, row in prior_table.items():
                     if isinstance(row, dict):
                         prior_rows[str(key)] = row
+    return prior_rows
 
-    joined_jobs = 0
-    joined_workflow = 0
-    with_prompt = 0
-    with_sources = 0
 
-    for rec in records:
+@dataclass
+class RatingsAccumulator:
+    """Buckets, contributors and per-output rows collected while scanning rated records."""
+
+    by_graph_hash: Dict[str, AggBucket] = field(default_factory=lambda: defaultdict(AggBucket))
+    by_shape_recipe: Dict[str, AggBucket] = field(default_factory=lambda: defaultdict(AggBucket))
+    by_source_basename: Dict[str, AggBucket] = field(default_factory=lambda: defaultdict(AggBucket))
+    graph_meta: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    graph_contributors: Dict[str, List[Dict[str, Any]]] = field(default_factory=lambda: defaultdict(list))
+    source_contributors: Dict[str, List[Dict[str, Any]]] = field(default_factory=lambda: defaultdict(list))
+    by_output_relpath: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    joined_jobs: int = 0
+    joined_workflow: int = 0
+    with_prompt: int = 0
+    with_sources: int = 0
+
+    def bucket(self, kind: str, key: str) -> AggBucket:
+        table = {
+            AGG_GRAPH_HASH: self.by_graph_hash,
+            AGG_SHAPE_RECIPE: self.by_shape_recipe,
+            AGG_SOURCE_BASENAME: self.by_source_basename,
+        }[kind]
+        return table[key]
+
+    def contributors(self, kind: str, key: str) -> Optional[List[Dict[str, Any]]]:
+        if kind == AGG_GRAPH_HASH:
+            return self.graph_contributors[key]
+        if kind == AGG_SOURCE_BASENAME:
+            return self.source_contributors[key]
+        return None
+
+    def add_contribution(self, kind: str, key: str, rating: int, contributor: Optional[Dict[str, Any]]) -> None:
+        self.bucket(kind, key).add(rating)
+        arr = self.contributors(kind, key)
+        if arr is not None and contributor is not None and len(arr) < RATINGS_MAX_CONTRIBUTORS:
+            arr.append(contributor)
+
+    def add_output(
+        self,
+        rec: Dict[str, Any],
+        gh: Optional[str],
+        recipe: Optional[str],
+        from_job: bool,
+        *,
+        job_index: Dict[str, Dict[str, Any]],
+        data_root: Path,
+        prior_rows: Dict[str, Dict[str, Any]],
+    ) -> None:
+        """Per-output row, join counters and graph meta for one record (buckets are separate)."""
         rating = int(rec["rating"])
         discovery_key = str(rec["output_discovery_key"])
         short_key = str(rec["output_short_key"])
-        usable = is_usable_quality_rating(rating)
-
         sources = rec.get("source_basenames") or []
-        source_paths = rec.get("sources") or []
         output_row: Dict[str, Any] = {
             "explicit": rating,
             "short_key": short_key,
             "xmp": rec.get("xmp_path"),
             "sources": sources,
-            "source_paths": source_paths,
+            "source_paths": rec.get("sources") or [],
         }
-
-        if rec.get("prompt"):
-            with_prompt += 1
+        if rec.get("prompt") or rec.get("has_prompt"):
+            self.with_prompt += 1
         if sources:
-            with_sources += 1
-            if usable:
-                for bn, raw in zip(sources, source_paths):
-                    by_source_basename[bn].add(rating)
-                    arr = source_contributors[bn]
-                    if len(arr) < _MAX_CONTRIBUTORS:
-                        arr.append(
-                            {
-                                "output_discovery_key": discovery_key,
-                                "rating": rating,
-                                "via_source": raw,
-                            }
-                        )
-
-        gh, recipe, from_job = _graph_hash_for_record(rec, job_index, data_root)
+            self.with_sources += 1
         if gh:
             output_row["graph_hash"] = gh
             if from_job:
-                joined_jobs += 1
-            else:
-                joined_workflow += 1
-            if usable:
-                by_graph_hash[gh].add(rating)
-                garr = graph_contributors[gh]
-                if len(garr) < _MAX_CONTRIBUTORS:
-                    garr.append({"output_discovery_key": discovery_key, "rating": rating})
-            if from_job:
-                meta = _lookup_job_meta(_norm_path_key(discovery_key, data_root), job_index) or {}
-                graph_meta.setdefault(
-                    gh,
-                    {
+                self.joined_jobs += 1
+                if gh not in self.graph_meta:
+                    meta = _lookup_job_meta(_norm_path_key(discovery_key, data_root), job_index) or {}
+                    self.graph_meta[gh] = {
                         "catalog_slug": meta.get("catalog_slug"),
                         "shape_id": meta.get("shape_id"),
-                    },
-                )
+                    }
+            else:
+                self.joined_workflow += 1
             if recipe:
                 output_row["shape_recipe"] = recipe
-                if usable:
-                    by_shape_recipe[str(recipe)].add(rating)
 
         prior = prior_rows.get(discovery_key) or prior_rows.get(short_key) or {}
         if isinstance(prior, dict):
@@ -640,31 +690,51 @@ def build_ratings_index(
                 if derived is not None:
                     # Prefer axis aggregate over raw XMP when Discovery has set axes.
                     output_row["explicit"] = int(derived)
+                    if int(derived) != rating:
+                        # Buckets were filled with the XMP star; the SQL aggregates follow it.
+                        output_row["xmp_explicit"] = rating
 
-        by_output_relpath[discovery_key] = output_row
-        by_output_relpath[short_key] = output_row
+        self.by_output_relpath[discovery_key] = output_row
+        self.by_output_relpath[short_key] = output_row
 
+
+def finish_ratings_doc(
+    acc: RatingsAccumulator,
+    *,
+    records: List[Dict[str, Any]],
+    job_output_keys: int,
+    data_root: Path,
+    join_lineage: bool = True,
+    lineage_edges_path: Optional[Path] = None,
+    lineage_credits: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Lineage uplift + sorted bucket tables → the ``ratings_index.json`` document (not written).
+    ``lineage_credits`` collects every uplift credit for ``write_ratings_index``.
+    """
     lineage_stats: Dict[str, Any] = {
         "lineage_edges_children": 0,
         "lineage_credits": 0,
         "lineage_sources_touched": 0,
     }
+    lineage_basenames: set[str] = set()
     if join_lineage:
         edges_path = Path(lineage_edges_path).expanduser().resolve() if lineage_edges_path else default_lineage_edges_path(data_root)
         parent_index = load_lineage_parent_index(edges_path)
-        before_keys = set(by_source_basename.keys())
+        before_keys = set(acc.by_source_basename.keys())
         lineage_stats = apply_lineage_uplift(
             rated_outputs=records,
             parent_index=parent_index,
-            by_source_basename=by_source_basename,
-            source_contributors=source_contributors,
+            by_source_basename=acc.by_source_basename,
+            source_contributors=acc.source_contributors,
             max_hops=LINEAGE_MAX_HOPS,
-            max_contributors=_MAX_CONTRIBUTORS,
+            max_contributors=RATINGS_MAX_CONTRIBUTORS,
+            credits=lineage_credits,
         )
-        lineage_stats["lineage_edges_path"] = str(edges_path) if edges_path.is_file() else None
-        lineage_basenames = set(by_source_basename.keys()) - before_keys
+        lineage_stats["lineage_edges_path"] = str(edges_path) if lineage_edges_exist(edges_path) else None
+        lineage_basenames = set(acc.by_source_basename.keys()) - before_keys
         # Also mark basenames that already existed but received lineage contributor rows.
-        for bn, arr in source_contributors.items():
+        for bn, arr in acc.source_contributors.items():
             if any(isinstance(c, dict) and (c.get("via_source") == "lineage" or (c.get("evidence") or {}).get("source") == "lineage") for c in arr):
                 lineage_basenames.add(bn)
 
@@ -673,11 +743,11 @@ def build_ratings_index(
         "updated_at": utc_now(),
         "stats": {
             "rated_outputs": len(records),
-            "with_prompt": with_prompt,
-            "with_sources": with_sources,
-            "joined_shape_factory_jobs": joined_jobs,
-            "joined_png_workflow_graph": joined_workflow,
-            "job_output_keys": len(job_index),
+            "with_prompt": acc.with_prompt,
+            "with_sources": acc.with_sources,
+            "joined_shape_factory_jobs": acc.joined_jobs,
+            "joined_png_workflow_graph": acc.joined_workflow,
+            "job_output_keys": job_output_keys,
             **{k: v for k, v in lineage_stats.items() if k != "lineage_edges_path"},
             "lineage_joined": bool(join_lineage and lineage_stats.get("lineage_credits")),
         },
@@ -687,39 +757,128 @@ def build_ratings_index(
         "by_output_relpath": {},
     }
 
-    for gh, bucket in sorted(by_graph_hash.items(), key=lambda kv: (-kv[1].mean(), -len(kv[1].ratings))):
-        extra = graph_meta.get(gh) or {}
+    for gh, bucket in sorted(acc.by_graph_hash.items(), key=lambda kv: (-kv[1].mean(), -len(kv[1].ratings))):
+        extra = acc.graph_meta.get(gh) or {}
         row = bucket.to_inferred(extra=extra)
-        row["contributors"] = graph_contributors.get(gh, [])
+        row["contributors"] = acc.graph_contributors.get(gh, [])
         doc["by_graph_hash"][gh] = row
 
-    for key, bucket in sorted(by_shape_recipe.items(), key=lambda kv: (-kv[1].mean(), -len(kv[1].ratings))):
+    for key, bucket in sorted(acc.by_shape_recipe.items(), key=lambda kv: (-kv[1].mean(), -len(kv[1].ratings))):
         doc["by_shape_recipe"][key] = bucket.to_inferred()
 
-    for bn, bucket in sorted(by_source_basename.items(), key=lambda kv: (-kv[1].mean(), -len(kv[1].ratings))):
+    for bn, bucket in sorted(acc.by_source_basename.items(), key=lambda kv: (-kv[1].mean(), -len(kv[1].ratings))):
         row = bucket.to_inferred()
         row["favorite_fanout"] = row.get("keepers_4plus", 0)
-        row["contributors"] = source_contributors.get(bn, [])
+        row["contributors"] = acc.source_contributors.get(bn, [])
         if bn in lineage_basenames:
             row["evidence"] = {"source": "lineage"}
         doc["by_source_basename"][bn] = row
 
-    doc["by_output_relpath"] = by_output_relpath
+    doc["by_output_relpath"] = acc.by_output_relpath
+    return doc
+
+
+def compute_ratings_index(
+    *,
+    og_root: Path,
+    jobs_root: Path,
+    data_root: Path,
+    out_path: Path,
+    name_glob: str = "*.XMP",
+    days: int = 0,
+    ffprobe: Optional[str] = None,
+    join_lineage: bool = True,
+    lineage_edges_path: Optional[Path] = None,
+    lineage_credits: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Full rebuild: re-read every rated XMP and job; returns the document without writing it."""
+    og_root = og_root.expanduser().resolve()
+    jobs_root = jobs_root.expanduser().resolve()
+    data_root = data_root.expanduser().resolve()
+    out_path = out_path.expanduser().resolve()
 
+    job_index = build_job_output_index(jobs_root, data_root)
+    records = list(
+        iter_rated_og_records(
+            og_root,
+            name_glob=name_glob,
+            days=days,
+            ffprobe=ffprobe,
+            # A whole-tree build walks (and reconciles the XMP catalog); --days reads the catalog.
+            scan=True if days <= 0 else None,
+        )
+    )
+    # Preserve operator-stamped fields across XMP rebuilds (rated_at, axes).
+    prior_rows = _load_prior_rating_rows(out_path)
+
+    acc = RatingsAccumulator()
+    for rec in records:
+        gh, recipe, from_job = _graph_hash_for_record(rec, job_index, data_root)
+        for kind, key, contributor in _record_contributions(rec, gh, recipe):
+            acc.add_contribution(kind, key, int(rec["rating"]), contributor)
+        acc.add_output(rec, gh, recipe, from_job, job_index=job_index, data_root=data_root, prior_rows=prior_rows)
+
+    return finish_ratings_doc(
+        acc,
+        records=records,
+        job_output_keys=len(job_index),
+        data_root=data_root,
+        join_lineage=join_lineage,
+        lineage_edges_path=lineage_edges_path,
+        lineage_credits=lineage_credits,
+    )
+
+
+def write_ratings_index(
+    doc: Dict[str, Any],
+    out_path: Path,
+    *,
+    lineage_credits: Optional[List[Dict[str, Any]]] = None,
+) -> None:
+    """Write ``ratings_index.json`` and sync rows + materialized aggregates into ratings.sqlite."""
+    out_path = out_path.expanduser().resolve()
     out_path.parent.mkdir(parents=True, exist_ok=True)
     out_path.write_text(json.dumps(doc, indent=2), encoding="utf-8")
-    # Keep SQLite live store in sync with the export (aggregates stay JSON-only).
+    # Keep SQLite live store (rows + aggregate tables) in sync with the export.
     try:
         db_path = ratings_db_path_for_index(out_path)
         con = open_ratings_db(db_path, ratings_json=out_path)
         try:
-            replace_rating_rows_from_doc(con, doc)
+            replace_rating_rows_from_doc(con, doc, lineage_credits=lineage_credits)
             _meta_set(con, "last_export_at", str(doc.get("updated_at") or utc_now()))
             con.commit()
         finally:
             con.close()
     except Exception:
         pass
+
+
+def build_ratings_index(
+    *,
+    og_root: Path,
+    jobs_root: Path,
+    data_root: Path,
+    out_path: Path,
+    name_glob: str = "*.XMP",
+    days: int = 0,
+    ffprobe: Optional[str] = None,
+    join_lineage: bool = True,
+    lineage_edges_path: Optional[Path] = None,
+) -> Dict[str, Any]:
+    lineage_credits: List[Dict[str, Any]] = []
+    doc = compute_ratings_index(
+        og_root=og_root,
+        jobs_root=jobs_root,
+        data_root=data_root,
+        out_path=out_path,
+        name_glob=name_glob,
+        days=days,
+        ffprobe=ffprobe,
+        join_lineage=join_lineage,
+        lineage_edges_path=lineage_edges_path,
+        lineage_credits=lineage_credits,
+    )
+    write_ratings_index(doc, out_path, lineage_credits=lineage_credits)
     return doc
 
 
@@ -754,41 +913,68 @@ def _output_lookup_keys(relpath: str) -> List[str]:
     return keys
 
 
-def lookup_output_rating(output_path: str, ratings_doc: dict[str, Any]) -> Optional[dict[str, Any]]:
-    """Resolve explicit output rating row from ratings_index by path variants."""
-    table = ratings_doc.get("by_output_relpath") or {}
-    if not isinstance(table, dict):
-        return None
+def _path_name(raw: str) -> str:
+    """``Path(raw).name`` without building a Path (hot in per-recipe scoring)."""
+    tail = raw.rstrip("/").rpartition("/")[2]
+    return tail if tail not in ("", ".") else Path(raw).name
+
+
+def _path_stem(name: str) -> str:
+    """``Path(name).stem`` for a bare file name."""
+    i = name.rfind(".")
+    return name[:i] if 0 < i < len(name) - 1 else name
+
+
+def output_lookup_keys(output_path: str) -> List[str]:
+    """Path variants (deduped, in priority order) an output's rating / appetite row may be keyed by."""
     raw = str(output_path or "").strip().replace("\\", "/")
     if not raw:
-        return None
-    keys = [raw, Path(raw).name]
+        return []
+    keys = [raw, _path_name(raw)]
     if "/output/output/" in raw:
         keys.append(re.sub(r"^.*?/output/output/", "output/", raw))
     if "/og/" in raw:
         tail = raw.split("/og/", 1)[-1]
         keys.append(f"output/og/{tail.rstrip('/')}")
         keys.append(f"og/{tail.rstrip('/')}")
-    expanded: List[str] = []
+    out: List[str] = []
+    seen: set[str] = set()
+
+    def add(key: str) -> None:
+        if key and key not in seen:
+            seen.add(key)
+            out.append(key)
+
     for key in keys:
         key = key.strip().replace("\\", "/")
         if not key:
             continue
-        expanded.append(key)
+        add(key)
         for suffix in (".mp4", ".MP4", ".png", ".PNG", ".webm", ".WEBM"):
             if key.endswith(suffix):
-                expanded.append(key[: -len(suffix)])
-    seen: set[str] = set()
-    for key in expanded:
-        if not key or key in seen:
-            continue
-        seen.add(key)
+                add(key[: -len(suffix)])
+    return out
+
+
+def lookup_output_row(table: Any, keys: List[str]) -> Optional[dict[str, Any]]:
+    """First dict row in ``table`` under ``keys`` (see :func:`output_lookup_keys`)."""
+    if not isinstance(table, dict):
+        return None
+    for key in keys:
         row = table.get(key)
         if isinstance(row, dict):
             return row
     return None
 
 
+def lookup_output_rating(output_path: str, ratings_doc: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """Resolve explicit output rating row from ratings_index by path variants."""
+    table = ratings_doc.get("by_output_relpath") or {}
+    if not isinstance(table, dict):
+        return None
+    return lookup_output_row(table, output_lookup_keys(output_path))
+
+
 _XMP_RATING_ATTR_RE = re.compile(r'xmp:Rating="\d+"')
 _XMP_RATING_TEMPLATE = (
     '<?xpacket begin="\ufeff" id="W5M0MpCehiHzreSzNTczkc9d"?>\n'
@@ -905,6 +1091,9 @@ def _rating_row_to_doc(row: Any) -> Dict[str, Any]:
     }
     if axes:
         out["axes"] = {a: axes[a] for a in QUALITY_AXES if a in axes}
+    xmp_explicit = _row_get(row, "xmp_explicit")
+    if xmp_explicit is not None:
+        out["xmp_explicit"] = xmp_explicit
     rated_at = _row_get(row, "rated_at")
     if rated_at:
         out["rated_at"] = rated_at
@@ -975,10 +1164,14 @@ def open_ratings_db(
             source_paths_json TEXT,
             graph_hash TEXT,
             shape_recipe TEXT,
-            updated_at TEXT
+            updated_at TEXT,
+            xmp_explicit INTEGER
         )
         """
     )
+    # v5: the XMP star the build aggregated, when axes gave the row a different explicit.
+    if "xmp_explicit" not in {r["name"] for r in con.execute("PRAGMA table_info(rating_row)")}:
+        con.execute("ALTER TABLE rating_row ADD COLUMN xmp_explicit INTEGER")
     con.execute(
         """
         CREATE TABLE IF NOT EXISTS appetite_row (
@@ -992,13 +1185,77 @@ def open_ratings_db(
         )
         """
     )
+    # Materialized by_graph_hash / by_shape_recipe / by_source_basename (v2). ``rating_agg``
+    # holds running sums, ``rating_agg_contrib`` one row per star landing in a bucket.
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rating_agg (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            n INTEGER NOT NULL DEFAULT 0,
+            keepers INTEGER NOT NULL DEFAULT 0,
+            wsum REAL NOT NULL DEFAULT 0,
+            wrsum REAL NOT NULL DEFAULT 0,
+            meta_json TEXT,
+            PRIMARY KEY (kind, key)
+        )
+        """
+    )
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rating_agg_contrib (
+            asset_key TEXT NOT NULL,
+            origin TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            rating INTEGER NOT NULL,
+            weight REAL NOT NULL,
+            via_source TEXT,
+            evidence_json TEXT,
+            PRIMARY KEY (asset_key, origin, seq)
+        )
+        """
+    )
+    con.execute("CREATE INDEX IF NOT EXISTS idx_rating_agg_contrib_bucket ON rating_agg_contrib(kind, key, origin, asset_key)")
+    # XMP sidecar catalog (v3), see xmp_catalog.py.
+    ensure_xmp_catalog(con)
+    # Row change log (v4): every write to rating_row / appetite_row, whoever makes it, so
+    # incremental readers (the rating-sampler pool) re-read only the rows that moved.
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS row_change (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tbl TEXT NOT NULL,
+            asset_key TEXT,
+            short_key TEXT
+        )
+        """
+    )
+    for tbl in ("rating_row", "appetite_row"):
+        for event, ref in (("INSERT", "NEW"), ("DELETE", "OLD")):
+            con.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{tbl}_{event.lower()}_log AFTER {event} ON {tbl} BEGIN
+                    INSERT INTO row_change(tbl, asset_key, short_key) VALUES('{tbl}', {ref}.asset_key, {ref}.short_key);
+                END
+                """
+            )
+        con.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{tbl}_update_log AFTER UPDATE ON {tbl} BEGIN
+                INSERT INTO row_change(tbl, asset_key, short_key) VALUES('{tbl}', NEW.asset_key, NEW.short_key);
+                INSERT INTO row_change(tbl, asset_key, short_key) SELECT '{tbl}', OLD.asset_key, OLD.short_key
+                    WHERE OLD.asset_key IS NOT NEW.asset_key OR OLD.short_key IS NOT NEW.short_key;
+            END
+            """
+        )
     con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
     con.execute("CREATE INDEX IF NOT EXISTS idx_rating_short ON rating_row(short_key)")
     con.execute("CREATE INDEX IF NOT EXISTS idx_appetite_short ON appetite_row(short_key)")
-    con.execute(
-        "INSERT OR REPLACE INTO meta(key, value) VALUES('schema_version', ?)",
-        (str(RATINGS_DB_SCHEMA_VERSION),),
-    )
+    if _meta_get(con, "schema_version") != str(RATINGS_DB_SCHEMA_VERSION):
+        # Only on change: every reader opens the store, and must not bump its mtime.
+        _meta_set(con, "schema_version", str(RATINGS_DB_SCHEMA_VERSION))
     con.commit()
 
     migrated = _meta_get(con, "migrated_from_json") == "1"
@@ -1025,6 +1282,9 @@ def open_ratings_db(
         if did or created:
             _meta_set(con, "migrated_from_json", "1")
             con.commit()
+    if _meta_get(con, "aggregates_materialized") != "1":
+        # v1 stores (or a fresh JSON migration): direct stars only until the next ratings build.
+        rebuild_rating_aggregates(con)
     return con
 
 
@@ -1094,6 +1354,10 @@ def upsert_rating_row(
         explicit_i = int(explicit) if explicit is not None else None
     except (TypeError, ValueError):
         explicit_i = None
+    try:
+        xmp_explicit = int(row["xmp_explicit"]) if row.get("xmp_explicit") is not None else None
+    except (TypeError, ValueError):
+        xmp_explicit = None
     sources = row.get("sources") if isinstance(row.get("sources"), list) else []
     source_paths = row.get("source_paths") if isinstance(row.get("source_paths"), list) else []
     now = updated_at or utc_now()
@@ -1103,8 +1367,8 @@ def upsert_rating_row(
             asset_key, short_key, discovery_key, explicit,
             subject_beauty, render_quality, action_quality,
             xmp, rated_at, sources_json, source_paths_json,
-            graph_hash, shape_recipe, updated_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            graph_hash, shape_recipe, updated_at, xmp_explicit
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ON CONFLICT(asset_key) DO UPDATE SET
             short_key=excluded.short_key,
             discovery_key=excluded.discovery_key,
@@ -1118,7 +1382,8 @@ def upsert_rating_row(
             source_paths_json=excluded.source_paths_json,
             graph_hash=excluded.graph_hash,
             shape_recipe=excluded.shape_recipe,
-            updated_at=excluded.updated_at
+            updated_at=excluded.updated_at,
+            xmp_explicit=excluded.xmp_explicit
         """,
         (
             asset_key,
@@ -1135,8 +1400,18 @@ def upsert_rating_row(
             row.get("graph_hash"),
             row.get("shape_recipe"),
             now,
+            xmp_explicit,
         ),
     )
+    _sync_rating_contributions(
+        con,
+        asset_key,
+        explicit=_aggregate_star(explicit_i, xmp_explicit),
+        sources=sources,
+        source_paths=source_paths,
+        graph_hash=row.get("graph_hash"),
+        shape_recipe=row.get("shape_recipe"),
+    )
     if commit:
         con.commit()
 
@@ -1151,15 +1426,211 @@ def delete_rating_row(
     keys = [k for k in (asset_key, short_key) if k]
     if not keys:
         return
-    con.execute(
-        f"DELETE FROM rating_row WHERE asset_key IN ({','.join('?' for _ in keys)}) "
-        f"OR short_key IN ({','.join('?' for _ in keys)})",
-        (*keys, *keys),
+    where = (
+        f"asset_key IN ({','.join('?' for _ in keys)}) "
+        f"OR short_key IN ({','.join('?' for _ in keys)})"
     )
+    for (gone,) in con.execute(f"SELECT asset_key FROM rating_row WHERE {where}", (*keys, *keys)).fetchall():
+        _sync_rating_contributions(con, str(gone), explicit=None)
+    con.execute(f"DELETE FROM rating_row WHERE {where}", (*keys, *keys))
     if commit:
         con.commit()
 
 
+def _rating_agg_add(con: sqlite3.Connection, kind: str, key: str, rating: int, weight: float, sign: int) -> None:
+    con.execute(
+        """
+        INSERT INTO rating_agg(kind, key, n, keepers, wsum, wrsum) VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(kind, key) DO UPDATE SET
+            n = n + excluded.n,
+            keepers = keepers + excluded.keepers,
+            wsum = wsum + excluded.wsum,
+            wrsum = wrsum + excluded.wrsum
+        """,
+        (kind, key, sign, sign if rating >= 4 else 0, sign * weight, sign * weight * rating),
+    )
+
+
+def _aggregate_star(explicit: Optional[int], xmp_explicit: Optional[int]) -> Optional[int]:
+    """Star a row adds to the aggregates: the XMP star ``finish_ratings_doc`` bucketed, else ``explicit``."""
+    return xmp_explicit if xmp_explicit is not None else explicit
+
+
+def _sync_rating_contributions(
+    con: sqlite3.Connection,
+    asset_key: str,
+    *,
+    explicit: Optional[int],
+    sources: Optional[List[Any]] = None,
+    source_paths: Optional[List[Any]] = None,
+    graph_hash: Optional[str] = None,
+    shape_recipe: Optional[str] = None,
+) -> None:
+    """
+    Move one output's stars in the materialized aggregates (caller owns the transaction).
+
+    Direct contributions (sources / graph hash / recipe) are replaced from the row.
+    Lineage credits written by ``ratings build`` keep their edge weight and follow the
+    new star; they are dropped with it. New lineage paths appear on the next build.
+    """
+    old = con.execute(
+        "SELECT kind, key, rating, weight FROM rating_agg_contrib WHERE asset_key = ?", (asset_key,)
+    ).fetchall()
+    touched: set[Tuple[str, str]] = set()
+    for r in old:
+        _rating_agg_add(con, r["kind"], r["key"], int(r["rating"]), float(r["weight"]), -1)
+        touched.add((r["kind"], r["key"]))
+    con.execute("DELETE FROM rating_agg_contrib WHERE asset_key = ? AND origin = 'direct'", (asset_key,))
+
+    rec = {
+        "rating": explicit if explicit is not None else 0,
+        "output_discovery_key": asset_key,
+        "source_basenames": list(sources or []),
+        "sources": list(source_paths or []),
+    }
+    for seq, (kind, key, contributor) in enumerate(_record_contributions(rec, graph_hash or None, shape_recipe or None)):
+        con.execute(
+            """
+            INSERT INTO rating_agg_contrib(asset_key, origin, seq, kind, key, rating, weight, via_source)
+            VALUES (?, 'direct', ?, ?, ?, ?, 1.0, ?)
+            """,
+            (asset_key, seq, kind, key, int(rec["rating"]), (contributor or {}).get("via_source")),
+        )
+    if is_usable_quality_rating(rec["rating"]):
+        con.execute(
+            "UPDATE rating_agg_contrib SET rating = ? WHERE asset_key = ? AND origin = 'lineage'",
+            (int(rec["rating"]), asset_key),
+        )
+    else:
+        con.execute("DELETE FROM rating_agg_contrib WHERE asset_key = ? AND origin = 'lineage'", (asset_key,))
+
+    for r in con.execute(
+        "SELECT kind, key, rating, weight FROM rating_agg_contrib WHERE asset_key = ?", (asset_key,)
+    ).fetchall():
+        _rating_agg_add(con, r["kind"], r["key"], int(r["rating"]), float(r["weight"]), 1)
+        touched.discard((r["kind"], r["key"]))
+    for kind, key in touched:
+        con.execute("DELETE FROM rating_agg WHERE kind = ? AND key = ? AND n <= 0", (kind, key))
+
+
+def insert_lineage_credits(con: sqlite3.Connection, credits: Iterable[Dict[str, Any]]) -> int:
+    """Add ``apply_lineage_uplift`` credits (one row per credit) to the materialized aggregates."""
+    next_seq: Dict[str, int] = {}
+    n = 0
+    for credit in credits:
+        asset_key = str(credit.get("asset_key") or "")
+        basename = str(credit.get("basename") or "")
+        if not asset_key or not basename:
+            continue
+        seq = next_seq.get(asset_key, 0)
+        next_seq[asset_key] = seq + 1
+        rating, weight = int(credit["rating"]), float(credit["weight"])
+        con.execute(
+            """
+            INSERT OR REPLACE INTO rating_agg_contrib
+              (asset_key, origin, seq, kind, key, rating, weight, via_source, evidence_json)
+            VALUES (?, 'lineage', ?, ?, ?, ?, ?, 'lineage', ?)
+            """,
+            (asset_key, seq, AGG_SOURCE_BASENAME, basename, rating, weight, json.dumps(credit.get("evidence") or {})),
+        )
+        _rating_agg_add(con, AGG_SOURCE_BASENAME, basename, rating, weight, 1)
+        n += 1
+    return n
+
+
+def rebuild_rating_aggregates(con: sqlite3.Connection) -> int:
+    """Recompute direct-star aggregates from ``rating_row`` (lineage credits are dropped)."""
+    con.execute("DELETE FROM rating_agg")
+    con.execute("DELETE FROM rating_agg_contrib")
+    n = 0
+    for row in con.execute("SELECT * FROM rating_row").fetchall():
+        doc_row = _rating_row_to_doc(row)
+        _sync_rating_contributions(
+            con,
+            str(row["asset_key"]),
+            explicit=_aggregate_star(doc_row.get("explicit"), doc_row.get("xmp_explicit")),
+            sources=doc_row.get("sources"),
+            source_paths=doc_row.get("source_paths"),
+            graph_hash=doc_row.get("graph_hash"),
+            shape_recipe=doc_row.get("shape_recipe"),
+        )
+        n += 1
+    _meta_set(con, "aggregates_materialized", "1")
+    con.commit()
+    return n
+
+
+def _agg_row_to_doc(con: sqlite3.Connection, agg: Any, *, contributors_limit: int, contributors_offset: int) -> Dict[str, Any]:
+    """``by_*`` table row (``to_inferred`` shape) for one bucket, contributors paged from SQL."""
+    kind, key = str(agg["kind"]), str(agg["key"])
+    wsum = float(agg["wsum"])
+    out: Dict[str, Any] = {
+        "inferred": round(float(agg["wrsum"]) / wsum, 2) if wsum > 0 else 0.0,
+        "n": int(agg["n"]),
+        "keepers_4plus": int(agg["keepers"]),
+    }
+    if agg["meta_json"]:
+        try:
+            out.update(json.loads(agg["meta_json"]))
+        except json.JSONDecodeError:
+            pass
+    if kind == AGG_SHAPE_RECIPE:
+        return out
+    if kind == AGG_SOURCE_BASENAME:
+        out["favorite_fanout"] = out["keepers_4plus"]
+    contributors: List[Dict[str, Any]] = []
+    rows = con.execute(
+        """
+        SELECT asset_key, origin, rating, weight, via_source, evidence_json FROM rating_agg_contrib
+        WHERE kind = ? AND key = ?
+        ORDER BY origin, asset_key, seq
+        LIMIT ? OFFSET ?
+        """,
+        (kind, key, int(contributors_limit) + 1, int(contributors_offset)),
+    ).fetchall()
+    lineage = False
+    for r in rows[: int(contributors_limit)]:
+        c: Dict[str, Any] = {"output_discovery_key": r["asset_key"], "rating": int(r["rating"])}
+        if kind == AGG_SOURCE_BASENAME:
+            c["via_source"] = r["via_source"]
+        if r["origin"] == "lineage":
+            lineage = True
+            c["evidence"] = json.loads(r["evidence_json"] or "{}")
+        contributors.append(c)
+    out["contributors"] = contributors
+    out["contributors_offset"] = int(contributors_offset)
+    out["contributors_next_offset"] = (
+        int(contributors_offset) + int(contributors_limit) if len(rows) > int(contributors_limit) else None
+    )
+    if kind == AGG_SOURCE_BASENAME and (
+        lineage
+        or con.execute(
+            "SELECT 1 FROM rating_agg_contrib WHERE kind = ? AND key = ? AND origin = 'lineage' LIMIT 1", (kind, key)
+        ).fetchone()
+    ):
+        out["evidence"] = {"source": "lineage"}
+    return out
+
+
+def fetch_rating_aggregate(
+    con: sqlite3.Connection,
+    kind: str,
+    key: str,
+    *,
+    contributors_limit: int = RATINGS_MAX_CONTRIBUTORS,
+    contributors_offset: int = 0,
+) -> Optional[Dict[str, Any]]:
+    """One materialized ``by_graph_hash`` / ``by_shape_recipe`` / ``by_source_basename`` row."""
+    if not key:
+        return None
+    agg = con.execute(
+        "SELECT * FROM rating_agg WHERE kind = ? AND key = ? AND n > 0", (kind, str(key))
+    ).fetchone()
+    if agg is None:
+        return None
+    return _agg_row_to_doc(con, agg, contributors_limit=contributors_limit, contributors_offset=contributors_offset)
+
+
 def upsert_appetite_row(
     con: sqlite3.Connection,
     *,
@@ -1233,9 +1704,10 @@ def fetch_rating_row(
     for key in (discovery_key, short_key):
         if not key:
             continue
+        # discovery_key is always written as asset_key; matching it too would defeat the indexes.
         row = con.execute(
-            "SELECT * FROM rating_row WHERE asset_key = ? OR discovery_key = ? OR short_key = ? LIMIT 1",
-            (key, key, key),
+            "SELECT * FROM rating_row WHERE asset_key = ? OR short_key = ? LIMIT 1",
+            (key, key),
         ).fetchone()
         if row is not None:
             return _rating_row_to_doc(row)
@@ -1268,10 +1740,78 @@ def appetite_output_table_from_db(con: sqlite3.Connection) -> Dict[str, Dict[str
     return table
 
 
-def replace_rating_rows_from_doc(con: sqlite3.Connection, doc: Dict[str, Any]) -> int:
-    """Replace rating_row contents from a full ratings doc (used after ratings build)."""
+def replace_rating_rows_from_doc(
+    con: sqlite3.Connection,
+    doc: Dict[str, Any],
+    *,
+    lineage_credits: Optional[Iterable[Dict[str, Any]]] = None,
+) -> int:
+    """
+    Replace rating_row contents from a full ratings doc (used after ratings build) and
+    re-materialize the aggregates: direct stars from the rows, ``lineage_credits`` from
+    the build's uplift, graph meta (catalog_slug / shape_id) and stats from ``doc``.
+    """
     con.execute("DELETE FROM rating_row")
-    return _import_ratings_doc_into_db(con, doc)
+    con.execute("DELETE FROM rating_agg")
+    con.execute("DELETE FROM rating_agg_contrib")
+    n = _import_ratings_doc_into_db(con, doc)
+    if lineage_credits is not None:
+        insert_lineage_credits(con, lineage_credits)
+    for gh, row in (doc.get("by_graph_hash") or {}).items():
+        if not isinstance(row, dict):
+            continue
+        meta = {k: row.get(k) for k in ("catalog_slug", "shape_id") if k in row}
+        if meta:
+            con.execute(
+                "UPDATE rating_agg SET meta_json = ? WHERE kind = ? AND key = ?",
+                (json.dumps(meta), AGG_GRAPH_HASH, str(gh)),
+            )
+    _meta_set(con, "build_stats", json.dumps(doc.get("stats") or {}))
+    _meta_set(con, "build_updated_at", str(doc.get("updated_at") or ""))
+    _meta_set(con, "aggregates_materialized", "1")
+    # Every row was rewritten: readers behind this point reload in full, so drop the log.
+    _meta_set(con, "row_change_floor", str(row_change_seq(con)))
+    con.execute("DELETE FROM row_change")
+    con.commit()
+    return n
+
+
+def row_change_seq(con: sqlite3.Connection) -> int:
+    """Newest ``row_change`` sequence number (0 before the first logged write)."""
+    row = con.execute("SELECT seq FROM sqlite_sequence WHERE name = 'row_change'").fetchone()
+    return int(row[0]) if row is not None else 0
+
+
+def row_changes_since(
+    con: sqlite3.Connection, seq: int, *, upto: Optional[int] = None
+) -> Optional[List[Tuple[str, str, str]]]:
+    """
+    ``(table, asset_key, short_key)`` for writes after ``seq`` (through ``upto``), oldest
+    first. None when the log cannot answer: pruned past ``seq`` by a full replace, or
+    ``seq`` is ahead of this store (it was recreated).
+    """
+    latest = row_change_seq(con)
+    if seq > latest or seq < int(_meta_get(con, "row_change_floor") or 0):
+        return None
+    rows = con.execute(
+        "SELECT tbl, asset_key, short_key FROM row_change WHERE seq > ? AND seq <= ? ORDER BY seq",
+        (int(seq), int(latest if upto is None else upto)),
+    )
+    return [(str(r[0]), str(r[1] or ""), str(r[2] or "")) for r in rows]
+
+
+def output_rows_for_keys(con: sqlite3.Connection, tbl: str, asset_keys: Iterable[str]) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """``(asset_key, short_key, doc row)`` of ``rating_row`` / ``appetite_row`` rows, in rowid order."""
+    to_doc = {"rating_row": _rating_row_to_doc, "appetite_row": _appetite_row_to_doc}[tbl]
+    keys = sorted({k for k in asset_keys if k})
+    found: List[Tuple[int, str, str, Dict[str, Any]]] = []
+    for i in range(0, len(keys), 500):
+        chunk = keys[i : i + 500]
+        marks = ",".join("?" * len(chunk))
+        for row in con.execute(f"SELECT rowid AS rid, * FROM {tbl} WHERE asset_key IN ({marks})", chunk):
+            found.append((int(row["rid"]), str(row["asset_key"] or "").strip(), str(row["short_key"] or "").strip(), to_doc(row)))
+    found.sort(key=lambda r: r[0])
+    return [(a, sk, doc) for _rid, a, sk, doc in found]
 
 
 _RATINGS_AGG_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
@@ -1386,7 +1926,13 @@ def _find_existing_xmp(media_abs: Path) -> Optional[Path]:
     return None
 
 
-def _write_xmp_rating(media_abs: Path, stars: int) -> Path:
+def _write_xmp_rating(
+    media_abs: Path,
+    stars: int,
+    *,
+    og_root: Optional[Path] = None,
+    catalog: Optional[sqlite3.Connection] = None,
+) -> Path:
     existing = _find_existing_xmp(media_abs)
     target = existing or media_abs.with_suffix(".XMP")
     if existing is not None:
@@ -1410,10 +1956,17 @@ def _write_xmp_rating(media_abs: Path, stars: int) -> Path:
     else:
         txt = _XMP_RATING_TEMPLATE.format(rating=stars)
     _atomic_write_text(target, txt)
+    if og_root is not None:
+        record_xmp(target, og_root, rating=int(stars), con=catalog)
     return target
 
 
-def _clear_xmp_rating(media_abs: Path) -> Optional[Path]:
+def _clear_xmp_rating(
+    media_abs: Path,
+    *,
+    og_root: Optional[Path] = None,
+    catalog: Optional[sqlite3.Connection] = None,
+) -> Optional[Path]:
     existing = _find_existing_xmp(media_abs)
     if existing is None:
         return None
@@ -1422,6 +1975,8 @@ def _clear_xmp_rating(media_abs: Path) -> Optional[Path]:
         # Drop the attribute (with any leading space) so the artifact reads as unrated.
         txt = re.sub(r'\s*xmp:Rating="\d+"', "", txt, count=1)
         _atomic_write_text(existing, txt)
+    if og_root is not None:
+        record_xmp(existing, og_root, rating=None, con=catalog)
     return existing
 
 
@@ -1530,7 +2085,7 @@ def set_output_quality_axis(
         explicit = aggregate_explicit_from_axes(axes)
         xmp_like = media_abs.with_suffix(".XMP")
         if explicit is None:
-            xmp_target = _clear_xmp_rating(media_abs)
+            xmp_target = _clear_xmp_rating(media_abs, og_root=og_root, catalog=con)
             delete_rating_row(con, asset_key=asset_key, short_key=short_key)
             return {
                 "ok": True,
@@ -1546,7 +2101,7 @@ def set_output_quality_axis(
                 "sources": prev.get("sources") or [],
             }
 
-        xmp_target = _write_xmp_rating(media_abs, int(explicit))
+        xmp_target = _write_xmp_rating(media_abs, int(explicit), og_root=og_root, catalog=con)
         now = utc_now()
         row: Dict[str, Any] = {
             "explicit": int(explicit),
@@ -1682,6 +2237,81 @@ def build_asset_ratings_explorer(
             output_row = row
             break
 
+    return _asset_ratings_explorer(
+        relpath=relpath,
+        keys=keys,
+        item=item,
+        output_row=output_row,
+        source_row=by_source.get,
+        graph_row=by_graph.get,
+        recipe_row=by_recipe.get,
+        index_updated_at=ratings_doc.get("updated_at"),
+        index_stats=ratings_doc.get("stats"),
+    )
+
+
+def build_asset_ratings_explorer_from_db(
+    con: sqlite3.Connection,
+    *,
+    relpath: str,
+    item: Optional[Dict[str, Any]] = None,
+    contributors_limit: int = RATINGS_MAX_CONTRIBUTORS,
+    contributors_offset: int = 0,
+) -> Dict[str, Any]:
+    """
+    ``build_asset_ratings_explorer`` answered from ratings.sqlite: the output row and the
+    materialized aggregate rows by key, contributor lists paged with
+    ``contributors_limit`` / ``contributors_offset`` (``contributors_next_offset`` per lens).
+    No JSON export is read, so cost does not grow with the rated corpus.
+    """
+    keys = _output_lookup_keys(relpath)
+    output_row: Optional[Dict[str, Any]] = None
+    for k in keys:
+        output_row = fetch_rating_row(con, discovery_key=k)
+        if output_row is not None:
+            break
+
+    def lens(kind: str, limit: int) -> Callable[[str], Optional[Dict[str, Any]]]:
+        def get(key: str) -> Optional[Dict[str, Any]]:
+            return fetch_rating_aggregate(
+                con, kind, key, contributors_limit=limit, contributors_offset=contributors_offset
+            )
+
+        return get
+
+    stats_raw = _meta_get(con, "build_stats")
+    try:
+        stats = json.loads(stats_raw) if stats_raw else None
+    except json.JSONDecodeError:
+        stats = None
+    return _asset_ratings_explorer(
+        relpath=relpath,
+        keys=keys,
+        item=item,
+        output_row=output_row,
+        source_row=lens(AGG_SOURCE_BASENAME, contributors_limit),
+        graph_row=lens(AGG_GRAPH_HASH, contributors_limit),
+        recipe_row=lens(AGG_SHAPE_RECIPE, 0),
+        cited_row=lens(AGG_SOURCE_BASENAME, 0),
+        index_updated_at=_meta_get(con, "build_updated_at") or _meta_get(con, "last_export_at"),
+        index_stats=stats,
+    )
+
+
+def _asset_ratings_explorer(
+    *,
+    relpath: str,
+    keys: List[str],
+    item: Optional[Dict[str, Any]],
+    output_row: Optional[Dict[str, Any]],
+    source_row: Callable[[str], Any],
+    graph_row: Callable[[str], Any],
+    recipe_row: Callable[[str], Any],
+    index_updated_at: Any,
+    index_stats: Any,
+    cited_row: Optional[Callable[[str], Any]] = None,
+) -> Dict[str, Any]:
+    cited_row = cited_row or source_row
     basename = ""
     if isinstance(item, dict):
         name = item.get("name")
@@ -1708,7 +2338,7 @@ def build_asset_ratings_explorer(
 
     as_source_block: Dict[str, Any] = {}
     if basename:
-        src_row = by_source.get(basename)
+        src_row = source_row(basename)
         if isinstance(src_row, dict):
             as_source_block = {
                 "basename": basename,
@@ -1717,11 +2347,13 @@ def build_asset_ratings_explorer(
                 "keepers_4plus": src_row.get("keepers_4plus") or src_row.get("favorite_fanout"),
                 "contributors": src_row.get("contributors") or [],
             }
+            if "contributors_next_offset" in src_row:
+                as_source_block["contributors_next_offset"] = src_row["contributors_next_offset"]
 
     workflow_block: Dict[str, Any] = {}
     graph_hash = output_row.get("graph_hash") if output_row else None
     if isinstance(graph_hash, str) and graph_hash:
-        gh_row = by_graph.get(graph_hash)
+        gh_row = graph_row(graph_hash)
         if isinstance(gh_row, dict):
             workflow_block = {
                 "graph_hash": graph_hash,
@@ -1732,11 +2364,13 @@ def build_asset_ratings_explorer(
                 "shape_id": gh_row.get("shape_id"),
                 "contributors": gh_row.get("contributors") or [],
             }
+            if "contributors_next_offset" in gh_row:
+                workflow_block["contributors_next_offset"] = gh_row["contributors_next_offset"]
 
     recipe_block: Dict[str, Any] = {}
     shape_recipe = output_row.get("shape_recipe") if output_row else None
     if isinstance(shape_recipe, str) and shape_recipe:
-        rec_row = by_recipe.get(shape_recipe)
+        rec_row = recipe_row(shape_recipe)
         if isinstance(rec_row, dict):
             recipe_block = {
                 "shape_recipe": shape_recipe,
@@ -1751,7 +2385,7 @@ def build_asset_ratings_explorer(
         basenames = output_row.get("sources") or []
         for raw, bn in zip(paths, basenames):
             cited: Dict[str, Any] = {"basename": bn, "via_source": raw}
-            src_row = by_source.get(bn) if bn else None
+            src_row = cited_row(bn) if bn else None
             if isinstance(src_row, dict):
                 cited["source_inferred"] = src_row.get("inferred")
                 cited["source_n"] = src_row.get("n")
@@ -1777,8 +2411,8 @@ def build_asset_ratings_explorer(
         "workflow": workflow_block or None,
         "recipe": recipe_block or None,
         "sources_cited": sources_cited,
-        "index_updated_at": ratings_doc.get("updated_at"),
-        "index_stats": ratings_doc.get("stats"),
+        "index_updated_at": index_updated_at,
+        "index_stats": index_stats,
     }
 
 
@@ -1850,34 +2484,7 @@ def lookup_output_appetite(output_path: str, appetite_doc: dict[str, Any]) -> Op
     table = (appetite_doc or {}).get("by_output_relpath") or {}
     if not isinstance(table, dict):
         return None
-    raw = str(output_path or "").strip().replace("\\", "/")
-    if not raw:
-        return None
-    keys = [raw, Path(raw).name]
-    if "/output/output/" in raw:
-        keys.append(re.sub(r"^.*?/output/output/", "output/", raw))
-    if "/og/" in raw:
-        tail = raw.split("/og/", 1)[-1]
-        keys.append(f"output/og/{tail.rstrip('/')}")
-        keys.append(f"og/{tail.rstrip('/')}")
-    expanded: List[str] = []
-    for key in keys:
-        key = key.strip().replace("\\", "/")
-        if not key:
-            continue
-        expanded.append(key)
-        for suffix in (".mp4", ".MP4", ".png", ".PNG", ".webm", ".WEBM"):
-            if key.endswith(suffix):
-                expanded.append(key[: -len(suffix)])
-    seen: set[str] = set()
-    for key in expanded:
-        if not key or key in seen:
-            continue
-        seen.add(key)
-        row = table.get(key)
-        if isinstance(row, dict):
-            return row
-    return None
+    return lookup_output_row(table, output_lookup_keys(output_path))
 
 
 def set_output_appetite(
@@ -1954,19 +2561,55 @@ def cmd_ratings_build(args: argparse.Namespace) -> int:
     ffprobe = args.ffprobe or shutil.which("ffprobe")
     lineage_edges = Path(args.lineage_edges).expanduser().resolve() if getattr(args, "lineage_edges", None) else None
 
-    doc = build_ratings_index(
+    build_kwargs: Dict[str, Any] = dict(
         og_root=og_root,
         jobs_root=jobs_root,
         data_root=data_root,
         out_path=out_path,
         name_glob=str(args.name_glob or "*.XMP"),
-        days=int(args.days or 0),
         ffprobe=ffprobe,
         join_lineage=bool(getattr(args, "join_lineage", True)),
         lineage_edges_path=lineage_edges,
     )
+    days = int(args.days or 0)
+    build_stats: Optional[Dict[str, Any]] = None
+    if getattr(args, "full", False) or days > 0:
+        doc = build_ratings_index(days=days, **build_kwargs)
+    else:
+        from shape_factory_ratings_incremental import (
+            build_ratings_index_incremental,
+            default_build_manifest_path,
+            open_build_manifest,
+            reset_build_manifest,
+            verify_incremental_build,
+        )
+
+        if getattr(args, "verify", False):
+            lineage_credits: List[Dict[str, Any]] = []
+            doc, build_stats, diffs = verify_incremental_build(lineage_credits=lineage_credits, **build_kwargs)
+            write_ratings_index(doc, out_path, lineage_credits=lineage_credits)
+            if diffs:
+                # Trust the full build; make the next incremental run start from scratch.
+                con = open_build_manifest(default_build_manifest_path(out_path))
+                try:
+                    reset_build_manifest(con)
+                finally:
+                    con.close()
+                print(f"Wrote {out_path} (full build)")
+                print(f"error: incremental build differs from full build ({len(diffs)} shown):", file=__import__("sys").stderr)
+                for line in diffs:
+                    print(f"  {line}", file=__import__("sys").stderr)
+                return 1
+            print("verify: incremental build matches full build")
+        else:
+            doc, build_stats = build_ratings_index_incremental(**build_kwargs)
     stats = doc.get("stats") or {}
     print(f"Wrote {out_path}")
+    if build_stats:
+        print(
+            "incremental: xmps={xmps} reextracted={reextracted} reused={reused} removed={removed} "
+            "contribution_deltas={contribution_deltas} jobs_reparsed={jobs_reparsed}/{jobs}".format(**build_stats)
+        )
     print(
         "rated_outputs={rated_outputs} with_prompt={with_prompt} with_sources={with_sources} "
         "joined_jobs={joined_shape_factory_jobs} joined_png_graph={joined_png_workflow_graph}".format(
@@ -2035,6 +2678,16 @@ def add_ratings_subparser(sub: argparse._SubParsersAction) -> None:
     build.add_argument("--name-glob", default="*.XMP")
     build.add_argument("--days", type=int, default=0)
     build.add_argument("--ffprobe", default=None)
+    build.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-read every XMP and job (default: incremental via ratings_build_manifest.sqlite; --days implies --full)",
+    )
+    build.add_argument(
+        "--verify",
+        action="store_true",
+        help="Run incremental and full builds, write the full result, exit 1 if they differ",
+    )
     build.add_argument(
         "--join-lineage",
         dest="join_lineage",
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+Incremental ``ratings build``: re-read only new / changed XMPs and move aggregate deltas.
+
+``ratings_build_manifest.sqlite`` beside ``ratings_index.json`` remembers, per XMP under
+og/, its stamp (XMP + sibling .png / .mp4 ``mtime_ns:size``), star, prompt fingerprint
+and the extracted record (sources, output keys, job lookup keys), plus the aggregate
+buckets that record's star landed in. A build still stats every XMP and job file, but
+re-extracts prompts (PIL / ffprobe) only where a stamp changed and re-parses only
+changed ``*.job.json``. A record whose contributions changed (new star, new sources, a
+job now claiming its output) moves its star in the ``agg`` histogram
+(graph_hash / shape_recipe / source_basename × star → count); everything else stays put.
+
+Buckets are rebuilt from the histogram and the first contributors per bucket (manifest
+order = sorted XMP path order), lineage uplift runs over all records as before, and the
+document is identical to ``compute_ratings_index`` apart from ``updated_at``:
+
+  python3 shape_factory.py ratings build --verify   # incremental vs full, exit 1 on diff
+
+``--days`` builds (time-windowed) always take the full path.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from correlate_output_ratings import parse_xmp_rating, rated_og_record
+from shape_factory_ratings import (
+    RATINGS_MAX_CONTRIBUTORS,
+    RatingsAccumulator,
+    _job_meta_from,
+    _job_output_keys,
+    _load_prior_rating_rows,
+    _lookup_job_meta,
+    _png_workflow_graph_hash,
+    _record_contributions,
+    _record_lookup_keys,
+    compute_ratings_index,
+    finish_ratings_doc,
+    write_ratings_index,
+)
+from xmp_catalog import open_xmp_catalog, reconcile_xmp_catalog, xmp_catalog_enabled
+
+BUILD_MANIFEST_BASENAME = "ratings_build_manifest.sqlite"
+BUILD_MANIFEST_SCHEMA_VERSION = 1
+
+_MANIFEST_TABLES = ("records", "contributions", "agg", "jobs")
+# Top-level document keys whose order (not just content) must match the full build.
+_ORDERED_TABLES = ("by_graph_hash", "by_shape_recipe", "by_source_basename", "by_output_relpath")
+
+
+def default_build_manifest_path(ratings_index_path: Path) -> Path:
+    return Path(ratings_index_path).with_name(BUILD_MANIFEST_BASENAME)
+
+
+def open_build_manifest(path: Path) -> sqlite3.Connection:
+    path = Path(path).expanduser().resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(path), timeout=30)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS records (
+            xmp_rel TEXT PRIMARY KEY,
+            sort_key TEXT NOT NULL,
+            stamp TEXT NOT NULL,
+            rating INTEGER,
+            prompt_fp TEXT,
+            record_json TEXT,
+            lookup_keys_json TEXT,
+            workflow_gh TEXT,
+            contrib_json TEXT NOT NULL DEFAULT '[]'
+        )
+        """
+    )
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS contributions (
+            xmp_rel TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            sort_key TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            rating INTEGER NOT NULL,
+            contributor_json TEXT,
+            PRIMARY KEY (xmp_rel, seq)
+        )
+        """
+    )
+    con.execute("CREATE INDEX IF NOT EXISTS idx_rbm_contrib_bucket ON contributions(kind, key, sort_key, seq)")
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS agg (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            rating INTEGER NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (kind, key, rating)
+        )
+        """
+    )
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_rel TEXT PRIMARY KEY,
+            stamp TEXT NOT NULL,
+            meta_json TEXT,
+            keys_json TEXT NOT NULL DEFAULT '[]'
+        )
+        """
+    )
+    con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    con.execute(
+        "INSERT OR REPLACE INTO meta(key, value) VALUES('schema_version', ?)",
+        (str(BUILD_MANIFEST_SCHEMA_VERSION),),
+    )
+    con.commit()
+    return con
+
+
+def reset_build_manifest(con: sqlite3.Connection) -> None:
+    """Forget every cached record / job so the next incremental build re-reads everything."""
+    with con:
+        for table in _MANIFEST_TABLES:
+            con.execute(f"DELETE FROM {table}")
+        con.execute("DELETE FROM meta WHERE key = 'scope'")
+
+
+def _ensure_scope(con: sqlite3.Connection, scope: Dict[str, Any]) -> bool:
+    """Reset the manifest when roots / glob / ffprobe changed since it was written. True if reset."""
+    want = json.dumps(scope, sort_keys=True)
+    row = con.execute("SELECT value FROM meta WHERE key = 'scope'").fetchone()
+    if row is not None and row[0] == want:
+        return False
+    reset_build_manifest(con)
+    with con:
+        con.execute("INSERT OR REPLACE INTO meta(key, value) VALUES('scope', ?)", (want,))
+    return True
+
+
+def _file_stamp(path: Path) -> str:
+    try:
+        st = path.stat()
+    except OSError:
+        return "-"
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _sort_key(rel_parts: Iterable[str]) -> str:
+    # \x01 sorts below every path character, so text order matches sorted(Path) order.
+    return "\x01".join(rel_parts)
+
+
+def prompt_fingerprint(prompt: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not prompt:
+        return None
+    raw = json.dumps(prompt, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _sync_job_index(
+    con: sqlite3.Connection,
+    jobs_root: Path,
+    data_root: Path,
+    stats: Dict[str, int],
+) -> Dict[str, Dict[str, Any]]:
+    """``build_job_output_index`` from cached per-job keys; only changed job files are parsed."""
+    cached = {str(r["job_rel"]): r for r in con.execute("SELECT job_rel, stamp, meta_json, keys_json FROM jobs")}
+    index: Dict[str, Dict[str, Any]] = {}
+    seen: set[str] = set()
+    job_paths = sorted(jobs_root.rglob("*.job.json")) if jobs_root.is_dir() else []
+    for job_path in job_paths:
+        rel = job_path.relative_to(jobs_root).as_posix()
+        stamp = _file_stamp(job_path)
+        seen.add(rel)
+        stats["jobs"] += 1
+        row = cached.get(rel)
+        if row is not None and row["stamp"] == stamp:
+            meta = json.loads(row["meta_json"]) if row["meta_json"] else None
+            keys = json.loads(row["keys_json"])
+        else:
+            stats["jobs_reparsed"] += 1
+            meta, keys = None, []
+            try:
+                job = json.loads(job_path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                job = None
+            if isinstance(job, dict):
+                meta = _job_meta_from(job)
+                keys = _job_output_keys(job, data_root)
+            con.execute(
+                "INSERT OR REPLACE INTO jobs(job_rel, stamp, meta_json, keys_json) VALUES (?, ?, ?, ?)",
+                (rel, stamp, json.dumps(meta) if meta is not None else None, json.dumps(keys)),
+            )
+        if meta is None:
+            continue
+        for key in keys:
+            index.setdefault(key, meta)
+    gone = [(rel,) for rel in cached if rel not in seen]
+    if gone:
+        con.executemany("DELETE FROM jobs WHERE job_rel = ?", gone)
+    return index
+
+
+def _move_contributions(
+    con: sqlite3.Connection,
+    xmp_rel: str,
+    sort_key: str,
+    old: List[List[Any]],
+    new: List[List[Any]],
+) -> None:
+    """Replace one record's ``[kind, key, rating, contributor]`` rows and shift the histogram."""
+    for kind, key, rating, _ in old:
+        con.execute("UPDATE agg SET n = n - 1 WHERE kind = ? AND key = ? AND rating = ?", (kind, key, rating))
+    if old:
+        con.execute("DELETE FROM agg WHERE n <= 0")
+        con.execute("DELETE FROM contributions WHERE xmp_rel = ?", (xmp_rel,))
+    for seq, (kind, key, rating, contributor) in enumerate(new):
+        con.execute(
+            """
+            INSERT INTO agg(kind, key, rating, n) VALUES (?, ?, ?, 1)
+            ON CONFLICT(kind, key, rating) DO UPDATE SET n = n + 1
+            """,
+            (kind, key, rating),
+        )
+        con.execute(
+            """
+            INSERT INTO contributions(xmp_rel, seq, sort_key, kind, key, rating, contributor_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (xmp_rel, seq, sort_key, kind, key, rating, json.dumps(contributor) if contributor is not None else None),
+        )
+
+
+def _sync_records(
+    con: sqlite3.Connection,
+    og_root: Path,
+    *,
+    name_glob: str,
+    ffprobe: Optional[str],
+    data_root: Path,
+    stats: Dict[str, int],
+) -> List[Dict[str, Any]]:
+    """
+    Rated manifest rows in ``iter_rated_og_records`` order; XMPs whose stamp changed are
+    re-read (star + prompt). Rows for vanished XMPs are dropped with their contributions.
+    The walk also reconciles the XMP catalog when ``ratings.sqlite`` exists.
+    """
+    cached = {str(r["xmp_rel"]): dict(r) for r in con.execute("SELECT * FROM records")}
+    out: List[Dict[str, Any]] = []
+    seen: set[str] = set()
+    walked: List[Tuple[Path, os.stat_result, Optional[int]]] = []
+    xmps = sorted(og_root.glob(f"**/{name_glob}")) if og_root.is_dir() else []
+    for xmp in xmps:
+        try:
+            st = xmp.stat()
+        except OSError:
+            continue
+        rel_parts = xmp.relative_to(og_root).parts
+        rel = "/".join(rel_parts)
+        seen.add(rel)
+        stats["xmps"] += 1
+        stamp = "|".join(
+            (f"{st.st_mtime_ns}:{st.st_size}", _file_stamp(xmp.with_suffix(".png")), _file_stamp(xmp.with_suffix(".mp4")))
+        )
+        row = cached.get(rel)
+        if row is None or row["stamp"] != stamp:
+            stats["reextracted"] += 1
+            rating = parse_xmp_rating(xmp)
+            rec: Optional[Dict[str, Any]] = None
+            if rating is not None:
+                rec = rated_og_record(xmp, og_root, rating=rating, mtime=datetime.fromtimestamp(st.st_mtime), ffprobe=ffprobe)
+                prompt = rec.pop("prompt", None)
+                rec["has_prompt"] = bool(prompt)
+                rec["prompt_fingerprint"] = prompt_fingerprint(prompt)
+            fresh = {
+                "xmp_rel": rel,
+                "sort_key": _sort_key(rel_parts),
+                "stamp": stamp,
+                "rating": rating,
+                "prompt_fp": rec["prompt_fingerprint"] if rec else None,
+                "record_json": json.dumps(rec) if rec else None,
+                "lookup_keys_json": json.dumps(_record_lookup_keys(rec, data_root)) if rec else None,
+                "workflow_gh": None,
+                "contrib_json": row["contrib_json"] if row is not None else "[]",
+            }
+            con.execute(
+                """
+                INSERT OR REPLACE INTO records
+                  (xmp_rel, sort_key, stamp, rating, prompt_fp, record_json, lookup_keys_json, workflow_gh, contrib_json)
+                VALUES (:xmp_rel, :sort_key, :stamp, :rating, :prompt_fp, :record_json, :lookup_keys_json,
+                        :workflow_gh, :contrib_json)
+                """,
+                fresh,
+            )
+            row = fresh
+        else:
+            stats["reused"] += 1
+        walked.append((xmp, st, None if row["rating"] is None else int(row["rating"])))
+        if row["rating"] is None:
+            stats["unrated"] += 1
+            if row["contrib_json"] != "[]":
+                _move_contributions(con, rel, row["sort_key"], json.loads(row["contrib_json"]), [])
+                con.execute("UPDATE records SET contrib_json = '[]' WHERE xmp_rel = ?", (rel,))
+            continue
+        out.append(row)
+
+    for rel, row in cached.items():
+        if rel in seen:
+            continue
+        stats["removed"] += 1
+        _move_contributions(con, rel, row["sort_key"], json.loads(row["contrib_json"]), [])
+        con.execute("DELETE FROM records WHERE xmp_rel = ?", (rel,))
+
+    catalog = open_xmp_catalog(og_root) if og_root.is_dir() and xmp_catalog_enabled() else None
+    if catalog is not None:
+        try:
+            reconcile_xmp_catalog(catalog, og_root, name_glob, walked)
+        finally:
+            catalog.close()
+    return out
+
+
+def _accumulator_from_manifest(con: sqlite3.Connection) -> RatingsAccumulator:
+    """Buckets in first-contributor order with their first N contributors, stars from ``agg``."""
+    acc = RatingsAccumulator()
+    rows = con.execute(
+        """
+        SELECT kind, key, contributor_json FROM (
+            SELECT kind, key, contributor_json, sort_key, seq,
+                   ROW_NUMBER() OVER (PARTITION BY kind, key ORDER BY sort_key, seq) AS rn
+            FROM contributions
+        )
+        WHERE rn <= ?
+        ORDER BY sort_key, seq
+        """,
+        (RATINGS_MAX_CONTRIBUTORS,),
+    )
+    for row in rows:
+        kind, key = str(row["kind"]), str(row["key"])
+        acc.bucket(kind, key)
+        arr = acc.contributors(kind, key)
+        if arr is not None and row["contributor_json"]:
+            arr.append(json.loads(row["contributor_json"]))
+    # Stars ascending with weight 1.0: integer sums are exact, so means match record order.
+    for row in con.execute("SELECT kind, key, rating, n FROM agg WHERE n > 0 ORDER BY kind, key, rating"):
+        bucket = acc.bucket(str(row["kind"]), str(row["key"]))
+        bucket.ratings.extend([int(row["rating"])] * int(row["n"]))
+        bucket.weights.extend([1.0] * int(row["n"]))
+    return acc
+
+
+def compute_ratings_index_incremental(
+    *,
+    og_root: Path,
+    jobs_root: Path,
+    data_root: Path,
+    out_path: Path,
+    name_glob: str = "*.XMP",
+    ffprobe: Optional[str] = None,
+    join_lineage: bool = True,
+    lineage_edges_path: Optional[Path] = None,
+    manifest_path: Optional[Path] = None,
+    lineage_credits: Optional[List[Dict[str, Any]]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """``(doc, build stats)``; same document as ``compute_ratings_index`` (not written)."""
+    og_root = og_root.expanduser().resolve()
+    jobs_root = jobs_root.expanduser().resolve()
+    data_root = data_root.expanduser().resolve()
+    out_path = out_path.expanduser().resolve()
+    manifest_path = Path(manifest_path or default_build_manifest_path(out_path)).expanduser().resolve()
+
+    stats: Dict[str, Any] = {
+        "mode": "incremental",
+        "manifest_path": str(manifest_path),
+        "manifest_reset": False,
+        "xmps": 0,
+        "reextracted": 0,
+        "reused": 0,
+        "unrated": 0,
+        "removed": 0,
+        "contribution_deltas": 0,
+        "jobs": 0,
+        "jobs_reparsed": 0,
+    }
+    con = open_build_manifest(manifest_path)
+    try:
+        stats["manifest_reset"] = _ensure_scope(
+            con,
+            {
+                "og_root": str(og_root),
+                "jobs_root": str(jobs_root),
+                "data_root": str(data_root),
+                "name_glob": name_glob,
+                "ffprobe": bool(ffprobe),
+            },
+        )
+        with con:
+            job_index = _sync_job_index(con, jobs_root, data_root, stats)
+            rows = _sync_records(con, og_root, name_glob=name_glob, ffprobe=ffprobe, data_root=data_root, stats=stats)
+
+            joined: List[Tuple[Dict[str, Any], Optional[str], Optional[str], bool]] = []
+            for row in rows:
+                rec = json.loads(row["record_json"])
+                meta = _lookup_job_meta(json.loads(row["lookup_keys_json"]), job_index)
+                if meta and meta.get("graph_hash"):
+                    gh, recipe, from_job = str(meta["graph_hash"]), meta.get("shape_recipe"), True
+                else:
+                    wf_gh = row["workflow_gh"]
+                    if wf_gh is None:
+                        wf_gh = _png_workflow_graph_hash(Path(str(rec.get("xmp_path") or ""))) or ""
+                        con.execute("UPDATE records SET workflow_gh = ? WHERE xmp_rel = ?", (wf_gh, row["xmp_rel"]))
+                    gh, recipe, from_job = (wf_gh or None), None, False
+                rating = int(rec["rating"])
+                new = [[kind, key, rating, contributor] for kind, key, contributor in _record_contributions(rec, gh, recipe)]
+                new_json = json.dumps(new)
+                if new_json != row["contrib_json"]:
+                    stats["contribution_deltas"] += 1
+                    _move_contributions(con, row["xmp_rel"], row["sort_key"], json.loads(row["contrib_json"]), new)
+                    con.execute("UPDATE records SET contrib_json = ? WHERE xmp_rel = ?", (new_json, row["xmp_rel"]))
+                joined.append((rec, gh, recipe, from_job))
+
+            acc = _accumulator_from_manifest(con)
+    finally:
+        con.close()
+
+    prior_rows = _load_prior_rating_rows(out_path)
+    records: List[Dict[str, Any]] = []
+    for rec, gh, recipe, from_job in joined:
+        acc.add_output(rec, gh, recipe, from_job, job_index=job_index, data_root=data_root, prior_rows=prior_rows)
+        records.append(rec)
+
+    doc = finish_ratings_doc(
+        acc,
+        records=records,
+        job_output_keys=len(job_index),
+        data_root=data_root,
+        join_lineage=join_lineage,
+        lineage_edges_path=lineage_edges_path,
+        lineage_credits=lineage_credits,
+    )
+    return doc, stats
+
+
+def build_ratings_index_incremental(
+    *,
+    og_root: Path,
+    jobs_root: Path,
+    data_root: Path,
+    out_path: Path,
+    name_glob: str = "*.XMP",
+    ffprobe: Optional[str] = None,
+    join_lineage: bool = True,
+    lineage_edges_path: Optional[Path] = None,
+    manifest_path: Optional[Path] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    lineage_credits: List[Dict[str, Any]] = []
+    doc, stats = compute_ratings_index_incremental(
+        og_root=og_root,
+        jobs_root=jobs_root,
+        data_root=data_root,
+        out_path=out_path,
+        name_glob=name_glob,
+        ffprobe=ffprobe,
+        join_lineage=join_lineage,
+        lineage_edges_path=lineage_edges_path,
+        manifest_path=manifest_path,
+        lineage_credits=lineage_credits,
+    )
+    write_ratings_index(doc, out_path.expanduser().resolve(), lineage_credits=lineage_credits)
+    return doc, stats
+
+
+def diff_ratings_docs(a: Dict[str, Any], b: Dict[str, Any], *, limit: int = 20) -> List[str]:
+    """Human-readable differences between two ratings documents (``updated_at`` ignored)."""
+    diffs: List[str] = []
+
+    def walk(x: Any, y: Any, path: str) -> None:
+        if len(diffs) >= limit:
+            return
+        if isinstance(x, dict) and isinstance(y, dict):
+            for k in sorted(set(x) | set(y), key=str):
+                if k == "updated_at" and not path:
+                    continue
+                sub = f"{path}.{k}" if path else str(k)
+                if k not in x or k not in y:
+                    diffs.append(f"{sub}: only in {'incremental' if k in x else 'full'}")
+                    if len(diffs) >= limit:
+                        return
+                    continue
+                walk(x[k], y[k], sub)
+        elif isinstance(x, list) and isinstance(y, list) and len(x) == len(y):
+            for i, (xi, yi) in enumerate(zip(x, y)):
+                walk(xi, yi, f"{path}[{i}]")
+        elif x != y:
+            diffs.append(f"{path}: {x!r} != {y!r}")
+
+    walk(a, b, "")
+    for table in _ORDERED_TABLES:
+        if len(diffs) >= limit:
+            break
+        ka, kb = list((a.get(table) or {}).keys()), list((b.get(table) or {}).keys())
+        if ka != kb and set(ka) == set(kb):
+            diffs.append(f"{table}: key order differs")
+    return diffs
+
+
+def verify_incremental_build(
+    *,
+    og_root: Path,
+    jobs_root: Path,
+    data_root: Path,
+    out_path: Path,
+    name_glob: str = "*.XMP",
+    ffprobe: Optional[str] = None,
+    join_lineage: bool = True,
+    lineage_edges_path: Optional[Path] = None,
+    manifest_path: Optional[Path] = None,
+    lineage_credits: Optional[List[Dict[str, Any]]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any], List[str]]:
+    """
+    ``(full doc, incremental build stats, differences)``; both computed, nothing written.
+    ``lineage_credits`` receives the full build's uplift credits.
+    """
+    kwargs: Dict[str, Any] = dict(
+        og_root=og_root,
+        jobs_root=jobs_root,
+        data_root=data_root,
+        out_path=out_path,
+        name_glob=name_glob,
+        ffprobe=ffprobe,
+        join_lineage=join_lineage,
+        lineage_edges_path=lineage_edges_path,
+    )
+    inc_doc, stats = compute_ratings_index_incremental(manifest_path=manifest_path, **kwargs)
+    full_doc = compute_ratings_index(lineage_credits=lineage_credits, **kwargs)
+    return full_doc, stats, diff_ratings_docs(inc_doc, full_doc)
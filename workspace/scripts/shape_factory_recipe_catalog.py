@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Persisted per-family hourly replay recipe catalog (rebuildable).
+
+``collect_replay_recipes`` used to re-parse every ``.job.json`` of a family and, for every
+deposit-pool member, stat the MP4 and re-extract the UI workflow from its companion PNG —
+on every replay / derive / predicted plan and on every tick of ``simulate_hourly_picks``.
+This SQLite (``shape_factory/_status/hourly_recipe_catalog.sqlite``) keeps one row per
+job file and per pool member: its ``mtime_ns:size`` stamp, the ``job_key`` and the
+recipe (``combo_key``, source job / ``og:`` path, output path, picks) or NULL when that
+entry yields none, plus the stamps of the files the recipe was resolved from (its picks
+and the job's ``generated_workflow_path``). A read stats the entries and their
+dependencies and re-parses only those whose stamps moved; recipes come back in exactly
+the order and dedupe of the full scan (:func:`shape_factory_hourly.merge_replay_recipes`).
+
+Freshness: ``shape_factory deposit`` refreshes the deposited job's row
+(:func:`note_job_deposited`); other writers are caught by the stamp check. A changed
+``<family>.shape.yaml`` drops that family's rows. A cached recipe whose input media or
+replay prompt profile was deleted is re-extracted. A NULL recipe is only cached when the
+entry itself is not replayable (unreadable job, no bindings, PNG without a workflow);
+entries whose media did not resolve are re-parsed on every read, like the full scan.
+
+  python3 shape_factory_recipe_catalog.py sync --family FB9_GEX2
+  python3 shape_factory_recipe_catalog.py verify --family FB9_GEX2
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import json
+import os
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+RECIPE_CATALOG_BASENAME = "hourly_recipe_catalog.sqlite"
+RECIPE_CATALOG_SCHEMA_VERSION = 2
+
+ORIGIN_JOB = "job"
+ORIGIN_OG = "og"
+
+
+def utc_now() -> str:
+    return _dt.datetime.now(_dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def default_recipe_catalog_path(data_root: Path) -> Path:
+    return Path(data_root).expanduser().resolve() / "shape_factory" / "_status" / RECIPE_CATALOG_BASENAME
+
+
+def file_stamp(path: Path) -> str:
+    """``mtime_ns:size`` (empty when the file is missing)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ""
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def open_recipe_catalog(path: Path) -> sqlite3.Connection:
+    path = Path(path).expanduser().resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(path), timeout=30)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    found = con.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    if found is not None and found[0] != str(RECIPE_CATALOG_SCHEMA_VERSION):
+        con.execute("DROP TABLE IF EXISTS entries")
+        con.execute("DROP TABLE IF EXISTS families")
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS families (
+            family TEXT PRIMARY KEY,
+            shape_stamp TEXT NOT NULL,
+            synced_at TEXT
+        )
+        """
+    )
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS entries (
+            family TEXT NOT NULL,
+            origin TEXT NOT NULL,
+            entry_path TEXT NOT NULL,
+            resolved_path TEXT,
+            stamp TEXT NOT NULL,
+            job_key TEXT NOT NULL DEFAULT '',
+            combo_key TEXT,
+            recipe_json TEXT,
+            deps_json TEXT,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (family, origin, entry_path)
+        )
+        """
+    )
+    con.execute("CREATE INDEX IF NOT EXISTS idx_rc_combo ON entries(family, combo_key)")
+    con.execute(
+        "INSERT OR REPLACE INTO meta(key, value) VALUES('schema_version', ?)",
+        (str(RECIPE_CATALOG_SCHEMA_VERSION),),
+    )
+    con.commit()
+    return con
+
+
+def _load_shape(family: str, data_root: Path) -> Tuple[Path, Dict[str, Any]]:
+    from shape_factory import load_yaml
+
+    shape_path = data_root / "shapes" / f"{family}.shape.yaml"
+    if not shape_path.is_file():
+        raise FileNotFoundError(f"missing shape for family {family!r}")
+    return shape_path, load_yaml(shape_path)
+
+
+def _ensure_family(con: sqlite3.Connection, family: str, shape_path: Path) -> bool:
+    """Drop the family's rows when its shape changed; True when they were dropped."""
+    stamp = file_stamp(shape_path)
+    row = con.execute("SELECT shape_stamp FROM families WHERE family = ?", (family,)).fetchone()
+    if row is not None and row["shape_stamp"] == stamp:
+        return False
+    con.execute("DELETE FROM entries WHERE family = ?", (family,))
+    con.execute(
+        "INSERT OR REPLACE INTO families(family, shape_stamp, synced_at) VALUES(?, ?, NULL)",
+        (family, stamp),
+    )
+    return row is not None
+
+
+def _cached_recipe(row: sqlite3.Row) -> Optional[Dict[str, Any]]:
+    raw = row["recipe_json"]
+    if not raw:
+        return None
+    try:
+        recipe = json.loads(raw)
+    except ValueError:
+        return None
+    return recipe if isinstance(recipe, dict) else None
+
+
+def _dependency_stamps(recipe: Optional[Dict[str, Any]], extra: Tuple[str, ...] = ()) -> Dict[str, str]:
+    """``path → stamp`` for the recipe's picks (media, replay prompt profile) and ``extra`` files."""
+    picks = (recipe or {}).get("picks") if isinstance((recipe or {}).get("picks"), dict) else {}
+    paths = [str(p) for p in picks.values() if p] + [p for p in extra if p]
+    return {p: file_stamp(Path(p)) for p in paths}
+
+
+def _dependencies_fresh(row: sqlite3.Row) -> bool:
+    """False when a file the cached recipe was resolved from moved or disappeared."""
+    try:
+        deps = json.loads(row["deps_json"] or "{}")
+    except ValueError:
+        return False
+    if not isinstance(deps, dict):
+        return False
+    return all(file_stamp(Path(p)) == stamp for p, stamp in deps.items())
+
+
+def _read_job(job_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        job = json.loads(job_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return job if isinstance(job, dict) else None
+
+
+def _drop_entry(con: sqlite3.Connection, family: str, origin: str, entry_path: str) -> None:
+    con.execute(
+        "DELETE FROM entries WHERE family = ? AND origin = ? AND entry_path = ?",
+        (family, origin, entry_path),
+    )
+
+
+def _put_entry(
+    con: sqlite3.Connection,
+    *,
+    family: str,
+    origin: str,
+    entry_path: str,
+    resolved_path: Optional[str],
+    stamp: str,
+    job_key: str,
+    recipe: Optional[Dict[str, Any]],
+    deps: Dict[str, str],
+) -> None:
+    con.execute(
+        """
+        INSERT OR REPLACE INTO entries(
+            family, origin, entry_path, resolved_path, stamp, job_key, combo_key, recipe_json, deps_json, updated_at
+        ) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            family,
+            origin,
+            entry_path,
+            resolved_path,
+            stamp,
+            job_key,
+            (recipe or {}).get("combo_key"),
+            json.dumps(recipe, ensure_ascii=False, sort_keys=True) if recipe is not None else None,
+            json.dumps(deps, ensure_ascii=False, sort_keys=True),
+            utc_now(),
+        ),
+    )
+
+
+def _job_entry(
+    con: sqlite3.Connection,
+    job_path: Path,
+    *,
+    family: str,
+    shape: Dict[str, Any],
+    data_root: Path,
+    rows: Dict[str, sqlite3.Row],
+    stats: Dict[str, int],
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    from shape_factory_hourly import _job_is_replayable, _job_replay_recipe
+
+    key = str(job_path)
+    stamp = file_stamp(job_path)
+    row = rows.get(key)
+    if row is not None and row["stamp"] == stamp and _dependencies_fresh(row):
+        stats["reused"] += 1
+        return row["job_key"], _cached_recipe(row)
+    stats["reparsed"] += 1
+    job_key, recipe = _job_replay_recipe(job_path, family=family, shape=shape, data_root=data_root)
+    job = _read_job(job_path) or {}
+    if recipe is None and job.get("bindings") and _job_is_replayable(job):
+        # Bindings that did not resolve (input media missing): re-parse on the next read.
+        stats["unresolved"] += 1
+        _drop_entry(con, family, ORIGIN_JOB, key)
+        return job_key, None
+    _put_entry(
+        con,
+        family=family,
+        origin=ORIGIN_JOB,
+        entry_path=key,
+        resolved_path=key,
+        stamp=stamp,
+        job_key=job_key,
+        recipe=recipe,
+        deps=_dependency_stamps(recipe, (str(job.get("generated_workflow_path") or "").strip(),)),
+    )
+    return job_key, recipe
+
+
+def _og_stamp(out_path: Path) -> str:
+    return f"{file_stamp(out_path)}|{file_stamp(out_path.with_suffix('.png'))}"
+
+
+def _og_entry(
+    con: sqlite3.Connection,
+    out_mp4: str,
+    *,
+    family: str,
+    shape: Dict[str, Any],
+    data_root: Path,
+    rows: Dict[str, sqlite3.Row],
+    stats: Dict[str, int],
+) -> Optional[Dict[str, Any]]:
+    from shape_factory_hourly import _og_replay_recipe, _png_workflow_for_output, _resolve_og_member_output
+
+    row = rows.get(out_mp4)
+    if row is not None and row["resolved_path"]:
+        cached_path = Path(row["resolved_path"])
+        if row["stamp"] == _og_stamp(cached_path) and not row["stamp"].startswith("|") and _dependencies_fresh(row):
+            stats["reused"] += 1
+            return _cached_recipe(row)
+    # Unresolvable members are not cached: the media may show up under another root later.
+    out_path = _resolve_og_member_output(out_mp4, data_root=data_root)
+    if out_path is None:
+        stats["unresolved"] += 1
+        return None
+    stats["reparsed"] += 1
+    recipe = _og_replay_recipe(out_path, family=family, shape=shape, data_root=data_root)
+    if recipe is None and _png_workflow_for_output(out_path) is not None:
+        stats["unresolved"] += 1
+        _drop_entry(con, family, ORIGIN_OG, out_mp4)
+        return None
+    _put_entry(
+        con,
+        family=family,
+        origin=ORIGIN_OG,
+        entry_path=out_mp4,
+        resolved_path=str(out_path),
+        stamp=_og_stamp(out_path),
+        job_key="",
+        recipe=recipe,
+        deps=_dependency_stamps(recipe),
+    )
+    return recipe
+
+
+def _rows_by_path(con: sqlite3.Connection, family: str, origin: str) -> Dict[str, sqlite3.Row]:
+    cur = con.execute("SELECT * FROM entries WHERE family = ? AND origin = ?", (family, origin))
+    return {row["entry_path"]: row for row in cur}
+
+
+def _prune(con: sqlite3.Connection, family: str, origin: str, stale: List[str]) -> int:
+    con.executemany(
+        "DELETE FROM entries WHERE family = ? AND origin = ? AND entry_path = ?",
+        [(family, origin, p) for p in stale],
+    )
+    return len(stale)
+
+
+def catalog_replay_recipes(
+    family: str,
+    *,
+    data_root: Path,
+    job_dir: Optional[Path] = None,
+    catalog_path: Optional[Path] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    ``collect_replay_recipes`` through the catalog: ``(recipes, stats)``.
+
+    Stats: ``reused`` / ``reparsed`` entries, ``unresolved`` entries (pool members or bindings
+    whose media did not resolve; never cached), ``pruned`` rows (job files / members that
+    disappeared) and ``family_reset`` (shape changed).
+    """
+    from shape_factory_hourly import _default_job_dir, _pool_index_mp4_members, merge_replay_recipes
+
+    data_root = Path(data_root).expanduser().resolve()
+    shape_path, shape = _load_shape(family, data_root)
+    jobs_root = job_dir or (_default_job_dir(data_root) / family)
+    job_paths = sorted(jobs_root.glob("*.job.json")) if jobs_root.is_dir() else []
+    members = _pool_index_mp4_members(family, data_root=data_root)
+
+    stats: Dict[str, Any] = {"reused": 0, "reparsed": 0, "unresolved": 0, "pruned": 0}
+    con = open_recipe_catalog(catalog_path or default_recipe_catalog_path(data_root))
+    try:
+        stats["family_reset"] = _ensure_family(con, family, shape_path)
+        job_rows = _rows_by_path(con, family, ORIGIN_JOB)
+        og_rows = _rows_by_path(con, family, ORIGIN_OG)
+        job_recipes = [
+            _job_entry(con, p, family=family, shape=shape, data_root=data_root, rows=job_rows, stats=stats)
+            for p in job_paths
+        ]
+        recipes = merge_replay_recipes(
+            job_recipes,
+            members,
+            lambda out_mp4: _og_entry(
+                con, out_mp4, family=family, shape=shape, data_root=data_root, rows=og_rows, stats=stats
+            ),
+        )
+        seen_jobs = {str(p) for p in job_paths}
+        seen_members = {m for m, _ in members}
+        stats["pruned"] += _prune(con, family, ORIGIN_JOB, [p for p in job_rows if p not in seen_jobs])
+        stats["pruned"] += _prune(con, family, ORIGIN_OG, [p for p in og_rows if p not in seen_members])
+        if stats["reparsed"] or stats["pruned"] or stats["family_reset"]:
+            con.execute("UPDATE families SET synced_at = ? WHERE family = ?", (utc_now(), family))
+        con.commit()
+    finally:
+        con.close()
+    stats["recipes"] = len(recipes)
+    return recipes, stats
+
+
+def note_job_deposited(job_path: Path, job: Dict[str, Any], *, data_root: Path) -> bool:
+    """Refresh one job's row after ``shape_factory deposit`` wrote it (False: no catalog / shape)."""
+    family = str(job.get("family_slug") or "").strip()
+    if not family:
+        return False
+    data_root = Path(data_root).expanduser().resolve()
+    catalog_path = default_recipe_catalog_path(data_root)
+    if not catalog_path.is_file():
+        return False  # first plan builds it
+    shape_path = data_root / "shapes" / f"{family}.shape.yaml"
+    if not shape_path.is_file():
+        return False
+    from shape_factory import load_yaml
+
+    con = open_recipe_catalog(catalog_path)
+    try:
+        _ensure_family(con, family, shape_path)
+        job_path = Path(job_path)
+        stats = {"reused": 0, "reparsed": 0, "unresolved": 0}
+        _job_entry(
+            con,
+            job_path,
+            family=family,
+            shape=load_yaml(shape_path),
+            data_root=data_root,
+            rows=_rows_by_path(con, family, ORIGIN_JOB),
+            stats=stats,
+        )
+        con.commit()
+    finally:
+        con.close()
+    return True
+
+
+def lookup_recipe(
+    family: str,
+    combo_key: str,
+    *,
+    data_root: Path,
+    catalog_path: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """Cached recipes for ``combo_key`` (unvalidated; run a read first for freshness)."""
+    path = catalog_path or default_recipe_catalog_path(data_root)
+    if not Path(path).is_file():
+        return []
+    con = open_recipe_catalog(path)
+    try:
+        cur = con.execute(
+            "SELECT * FROM entries WHERE family = ? AND combo_key = ? ORDER BY origin, entry_path",
+            (family, combo_key),
+        )
+        return [r for r in (_cached_recipe(row) for row in cur) if r is not None]
+    finally:
+        con.close()
+
+
+def verify_recipe_catalog(
+    family: str,
+    *,
+    data_root: Path,
+    job_dir: Optional[Path] = None,
+    catalog_path: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Catalog read vs the uncached scan: same recipes in the same order."""
+    from shape_factory_hourly import scan_replay_recipes
+
+    data_root = Path(data_root).expanduser().resolve()
+    cached, stats = catalog_replay_recipes(family, data_root=data_root, job_dir=job_dir, catalog_path=catalog_path)
+    _shape_path, shape = _load_shape(family, data_root)
+    full = scan_replay_recipes(family, data_root=data_root, shape=shape, job_dir=job_dir)
+    mismatches = [
+        i for i, (a, b) in enumerate(zip(cached, full)) if json.dumps(a, sort_keys=True) != json.dumps(b, sort_keys=True)
+    ]
+    return {
+        "ok": len(cached) == len(full) and not mismatches,
+        "family": family,
+        "catalog_recipes": len(cached),
+        "scan_recipes": len(full),
+        "mismatched_positions": mismatches[:20],
+        "stats": stats,
+    }
+
+
+def _data_root_from_args(args: argparse.Namespace) -> Path:
+    if args.data_root:
+        return Path(args.data_root).expanduser().resolve()
+    from shape_factory_hourly import _default_data_root
+
+    return _default_data_root()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Hourly replay recipe catalog")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name, help_text in (
+        ("sync", "Refresh the family's rows (re-parses only entries whose mtimes moved)"),
+        ("rebuild", "Drop the family's rows and re-parse everything"),
+        ("verify", "Compare the catalog read with the uncached scan (exit 1 on mismatch)"),
+    ):
+        sp = sub.add_parser(name, help=help_text)
+        sp.add_argument("--family", default="FB9_GEX2")
+        sp.add_argument("--data-root", type=Path, default=None)
+        sp.add_argument("--job-dir", type=Path, default=None)
+    args = ap.parse_args(argv)
+    data_root = _data_root_from_args(args)
+    job_dir = args.job_dir.expanduser().resolve() if args.job_dir else None
+
+    if args.cmd == "verify":
+        result = verify_recipe_catalog(args.family, data_root=data_root, job_dir=job_dir)
+        print(json.dumps(result, indent=2))
+        return 0 if result["ok"] else 1
+    if args.cmd == "rebuild":
+        con = open_recipe_catalog(default_recipe_catalog_path(data_root))
+        try:
+            con.execute("DELETE FROM entries WHERE family = ?", (args.family,))
+            con.commit()
+        finally:
+            con.close()
+    _recipes, stats = catalog_replay_recipes(args.family, data_root=data_root, job_dir=job_dir)
+    print(json.dumps({"family": args.family, **stats}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
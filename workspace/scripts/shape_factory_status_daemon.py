@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Event-driven shape-factory job status from ComfyUI ``/ws``.
+
+Long-running alternative to polling ``/history/<prompt_id>`` per job in
+``shape_factory status``: a :class:`comfy_live_preview.LivePreviewBridge` subclass feeds
+:class:`ComfyStatusTracker`, which updates the matching ``.job.json`` + timings sidecar.
+
+Comfy keeps one socket per clientId and a newer connection displaces the older one, so the
+daemon connects as :data:`STATUS_CLIENT_ID` and refuses the submitter ids in
+``DEFAULT_CLIENT_IDS`` (the experiments UI live-preview bridge listens on those). Execution
+events are addressed to the submitting clientId, so the daemon mostly sees the broadcast
+``status`` message: whenever its ``queue_remaining`` changes, a prompt was queued or
+finished and the tracker resyncs (below). Events that do reach it (prompts posted without a
+clientId are broadcast) are applied directly:
+
+- ``execution_start``  → ``submit.status = running``, ``timings.execution.started_ts``
+- ``executing`` / ``execution_cached`` → per-node timing messages (receive time stamped)
+- ``executed``         → node outputs
+- ``execution_success`` / ``execution_error`` / ``execution_interrupted`` → terminal
+  status via ``update_job_status_from_comfy`` with a history entry synthesized from the
+  events (same outputs / timings / ledger path as a polled status pass)
+
+A resync is one ``/queue`` + one batched ``/history?max_items=`` request for all in-flight
+jobs in the job catalog; it also runs after every (re)connect (changes missed while
+disconnected).
+
+  python3 shape_factory_status_daemon.py --server http://127.0.0.1:8188 --data-root /data
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import shape_factory as sf
+from comfy_live_preview import DEFAULT_CLIENT_IDS, LivePreviewBridge
+from shape_factory_job_catalog import IN_FLIGHT_STATUSES, in_flight_jobs, open_synced_job_catalog
+
+_TERMINAL_EVENTS = {
+    "execution_success": "success",
+    "execution_error": "error",
+    "execution_interrupted": "error",
+}
+_TIMING_EVENTS = {"execution_start", "execution_cached", "executing"}
+
+# Must differ from the experiments UI bridge ids (DEFAULT_CLIENT_IDS): one socket per clientId.
+STATUS_CLIENT_ID = "shape-factory-status"
+
+
+class ComfyStatusTracker:
+    """Applies Comfy ``/ws`` execution events to shape-factory job files (thread-safe)."""
+
+    def __init__(self, *, server: str, data_root: Path, history_batch_size: int = 256) -> None:
+        self.server = str(server or "").rstrip("/")
+        self.data_root = Path(data_root).expanduser().resolve()
+        self.jobs_root = self.data_root / "shape_factory" / "jobs"
+        self.history_batch_size = int(history_batch_size)
+        self._lock = threading.RLock()
+        self._events: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"events": 0, "job_writes": 0, "resyncs": 0, "resync_updates": 0, "ignored": 0}
+
+    # -- events -----------------------------------------------------------------
+
+    def on_event(self, msg_type: str, data: Dict[str, Any], *, recv_ts: Optional[float] = None) -> Optional[str]:
+        """Handle one ``/ws`` text message; returns the job's new status when a job was written."""
+        pid = str(data.get("prompt_id") or "").strip()
+        if not pid or (msg_type not in _TIMING_EVENTS and msg_type not in _TERMINAL_EVENTS and msg_type != "executed"):
+            return None
+        ts = float(recv_ts if recv_ts is not None else time.time())
+        with self._lock:
+            self.stats["events"] += 1
+            acc = self._events.setdefault(pid, {"messages": [], "outputs": {}})
+            payload = dict(data)
+            if msg_type in _TIMING_EVENTS or msg_type in _TERMINAL_EVENTS:
+                # Node-level ``executing`` carries no timestamp; stamp receive time (ms, like Comfy).
+                payload.setdefault("timestamp", int(ts * 1000))
+                acc["messages"].append([msg_type, payload])
+            if msg_type == "executed":
+                node = data.get("node") or data.get("display_node")
+                if node is not None and isinstance(data.get("output"), dict):
+                    acc["outputs"][str(node)] = data["output"]
+                return None
+            if msg_type == "execution_start":
+                return self._apply_running(pid, ts)
+            if msg_type in _TERMINAL_EVENTS:
+                try:
+                    return self._apply_terminal(pid, _TERMINAL_EVENTS[msg_type], ts)
+                finally:
+                    self._events.pop(pid, None)
+        return None
+
+    def _history_from_events(self, pid: str, *, status_str: Optional[str]) -> Dict[str, Any]:
+        acc = self._events.get(pid) or {"messages": [], "outputs": {}}
+        status: Dict[str, Any] = {"messages": copy.deepcopy(acc["messages"])}
+        if status_str:
+            status["status_str"] = status_str
+            status["completed"] = status_str == "success"
+        return {"status": status, "outputs": copy.deepcopy(acc["outputs"])}
+
+    def _load(self, pid: str) -> tuple[Optional[Path], Optional[Dict[str, Any]]]:
+        path, job = sf.find_job_by_prompt_id(self.jobs_root, pid)
+        if path is None or job is None:
+            self.stats["ignored"] += 1
+            self._events.pop(pid, None)
+        return path, job
+
+    def _write(self, path: Path, job: Dict[str, Any], status: str) -> None:
+        sf.atomic_write_json(path, job)
+        sf.persist_timings(path, job, ledger=status in {"complete", "error"})
+        self.stats["job_writes"] += 1
+
+    def _apply_running(self, pid: str, ts: float) -> Optional[str]:
+        path, job = self._load(pid)
+        if path is None or job is None:
+            return None
+        submit = job.setdefault("submit", {})
+        submit["status"] = "running"
+        sf.update_job_timings_on_status(
+            job,
+            status="running",
+            history=self._history_from_events(pid, status_str=None),
+            now=ts,
+            data_root=self.data_root,
+        )
+        self._write(path, job, "running")
+        return "running"
+
+    def _apply_terminal(self, pid: str, status_str: str, ts: float) -> Optional[str]:
+        path, job = self._load(pid)
+        if path is None or job is None:
+            return None
+        status = sf.update_job_status_from_comfy(
+            job,
+            server=self.server,
+            data_root=self.data_root,
+            running_ids=set(),
+            pending_ids=set(),
+            now=ts,
+            history_batch={pid: self._history_from_events(pid, status_str=status_str)},
+        )
+        self._write(path, job, status)
+        return status
+
+    # -- reconnect fallback ----------------------------------------------------
+
+    def resync(self) -> Dict[str, Any]:
+        """One ``/queue`` + one batched ``/history`` pass over in-flight catalog jobs."""
+        with self._lock:
+            self.stats["resyncs"] += 1
+        if not self.jobs_root.is_dir():
+            return {"jobs": 0, "updated": 0}
+        con = open_synced_job_catalog(self.jobs_root)
+        try:
+            rows = in_flight_jobs(con)
+        finally:
+            con.close()
+        if not rows:
+            return {"jobs": 0, "updated": 0}
+        # Fetch without the lock: events keep landing while Comfy answers.
+        running_ids, pending_ids = sf.queue_prompt_id_buckets(self.server)
+        batch = sf.fetch_comfy_history_batch(self.server, max_items=max(self.history_batch_size, 2 * len(rows)))
+        updated = 0
+        with self._lock:
+            for row in rows:
+                path = Path(row["job_path"])
+                try:
+                    job = json.loads(path.read_text(encoding="utf-8"))
+                except Exception:
+                    continue
+                if not isinstance(job, dict):
+                    continue
+                before = str((job.get("submit") or {}).get("status") or "")
+                if before not in IN_FLIGHT_STATUSES and before:
+                    # A terminal event landed during the fetch; the snapshot is older than the job.
+                    continue
+                status = sf.update_job_status_from_comfy(
+                    job,
+                    server=self.server,
+                    data_root=self.data_root,
+                    running_ids=running_ids,
+                    pending_ids=pending_ids,
+                    history_batch=batch,
+                )
+                self._write(path, job, status)
+                if status != before:
+                    updated += 1
+            self.stats["resync_updates"] += updated
+        return {"jobs": len(rows), "updated": updated}
+
+
+class ComfyStatusDaemon(LivePreviewBridge):
+    """``/ws`` subscriber that routes execution events into a :class:`ComfyStatusTracker`."""
+
+    def __init__(
+        self,
+        *,
+        tracker: ComfyStatusTracker,
+        client_ids: Sequence[str] = (STATUS_CLIENT_ID,),
+    ) -> None:
+        shared = sorted(set(str(c).strip() for c in client_ids) & set(DEFAULT_CLIENT_IDS))
+        if shared:
+            raise ValueError(f"client ids {shared} belong to the experiments UI live-preview bridge")
+        super().__init__(comfy_server=tracker.server, client_ids=client_ids)
+        self.tracker = tracker
+        self._resync_state = threading.Lock()
+        self._resyncing = False
+        self._resync_again = False
+        self._queue_remaining: Optional[int] = None
+
+    def _on_connected(self, client_id: str) -> None:
+        self._queue_remaining = None
+        self._request_resync(client_id)
+
+    def _request_resync(self, reason: str) -> None:
+        # Off the socket thread: a slow /history must not stall heartbeats.
+        threading.Thread(target=self._resync_loop, name=f"comfy-status-resync:{reason}", daemon=True).start()
+
+    def _resync_loop(self) -> None:
+        # One resync at a time; requests arriving meanwhile collapse into one more pass.
+        with self._resync_state:
+            if self._resyncing:
+                self._resync_again = True
+                return
+            self._resyncing = True
+        while True:
+            try:
+                result = self.tracker.resync()
+                print(f"[comfy-status] resync jobs={result['jobs']} updated={result['updated']}")
+            except Exception as exc:
+                print(f"[comfy-status] resync failed: {exc}", file=sys.stderr)
+            with self._resync_state:
+                if not self._resync_again:
+                    self._resyncing = False
+                    return
+                self._resync_again = False
+
+    def _on_status(self, data: Dict[str, Any]) -> None:
+        status = data.get("status") if isinstance(data.get("status"), dict) else {}
+        exec_info = status.get("exec_info") if isinstance(status.get("exec_info"), dict) else {}
+        remaining = exec_info.get("queue_remaining")
+        if not isinstance(remaining, int):
+            return
+        before, self._queue_remaining = self._queue_remaining, remaining
+        if before is not None and remaining != before:
+            self._request_resync("status")
+
+    def _handle_text(self, raw: str, current_pid: Optional[str]) -> Optional[str]:
+        pid = super()._handle_text(raw, current_pid)
+        try:
+            obj = json.loads(raw)
+        except Exception:
+            return pid
+        if isinstance(obj, dict) and obj.get("type") == "status" and isinstance(obj.get("data"), dict):
+            self._on_status(obj["data"])
+        elif isinstance(obj, dict) and isinstance(obj.get("type"), str) and isinstance(obj.get("data"), dict):
+            try:
+                status = self.tracker.on_event(obj["type"], obj["data"])
+            except Exception as exc:
+                print(f"[comfy-status] {obj['type']} failed: {exc}", file=sys.stderr)
+            else:
+                if status:
+                    print(f"[comfy-status] {obj['data'].get('prompt_id')}: {status}")
+        return pid
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Track shape-factory job status from ComfyUI /ws events")
+    ap.add_argument("--server", default=sf.DEFAULT_COMFY_SERVER, help="ComfyUI base URL")
+    ap.add_argument("--data-root", default=str(sf.DEFAULT_DATA_ROOT))
+    ap.add_argument(
+        "--client-id",
+        action="append",
+        default=None,
+        help=f"clientId to connect as (repeatable; default: {STATUS_CLIENT_ID}; not the UI ids {', '.join(DEFAULT_CLIENT_IDS)})",
+    )
+    ap.add_argument("--history-batch", type=int, default=256, help="max_items for the reconnect /history fetch")
+    args = ap.parse_args(argv)
+
+    tracker = ComfyStatusTracker(server=args.server, data_root=Path(args.data_root), history_batch_size=args.history_batch)
+    try:
+        daemon = ComfyStatusDaemon(tracker=tracker, client_ids=args.client_id or (STATUS_CLIENT_ID,))
+    except ValueError as exc:
+        ap.error(str(exc))
+    daemon.start()
+    print(f"[comfy-status] server={tracker.server} jobs_root={tracker.jobs_root} clients={list(daemon.client_ids)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        daemon.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
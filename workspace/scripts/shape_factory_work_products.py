@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import base64
 import json
 import os
 import re
@@ -1308,12 +1309,13 @@ def _timing_summary(timings: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     }
 
 
-def _job_recency_ts(path: Path) -> float:
+def _job_recency_ts(path: Path, job: Any = None) -> float:
     """Prefer job created_at over file mtime (backfills/rewrites inflate mtime)."""
-    try:
-        job = json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
-        job = None
+    if job is None:
+        try:
+            job = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            job = None
     if isinstance(job, dict):
         ts = _parse_created_at_ts(job.get("created_at"))
         if ts is not None:
@@ -1566,6 +1568,74 @@ def _work_product_item_from_job(
     return item
 
 
+def encode_work_products_cursor(recency_ts: float, job_path: str) -> str:
+    raw = json.dumps([float(recency_ts), str(job_path)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_work_products_cursor(cursor: Any) -> Optional[Tuple[float, str]]:
+    """``(recency_ts, job_path)`` from :func:`encode_work_products_cursor`; None when absent/invalid."""
+    text = str(cursor or "").strip()
+    if not text:
+        return None
+    try:
+        ts, path = json.loads(base64.urlsafe_b64decode(text + "=" * (-len(text) % 4)).decode("utf-8"))
+        return float(ts), str(path)
+    except Exception:
+        return None
+
+
+def _recent_job_refs(
+    jobs_root: Path,
+    *,
+    hourly_only: bool,
+    family: Optional[str],
+    after: Optional[Tuple[float, str]],
+    batch: int,
+) -> Iterable[Tuple[float, Path]]:
+    """
+    ``(recency_ts, job_path)`` newest-first after ``after``, from the job catalog.
+
+    Falls back to one parse per job file (no catalog / unwritable ``_status``).
+    """
+    try:
+        from shape_factory_job_catalog import open_synced_job_catalog, recent_jobs
+
+        con = open_synced_job_catalog(jobs_root)
+    except Exception:
+        con = None
+    if con is not None:
+        try:
+            cursor = after
+            while True:
+                rows = recent_jobs(con, limit=batch, hourly_only=hourly_only, family=family, after=cursor)
+                for row in rows:
+                    yield float(row["recency_ts"]), Path(row["job_path"])
+                if len(rows) < batch:
+                    return
+                cursor = (float(rows[-1]["recency_ts"]), str(rows[-1]["job_path"]))
+        finally:
+            con.close()
+        return
+
+    refs: List[Tuple[float, str]] = []
+    for path in iter_job_paths(jobs_root, hourly_only=hourly_only):
+        try:
+            job = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        if not isinstance(job, dict):
+            continue
+        if family and str(job.get("family_slug") or path.parent.name or "") != family:
+            continue
+        refs.append((_job_recency_ts(path, job), str(path)))
+    refs.sort(key=lambda r: (-r[0], r[1]))
+    for ts, path_s in refs:
+        if after is not None and (ts > after[0] or (ts == after[0] and path_s <= after[1])):
+            continue
+        yield ts, Path(path_s)
+
+
 def list_recent_work_products(
     *,
     data_root: Path,
@@ -1573,21 +1643,21 @@ def list_recent_work_products(
     limit: int = 40,
     hourly_only: bool = True,
     family: Optional[str] = None,
+    cursor: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     List recent factory jobs as work products with viewer URLs + construction details.
 
     Prefer jobs that have outputs; still include queued/incomplete so the pipeline
-    can be inspected mid-flight.
+    can be inspected mid-flight. Order (``created_at`` → ``submitted_at`` → mtime, newest
+    first) comes from the job catalog; only the returned page's job docs are opened.
+    ``next_cursor`` continues after the last item.
     """
     data_root = data_root.resolve()
     output_root = output_root.resolve()
     jobs_root = data_root / "shape_factory" / "jobs"
     limit = max(1, min(200, int(limit)))
-
-    paths = list(iter_job_paths(jobs_root, hourly_only=hourly_only))
-    # Newest-first by job created_at (not file mtime — deposit/backfill rewrites bump mtime).
-    paths.sort(key=_job_recency_ts, reverse=True)
+    after = decode_work_products_cursor(cursor)
 
     work_items_doc = None
     work_items_for_item = None
@@ -1612,8 +1682,13 @@ def list_recent_work_products(
         work_items_for_item = None
 
     items: List[Dict[str, Any]] = []
-    for path in paths:
+    next_cursor: Optional[str] = None
+    last_ref: Optional[Tuple[float, Path]] = None
+    refs = _recent_job_refs(jobs_root, hourly_only=hourly_only, family=family, after=after, batch=limit + 1)
+    for ts, path in refs:
         if len(items) >= limit:
+            if last_ref is not None:
+                next_cursor = encode_work_products_cursor(last_ref[0], str(last_ref[1]))
             break
         try:
             job = json.loads(path.read_text(encoding="utf-8"))
@@ -1624,6 +1699,7 @@ def list_recent_work_products(
         fam = str(job.get("family_slug") or path.parent.name or "")
         if family and fam != family:
             continue
+        last_ref = (ts, path)
         items.append(
             _work_product_item_from_job(
                 path,
@@ -1634,6 +1710,7 @@ def list_recent_work_products(
                 work_items_for_item=work_items_for_item,
             )
         )
+    refs.close()
 
     families = list_shape_families(
         data_root,
@@ -1650,6 +1727,8 @@ def list_recent_work_products(
         "hourly_only": bool(hourly_only),
         "family": family,
         "limit": limit,
+        "cursor": cursor or None,
+        "next_cursor": next_cursor,
         "count": len(items),
         "families": families,
         "extend_family_defaults": extend_family_defaults,
@@ -1836,6 +1915,26 @@ def _find_job_by_prompt_id(jobs_root: Path, prompt_id: str) -> Tuple[Optional[Pa
     pid = str(prompt_id or "").strip()
     if not pid or not jobs_root.is_dir():
         return None, None
+    try:
+        from shape_factory_job_catalog import lookup_by_prompt_id, open_synced_job_catalog
+
+        con = open_synced_job_catalog(jobs_root)
+    except Exception:
+        con = None
+    if con is not None:
+        try:
+            row = lookup_by_prompt_id(con, pid)
+        finally:
+            con.close()
+        if row is None:
+            return None, None
+        try:
+            job = json.loads(Path(row["job_path"]).read_text(encoding="utf-8"))
+        except Exception:
+            job = None
+        submit = job.get("submit") if isinstance(job, dict) and isinstance(job.get("submit"), dict) else {}
+        if str(submit.get("prompt_id") or "").strip() == pid:
+            return Path(row["job_path"]), job
     for path in jobs_root.rglob("*.job.json"):
         try:
             text = path.read_text(encoding="utf-8")
@@ -2605,7 +2704,10 @@ def attach_comfy_history_failures(
             found_job = dict(found_job)
             found_job["submit"] = submit
             try:
-                found_path.write_text(json.dumps(found_job, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+                # atomic_write_json also refreshes the job catalog row (status / error columns).
+                from shape_factory import atomic_write_json  # type: ignore
+
+                atomic_write_json(found_path, found_job)
             except Exception:
                 pass
             row = _work_product_item_from_job(
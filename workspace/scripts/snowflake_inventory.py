@@ -21,7 +21,6 @@ import json
 import re
 import sqlite3
 import struct
-import subprocess
 import sys
 from pathlib import Path
 from typing import Any, Iterable, Iterator, Optional
@@ -32,9 +31,10 @@ from comfy_meta_lib import (
     ffprobe_format_tags,
     json_min,
     maybe_json,
-    read_png_text_chunks,
+    read_png_header_text_chunks,
     stable_json_sha256,
 )
+from media_probe import ProbeError, probe_media
 
 
 VIDEO_EXTS = {".mp4", ".mov", ".mkv", ".webm"}
@@ -79,27 +79,10 @@ def png_dimensions(path: Path) -> tuple[Optional[int], Optional[int]]:
 
 
 def ffprobe_media_info(path: Path) -> dict[str, Any]:
-    cmd = [
-        "ffprobe",
-        "-v",
-        "quiet",
-        "-print_format",
-        "json",
-        "-show_format",
-        "-show_streams",
-        str(path),
-    ]
-    proc = subprocess.run(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-    )
-    if proc.returncode != 0:
-        raise RuntimeError(proc.stderr.strip() or f"ffprobe failed for {path}")
-    return json.loads(proc.stdout)
+    try:
+        return probe_media(path)
+    except ProbeError as exc:
+        raise RuntimeError(str(exc) or f"ffprobe failed for {path}") from exc
 
 
 def video_dimensions_duration(path: Path) -> tuple[Optional[int], Optional[int], Optional[float]]:
@@ -787,7 +770,7 @@ def extract_from_json(path: Path) -> tuple[str, Optional[Any], Optional[Any], li
 
 def extract_workflow_from_png(path: Path) -> tuple[Optional[Any], Optional[Any], list[str], Optional[int], Optional[int]]:
     media_width, media_height = png_dimensions(path)
-    chunks = read_png_text_chunks(path)
+    chunks = read_png_header_text_chunks(path)
     metadata_keys = sorted(chunks.keys())
     prompt, workflow = extract_prompt_workflow_from_png_chunks(chunks)
     return workflow, prompt, metadata_keys, media_width, media_height
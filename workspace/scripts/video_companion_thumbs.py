@@ -15,6 +15,7 @@ import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence
 
+from media_probe import ProbeError, format_duration_sec, probe_media
 from snowflake_inventory import (
     VIDEO_EXTS,
     companion_image_for_video,
@@ -23,25 +24,11 @@ from snowflake_inventory import (
 
 
 def probe_duration_sec(video: Path, *, ffprobe: str = "ffprobe") -> Optional[float]:
-    cmd = [
-        ffprobe,
-        "-v",
-        "error",
-        "-show_entries",
-        "format=duration",
-        "-of",
-        "default=noprint_wrappers=1:nokey=1",
-        str(video),
-    ]
-    try:
-        proc = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=60)
-    except FileNotFoundError as e:
-        raise RuntimeError(f"ffprobe not found ({ffprobe})") from e
-    if proc.returncode != 0:
-        return None
     try:
-        return float((proc.stdout or "").strip())
-    except ValueError:
+        return format_duration_sec(probe_media(video, ffprobe=ffprobe, timeout=60))
+    except ProbeError as e:
+        if str(e).startswith("ffprobe not found"):
+            raise RuntimeError(str(e)) from e
         return None
 
 
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Content-addressed caption cache for vision slice runs.
+
+One SQLite file beside the caption NDJSON (``<status_dir>/vision_slice_caption_cache.sqlite``)
+maps ``(frame sha256, variant key)`` → the runner's ``CaptionResult``. The variant key
+hashes the parameters that change the model output — backend family, ``model_pin``,
+normalized task, ``max_new_tokens`` — so re-sampling the same assets, re-running a variant
+without ``--append``, or resuming after a crash only sends new frames to the GPU.
+Rows are committed as each caption lands.
+
+Disable with ``--no-caption-cache`` / ``VISION_CAPTION_CACHE=off``.
+
+  python3 vision_slice_caption_cache.py stats --status-dir output/_status
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+CAPTION_CACHE_BASENAME = "vision_slice_caption_cache.sqlite"
+CAPTION_CACHE_SCHEMA_VERSION = 1
+CAPTION_CACHE_ENV = "VISION_CAPTION_CACHE"
+
+_HASH_CHUNK = 1 << 20
+
+_PROVIDER_FAMILY = {
+    "comfy": "comfy",
+    "comfyui": "comfy",
+    "runpod": "comfy",
+    "transformers": "transformers",
+    "florence2": "transformers",
+    "local": "transformers",
+}
+
+
+def caption_cache_enabled(raw: Optional[str]) -> bool:
+    return str(raw or "").strip().lower() not in {"off", "0", "none", "false", "no"}
+
+
+def frame_sha256(path: Union[str, Path]) -> str:
+    h = hashlib.sha256()
+    with Path(path).open("rb") as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def variant_cache_key(*, provider: str, model_pin: str, task: str, max_new_tokens: int) -> str:
+    """Stable digest of the caption parameters (Comfy and RunPod share one family)."""
+    params = {
+        "family": _PROVIDER_FAMILY.get(str(provider), str(provider)),
+        "model_pin": str(model_pin),
+        "task": str(task),
+        "max_new_tokens": int(max_new_tokens),
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+
+class CaptionCache:
+    """SQLite ``(sha256, variant_key) → result`` store with per-run hit/miss counters."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path).expanduser().resolve()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._con = sqlite3.connect(str(self.path), timeout=30)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS captions (
+                sha256 TEXT NOT NULL,
+                variant_key TEXT NOT NULL,
+                caption TEXT NOT NULL,
+                provider TEXT NOT NULL,
+                model_pin TEXT NOT NULL,
+                runner TEXT NOT NULL,
+                raw_json TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (sha256, variant_key)
+            )
+            """
+        )
+        self._con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._con.execute(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES('schema_version', ?)",
+            (str(CAPTION_CACHE_SCHEMA_VERSION),),
+        )
+        self._con.commit()
+
+    def get(self, sha256: str, variant_key: str) -> Optional[Dict[str, Any]]:
+        """Cached result fields (``caption``, ``provider``, ``model_pin``, ``runner``, ``raw``) or None."""
+        try:
+            row = self._con.execute(
+                "SELECT caption, provider, model_pin, runner, raw_json FROM captions WHERE sha256 = ? AND variant_key = ?",
+                (sha256, variant_key),
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {
+            "caption": row[0],
+            "provider": row[1],
+            "model_pin": row[2],
+            "runner": row[3],
+            "raw": json.loads(row[4]),
+        }
+
+    def put(
+        self,
+        sha256: str,
+        variant_key: str,
+        *,
+        caption: str,
+        provider: str,
+        model_pin: str,
+        runner: str,
+        raw: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        try:
+            self._con.execute(
+                "INSERT OR REPLACE INTO captions(sha256, variant_key, caption, provider, model_pin, runner, raw_json, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (sha256, variant_key, caption, provider, model_pin, runner, json.dumps(raw or {}, ensure_ascii=False), time.time()),
+            )
+            self._con.commit()
+            self.stores += 1
+        except sqlite3.Error:
+            pass
+
+    def count(self) -> int:
+        return int(self._con.execute("SELECT COUNT(*) FROM captions").fetchone()[0])
+
+    def summary(self) -> Dict[str, Any]:
+        """Run counters for the caption manifest."""
+        looked_up = self.hits + self.misses
+        return {
+            "enabled": True,
+            "path": str(self.path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stored": self.stores,
+            "hit_rate": round(self.hits / looked_up, 4) if looked_up else None,
+        }
+
+    def close(self) -> None:
+        self._con.close()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Vision slice caption cache")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    st = sub.add_parser("stats", help="Row counts per variant key")
+    st.add_argument("--status-dir", type=Path, required=True)
+    args = ap.parse_args()
+
+    path = Path(args.status_dir).expanduser() / CAPTION_CACHE_BASENAME
+    if not path.is_file():
+        print(json.dumps({"path": str(path), "rows": 0}))
+        return 0
+    cache = CaptionCache(path)
+    try:
+        by_key = cache._con.execute(
+            "SELECT variant_key, model_pin, COUNT(*) FROM captions GROUP BY variant_key, model_pin ORDER BY 3 DESC"
+        ).fetchall()
+        print(
+            json.dumps(
+                {
+                    "path": str(cache.path),
+                    "rows": cache.count(),
+                    "variants": [{"variant_key": k, "model_pin": pin, "rows": n} for k, pin, n in by_key],
+                },
+                indent=2,
+            )
+        )
+    finally:
+        cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,9 +5,14 @@ Vision V1 — caption frames_manifest.json into NDJSON (run-anywhere).
 Providers (via ``vision_slice_runner.make_runner``):
 
 - ``--dry-run`` / ``--provider dry-run`` — placeholders, no GPU
-- ``--provider comfy`` — ComfyUI Florence2 over HTTP (local Docker or RunPod :8188)
+- ``--provider comfy`` — ComfyUI Florence2 over HTTP (local Docker or RunPod :8188);
+  ``--in-flight K`` keeps K prompts queued (rows are still written in frame order)
 - ``--provider transformers`` — in-process Florence (optional torch deps)
 
+Frames already captioned with the same model / task / max_new_tokens are served from the
+content-addressed cache under ``_status/`` (``vision_slice_caption_cache``) and never reach
+the runner; ``--no-caption-cache`` forces every frame through.
+
 See docs/VISION_V1_TIME_SLICE_CAPTION_SPIKE.md.
 """
 
@@ -22,18 +27,30 @@ import sys
 import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence
-
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from vision_slice_caption_cache import (
+    CAPTION_CACHE_BASENAME,
+    CAPTION_CACHE_ENV,
+    CaptionCache,
+    caption_cache_enabled,
+    frame_sha256,
+    variant_cache_key,
+)
 from vision_slice_review import (
     register_variant,
     sanitize_variant_id,
     variant_ndjson_name,
 )
 from vision_slice_runner import (
+    DEFAULT_COMFY_IN_FLIGHT,
     DEFAULT_COMFY_MODEL,
     DEFAULT_COMFY_TASK,
     CaptionRequest,
+    CaptionResult,
+    caption_stream,
     make_runner,
+    normalize_comfy_task,
 )
 
 SCHEMA_VERSION = 1
@@ -103,6 +120,17 @@ def _env_path(name: str) -> Optional[Path]:
     return Path(raw).expanduser() if raw else None
 
 
+def _env_int(name: str, default: int) -> int:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        print(f"warning: ignoring {name}={raw!r} (not an integer); using {default}", file=sys.stderr)
+        return default
+
+
 def load_frames_manifest(path: Path) -> Dict[str, Any]:
     doc = json.loads(path.read_text(encoding="utf-8"))
     if not isinstance(doc, dict):
@@ -262,6 +290,8 @@ def run_caption(
     task: str = DEFAULT_COMFY_TASK,
     max_new_tokens: int = 64,
     variant_label: str = "",
+    in_flight: int = DEFAULT_COMFY_IN_FLIGHT,
+    caption_cache: bool = True,
 ) -> Dict[str, Any]:
     doc = load_frames_manifest(frames_manifest)
     wd = Path(work_dir or doc.get("work_dir") or frames_manifest.parent).expanduser().resolve()
@@ -285,6 +315,16 @@ def run_caption(
         dry_run=dry_run,
         task=task,
         max_new_tokens=max_new_tokens,
+        in_flight=in_flight,
+    )
+    cache: Optional[CaptionCache] = None
+    if caption_cache and not dry_run and provider not in ("dry-run", "dry_run"):
+        cache = CaptionCache(status_dir / CAPTION_CACHE_BASENAME)
+    cache_key = variant_cache_key(
+        provider=provider,
+        model_pin=model_pin,
+        task=normalize_comfy_task(task),
+        max_new_tokens=max_new_tokens,
     )
 
     rows: List[Dict[str, Any]] = []
@@ -328,39 +368,82 @@ def run_caption(
     except OSError:
         pass
 
+    def _error(frame: Dict[str, Any], exc: Exception) -> None:
+        errors.append(
+            {
+                "asset_relpath": str(frame.get("asset_relpath") or ""),
+                "frame_relpath": str(frame.get("frame_relpath") or ""),
+                "error": str(exc),
+            }
+        )
+
+    # Requests up front so a pipelined runner can upload / queue ahead; results come back
+    # in frame order, so NDJSON rows keep the manifest's order. Cache hits never reach
+    # the runner: (frame, CaptionRequest | CaptionResult | Exception, frame sha256).
+    planned: List[Tuple[Dict[str, Any], Any, Optional[str]]] = []
+    for frame in doc.get("frames") or []:
+        if not isinstance(frame, dict):
+            continue
+        try:
+            img = resolve_frame_path(frame, work_dir=wd)
+        except Exception as e:
+            planned.append((frame, e, None))
+            continue
+        sha: Optional[str] = None
+        if cache is not None:
+            try:
+                sha = frame_sha256(img)
+            except OSError:
+                sha = None  # the runner reports the missing frame
+            hit = cache.get(sha, cache_key) if sha else None
+            if hit is not None:
+                planned.append((frame, CaptionResult(**hit), sha))
+                continue
+        req = CaptionRequest(
+            image_path=img,
+            asset_relpath=str(frame.get("asset_relpath") or ""),
+            frame_relpath=str(frame.get("frame_relpath") or ""),
+            meta={
+                "slice": frame.get("slice"),
+                "t0": frame.get("t0"),
+                "t1": frame.get("t1"),
+                "frame_t": frame.get("frame_t"),
+            },
+        )
+        planned.append((frame, req, sha))
+
     try:
         with ndjson_path.open("a", encoding="utf-8") as fh:
-            for frame in doc.get("frames") or []:
-                if not isinstance(frame, dict):
+            results = caption_stream(cap_runner, [x for _, x, _ in planned if isinstance(x, CaptionRequest)])
+            t_cap0 = time.perf_counter()
+            for frame, planned_item, sha in planned:
+                cached = isinstance(planned_item, CaptionResult)
+                if cached:
+                    outcome: Any = planned_item
+                elif isinstance(planned_item, CaptionRequest):
+                    outcome = next(results)
+                else:
+                    _error(frame, planned_item)
+                    continue
+                t_cap1 = time.perf_counter()
+                elapsed, t_cap0 = t_cap1 - t_cap0, t_cap1
+                if isinstance(outcome, Exception):
+                    _error(frame, outcome)
                     continue
                 try:
-                    img = resolve_frame_path(frame, work_dir=wd)
-                    t_cap0 = time.perf_counter()
-                    result = cap_runner.caption(
-                        CaptionRequest(
-                            image_path=img,
-                            asset_relpath=str(frame.get("asset_relpath") or ""),
-                            frame_relpath=str(frame.get("frame_relpath") or ""),
-                            meta={
-                                "slice": frame.get("slice"),
-                                "t0": frame.get("t0"),
-                                "t1": frame.get("t1"),
-                                "frame_t": frame.get("frame_t"),
-                            },
-                        )
-                    )
-                    t_cap1 = time.perf_counter()
+                    result = outcome
                     used_provider = result.provider
                     used_pin = result.model_pin
                     if isinstance(result.raw, dict) and result.raw.get("task"):
                         used_task = str(result.raw["task"])
-                    timing = _timing_from_raw(result.raw if isinstance(result.raw, dict) else None)
-                    if "total_s" in timing:
-                        per_caption_s.append(float(timing["total_s"]))
-                    else:
-                        per_caption_s.append(t_cap1 - t_cap0)
-                    if explicit_model_load_s is None and "model_load_s" in timing:
-                        explicit_model_load_s = float(timing["model_load_s"])
+                    if not cached:
+                        timing = _timing_from_raw(result.raw if isinstance(result.raw, dict) else None)
+                        if "total_s" in timing:
+                            per_caption_s.append(float(timing["total_s"]))
+                        else:
+                            per_caption_s.append(elapsed)
+                        if explicit_model_load_s is None and "model_load_s" in timing:
+                            explicit_model_load_s = float(timing["model_load_s"])
                     row = build_row(
                         frame,
                         caption=result.caption,
@@ -372,21 +455,29 @@ def run_caption(
                         task=used_task,
                         extra=result.raw or None,
                     )
+                    if cached:
+                        row["caption_cache"] = "hit"
                     fh.write(json.dumps(row, ensure_ascii=False) + "\n")
                     rows.append(row)
+                    if cache is not None and sha and not cached:
+                        cache.put(
+                            sha,
+                            cache_key,
+                            caption=result.caption,
+                            provider=result.provider,
+                            model_pin=result.model_pin,
+                            runner=result.runner or runner,
+                            raw=result.raw,
+                        )
                 except Exception as e:
-                    errors.append(
-                        {
-                            "asset_relpath": str(frame.get("asset_relpath") or ""),
-                            "frame_relpath": str(frame.get("frame_relpath") or ""),
-                            "error": str(e),
-                        }
-                    )
+                    _error(frame, e)
     finally:
         try:
             cap_runner.close()
         except Exception:
             pass
+        if cache is not None:
+            cache.close()
 
     finished = utc_now()
     wall_s = time.perf_counter() - wall0
@@ -395,6 +486,11 @@ def run_caption(
         per_caption_s=per_caption_s,
         model_load_s=explicit_model_load_s,
     )
+    if getattr(cap_runner, "caption_many", None) is not None:
+        # Pipelined captions overlap: per-caption totals no longer add up to the wall.
+        timing_summary["in_flight"] = max(1, int(in_flight))
+        if rows and wall_s > 0:
+            timing_summary["captions_per_min_wall"] = round(60.0 * len(rows) / wall_s, 2)
     label = variant_label or default_variant_label(
         variant_id=variant_id, model_pin=used_pin, task=used_task
     )
@@ -438,6 +534,7 @@ def run_caption(
         "error_count": len(errors),
         "errors": errors,
         "ndjson": str(ndjson_path),
+        "caption_cache": cache.summary() if cache is not None else {"enabled": False},
         "timing": timing_summary,
     }
     # Per-variant manifest + latest pointer (keeps UI/docs familiar)
@@ -533,6 +630,12 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         default=int(os.environ.get("VISION_MAX_NEW_TOKENS", "64")),
         help="Florence2Run max_new_tokens (raise for detailed_caption)",
     )
+    ap.add_argument(
+        "--in-flight",
+        type=int,
+        default=_env_int("VISION_COMFY_IN_FLIGHT", DEFAULT_COMFY_IN_FLIGHT),
+        help="Comfy prompts queued at once (frames uploaded ahead; 1 = serial)",
+    )
     ap.add_argument(
         "--device",
         default=os.environ.get("VISION_DEVICE", "cuda"),
@@ -540,6 +643,12 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
     )
     ap.add_argument("--dry-run", action="store_true", help="Placeholder captions; no model / Comfy")
     ap.add_argument("--append", action="store_true", help="Append to existing NDJSON instead of replace")
+    ap.add_argument(
+        "--no-caption-cache",
+        action="store_true",
+        default=not caption_cache_enabled(os.environ.get(CAPTION_CACHE_ENV)),
+        help=f"Caption every frame even if _status/{CAPTION_CACHE_BASENAME} has it (or {CAPTION_CACHE_ENV}=off)",
+    )
     args = ap.parse_args(list(argv) if argv is not None else None)
 
     status_dir = args.status_dir
@@ -570,6 +679,8 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
             task=str(args.task),
             max_new_tokens=int(args.max_new_tokens),
             variant_label=str(args.variant_label or ""),
+            in_flight=int(args.in_flight),
+            caption_cache=not bool(args.no_caption_cache),
         )
     except Exception as e:
         print(f"error: {e}", file=sys.stderr)
@@ -587,6 +698,7 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
                 "error_count": manifest.get("error_count"),
                 "provider": manifest.get("provider"),
                 "dry_run": manifest.get("dry_run"),
+                "caption_cache": manifest.get("caption_cache"),
                 "timing": manifest.get("timing"),
             },
             indent=2,
@@ -3,7 +3,9 @@
 Vision V1 — classical frame quality on frames_manifest.json (run-anywhere).
 
 Writes ``vision_slice_quality.ndjson`` + ``vision_slice_manifest__quality.json``.
-Uses Pillow when available; otherwise ffmpeg raw gray decode.
+Uses Pillow when available; otherwise ffmpeg raw gray decode. Decoded rasters go
+straight into float32 ndarrays when NumPy is installed, and each asset's frames are
+scored as one batch (see ``vision_slice_quality_metrics``).
 """
 
 from __future__ import annotations
@@ -15,10 +17,11 @@ import subprocess
 import sys
 import time
 from datetime import datetime, timezone
+from itertools import groupby
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from vision_slice_quality_metrics import Gray, rollup_quality_rows, score_frame
+from vision_slice_quality_metrics import Gray, engine_name, gray_from_bytes, rollup_quality_rows, score_frames
 
 SCHEMA_VERSION = 1
 QUALITY_NDJSON = "vision_slice_quality.ndjson"
@@ -61,13 +64,8 @@ def _gray_from_pil(path: Path, *, max_side: int = 384) -> Gray:
         scale = min(1.0, float(max_side) / float(max(w, h, 1)))
         if scale < 1.0:
             im = im.resize((max(1, int(w * scale)), max(1, int(h * scale))), Image.BILINEAR)
-        pixels = list(im.getdata())
         ww, hh = im.size
-    out: Gray = []
-    for y in range(hh):
-        row = pixels[y * ww : (y + 1) * ww]
-        out.append([p / 255.0 for p in row])
-    return out
+        return gray_from_bytes(im.tobytes(), ww, hh)
 
 
 def _gray_from_ffmpeg(path: Path, *, ffmpeg: str = "ffmpeg", max_side: int = 384) -> Gray:
@@ -136,11 +134,7 @@ def _gray_from_ffmpeg(path: Path, *, ffmpeg: str = "ffmpeg", max_side: int = 384
     expect = ow * oh
     if len(data) < expect:
         raise RuntimeError(f"ffmpeg gray decode short for {path}: {len(data)} < {expect}")
-    out: Gray = []
-    for y in range(oh):
-        base = y * ow
-        out.append([data[base + x] / 255.0 for x in range(ow)])
-    return out
+    return gray_from_bytes(data, ow, oh)
 
 
 def load_gray(path: Path, *, ffmpeg: str = "ffmpeg", max_side: int = 384) -> Gray:
@@ -203,19 +197,42 @@ def run_quality(
 
     rows: List[Dict[str, Any]] = []
     errors: List[Dict[str, str]] = []
-    prev_by_asset: Dict[str, Gray] = {}
 
+    def _error(frame: Dict[str, Any], asset: str, exc: Exception) -> None:
+        errors.append(
+            {
+                "asset_relpath": asset,
+                "frame_relpath": str(frame.get("frame_relpath") or ""),
+                "error": str(exc),
+            }
+        )
+
+    decode_s = score_s = 0.0
     with nd_path.open("w", encoding="utf-8") as fh:
-        for frame in frames:
-            asset = str(frame.get("asset_relpath") or "")
+        # Frames are sorted by asset: decode one asset's frames, then score them as a batch
+        # (convergence compares each decoded frame with the previous decoded one).
+        for asset, group in groupby(frames, key=lambda f: str(f.get("asset_relpath") or "")):
+            loaded: List[Tuple[Dict[str, Any], Gray]] = []
+            t0 = time.perf_counter()
+            for frame in group:
+                try:
+                    img_path = resolve_frame_path(frame, work_dir=wd)
+                    if not img_path.is_file():
+                        raise FileNotFoundError(str(img_path))
+                    loaded.append((frame, load_gray(img_path, ffmpeg=ffmpeg, max_side=max_side)))
+                except Exception as e:
+                    _error(frame, asset, e)
+            t1 = time.perf_counter()
             try:
-                img_path = resolve_frame_path(frame, work_dir=wd)
-                if not img_path.is_file():
-                    raise FileNotFoundError(str(img_path))
-                gray = load_gray(img_path, ffmpeg=ffmpeg, max_side=max_side)
-                prev = prev_by_asset.get(asset)
-                quality = score_frame(gray, prev=prev)
-                prev_by_asset[asset] = gray
+                qualities = score_frames([gray for _, gray in loaded])
+            except Exception as e:
+                for frame, _ in loaded:
+                    _error(frame, asset, e)
+                continue
+            finally:
+                decode_s += t1 - t0
+                score_s += time.perf_counter() - t1
+            for (frame, _), quality in zip(loaded, qualities):
                 row = {
                     "schema": SCHEMA_VERSION,
                     "asset_relpath": asset,
@@ -234,14 +251,6 @@ def run_quality(
                 }
                 fh.write(json.dumps(row, ensure_ascii=False) + "\n")
                 rows.append(row)
-            except Exception as e:
-                errors.append(
-                    {
-                        "asset_relpath": asset,
-                        "frame_relpath": str(frame.get("frame_relpath") or ""),
-                        "error": str(e),
-                    }
-                )
 
     finished = utc_now()
     wall_s = time.perf_counter() - wall0
@@ -271,7 +280,12 @@ def run_quality(
         "error_count": len(errors),
         "errors": errors[:50],
         "ndjson": str(nd_path),
-        "timing": {"wall_s": round(wall_s, 3)},
+        "timing": {
+            "wall_s": round(wall_s, 3),
+            "decode_s": round(decode_s, 3),
+            "score_s": round(score_s, 3),
+            "metrics_engine": engine_name(),
+        },
         "asset_quality": asset_quality,
     }
     man_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
@@ -3,14 +3,67 @@
 Classical (non-learned) frame quality metrics for Vision V1 slices.
 
 Pure functions over grayscale float matrices in [0, 1]. No OpenCV / no VQA models.
+
+A frame is either a list of rows (pure Python) or a 2-D float32 ndarray when NumPy is
+installed; :func:`gray_from_bytes` picks the representation for decoders. Every metric
+accepts both and the ndarray path gives the same scores up to float32 rounding
+(``tests/test_vision_slice_quality.py`` pins the tolerance). :func:`score_frames`
+scores one asset's frames in order; same-sized ndarray frames are stacked and scored in
+one pass. ``VISION_QUALITY_ENGINE=python`` forces the list path.
+
+  python3 bench_vision_quality_metrics.py --frames 32 --side 384
 """
 
 from __future__ import annotations
 
 import math
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as _np
+except ImportError:  # optional: the list path gives the same scores
+    _np = None
+
+Gray = Union[List[List[float]], Any]  # list of rows, or a 2-D float32 ndarray
+
+QUALITY_KEYS = ("sharpness", "convergence", "artifacting", "exposure", "contrast")
+
+
+def numpy_enabled() -> bool:
+    if _np is None:
+        return False
+    return os.environ.get("VISION_QUALITY_ENGINE", "").strip().lower() not in {"python", "py", "off"}
+
+
+def engine_name() -> str:
+    return "numpy" if numpy_enabled() else "python"
+
+
+def _is_array(gray: Any) -> bool:
+    return _np is not None and isinstance(gray, _np.ndarray)
+
+
+def gray_from_bytes(data: bytes, width: int, height: int) -> Gray:
+    """8-bit gray raster (row-major) → frame in [0, 1].
+
+    With NumPy the bytes are viewed in place (``frombuffer``) and scaled into one
+    float32 buffer; otherwise a list of rows.
+    """
+    n = width * height
+    if len(data) < n:
+        raise ValueError(f"gray raster short: {len(data)} < {n}")
+    if numpy_enabled():
+        raw = _np.frombuffer(data, dtype=_np.uint8, count=n).reshape(height, width)
+        return raw.astype(_np.float32) / _np.float32(255.0)
+    return [[data[y * width + x] / 255.0 for x in range(width)] for y in range(height)]
 
-Gray = List[List[float]]
+
+def as_gray_list(gray: Gray) -> List[List[float]]:
+    """List-of-rows view of a frame (for the pure-Python metrics)."""
+    if _is_array(gray):
+        return [[float(v) for v in row] for row in gray.tolist()]
+    return gray
 
 
 def _clamp01(x: float) -> float:
@@ -44,6 +97,8 @@ def _percentile(xs: Sequence[float], p: float) -> Optional[float]:
 
 
 def shape(gray: Gray) -> Tuple[int, int]:
+    if _is_array(gray):
+        return int(gray.shape[0]), int(gray.shape[1]) if gray.ndim > 1 else 0
     h = len(gray)
     w = len(gray[0]) if h else 0
     return h, w
@@ -54,6 +109,8 @@ def laplacian_variance(gray: Gray) -> float:
     h, w = shape(gray)
     if h < 3 or w < 3:
         return 0.0
+    if _is_array(gray):
+        return float(_laplacian_var_np(gray[_np.newaxis])[0])
     vals: List[float] = []
     for y in range(1, h - 1):
         row = gray[y]
@@ -83,6 +140,8 @@ def exposure_score(gray: Gray) -> float:
     h, w = shape(gray)
     if h == 0 or w == 0:
         return 0.0
+    if _is_array(gray):
+        return _clamp01(float(gray.mean(dtype=_np.float64)))
     total = 0.0
     n = 0
     for row in gray:
@@ -96,6 +155,8 @@ def contrast_score(gray: Gray) -> float:
     h, w = shape(gray)
     if h == 0 or w == 0:
         return 0.0
+    if _is_array(gray):
+        return _clamp01(float(gray.std(dtype=_np.float64)) * 2.5)
     vals: List[float] = []
     for row in gray:
         vals.extend(row)
@@ -112,6 +173,10 @@ def mean_abs_diff(a: Gray, b: Gray) -> float:
     h, w = min(ha, hb), min(wa, wb)
     if h == 0 or w == 0:
         return 1.0
+    if _is_array(a) or _is_array(b):
+        da = _np.asarray(a, dtype=_np.float32)[:h, :w]
+        db = _np.asarray(b, dtype=_np.float32)[:h, :w]
+        return float(_np.abs(da - db).mean(dtype=_np.float64))
     total = 0.0
     n = 0
     for y in range(h):
@@ -143,6 +208,8 @@ def artifacting_score(gray: Gray) -> float:
     h, w = shape(gray)
     if h < 16 or w < 16:
         return 0.0
+    if _is_array(gray):
+        return float(_artifacting_np(gray[_np.newaxis])[0])
 
     # Block boundary energy (every 8th row/col interior difference).
     bound = 0.0
@@ -178,6 +245,60 @@ def artifacting_score(gray: Gray) -> float:
     return _clamp01(block * 4.0 + residual * 6.0)
 
 
+# --- ndarray engine: each helper takes an (n, h, w) stack and returns one value per frame.
+
+
+def _laplacian_var_np(stack: Any) -> Any:
+    c = stack[:, 1:-1, 1:-1]
+    lap = stack[:, 1:-1, 2:] + stack[:, 1:-1, :-2] + stack[:, 2:, 1:-1] + stack[:, :-2, 1:-1] - 4.0 * c
+    return lap.var(axis=(1, 2), dtype=_np.float64)
+
+
+def _artifacting_np(stack: Any) -> Any:
+    n, h, w = stack.shape
+    if h < 16 or w < 16:
+        return _np.zeros(n)
+    # Block boundary energy: columns 8, 16, … vs their left neighbour; rows likewise.
+    cols = _np.abs(stack[:, :, 8::8] - stack[:, :, 7 : w - 1 : 8])
+    rows = _np.abs(stack[:, 8::8, :] - stack[:, 7 : h - 1 : 8, :])
+    bound = cols.sum(axis=(1, 2), dtype=_np.float64) + rows.sum(axis=(1, 2), dtype=_np.float64)
+    block = bound / float(cols[0].size + rows[0].size)
+    # High-frequency residual vs the 3×3 box mean (sum of the nine shifted views).
+    box = _np.zeros((n, h - 2, w - 2), dtype=_np.float64)
+    for dy in (0, 1, 2):
+        for dx in (0, 1, 2):
+            box += stack[:, dy : h - 2 + dy, dx : w - 2 + dx]
+    residual = _np.abs(stack[:, 1:-1, 1:-1] - box / 9.0).mean(axis=(1, 2))
+    return _np.clip(block * 4.0 + residual * 6.0, 0.0, 1.0)
+
+
+def _score_stack_np(stack: Any, prev: Optional[Gray]) -> List[Dict[str, Any]]:
+    """Score an (n, h, w) float32 stack in frame order; ``prev`` precedes frame 0."""
+    n, h, w = stack.shape
+    sharp = _laplacian_var_np(stack) if h >= 3 and w >= 3 else _np.zeros(n)
+    art = _artifacting_np(stack)
+    flat = stack.reshape(n, -1)
+    expo = flat.mean(axis=1, dtype=_np.float64)
+    contrast = flat.std(axis=1, dtype=_np.float64)
+    diffs = _np.abs(stack[1:] - stack[:-1]).mean(axis=(1, 2), dtype=_np.float64)
+    out: List[Dict[str, Any]] = []
+    for i in range(n):
+        if i:
+            conv: Optional[float] = _clamp01(1.0 - float(diffs[i - 1]))
+        else:
+            conv = convergence_score(prev, stack[0])
+        out.append(
+            {
+                "sharpness": round(_clamp01(math.log1p(max(0.0, float(sharp[i])) * 50.0) / 4.0), 4),
+                "artifacting": round(float(art[i]), 4),
+                "exposure": round(_clamp01(float(expo[i])), 4),
+                "contrast": round(_clamp01(float(contrast[i]) * 2.5), 4),
+                "convergence": None if conv is None else round(conv, 4),
+            }
+        )
+    return out
+
+
 def score_frame(gray: Gray, *, prev: Optional[Gray] = None) -> Dict[str, Any]:
     """Return the v1 quality dict for one grayscale frame."""
     conv = convergence_score(prev, gray)
@@ -194,6 +315,30 @@ def score_frame(gray: Gray, *, prev: Optional[Gray] = None) -> Dict[str, Any]:
     return out
 
 
+def score_frames(frames: Sequence[Gray], *, prev: Optional[Gray] = None) -> List[Dict[str, Any]]:
+    """Quality dicts for one asset's frames in order (convergence vs the previous frame).
+
+    Runs of same-sized ndarray frames are stacked and scored together; anything else
+    goes through :func:`score_frame` one by one. ``prev`` precedes ``frames[0]``.
+    """
+    out: List[Dict[str, Any]] = []
+    i = 0
+    while i < len(frames):
+        cur = frames[i]
+        if not (_is_array(cur) and cur.ndim == 2):
+            out.append(score_frame(cur, prev=prev))
+            prev = cur
+            i += 1
+            continue
+        j = i + 1
+        while j < len(frames) and _is_array(frames[j]) and frames[j].shape == cur.shape:
+            j += 1
+        out.extend(_score_stack_np(_np.stack(frames[i:j]).astype(_np.float32, copy=False), prev))
+        prev = frames[j - 1]
+        i = j
+    return out
+
+
 def rollup_metric(values: Sequence[Optional[float]]) -> Optional[Dict[str, float]]:
     xs = [float(v) for v in values if isinstance(v, (int, float))]
     if not xs:
@@ -213,9 +358,8 @@ def rollup_quality_rows(rows: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
 
     Each row may be a flat quality dict or ``{"quality": {...}}``.
     """
-    keys = ("sharpness", "convergence", "artifacting", "exposure", "contrast")
     out: Dict[str, Any] = {"frame_count": len(rows)}
-    for k in keys:
+    for k in QUALITY_KEYS:
         vals: List[Optional[float]] = []
         for r in rows:
             q = r.get("quality") if isinstance(r.get("quality"), dict) else r
@@ -8,6 +8,12 @@ Same job contract for local transformers, ComfyUI (local Docker), or remote Comf
   CaptionRequest  →  CaptionRunner.caption()  →  CaptionResult
 
 Comfy path: upload (or copy into input/) → LoadImage → Florence2 → poll /history.
+
+``caption_stream`` drives a whole frame list. ``ComfyCaptionRunner.caption_many`` keeps
+``in_flight`` prompts queued on Comfy (frames uploaded ahead on worker threads) and
+collects completions with one ``/history?max_items=…`` call per poll; with the optional
+``websocket-client`` installed, ``/ws`` completion events wake the poll early. Results
+always come back in request order.
 """
 
 from __future__ import annotations
@@ -15,18 +21,22 @@ from __future__ import annotations
 import json
 import mimetypes
 import shutil
+import threading
 import time
 import urllib.error
 import urllib.parse
 import urllib.request
 import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional, Protocol, runtime_checkable
+from typing import Any, Deque, Dict, Iterable, Iterator, Optional, Protocol, Tuple, Union, runtime_checkable
 
 DEFAULT_COMFY_MODEL = "microsoft/Florence-2-base"
 DEFAULT_COMFY_TASK = "caption"
 DEFAULT_CLIENT_ID = "vision_slice_v1"
+DEFAULT_COMFY_IN_FLIGHT = 4
 
 # Short aliases → Florence2Run enum values (Comfy rejects unknown task strings with HTTP 400).
 COMFY_TASK_ALIASES: Dict[str, str] = {
@@ -200,6 +210,14 @@ def build_florence_caption_prompt(
     }
 
 
+def _history_error(prompt_id: str, entry: Any) -> Optional[RuntimeError]:
+    """RuntimeError when a /history entry finished with an execution error (no outputs will follow)."""
+    status = entry.get("status") if isinstance(entry, dict) else None
+    if isinstance(status, dict) and status.get("status_str") == "error":
+        return RuntimeError(f"Comfy execution error for {prompt_id}: {status.get('messages')!r}"[:2000])
+    return None
+
+
 def extract_caption_from_history(history_entry: Dict[str, Any], *, run_node_id: str = "3") -> str:
     """Pull caption STRING from ShowText sink and/or Florence2Run in /history."""
     outputs = history_entry.get("outputs") if isinstance(history_entry, dict) else None
@@ -255,6 +273,8 @@ class ComfyRunnerConfig:
     timeout_s: float = 900.0
     poll_interval_s: float = 1.0
     submit_timeout_s: float = 60.0
+    in_flight: int = 1  # prompts queued on Comfy at once by caption_many
+    upload_ahead: int = 2  # upload threads feeding caption_many
 
 
 class ComfyCaptionRunner:
@@ -297,28 +317,34 @@ class ComfyCaptionRunner:
         url = f"{self.server}/history/{urllib.parse.quote(prompt_id)}"
         last_err: Optional[Exception] = None
         while time.time() < deadline:
+            entry: Any = None
             try:
                 doc = _http_json("GET", url, timeout_s=min(30.0, self.cfg.submit_timeout_s))
-                if isinstance(doc, dict) and prompt_id in doc:
-                    entry = doc[prompt_id]
-                    if isinstance(entry, dict) and entry.get("outputs"):
-                        return entry
+                if isinstance(doc, dict):
+                    entry = doc.get(prompt_id)
             except Exception as e:
                 last_err = e
+            if isinstance(entry, dict) and entry.get("outputs"):
+                return entry
+            failed = _history_error(prompt_id, entry)
+            if failed is not None:
+                raise failed
             time.sleep(float(self.cfg.poll_interval_s))
         raise TimeoutError(
             f"Comfy history timeout for {prompt_id} after {self.cfg.timeout_s}s"
             + (f" last_err={last_err}" if last_err else "")
         )
 
-    def caption(self, req: CaptionRequest) -> CaptionResult:
+    def _upload(self, req: CaptionRequest) -> Tuple[str, float, float]:
+        """(image_ref, t_start, t_uploaded) for one frame."""
         image_path = Path(req.image_path)
         if not image_path.is_file() or image_path.stat().st_size == 0:
             raise FileNotFoundError(f"missing/empty frame: {image_path}")
-
         t0 = time.perf_counter()
         image_ref = self._image_ref_for_load_image(image_path)
-        t_upload = time.perf_counter()
+        return image_ref, t0, time.perf_counter()
+
+    def _submit(self, image_ref: str) -> str:
         prompt = build_florence_caption_prompt(
             image_name=image_ref,
             model=self.cfg.model,
@@ -338,14 +364,31 @@ class ComfyCaptionRunner:
             payload,
             timeout_s=self.cfg.submit_timeout_s,
         )
-        t_submit = time.perf_counter()
         prompt_id = submit.get("prompt_id")
         if not isinstance(prompt_id, str) or not prompt_id.strip():
             raise RuntimeError(f"Comfy submit missing prompt_id: {submit}")
-
-        entry = self._wait_history(prompt_id)
-        t_done = time.perf_counter()
+        return prompt_id
+
+    def _result(
+        self,
+        *,
+        prompt_id: str,
+        image_ref: str,
+        entry: Dict[str, Any],
+        t0: float,
+        t_upload: float,
+        t_submit: float,
+        t_done: float,
+        extra_timing: Optional[Dict[str, Any]] = None,
+    ) -> CaptionResult:
         caption = extract_caption_from_history(entry, run_node_id="3")
+        timing: Dict[str, Any] = {
+            "upload_s": round(t_upload - t0, 3),
+            "submit_s": round(t_submit - t_upload, 3),
+            "wait_s": round(t_done - t_submit, 3),
+            "total_s": round(t_done - t0, 3),
+        }
+        timing.update(extra_timing or {})
         return CaptionResult(
             caption=caption,
             provider="comfy_florence2",
@@ -356,15 +399,238 @@ class ComfyCaptionRunner:
                 "image_ref": image_ref,
                 "server": self.server,
                 "task": self.cfg.task,
-                "timing": {
-                    "upload_s": round(t_upload - t0, 3),
-                    "submit_s": round(t_submit - t_upload, 3),
-                    "wait_s": round(t_done - t_submit, 3),
-                    "total_s": round(t_done - t0, 3),
-                },
+                "timing": timing,
             },
         )
 
+    def caption(self, req: CaptionRequest) -> CaptionResult:
+        image_ref, t0, t_upload = self._upload(req)
+        prompt_id = self._submit(image_ref)
+        t_submit = time.perf_counter()
+        entry = self._wait_history(prompt_id)
+        return self._result(
+            prompt_id=prompt_id,
+            image_ref=image_ref,
+            entry=entry,
+            t0=t0,
+            t_upload=t_upload,
+            t_submit=t_submit,
+            t_done=time.perf_counter(),
+        )
+
+    def caption_many(self, reqs: Iterable[CaptionRequest]) -> Iterator[Union[CaptionResult, Exception]]:
+        """
+        Caption ``reqs`` with up to ``cfg.in_flight`` prompts queued on Comfy at once.
+
+        Yields one result per request — or the exception that frame raised — in request
+        order. ``in_flight <= 1`` is the serial :meth:`caption` loop.
+        """
+        k = max(1, int(self.cfg.in_flight))
+        if k == 1:
+            for req in reqs:
+                try:
+                    yield self.caption(req)
+                except Exception as e:
+                    yield e
+            return
+
+        it = iter(reqs)
+        exhausted = False
+        uploads: Deque[Future] = deque()
+        slots: Deque[_PromptSlot] = deque()  # submission (= request) order
+        waker = _CompletionWaker(self.server, self.cfg.client_id)
+        pool = ThreadPoolExecutor(max_workers=max(1, int(self.cfg.upload_ahead)), thread_name_prefix="vision-upload")
+        try:
+            waker.start()
+            while True:
+                # Upload ahead of submission so a free queue slot never waits on the network.
+                while not exhausted and len(uploads) < k + max(1, int(self.cfg.upload_ahead)):
+                    try:
+                        req = next(it)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    uploads.append(pool.submit(self._upload, req))
+                # Keep k prompts queued; bound finished-but-blocked slots behind a slow head.
+                while uploads and sum(1 for s in slots if s.pending) < k and len(slots) < 4 * k:
+                    slot = _PromptSlot()
+                    slots.append(slot)
+                    try:
+                        slot.image_ref, slot.t0, slot.t_upload = uploads.popleft().result()
+                        slot.prompt_id = self._submit(slot.image_ref)
+                        slot.t_submit = time.perf_counter()
+                        slot.deadline = time.time() + float(self.cfg.timeout_s)
+                    except Exception as e:
+                        slot.error = e
+                while slots and not slots[0].pending:
+                    yield self._slot_outcome(slots.popleft(), in_flight=k)
+                if not slots and not uploads and exhausted:
+                    return
+                if slots and slots[0].pending:
+                    if not self._poll_slots(slots, page=max(64, 4 * k)):
+                        waker.wait(float(self.cfg.poll_interval_s))
+        finally:
+            waker.stop()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _poll_slots(self, slots: Iterable["_PromptSlot"], *, page: int) -> bool:
+        """One batched /history read for every pending slot; True when any finished."""
+        pending = {s.prompt_id: s for s in slots if s.pending}
+        if not pending:
+            return False
+        found: Dict[str, Any] = {}
+        try:
+            doc = _http_json("GET", f"{self.server}/history?max_items={int(page)}", timeout_s=min(30.0, self.cfg.submit_timeout_s))
+            if isinstance(doc, dict):
+                found = doc
+            if len(found) >= page:
+                # The page may have scrolled past a finished prompt (other clients): ask by id.
+                for pid in [pid for pid in pending if pid not in found]:
+                    one = _http_json("GET", f"{self.server}/history/{urllib.parse.quote(pid)}", timeout_s=min(30.0, self.cfg.submit_timeout_s))
+                    if isinstance(one, dict) and pid in one:
+                        found[pid] = one[pid]
+        except Exception as e:
+            for slot in pending.values():
+                slot.last_err = e
+        progressed = False
+        now = time.time()
+        for pid, slot in pending.items():
+            entry = found.get(pid)
+            if isinstance(entry, dict) and entry.get("outputs"):
+                slot.entry = entry
+                slot.t_done = time.perf_counter()
+                progressed = True
+                continue
+            failed = _history_error(pid, entry)
+            if failed is not None:
+                slot.error = failed
+                progressed = True
+            elif now > slot.deadline:
+                slot.error = TimeoutError(
+                    f"Comfy history timeout for {pid} after {self.cfg.timeout_s}s"
+                    + (f" last_err={slot.last_err}" if slot.last_err else "")
+                )
+                progressed = True
+        return progressed
+
+    def _slot_outcome(self, slot: "_PromptSlot", *, in_flight: int) -> Union[CaptionResult, Exception]:
+        if slot.error is not None:
+            return slot.error
+        try:
+            return self._result(
+                prompt_id=slot.prompt_id,
+                image_ref=slot.image_ref,
+                entry=slot.entry or {},
+                t0=slot.t0,
+                t_upload=slot.t_upload,
+                t_submit=slot.t_submit,
+                t_done=slot.t_done,
+                extra_timing={"in_flight": in_flight},
+            )
+        except Exception as e:
+            return e
+
+
+@dataclass
+class _PromptSlot:
+    """One queued Comfy prompt in ``caption_many`` (done once ``entry`` or ``error`` is set)."""
+
+    image_ref: str = ""
+    prompt_id: str = ""
+    t0: float = 0.0
+    t_upload: float = 0.0
+    t_submit: float = 0.0
+    t_done: float = 0.0
+    deadline: float = 0.0
+    entry: Optional[Dict[str, Any]] = None
+    error: Optional[Exception] = None
+    last_err: Optional[Exception] = None
+
+    @property
+    def pending(self) -> bool:
+        return self.entry is None and self.error is None
+
+
+class _CompletionWaker:
+    """
+    Wake ``caption_many``'s poll on Comfy ``/ws`` completion events (optional).
+
+    Needs ``websocket-client``; without it — or if the socket fails — ``wait`` is a plain
+    sleep and the batched /history poll alone drives completion.
+    """
+
+    _DONE_TYPES = {"executed", "execution_success", "execution_error", "execution_interrupted"}
+
+    def __init__(self, server: str, client_id: str) -> None:
+        base = server.rstrip("/")
+        if base.startswith("https://"):
+            base = "wss://" + base[len("https://") :]
+        elif base.startswith("http://"):
+            base = "ws://" + base[len("http://") :]
+        self.url = f"{base}/ws?clientId={urllib.parse.quote(client_id)}"
+        self._event = threading.Event()
+        self._stop = threading.Event()
+        self._ws: Any = None
+
+    def start(self) -> None:
+        try:
+            import websocket  # type: ignore
+        except ImportError:
+            return
+        try:
+            self._ws = websocket.create_connection(self.url, timeout=5)
+        except Exception:
+            self._ws = None
+            return
+        threading.Thread(target=self._read, name="vision-ws-waker", daemon=True).start()
+
+    def _read(self) -> None:
+        while not self._stop.is_set() and self._ws is not None:
+            ws = self._ws
+            try:
+                msg = ws.recv()
+            except Exception:
+                if self._stop.is_set() or not getattr(ws, "connected", False):
+                    return  # closed: the poll interval takes over
+                continue  # recv timeout: keep listening
+            if not isinstance(msg, str):
+                continue  # binary previews
+            try:
+                obj = json.loads(msg)
+            except ValueError:
+                continue
+            if not isinstance(obj, dict):
+                continue
+            data = obj.get("data") if isinstance(obj.get("data"), dict) else {}
+            if obj.get("type") in self._DONE_TYPES or (obj.get("type") == "executing" and data.get("node") is None):
+                self._event.set()
+
+    def wait(self, timeout_s: float) -> None:
+        self._event.wait(timeout_s)
+        self._event.clear()
+
+    def stop(self) -> None:
+        self._stop.set()
+        ws, self._ws = self._ws, None
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+
+def caption_stream(runner: CaptionRunner, reqs: Iterable[CaptionRequest]) -> Iterator[Union[CaptionResult, Exception]]:
+    """One result (or the frame's exception) per request, in order; pipelined when the runner can."""
+    many = getattr(runner, "caption_many", None)
+    if callable(many):
+        yield from many(reqs)
+        return
+    for req in reqs:
+        try:
+            yield runner.caption(req)
+        except Exception as e:
+            yield e
+
 
 class DryRunCaptionRunner:
     def __init__(self, *, runner_label: str = "local") -> None:
@@ -402,6 +668,7 @@ def make_runner(
     dry_run: bool = False,
     task: str = DEFAULT_COMFY_TASK,
     max_new_tokens: int = 64,
+    in_flight: int = DEFAULT_COMFY_IN_FLIGHT,
 ) -> CaptionRunner:
     """
     Factory used by vision_slice_caption_run.
@@ -425,6 +692,7 @@ def make_runner(
                 runner_label=label,
                 image_mode=image_mode,
                 comfy_input_root=comfy_input_root,
+                in_flight=max(1, int(in_flight)),
             )
         )
 
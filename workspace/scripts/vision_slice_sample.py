@@ -5,6 +5,11 @@ Vision V1 — CPU frame sampler for time-slice captions.
 Reads a list of asset relpaths (or absolute paths), probes duration with ffprobe,
 emits fixed windows, extracts mid-frame JPEGs with ffmpeg, writes frames_manifest.json.
 
+By default every frame of an asset comes out of one ffmpeg decode (``select`` filter
+over all planned timestamps, ``--extract-mode single``); ``seek`` keeps one ffmpeg per
+frame. Assets are sampled in parallel with ``--jobs`` worker processes, and each asset
+records its probe / decode / excerpt time under ``timing``.
+
 See docs/VISION_V1_TIME_SLICE_CAPTION_SPIKE.md.
 """
 
@@ -17,18 +22,29 @@ import re
 import shutil
 import subprocess
 import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+from media_probe import ProbeError, format_duration_sec, probe_media
+
 FRAMES_MANIFEST_NAME = "frames_manifest.json"
 DEFAULT_WINDOW_SEC = 2.0
 DEFAULT_MAX_WINDOWS = 30
 DEFAULT_EXCERPT_SEC = 0.0  # 0 = use full video
 DEFAULT_EXCERPT_COUNT = 2
+EXTRACT_MODES = ("single", "seek")
 SCHEMA_VERSION = 1
 
+# Accurate seek trims at the seek point rounded to the stream tick, so a frame sitting on a
+# (6-decimal) target still counts; select with the same slack.
+_SELECT_SLACK_S = 5e-6
+_SHOWINFO_RE = re.compile(r"\bn:\s*\d+\s+pts:\s*\S+\s+pts_time:(\S+)")
+
 
 def utc_now() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -212,26 +228,15 @@ class FrameItem:
 
 
 def probe_duration_sec(video: Path, *, ffprobe: str = "ffprobe") -> float:
-    cmd = [
-        ffprobe,
-        "-v",
-        "error",
-        "-show_entries",
-        "format=duration",
-        "-of",
-        "default=noprint_wrappers=1:nokey=1",
-        str(video),
-    ]
-    try:
-        proc = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=120)
-    except FileNotFoundError as e:
-        raise RuntimeError(f"ffprobe not found ({ffprobe})") from e
-    if proc.returncode != 0:
-        raise RuntimeError(f"ffprobe failed for {video}: {proc.stderr.strip() or proc.stdout.strip()}")
     try:
-        return float((proc.stdout or "").strip())
-    except ValueError as e:
-        raise RuntimeError(f"ffprobe duration parse failed for {video}: {proc.stdout!r}") from e
+        probe = probe_media(video, ffprobe=ffprobe, timeout=120)
+    except ProbeError as e:
+        msg = str(e)
+        raise RuntimeError(msg if msg.startswith("ffprobe not found") else f"ffprobe failed for {video}: {msg}") from e
+    duration = format_duration_sec(probe)
+    if duration is None:
+        raise RuntimeError(f"ffprobe duration parse failed for {video}: {probe.get('format')!r}")
+    return duration
 
 
 def extract_frame_jpeg(
@@ -243,10 +248,7 @@ def extract_frame_jpeg(
     duration_sec: Optional[float] = None,
 ) -> None:
     out_jpeg.parent.mkdir(parents=True, exist_ok=True)
-    t = max(0.0, float(frame_t))
-    if duration_sec is not None and float(duration_sec) > 0:
-        # Stay inside the stream — end-of-file seeks fail on short OG clips.
-        t = min(t, max(0.0, float(duration_sec) - 0.05))
+    t = _clamp_frame_t(frame_t, duration_sec)
     # -ss after -i is slower but more accurate for mid-window frames.
     cmd = [
         ffmpeg,
@@ -272,6 +274,97 @@ def extract_frame_jpeg(
         raise RuntimeError(f"ffmpeg extract failed for {video}@{t}: {proc.stderr.strip()}")
 
 
+def _clamp_frame_t(frame_t: float, duration_sec: Optional[float]) -> float:
+    t = max(0.0, float(frame_t))
+    if duration_sec is not None and float(duration_sec) > 0:
+        # Stay inside the stream — end-of-file seeks fail on short OG clips.
+        t = min(t, max(0.0, float(duration_sec) - 0.05))
+    return t
+
+
+def extract_frames_jpeg(
+    video: Path,
+    *,
+    frame_ts: Sequence[float],
+    out_jpegs: Sequence[Path],
+    ffmpeg: str = "ffmpeg",
+    duration_sec: Optional[float] = None,
+) -> int:
+    """
+    Write the frame at each ``frame_ts[i]`` to ``out_jpegs[i]`` with one ffmpeg decode.
+
+    A ``select`` filter keeps, per target, the first frame at or after it — the frame
+    ``extract_frame_jpeg``'s accurate seek lands on — and ``showinfo`` reports which
+    timestamps came out. Targets sharing a frame share its JPEG. Targets the pass did
+    not yield (past the last frame) fall back to ``extract_frame_jpeg``.
+
+    Returns the number of ffmpeg invocations.
+    """
+    if len(frame_ts) != len(out_jpegs):
+        raise ValueError(f"{len(frame_ts)} timestamps for {len(out_jpegs)} outputs")
+    if not out_jpegs:
+        return 0
+    targets = [round(_clamp_frame_t(t, duration_sec), 6) for t in frame_ts]
+    lows = sorted({round(max(0.0, t - _SELECT_SLACK_S), 6) for t in targets})
+    terms = [f"gte(t\\,{lo:.6f})*(isnan(prev_selected_t)+lt(prev_selected_t\\,{lo:.6f}))" for lo in lows]
+    stage_parent = out_jpegs[0].parent
+    stage_parent.mkdir(parents=True, exist_ok=True)
+    stage = Path(tempfile.mkdtemp(prefix=".extract_", dir=stage_parent))
+    calls = 1
+    try:
+        cmd = [
+            ffmpeg,
+            "-hide_banner",
+            "-nostats",
+            "-loglevel",
+            "info",  # showinfo logs at info
+            "-y",
+            "-i",
+            str(video),
+            "-an",
+            "-sn",
+            "-vf",
+            f"select='{'+'.join(terms)}',showinfo",
+            # One image per selected frame (no cfr duplication).
+            "-vsync",
+            "0",
+            "-q:v",
+            "2",
+            str(stage / "f_%05d.jpg"),
+        ]
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=300)
+        except FileNotFoundError as e:
+            raise RuntimeError(f"ffmpeg not found ({ffmpeg})") from e
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg extract failed for {video}: {proc.stderr.strip()[-2000:]}")
+        picked: List[float] = []
+        for line in proc.stderr.splitlines():
+            if "showinfo" not in line:
+                continue
+            m = _SHOWINFO_RE.search(line)
+            if m:
+                try:
+                    picked.append(float(m.group(1)))
+                except ValueError:
+                    continue
+        files = sorted(stage.glob("f_*.jpg"))
+        if len(files) != len(picked):
+            picked = []  # cannot map images to timestamps; use per-frame seeks
+        for t, out in zip(targets, out_jpegs):
+            out.parent.mkdir(parents=True, exist_ok=True)
+            lo = round(max(0.0, t - _SELECT_SLACK_S), 6)
+            k = next((i for i, pt in enumerate(picked) if pt >= lo - 1e-7), None)
+            if k is None:
+                extract_frame_jpeg(video, frame_t=t, out_jpeg=out, ffmpeg=ffmpeg, duration_sec=duration_sec)
+                calls += 1
+                continue
+            shutil.copyfile(files[k], out)
+    finally:
+        shutil.rmtree(stage, ignore_errors=True)
+    return calls
+
+
 def extract_excerpt_mp4(
     video: Path,
     *,
@@ -400,8 +493,14 @@ def sample_asset(
     excerpt_media_dir: Optional[Path] = None,
     data_root: Optional[Path] = None,
     force_excerpts: bool = False,
+    extract_mode: str = "single",
 ) -> Dict[str, Any]:
+    if extract_mode not in EXTRACT_MODES:
+        raise ValueError(f"extract_mode must be one of {EXTRACT_MODES}: {extract_mode!r}")
+    t_start = time.perf_counter()
     source_duration = probe_duration_sec(video, ffprobe=ffprobe)
+    probe_s = time.perf_counter() - t_start
+    excerpt_s = 0.0
     if float(excerpt_sec) > 0:
         spans = plan_excerpt_spans(
             source_duration,
@@ -420,6 +519,7 @@ def sample_asset(
     frame_idx = 0
     truncated = bool(float(excerpt_sec) > 0 and source_duration > float(excerpt_sec) + 1e-3)
     excerpt_metas: List[Dict[str, Any]] = []
+    pending: List[Tuple[float, Path]] = []  # (frame_t, jpeg) extracted after planning
 
     def add_item(
         t0: float,
@@ -436,13 +536,7 @@ def sample_asset(
         rel = f"frames/{stem}/{name}".replace("\\", "/")
         abs_jpg = work_dir / rel
         if extract:
-            extract_frame_jpeg(
-                video,
-                frame_t=frame_t,
-                out_jpeg=abs_jpg,
-                ffmpeg=ffmpeg,
-                duration_sec=source_duration,
-            )
+            pending.append((frame_t, abs_jpg))
         else:
             abs_jpg.parent.mkdir(parents=True, exist_ok=True)
             if not abs_jpg.is_file():
@@ -469,6 +563,7 @@ def sample_asset(
         if float(excerpt_sec) > 0:
             out_mp4 = media_dir / stem / f"ex{ei:02d}.mp4"
             if extract:
+                t_cut = time.perf_counter()
                 extract_excerpt_mp4(
                     video,
                     t0=excerpt_t0,
@@ -477,6 +572,7 @@ def sample_asset(
                     ffmpeg=ffmpeg,
                     force=force_excerpts,
                 )
+                excerpt_s += time.perf_counter() - t_cut
             else:
                 out_mp4.parent.mkdir(parents=True, exist_ok=True)
                 if not out_mp4.is_file():
@@ -534,6 +630,28 @@ def sample_asset(
                 excerpt_video_relpath=excerpt_video_relpath,
             )
 
+    t_decode = time.perf_counter()
+    ffmpeg_calls = 0
+    if pending and extract_mode == "single":
+        ffmpeg_calls = extract_frames_jpeg(
+            video,
+            frame_ts=[t for t, _ in pending],
+            out_jpegs=[p for _, p in pending],
+            ffmpeg=ffmpeg,
+            duration_sec=source_duration,
+        )
+    else:
+        for frame_t, abs_jpg in pending:
+            extract_frame_jpeg(
+                video,
+                frame_t=frame_t,
+                out_jpeg=abs_jpg,
+                ffmpeg=ffmpeg,
+                duration_sec=source_duration,
+            )
+            ffmpeg_calls += 1
+    decode_s = time.perf_counter() - t_decode
+
     out: Dict[str, Any] = {
         "asset_relpath": asset_relpath,
         "abs_path": str(video),
@@ -543,6 +661,13 @@ def sample_asset(
         "truncated": truncated,
         "frame_count": len(items),
         "frames": [asdict(x) for x in items],
+        "timing": {
+            "probe_s": round(probe_s, 3),
+            "decode_s": round(decode_s, 3),
+            "excerpt_s": round(excerpt_s, 3),
+            "extract_mode": extract_mode if extract else None,
+            "frame_ffmpeg_calls": ffmpeg_calls,
+        },
     }
     if float(excerpt_sec) > 0:
         out["excerpt_sec"] = float(excerpt_sec)
@@ -575,6 +700,7 @@ def build_frames_manifest(
                 "excerpts": ar.get("excerpts"),
                 "truncated": ar["truncated"],
                 "frame_count": ar["frame_count"],
+                "timing": ar.get("timing"),
             }
         )
         frames.extend(ar["frames"])
@@ -605,6 +731,17 @@ def write_frames_manifest(doc: Dict[str, Any], work_dir: Path) -> Path:
     return path
 
 
+def _sample_input(raw: str, opts: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker: ``{"result": asset}`` or ``{"error": {...}}`` for one input line."""
+    try:
+        rel, abs_p = resolve_asset_path(raw, data_root=opts.get("data_root"))
+        if not abs_p.is_file():
+            raise FileNotFoundError(f"missing video: {abs_p}")
+        return {"result": sample_asset(asset_relpath=rel, video=abs_p, **opts)}
+    except Exception as e:
+        return {"error": {"input": raw, "error": str(e)}}
+
+
 def run_sample(
     inputs: Sequence[str],
     *,
@@ -621,6 +758,8 @@ def run_sample(
     excerpt_count: int = DEFAULT_EXCERPT_COUNT,
     excerpt_media_dir: Optional[Path] = None,
     force_excerpts: bool = False,
+    extract_mode: str = "single",
+    jobs: int = 1,
 ) -> Dict[str, Any]:
     if shutil.which(ffprobe) is None and extract:
         raise RuntimeError(f"ffprobe not on PATH ({ffprobe})")
@@ -631,33 +770,38 @@ def run_sample(
     work_dir.mkdir(parents=True, exist_ok=True)
     results: List[Dict[str, Any]] = []
     errors: List[Dict[str, str]] = []
+    opts: Dict[str, Any] = {
+        "work_dir": work_dir,
+        "window_sec": window_sec,
+        "max_windows": max_windows,
+        "include_whole": include_whole,
+        "ffprobe": ffprobe,
+        "ffmpeg": ffmpeg,
+        "extract": extract,
+        "excerpt_sec": excerpt_sec,
+        "excerpt_mode": excerpt_mode,
+        "excerpt_count": excerpt_count,
+        "excerpt_media_dir": excerpt_media_dir,
+        "data_root": data_root,
+        "force_excerpts": force_excerpts,
+        "extract_mode": extract_mode,
+    }
 
-    for raw in inputs:
-        try:
-            rel, abs_p = resolve_asset_path(raw, data_root=data_root)
-            if not abs_p.is_file():
-                raise FileNotFoundError(f"missing video: {abs_p}")
-            results.append(
-                sample_asset(
-                    asset_relpath=rel,
-                    video=abs_p,
-                    work_dir=work_dir,
-                    window_sec=window_sec,
-                    max_windows=max_windows,
-                    include_whole=include_whole,
-                    ffprobe=ffprobe,
-                    ffmpeg=ffmpeg,
-                    extract=extract,
-                    excerpt_sec=excerpt_sec,
-                    excerpt_mode=excerpt_mode,
-                    excerpt_count=excerpt_count,
-                    excerpt_media_dir=excerpt_media_dir,
-                    data_root=data_root,
-                    force_excerpts=force_excerpts,
-                )
-            )
-        except Exception as e:
-            errors.append({"input": raw, "error": str(e)})
+    wall0 = time.perf_counter()
+    workers = max(1, min(int(jobs), len(inputs)))
+    if workers > 1 and extract:
+        # ffmpeg decodes dominate; one worker process per asset in flight (input order kept).
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_sample_input, inputs, [opts] * len(inputs)))
+    else:
+        workers = 1
+        outcomes = [_sample_input(raw, opts) for raw in inputs]
+    for outcome in outcomes:
+        if "result" in outcome:
+            results.append(outcome["result"])
+        else:
+            errors.append(outcome["error"])
+    wall_s = time.perf_counter() - wall0
 
     doc = build_frames_manifest(
         results,
@@ -669,6 +813,12 @@ def run_sample(
         excerpt_mode=excerpt_mode,
         excerpt_count=excerpt_count,
     )
+    doc["timing"] = {
+        "wall_s": round(wall_s, 3),
+        "decode_s": round(sum(float((r.get("timing") or {}).get("decode_s") or 0.0) for r in results), 3),
+        "extract_mode": extract_mode if extract else None,
+        "jobs": workers,
+    }
     if errors:
         doc["errors"] = errors
     path = write_frames_manifest(doc, work_dir)
@@ -681,6 +831,17 @@ def _env_path(name: str) -> Optional[Path]:
     return Path(raw).expanduser() if raw else None
 
 
+def _env_int(name: str, default: int) -> int:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        print(f"warning: ignoring {name}={raw!r} (not an integer); using {default}", file=sys.stderr)
+        return default
+
+
 def main(argv: Optional[Sequence[str]] = None) -> int:
     ap = argparse.ArgumentParser(description="Vision V1: sample mid-frames for time-slice captions")
     ap.add_argument(
@@ -740,6 +901,18 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
     ap.add_argument("--no-whole", action="store_true", help="Skip whole-excerpt mid frame")
     ap.add_argument("--ffprobe", default=os.environ.get("VISION_FFPROBE", "ffprobe"))
     ap.add_argument("--ffmpeg", default=os.environ.get("VISION_FFMPEG", "ffmpeg"))
+    ap.add_argument(
+        "--extract-mode",
+        choices=list(EXTRACT_MODES),
+        default=os.environ.get("VISION_EXTRACT_MODE", "single"),
+        help="single=one ffmpeg decode per asset for all frames (default); seek=one ffmpeg per frame",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=_env_int("VISION_SAMPLE_JOBS", min(4, os.cpu_count() or 1)),
+        help="Assets sampled in parallel worker processes (default min(4, CPUs); 1 = in-process)",
+    )
     ap.add_argument(
         "--no-extract",
         action="store_true",
@@ -775,6 +948,8 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
             excerpt_count=int(args.excerpt_count),
             excerpt_media_dir=Path(args.excerpt_media_dir) if args.excerpt_media_dir else None,
             force_excerpts=bool(args.force_excerpts),
+            extract_mode=str(args.extract_mode),
+            jobs=int(args.jobs),
         )
     except Exception as e:
         print(f"error: {e}", file=sys.stderr)
@@ -791,6 +966,7 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
                 "excerpt_mode": doc.get("excerpt_mode"),
                 "excerpt_count": doc.get("excerpt_count"),
                 "error_count": len(doc.get("errors") or []),
+                "timing": doc.get("timing"),
             },
             indent=2,
         )
@@ -7,7 +7,8 @@ experiments root directory containing many experiment subdirectories.
 
 For each run directory:
   - if history.json exists: done
-  - elif submit.json has prompt_id: poll /history/<prompt_id> and write history.json when available
+  - elif submit.json has prompt_id: look it up in one batched /history?max_items= per pass
+    (per-prompt /history/<prompt_id> only for misses) and write history.json when available
   - else: submit prompt.json to /prompt and write submit.json
 
 It keeps the system loosely coupled:
@@ -461,6 +462,15 @@ def _queue_prompt_ids(server: str, *, timeout_s: int = 5) -> Optional[Set[str]]:
     return ids
 
 
+def _history_batch(server: str, *, max_items: int, timeout_s: int = 10) -> Optional[Dict[str, Any]]:
+    """Most recent history entries in one request (``GET /history?max_items=``); None on error."""
+    try:
+        obj = _http_json("GET", f"{server}/history?max_items={max(256, int(max_items))}", None, timeout_s=timeout_s)
+    except Exception:
+        return None
+    return obj if isinstance(obj, dict) else None
+
+
 def _queue_is_empty(server: str, *, timeout_s: int = 5) -> Optional[bool]:
     try:
         q = _http_json("GET", f"{server.rstrip('/')}/queue", None, timeout_s=timeout_s)
@@ -1255,11 +1265,20 @@ def watch(
             if stale_to_resubmit:
                 pending_submit = list(stale_to_resubmit) + pending_submit
 
-        # 2) Poll history for all submitted-without-history runs.
+        # 2) Collect history for all submitted-without-history runs: one batched /history per pass,
+        #    per-prompt GET only for prompts missing from the batch that are not known to be queued.
         collected_now = 0
+        history_batch = None
+        if pending_history:
+            history_batch = _history_batch(server, max_items=2 * len(pending_history), timeout_s=history_timeout_s)
         for r, pid in pending_history:
             try:
-                hist = _http_json("GET", f"{server}/history/{pid}", None, timeout_s=history_timeout_s)
+                if history_batch is not None and pid in history_batch:
+                    hist = {pid: history_batch[pid]}
+                elif history_batch is not None and queue_ids is not None and pid in queue_ids:
+                    continue
+                else:
+                    hist = _http_json("GET", f"{server}/history/{pid}", None, timeout_s=history_timeout_s)
                 if hist:
                     collected_ts = time.time()
                     _write_json(r.history_path, hist, indent=indent)
@@ -14,7 +14,7 @@ import re
 import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Callable, Optional, Protocol
+from typing import TYPE_CHECKING, Any, Callable, Optional, Protocol, Union
 
 import yaml
 
@@ -26,6 +26,12 @@ from output_path_lib import (  # noqa: E402
     normalize_ui_workflow_output_prefixes,
 )
 
+if TYPE_CHECKING:
+    from comfy_object_info_store import ObjectInfoSnapshot
+
+# Raw ``/object_info`` dict or a stored snapshot (both answer ``class_type in object_info``).
+ObjectInfoLike = Union[dict[str, Any], "ObjectInfoSnapshot"]
+
 def _repo_scripts_config(name: str) -> Path:
     """Resolve ``scripts/<name>`` for host (``workspace/scripts``) and Docker (``ws_scripts``)."""
     here = Path(__file__).resolve()
@@ -99,17 +105,32 @@ class RepairFix:
 @dataclass
 class RepairContext:
     workflow: dict[str, Any]
-    object_info: Optional[dict[str, Any]] = None
+    object_info: Optional[ObjectInfoLike] = None
     map_path: Optional[Path] = None
     repair_rules_path: Optional[Path] = None
     data_root: Optional[Path] = None
     prompt: Optional[dict[str, Any]] = None
     report: Optional[dict[str, Any]] = None
     ui_only_types: frozenset[str] = UI_ONLY_NODE_TYPES
+    _registered_types: Optional[frozenset[str]] = field(default=None, init=False, repr=False, compare=False)
 
     def copy_workflow(self) -> dict[str, Any]:
         return copy.deepcopy(self.workflow)
 
+    def registered_node_types(self) -> frozenset[str]:
+        """Node classes in ``object_info`` (computed once per context)."""
+        if self._registered_types is None:
+            self._registered_types = registered_node_types(self.object_info)
+        return self._registered_types
+
+
+def registered_node_types(object_info: Any) -> frozenset[str]:
+    """Class names from a raw ``/object_info`` dict or a stored ``ObjectInfoSnapshot``."""
+    node_types = getattr(object_info, "node_types", None)
+    if node_types is not None:
+        return frozenset(node_types)
+    return frozenset(object_info.keys()) if isinstance(object_info, dict) else frozenset()
+
 
 class RepairRule(Protocol):
     rule_id: str
@@ -580,7 +601,7 @@ class NodeTypeRenameRule:
         mappings = self._mappings(ctx)
         if not mappings:
             return False
-        registered = set(ctx.object_info.keys()) if isinstance(ctx.object_info, dict) else set()
+        registered = ctx.registered_node_types()
         for node in ctx.workflow.get("nodes") or []:
             if not isinstance(node, dict):
                 continue
@@ -591,7 +612,7 @@ class NodeTypeRenameRule:
 
     def apply(self, ctx: RepairContext) -> list[RepairFix]:
         mappings = self._mappings(ctx)
-        registered = set(ctx.object_info.keys()) if isinstance(ctx.object_info, dict) else set()
+        registered = ctx.registered_node_types()
         fixes: list[RepairFix] = []
         for node in ctx.workflow.get("nodes") or []:
             if not isinstance(node, dict):
@@ -1406,7 +1427,7 @@ def repair_until_stable(
 def apply_workflow_compat_patches(
     workflow: dict[str, Any],
     *,
-    object_info: Optional[dict[str, Any]] = None,
+    object_info: Optional[ObjectInfoLike] = None,
     map_path: Optional[Path] = None,
     only_missing: bool = True,
     in_place: bool = False,
@@ -1431,7 +1452,7 @@ def apply_workflow_compat_patches(
 
 def patchable_missing_types(
     workflow: dict[str, Any],
-    object_info: dict[str, Any],
+    object_info: ObjectInfoLike,
     *,
     map_path: Optional[Path] = None,
 ) -> list[str]:
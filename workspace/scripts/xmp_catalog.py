@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Catalog of XMP sidecars under og/ (path, mtime, star, group id) in ``ratings.sqlite``.
+
+``iter_rated_og_records`` (``ratings build --days``, ``correlate_output_ratings.py``)
+used to ``glob("**/*.XMP")``, stat every sidecar and read each one for its star before
+filtering by mtime — on a slow bind mount that walk dominates. A walk over the whole tree
+(``ratings build``, ``sync``) now reconciles ``xmp_catalog`` rows for its root + glob and
+marks that scope synced; star clicks (``_write_xmp_rating`` / ``_clear_xmp_rating``)
+upsert the one row they touch. Day-windowed and rated-only listings of a synced scope
+are then answered from SQL (mtime index) in the walk's order, without touching the tree.
+
+XMPs edited by other tools are picked up by the next full ``ratings build`` (or ``sync``);
+``XMP_CATALOG=off`` always walks.
+
+  python3 xmp_catalog.py sync  --root /path/to/output/og
+  python3 xmp_catalog.py stats --root /path/to/output/og
+  python3 xmp_catalog.py query --root /path/to/output/og --days 7 --rated-only
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from correlate_output_ratings import output_relpath_keys_from_xmp, parse_xmp_rating
+
+XMP_CATALOG_DB_FILENAME = "ratings.sqlite"
+DEFAULT_XMP_GLOB = "*.XMP"
+
+
+class XmpEntry(NamedTuple):
+    path: Path
+    mtime: float
+    rating: Optional[int]
+
+
+def xmp_catalog_enabled() -> bool:
+    return os.environ.get("XMP_CATALOG", "").strip().lower() not in {"0", "off", "false", "no"}
+
+
+def default_xmp_catalog_path(og_root: Path) -> Path:
+    """``ratings.sqlite`` for ``og_root`` (``<og>/../_status/``, beside ratings_index.json)."""
+    return Path(og_root).expanduser().resolve().parent / "_status" / XMP_CATALOG_DB_FILENAME
+
+
+def ensure_xmp_catalog(con: sqlite3.Connection) -> None:
+    """Create the catalog tables (``open_ratings_db`` calls this too)."""
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS xmp_catalog (
+            xmp_path TEXT PRIMARY KEY,
+            og_root TEXT NOT NULL,
+            sort_key TEXT NOT NULL,
+            name TEXT NOT NULL,
+            mtime REAL NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            rating INTEGER,
+            group_id TEXT,
+            short_key TEXT,
+            discovery_key TEXT,
+            updated_at TEXT
+        )
+        """
+    )
+    con.execute("CREATE INDEX IF NOT EXISTS idx_xmp_catalog_mtime ON xmp_catalog(og_root, mtime)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_xmp_catalog_sort ON xmp_catalog(og_root, sort_key)")
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS xmp_catalog_scope (
+            og_root TEXT NOT NULL,
+            name_glob TEXT NOT NULL,
+            synced_at TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (og_root, name_glob)
+        )
+        """
+    )
+
+
+def open_xmp_catalog(og_root: Path, *, create: bool = False) -> Optional[sqlite3.Connection]:
+    """Catalog connection for ``og_root``; None when the store is absent and ``create`` is False."""
+    path = default_xmp_catalog_path(og_root)
+    if not path.is_file() and not create:
+        return None
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(path), timeout=30)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    ensure_xmp_catalog(con)
+    con.commit()
+    return con
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _sort_key(rel_parts: Iterable[str]) -> str:
+    # \x01 sorts below every path character, so text order matches sorted(Path) order.
+    return "\x01".join(rel_parts)
+
+
+def _row_values(xmp: Path, og_root: Path, st: os.stat_result, rating: Optional[int]) -> Tuple[Any, ...]:
+    rel_parts = xmp.relative_to(og_root).parts
+    short_key, discovery_key = output_relpath_keys_from_xmp(xmp, og_root)
+    return (
+        str(xmp),
+        str(og_root),
+        _sort_key(rel_parts),
+        xmp.name,
+        st.st_mtime,
+        st.st_mtime_ns,
+        st.st_size,
+        rating,
+        f"og:stem:{xmp.stem.lower()}",
+        short_key,
+        discovery_key,
+        _utc_now(),
+    )
+
+
+_UPSERT_SQL = """
+    INSERT OR REPLACE INTO xmp_catalog
+      (xmp_path, og_root, sort_key, name, mtime, mtime_ns, size, rating, group_id, short_key, discovery_key, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _same_db(con: sqlite3.Connection, path: Path) -> bool:
+    try:
+        row = con.execute("PRAGMA database_list").fetchone()
+    except sqlite3.Error:
+        return False
+    return bool(row and row[2]) and Path(row[2]).resolve() == path
+
+
+def record_xmp(
+    xmp_path: Path,
+    og_root: Path,
+    *,
+    rating: Optional[int],
+    con: Optional[sqlite3.Connection] = None,
+) -> bool:
+    """
+    Upsert one sidecar after it was written / cleared (star click). Uses ``con`` when it is
+    the catalog's store, else opens it; a no-op when the XMP is outside ``og_root`` or no
+    store exists yet. True when a row was written.
+    """
+    og_root = Path(og_root).expanduser().resolve()
+    xmp = Path(xmp_path).expanduser().resolve()
+    try:
+        xmp.relative_to(og_root)
+        st = xmp.stat()
+    except (ValueError, OSError):
+        return False
+    own = None
+    if con is None or not _same_db(con, default_xmp_catalog_path(og_root)):
+        own = con = open_xmp_catalog(og_root)
+        if con is None:
+            return False
+    try:
+        ensure_xmp_catalog(con)
+        con.execute(_UPSERT_SQL, _row_values(xmp, og_root, st, rating))
+        con.commit()
+    finally:
+        if own is not None:
+            own.close()
+    return True
+
+
+def _cached_rows(con: sqlite3.Connection, og_root: Path) -> Dict[str, sqlite3.Row]:
+    return {
+        str(r["xmp_path"]): r
+        for r in con.execute(
+            "SELECT xmp_path, name, mtime_ns, size, rating FROM xmp_catalog WHERE og_root = ?", (str(og_root),)
+        )
+    }
+
+
+def reconcile_xmp_catalog(
+    con: sqlite3.Connection,
+    og_root: Path,
+    name_glob: str,
+    walked: Iterable[Tuple[Path, os.stat_result, Optional[int]]],
+) -> int:
+    """
+    Make the ``og_root`` / ``name_glob`` rows equal one full walk's ``(xmp, stat, star)``
+    and mark the scope synced. Returns the number of rows written or removed.
+    """
+    og_root = Path(og_root).expanduser().resolve()
+    ensure_xmp_catalog(con)
+    cached = _cached_rows(con, og_root)
+    upserts: List[Tuple[Any, ...]] = []
+    n = 0
+    for xmp, st, rating in walked:
+        n += 1
+        row = cached.pop(str(xmp), None)
+        if (
+            row is not None
+            and int(row["mtime_ns"]) == st.st_mtime_ns
+            and int(row["size"]) == st.st_size
+            and row["rating"] == rating
+        ):
+            continue
+        upserts.append(_row_values(xmp, og_root, st, rating))
+    # Left in ``cached``: rows of this glob the walk no longer saw.
+    gone = [(p,) for p, r in cached.items() if fnmatchcase(str(r["name"]), name_glob)]
+    with con:
+        con.executemany(_UPSERT_SQL, upserts)
+        con.executemany("DELETE FROM xmp_catalog WHERE xmp_path = ?", gone)
+        con.execute(
+            "INSERT OR REPLACE INTO xmp_catalog_scope(og_root, name_glob, synced_at, n) VALUES (?, ?, ?, ?)",
+            (str(og_root), name_glob, _utc_now(), n),
+        )
+    return len(upserts) + len(gone)
+
+
+def scan_xmps(og_root: Path, *, name_glob: str = DEFAULT_XMP_GLOB, con: Optional[sqlite3.Connection] = None) -> List[XmpEntry]:
+    """
+    Walk ``og_root`` (``sorted(glob("**/<name_glob>"))``), stat and read stars. With ``con``,
+    sidecars whose ``mtime_ns:size`` is unchanged reuse the cataloged star and the scope is
+    reconciled.
+    """
+    og_root = Path(og_root).expanduser().resolve()
+    if not og_root.is_dir():
+        return []
+    cached: Dict[str, sqlite3.Row] = {}
+    if con is not None:
+        ensure_xmp_catalog(con)
+        cached = _cached_rows(con, og_root)
+    walked: List[Tuple[Path, os.stat_result, Optional[int]]] = []
+    for xmp in sorted(og_root.glob(f"**/{name_glob}")):
+        try:
+            st = xmp.stat()
+        except OSError:
+            continue
+        row = cached.get(str(xmp))
+        if row is not None and int(row["mtime_ns"]) == st.st_mtime_ns and int(row["size"]) == st.st_size:
+            rating = None if row["rating"] is None else int(row["rating"])
+        else:
+            rating = parse_xmp_rating(xmp)
+        walked.append((xmp, st, rating))
+    if con is not None:
+        reconcile_xmp_catalog(con, og_root, name_glob, walked)
+    return [XmpEntry(xmp, st.st_mtime, rating) for xmp, st, rating in walked]
+
+
+def _glob_covered(synced: str, wanted: str) -> bool:
+    """True when every name matching ``wanted`` also matches the synced glob ``synced``."""
+    if synced == wanted:
+        return True
+    # ``*.XMP`` covers ``X-Kneel*.XMP``: a bare-suffix scope and a query with the same suffix.
+    if synced.startswith("*") and not any(c in synced[1:] for c in "*?[/"):
+        return "/" not in wanted and wanted.endswith(synced[1:])
+    return False
+
+
+def catalog_covers(con: sqlite3.Connection, og_root: Path, name_glob: str) -> bool:
+    og_root = Path(og_root).expanduser().resolve()
+    rows = con.execute("SELECT name_glob FROM xmp_catalog_scope WHERE og_root = ?", (str(og_root),)).fetchall()
+    return any(_glob_covered(str(r["name_glob"]), name_glob) for r in rows)
+
+
+def query_xmps(
+    con: sqlite3.Connection,
+    og_root: Path,
+    *,
+    name_glob: str = DEFAULT_XMP_GLOB,
+    since: Optional[datetime] = None,
+    rated_only: bool = False,
+) -> List[XmpEntry]:
+    """Cataloged sidecars in walk order; ``since`` keeps local mtime >= since (as the walk filter)."""
+    og_root = Path(og_root).expanduser().resolve()
+    sql = "SELECT xmp_path, name, mtime, rating FROM xmp_catalog WHERE og_root = ?"
+    params: List[Any] = [str(og_root)]
+    if since is not None:
+        # Coarse SQL bound (a day of slack for DST / local-time edges); exact check below.
+        sql += " AND mtime >= ?"
+        params.append(since.timestamp() - 86400)
+    if rated_only:
+        sql += " AND rating IS NOT NULL"
+    sql += " ORDER BY sort_key"
+    out: List[XmpEntry] = []
+    for r in con.execute(sql, params):
+        if not fnmatchcase(str(r["name"]), name_glob):
+            continue
+        mtime = float(r["mtime"])
+        if since is not None and datetime.fromtimestamp(mtime) < since:
+            continue
+        out.append(XmpEntry(Path(str(r["xmp_path"])), mtime, None if r["rating"] is None else int(r["rating"])))
+    return out
+
+
+def list_xmps(
+    og_root: Path,
+    *,
+    name_glob: str = DEFAULT_XMP_GLOB,
+    days: int = 0,
+    rated_only: bool = False,
+    scan: Optional[bool] = None,
+) -> Tuple[List[XmpEntry], str]:
+    """
+    ``(entries, "catalog" | "scan")``: sidecars under ``og_root`` modified in the last
+    ``days`` (0 = all), in ``sorted(glob)`` order.
+
+    ``scan=None`` answers from the catalog when it has synced a covering glob for this root,
+    else walks (reconciling an existing catalog); ``scan=True`` always walks.
+    """
+    og_root = Path(og_root).expanduser().resolve()
+    cut = datetime.now() - timedelta(days=days) if days and days > 0 else None
+    con = open_xmp_catalog(og_root) if xmp_catalog_enabled() else None
+    try:
+        if con is not None and scan is not True and catalog_covers(con, og_root, name_glob):
+            return query_xmps(con, og_root, name_glob=name_glob, since=cut, rated_only=rated_only), "catalog"
+        entries = scan_xmps(og_root, name_glob=name_glob, con=con)
+    finally:
+        if con is not None:
+            con.close()
+    out = [
+        e
+        for e in entries
+        if not (cut and datetime.fromtimestamp(e.mtime) < cut) and not (rated_only and e.rating is None)
+    ]
+    return out, "scan"
+
+
+def catalog_stats(con: sqlite3.Connection, og_root: Path) -> Dict[str, Any]:
+    og_root = Path(og_root).expanduser().resolve()
+    row = con.execute(
+        "SELECT COUNT(*) AS n, SUM(rating IS NOT NULL) AS rated, MAX(mtime) AS newest FROM xmp_catalog WHERE og_root = ?",
+        (str(og_root),),
+    ).fetchone()
+    scopes = con.execute(
+        "SELECT name_glob, synced_at, n FROM xmp_catalog_scope WHERE og_root = ? ORDER BY name_glob", (str(og_root),)
+    ).fetchall()
+    return {
+        "og_root": str(og_root),
+        "xmps": int(row["n"] or 0),
+        "rated": int(row["rated"] or 0),
+        "newest_mtime": datetime.fromtimestamp(row["newest"]).isoformat(timespec="seconds") if row["newest"] else None,
+        "scopes": [dict(s) for s in scopes],
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="XMP sidecar catalog in ratings.sqlite")
+    ap.add_argument("cmd", choices=("sync", "stats", "query"))
+    ap.add_argument("--root", type=Path, required=True, help="og/ library root")
+    ap.add_argument("--name-glob", default=DEFAULT_XMP_GLOB)
+    ap.add_argument("--days", type=int, default=0)
+    ap.add_argument("--rated-only", action="store_true")
+    args = ap.parse_args()
+    root = args.root.expanduser().resolve()
+
+    if args.cmd == "query":
+        entries, source = list_xmps(root, name_glob=args.name_glob, days=args.days, rated_only=args.rated_only)
+        rows = [{"xmp": str(e.path), "mtime": e.mtime, "rating": e.rating} for e in entries]
+        print(json.dumps({"source": source, "count": len(rows), "xmps": rows}, indent=2))
+        return 0
+    con = open_xmp_catalog(root, create=args.cmd == "sync")
+    if con is None:
+        print(json.dumps({"ok": False, "error": "no_catalog", "path": str(default_xmp_catalog_path(root))}))
+        return 1
+    try:
+        if args.cmd == "sync":
+            scan_xmps(root, name_glob=args.name_glob, con=con)
+        print(json.dumps(catalog_stats(con, root), indent=2))
+    finally:
+        con.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
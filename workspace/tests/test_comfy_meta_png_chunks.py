@@ -0,0 +1,64 @@
+"""comfy_meta_lib PNG text-chunk readers: streaming, header-only (stop at IDAT)."""
+
+import struct
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+
+from support import ROOT, SCRIPTS_DIR  # noqa: F401
+
+import comfy_meta_lib as cml  # noqa: E402
+
+
+def _chunk(ctype: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + ctype + data + struct.pack(">I", zlib.crc32(ctype + data) & 0xFFFFFFFF)
+
+
+def _png(*chunks: bytes) -> bytes:
+    ihdr = _chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0))
+    return cml.PNG_MAGIC + ihdr + b"".join(chunks) + _chunk(b"IEND", b"")
+
+
+class TestPngTextChunks(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.dir = Path(self._td.name)
+
+    def tearDown(self):
+        self._td.cleanup()
+
+    def _write(self, data: bytes) -> Path:
+        p = self.dir / "a.png"
+        p.write_bytes(data)
+        return p
+
+    def test_header_only_stops_at_idat(self):
+        p = self._write(
+            _png(
+                _chunk(b"tEXt", b'prompt\x00{"1": {}}'),
+                _chunk(b"zTXt", b"workflow\x00\x00" + zlib.compress(b'{"nodes": []}')),
+                _chunk(b"iTXt", b"note\x00\x00\x00\x00\x00caf\xc3\xa9"),
+                _chunk(b"IDAT", zlib.compress(b"\x00\x00\x00\x00")),
+                _chunk(b"tEXt", b"trailing\x00late"),
+            )
+        )
+        head = cml.read_png_header_text_chunks(p)
+        self.assertEqual(head, {"prompt": '{"1": {}}', "workflow": '{"nodes": []}', "note": "café"})
+        full = cml.read_png_text_chunks(p)
+        self.assertEqual(full["trailing"], "late")
+        self.assertEqual(cml.read_png_text_chunks(p, include_trailing=False), head)
+
+    def test_not_png_raises(self):
+        p = self._write(b"GIF89a" + b"\x00" * 32)
+        with self.assertRaises(ValueError):
+            cml.read_png_header_text_chunks(p)
+
+    def test_truncated_file_returns_what_was_read(self):
+        data = _png(_chunk(b"tEXt", b"prompt\x00{}"), _chunk(b"IDAT", b"x" * 64))
+        p = self._write(data[: len(data) - 40])
+        self.assertEqual(cml.read_png_text_chunks(p), {"prompt": "{}"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Tests for comfy_object_info_store (persistent /object_info snapshots)."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import support  # noqa: F401
+import comfy_object_info_store as store
+import shape_factory as sf
+from workflow_repair import RepairContext
+
+_OBJECT_INFO = {
+    "KSampler": {
+        "input": {"required": {"model": ["MODEL"], "seed": ["INT", {"default": 0}]}, "optional": {"denoise": ["FLOAT"]}},
+        "output": ["LATENT"],
+        "category": "sampling",
+    },
+    "LoadImage": {"input": {"required": {"image": [["a.png"]]}}, "output": ["IMAGE", "MASK"], "category": "image"},
+}
+
+
+class _FakeComfy(BaseHTTPRequestHandler):
+    hits: dict[str, int] = {}
+    extensions: list[str] = ["/extensions/core/a.js"]
+    object_info: dict = _OBJECT_INFO
+
+    def do_GET(self) -> None:  # noqa: N802
+        path = self.path.split("?")[0]
+        type(self).hits[path] = type(self).hits.get(path, 0) + 1
+        body = {
+            "/object_info": type(self).object_info,
+            "/extensions": type(self).extensions,
+            "/system_stats": {"system": {"comfyui_version": "0.3.0"}},
+        }.get(path)
+        if body is None:
+            self.send_error(404)
+            return
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args) -> None:  # quiet
+        pass
+
+
+class ObjectInfoStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self._env = mock.patch.dict(os.environ, {store.OBJECT_INFO_STORE_ENV: str(Path(self._td.name) / "oi.sqlite")})
+        self._env.start()
+        _FakeComfy.hits = {}
+        _FakeComfy.extensions = ["/extensions/core/a.js"]
+        _FakeComfy.object_info = _OBJECT_INFO
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _FakeComfy)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.server = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        store.reset_object_info_memo()
+
+    def _stop_server(self) -> None:
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def tearDown(self) -> None:
+        self._stop_server()
+        self._env.stop()
+        store.reset_object_info_memo()
+        self._td.cleanup()
+
+    def test_download_once_per_fingerprint(self) -> None:
+        first = store.load_object_info(self.server)
+        self.assertEqual(first.source, "fetched")
+        self.assertEqual(store.load_object_info(self.server), first)  # in-process memo
+
+        store.reset_object_info_memo()  # new CLI process, fingerprint re-check forced
+        again = store.load_object_info(self.server, fingerprint_ttl_s=0)
+        self.assertEqual((again.source, again.fingerprint), ("store", first.fingerprint))
+        self.assertEqual(again.object_info, _OBJECT_INFO)
+        self.assertEqual(_FakeComfy.hits["/object_info"], 1)
+
+        _FakeComfy.extensions = [*_FakeComfy.extensions, "/extensions/new_pack/b.js"]
+        store.reset_object_info_memo()
+        changed = store.load_object_info(self.server, fingerprint_ttl_s=0)
+        self.assertEqual(changed.source, "fetched")
+        self.assertNotEqual(changed.fingerprint, first.fingerprint)
+        self.assertEqual(_FakeComfy.hits["/object_info"], 2)
+
+    def test_missing_types_recheck_live_object_info(self) -> None:
+        store.load_object_info(self.server)
+        # A Python-only node pack: /object_info grows, the fingerprint does not move.
+        _FakeComfy.object_info = {**_OBJECT_INFO, "NewPackNode": {"input": {"required": {}}, "output": []}}
+        store.reset_object_info_memo()
+        stale = store.load_object_info(self.server, fingerprint_ttl_s=0)
+        self.assertEqual(stale.source, "store")
+        self.assertNotIn("NewPackNode", stale)
+
+        self.assertIs(store.recheck_missing_node_types(stale, ["KSampler"], min_age_s=0), stale)
+        self.assertIs(store.recheck_missing_node_types(stale, ["NewPackNode"]), stale)  # just fetched
+        fresh = store.recheck_missing_node_types(stale, ["NewPackNode"], min_age_s=0)
+        self.assertEqual(fresh.source, "fetched")
+        self.assertIn("NewPackNode", fresh)
+        self.assertEqual(_FakeComfy.hits["/object_info"], 2)
+
+        self._stop_server()
+        self.assertIs(store.recheck_missing_node_types(stale, ["StillMissing"], timeout_s=2, min_age_s=0), stale)
+
+    def test_input_index_and_repair_context_lookups(self) -> None:
+        store.load_object_info(self.server)
+        store.reset_object_info_memo()
+        snap = store.load_object_info(self.server)
+        self.assertEqual(snap.input_names("KSampler"), ["model", "seed", "denoise"])
+        self.assertEqual(snap.input_schema("LoadImage")["output"], ["IMAGE", "MASK"])
+        self.assertIsNone(snap.input_schema("Nope"))
+        self.assertIn("KSampler", snap)
+        ctx = RepairContext(workflow={"nodes": []}, object_info=snap)
+        self.assertEqual(ctx.registered_node_types(), frozenset(_OBJECT_INFO))
+
+    def test_validation_lookups_work_with_server_down(self) -> None:
+        store.load_object_info(self.server)
+        store.reset_object_info_memo()
+        self._stop_server()
+        workflow = {"nodes": [{"id": 1, "type": "KSampler"}, {"id": 2, "type": "MissingPack"}]}
+        snap = sf.fetch_object_info_snapshot(self.server, timeout_s=2, cache_ttl_s=0)
+        self.assertEqual(snap.source, "offline")
+        self.assertEqual([m["class_type"] for m in sf.missing_node_types(workflow, snap)], ["MissingPack"])
+
+        store.reset_object_info_memo()
+        with mock.patch.dict(os.environ, {store.OBJECT_INFO_STORE_ENV: str(Path(self._td.name) / "empty.sqlite")}):
+            with self.assertRaises(store.ObjectInfoError):
+                store.load_object_info(self.server, offline=True)
+
+    def test_default_store_sits_in_the_output_status_dir(self) -> None:
+        out = Path(self._td.name) / "output"
+        with mock.patch.dict(os.environ, {store.OBJECT_INFO_STORE_ENV: "", "COMFYUI_BIND_OUTPUT_DIR": str(out)}):
+            self.assertEqual(store.default_object_info_store_path(), out.resolve() / "_status" / store.OBJECT_INFO_STORE_BASENAME)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+"""Discovery og/wip index: incremental / parallel scan, SQLite mirror and row lookups."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SERVER_PATH = REPO_ROOT / "scripts" / "experiments_ui_server.py"
+
+
+def _load_server():
+    spec = importlib.util.spec_from_file_location("experiments_ui_server_discovery_scan_test", SERVER_PATH)
+    assert spec and spec.loader
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _cfg(root: Path) -> SimpleNamespace:
+    out = root / "output"
+    return SimpleNamespace(
+        output_root=out,
+        workspace_root=root,
+        discovery_index_path=out / "_status" / "discovery_og_wip_index.json",
+        discovery_scan_workers=1,
+        discovery_scan_io_mb_per_s=0.0,
+    )
+
+
+def _strip_volatile(doc):
+    return {k: v for k, v in doc.items() if k not in ("updated_at", "scan_ms", "scan_stats")}
+
+
+class TestDiscoveryIndexIncremental(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.m = _load_server()
+
+    def _seed(self, root: Path) -> Path:
+        og = root / "output" / "og" / "2026-08-01"
+        og.mkdir(parents=True)
+        (og / "clip_a.mp4").write_bytes(b"video-a")
+        (og / "clip_a.png").write_bytes(b"not-a-png")
+        (og / "clip_b.mp4").write_bytes(b"video-b")
+        (root / "output" / "wip").mkdir(parents=True)
+        return og
+
+    def test_second_build_reuses_unchanged_files(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            og = self._seed(root)
+            cfg = _cfg(root)
+            first = self.m._build_discovery_og_wip_index(cfg)
+            self.assertEqual(first["scan_stats"]["mode"], "full")
+            self.assertEqual(first["scan_stats"]["hashed_files"], 3)
+
+            second = self.m._build_discovery_og_wip_index(cfg)
+            self.assertEqual(second["scan_stats"]["mode"], "incremental")
+            self.assertEqual(second["scan_stats"]["hashed_files"], 0)
+            self.assertEqual(second["scan_stats"]["reused_files"], 3)
+            self.assertEqual(_strip_volatile(first), _strip_volatile(second))
+
+            (og / "clip_b.mp4").write_bytes(b"video-b-changed")
+            st = (og / "clip_b.mp4").stat()
+            os.utime(og / "clip_b.mp4", (st.st_atime, st.st_mtime + 5))
+            (og / "clip_a.png").unlink()
+            third = self.m._build_discovery_og_wip_index(cfg)
+            self.assertEqual(third["scan_stats"]["hashed_files"], 1)
+            self.assertEqual(third["scan_stats"]["reused_files"], 1)
+            self.assertEqual(third["scan_stats"]["dropped_files"], 1)
+
+            manifest = json.loads(
+                self.m._discovery_scan_manifest_path(cfg.discovery_index_path).read_text(encoding="utf-8")
+            )
+            self.assertEqual(
+                sorted(manifest["files"]),
+                ["og/2026-08-01/clip_a.mp4", "og/2026-08-01/clip_b.mp4"],
+            )
+            full = self.m._build_discovery_og_wip_index(cfg, incremental=False)
+            self.assertEqual(full["scan_stats"]["hashed_files"], 2)
+            self.assertEqual(_strip_volatile(full), _strip_volatile(third))
+
+    def test_health_reports_scan_counts(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            self._seed(root)
+            cfg = _cfg(root)
+            self.m._build_discovery_og_wip_index(cfg)
+            current = self.m._build_discovery_og_wip_index(cfg)
+            health = self.m._build_discovery_index_health(
+                cfg,
+                previous_index=None,
+                current_index=current,
+                reason="refresh",
+                from_cache=False,
+            )
+            self.assertEqual(health["scan"]["reused_files"], 3)
+            self.assertEqual(health["scan"]["hashed_files"], 0)
+            self.assertIn("scan_ms", health["scan"])
+
+
+class TestDiscoveryIndexParallel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.m = _load_server()
+
+    def test_parallel_matches_serial(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            for lib in ("og", "wip"):
+                for d in range(3):
+                    sub = root / "output" / lib / f"d{d}"
+                    sub.mkdir(parents=True)
+                    for i in range(6):
+                        (sub / f"clip_{d}_{i}.mp4").write_bytes(f"{lib}-{d}-{i}".encode())
+                        (sub / f"clip_{d}_{i}.png").write_bytes(b"x" * (i + 1))
+                        os.utime(sub / f"clip_{d}_{i}.mp4", (1_700_000_000, 1_700_000_000))
+            cfg = _cfg(root)
+            serial = self.m._build_discovery_og_wip_index(cfg, incremental=False, workers=1)
+            parallel = self.m._build_discovery_og_wip_index(
+                cfg, incremental=False, workers=4, io_mb_per_s=512.0
+            )
+            self.assertEqual(parallel["scan_stats"]["workers"], 4)
+            self.assertEqual(parallel["item_count"], 36)
+            self.assertEqual(
+                json.dumps(_strip_volatile(serial), sort_keys=False),
+                json.dumps(_strip_volatile(parallel), sort_keys=False),
+            )
+
+
+class TestDiscoveryIndexLookups(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.m = _load_server()
+
+    def _index(self):
+        def row(stem, mtime):
+            return {
+                "group_id": f"og:stem:{stem}",
+                "relpath": f"og/d/{stem}.mp4",
+                "name": f"{stem}.mp4",
+                "library": "og",
+                "mtime": mtime,
+                "members": [
+                    {"relpath": f"og/d/{stem}.mp4", "name": f"{stem}.mp4"},
+                    {"relpath": f"og/e/{stem}.png", "name": f"{stem}.png"},
+                ],
+            }
+
+        return {"version": 5, "updated_at": "t", "items": [row("a", 1.0), row("b", 3.0), row("a", 2.0)]}
+
+    def test_memoized_lookups_match_scan_semantics(self):
+        idx = self._index()
+        first = self.m._discovery_item_for_relpath(idx, "og/e/a.png")
+        self.assertIs(first, idx["items"][0])
+        self.assertIs(self.m._discovery_item_for_relpath(idx, "og/d/b.xmp"), idx["items"][1])
+        self.assertIsNone(self.m._discovery_item_for_relpath(idx, "og/d/zzz.mp4"))
+        # Newest by mtime wins for basename hits.
+        self.assertIs(self.m._discovery_find_item_by_media_basename(idx, "/abs/A.PNG"), idx["items"][2])
+        self.assertIs(self.m._discovery_index_items_by_group_id(idx)["og:stem:b"], idx["items"][1])
+
+    def test_lookups_are_keyed_on_index_generation(self):
+        idx = self._index()
+        tables = self.m._discovery_index_lookups(idx)
+        self.assertIs(self.m._discovery_index_lookups(idx), tables)
+        self.assertIn(("t", 3), self.m._DISCOVERY_INDEX_LOOKUPS)
+        # Same generation re-read from disk: rows come from the new doc.
+        again = self._index()
+        self.assertIs(self.m._discovery_index_items_by_group_id(again)["og:stem:b"], again["items"][1])
+        newer = {**self._index(), "updated_at": "u"}
+        self.m._discovery_index_lookups(newer)
+        self.assertIn(("u", 3), self.m._DISCOVERY_INDEX_LOOKUPS)
+
+    def test_write_index_mirrors_into_store(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            self.m._discovery_write_index(_cfg(root), {**self._index(), "item_count": 3})
+            con = self.m._discovery_index_store_open(_cfg(root))
+            self.assertIsNotNone(con)
+            try:
+                meta = self.m._discovery_index_store_meta(con)
+                self.assertEqual(meta["item_count"], 3)
+                n = con.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+                self.assertEqual(n, 2)
+            finally:
+                con.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
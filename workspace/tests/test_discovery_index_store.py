@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Tests for discovery_index_store (SQLite mirror of the Discovery index)."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import support  # noqa: F401
+from discovery_index_store import (
+    items_matching_stem,
+    lookup_by_basename,
+    lookup_by_group_id,
+    lookup_by_relpath,
+    lookup_by_sha256,
+    newest_items,
+    open_discovery_index_store,
+    query_library,
+    read_meta,
+    relpath_stem_key,
+    sync_from_json,
+)
+
+
+def _item(lib: str, stem: str, mtime: float, *, day: str = "2026-08-01") -> dict:
+    return {
+        "group_id": f"{lib}:stem:{stem.lower()}",
+        "relpath": f"{lib}/{day}/{stem}.mp4",
+        "library": lib,
+        "name": f"{stem}.mp4",
+        "mtime": mtime,
+        "size": 10,
+        "sha256": f"sha-{stem}",
+        "video_relpath": f"{lib}/{day}/{stem}.mp4",
+        "thumb_relpath": f"{lib}/{day}/{stem}.png",
+        "members": [
+            {"relpath": f"{lib}/{day}/{stem}.mp4", "name": f"{stem}.mp4", "kind": "video"},
+            {"relpath": f"{lib}/{day}/{stem}.png", "name": f"{stem}.png", "kind": "image"},
+        ],
+    }
+
+
+def _doc() -> dict:
+    items = [
+        _item("og", "FB9_GEX2_2026-08-01_00003", 300.0),
+        _item("wip", "tune_alpha_00001", 200.0),
+        _item("og", "FB9_GEX2_2026-08-01_00001", 100.0),
+    ]
+    return {"version": 5, "updated_at": "2026-08-01T00:00:00Z", "item_count": len(items), "scan_ms": 7, "items": items}
+
+
+class DiscoveryIndexStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        root = Path(self._td.name)
+        self.json_path = root / "discovery_og_wip_index.json"
+        self.json_path.write_text(json.dumps(_doc()), encoding="utf-8")
+        self.con = open_discovery_index_store(root / "discovery_index.sqlite")
+        self.assertTrue(sync_from_json(self.con, self.json_path))
+
+    def tearDown(self) -> None:
+        self.con.close()
+        self._td.cleanup()
+
+    def test_sync_is_skipped_when_json_unchanged(self) -> None:
+        self.assertFalse(sync_from_json(self.con, self.json_path))
+        meta = read_meta(self.con)
+        self.assertEqual(meta["version"], 5)
+        self.assertEqual(meta["item_count"], 3)
+
+    def test_reopen_does_not_write(self) -> None:
+        before = self.con.execute("PRAGMA data_version").fetchone()[0]
+        open_discovery_index_store(Path(self._td.name) / "discovery_index.sqlite").close()
+        self.assertEqual(self.con.execute("PRAGMA data_version").fetchone()[0], before)  # no commit from the reopen
+
+    def test_query_library_filters_and_pages(self) -> None:
+        items, total = query_library(self.con, limit=2)
+        self.assertEqual(total, 3)
+        self.assertEqual([it["name"] for it in items], ["FB9_GEX2_2026-08-01_00003.mp4", "tune_alpha_00001.mp4"])
+        page2, _ = query_library(self.con, limit=2, offset=2)
+        self.assertEqual([it["name"] for it in page2], ["FB9_GEX2_2026-08-01_00001.mp4"])
+
+        og, total_og = query_library(self.con, library="og")
+        self.assertEqual(total_og, 2)
+        self.assertTrue(all(it["library"] == "og" for it in og))
+
+        hits, n = query_library(self.con, q="ALPHA_00001.PNG")
+        self.assertEqual(n, 1)
+        self.assertEqual(hits[0]["library"], "wip")
+
+        recent, n_recent = query_library(self.con, since_mtime=150.0)
+        self.assertEqual(n_recent, 2)
+        self.assertEqual(len(recent), 2)
+
+        _none, n_like = query_library(self.con, q="%")
+        self.assertEqual(n_like, 0)
+
+    def test_point_lookups(self) -> None:
+        self.assertEqual(relpath_stem_key("og/a/B.MP4"), "og/a/B")
+        gid = "og:stem:fb9_gex2_2026-08-01_00001"
+        self.assertEqual(lookup_by_group_id(self.con, gid)["mtime"], 100.0)
+        self.assertEqual(lookup_by_relpath(self.con, "og/2026-08-01/FB9_GEX2_2026-08-01_00001.png")["group_id"], gid)
+        self.assertEqual(lookup_by_relpath(self.con, "og/2026-08-01/FB9_GEX2_2026-08-01_00001.xmp")["group_id"], gid)
+        self.assertIsNone(lookup_by_relpath(self.con, "og/2026-08-01/missing.mp4"))
+        self.assertEqual(lookup_by_basename(self.con, "/x/y/tune_alpha_00001.PNG")["library"], "wip")
+        self.assertEqual(len(lookup_by_sha256(self.con, "sha-tune_alpha_00001")), 1)
+        self.assertEqual(newest_items(self.con, 1)[0]["mtime"], 300.0)
+
+    def test_items_matching_stem(self) -> None:
+        hits = items_matching_stem(self.con, "fb9_gex2_2026", exclude_group_id="og:stem:fb9_gex2_2026-08-01_00003")
+        self.assertEqual([h["group_id"] for h in hits], ["og:stem:fb9_gex2_2026-08-01_00001"])
+        self.assertEqual(items_matching_stem(self.con, "short"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Tests for discovery_lineage_store (append-only lineage edges) and its readers."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+
+import support  # noqa: F401
+from discovery_lineage_store import (
+    all_edges,
+    default_lineage_store_path,
+    edges_for_child,
+    edges_for_parent,
+    export_json,
+    import_json,
+    insert_edges,
+    open_lineage_store,
+    store_version,
+)
+from shape_factory_heuristics import LineageGraph
+from shape_factory_ratings import load_lineage_parent_index
+
+SERVER_PATH = Path(__file__).resolve().parents[2] / "scripts" / "experiments_ui_server.py"
+
+
+def _edge(child: str, parent: str, via: str = "", evidence: str = "png_prompt_source_path") -> dict:
+    return {"child_group_id": child, "parent_group_id": parent, "via_source_raw": via, "evidence": evidence}
+
+
+class LineageStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.json_path = Path(self._td.name) / "_status" / "discovery_lineage_edges.json"
+        self.con = open_lineage_store(default_lineage_store_path(self.json_path))
+
+    def tearDown(self) -> None:
+        self.con.close()
+        self._td.cleanup()
+
+    def test_insert_is_unique_on_child_parent_via(self) -> None:
+        batch = [_edge("og:stem:b", "og:stem:a", "a.mp4"), _edge("og:stem:b", "og:stem:a", "a.mp4"), _edge("", "x")]
+        self.assertEqual(insert_edges(self.con, batch), 1)
+        self.assertEqual(insert_edges(self.con, [_edge("og:stem:b", "og:stem:a", "input/a.png")]), 1)
+        self.assertEqual(insert_edges(self.con, batch), 0)
+        self.assertEqual(store_version(self.con)[1], 2)
+        self.assertEqual(len(edges_for_child(self.con, "og:stem:b")), 2)
+        self.assertEqual(len(edges_for_parent(self.con, "og:stem:a")), 2)
+        self.assertEqual(edges_for_parent(self.con, "og:stem:b"), [])
+
+    def test_legacy_json_imported_once_and_export_round_trips(self) -> None:
+        self.json_path.write_text(
+            json.dumps({"version": 1, "edges": [_edge("c", "b"), _edge("b", "a"), "junk"]}), encoding="utf-8"
+        )
+        self.assertEqual(import_json(self.con, self.json_path), 2)
+        self.assertEqual(import_json(self.con, self.json_path), 0)  # unchanged file: skipped
+
+        insert_edges(self.con, [_edge("d", "c")])
+        self.assertEqual(export_json(self.con, self.json_path), 3)
+        self.assertEqual(import_json(self.con, self.json_path), 0)  # own export is not re-read
+        doc = json.loads(self.json_path.read_text(encoding="utf-8"))
+        self.assertEqual([e["child_group_id"] for e in doc["edges"]], ["c", "b", "d"])
+        self.assertEqual(all_edges(self.con), doc["edges"])
+
+    def test_readers_use_store_without_json(self) -> None:
+        insert_edges(
+            self.con,
+            [
+                _edge("og:stem:child", "og:stem:parent", "output/og/parent.mp4"),
+                _edge("og:stem:parent", "og:stem:root", "output/og/root.mp4", evidence="shape_factory_deposit"),
+            ],
+        )
+        self.assertFalse(self.json_path.exists())
+        graph = LineageGraph.load(self.json_path)
+        self.assertEqual(graph.ancestors("og:stem:child"), [("og:stem:parent", 1), ("og:stem:root", 2)])
+        index = load_lineage_parent_index(self.json_path)
+        self.assertEqual(index["child"][0]["parent_basename"], "parent.mp4")
+        self.assertEqual(index["parent"][0]["weight"], 1.0)
+
+
+class ServerLineagePersistTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        spec = importlib.util.spec_from_file_location("experiments_ui_server_lineage_store_test", SERVER_PATH)
+        assert spec and spec.loader
+        cls.m = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = cls.m
+        spec.loader.exec_module(cls.m)
+
+    def test_persist_appends_without_rewriting_json(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            status = Path(td) / "_status"
+            status.mkdir()
+            cfg = types.SimpleNamespace(discovery_index_path=status / "discovery_og_wip_index.json")
+            path = self.m._discovery_lineage_edges_path(cfg)
+            rows = [_edge("og:stem:b", "og:stem:a", "output/og/a.mp4"), _edge("og:stem:c", "og:stem:b", "output/og/b.mp4")]
+            self.assertEqual(self.m._discovery_persist_lineage_edge_rows(cfg, rows), 2)
+            self.assertEqual(self.m._discovery_persist_lineage_edge_rows(cfg, rows), 0)
+            self.assertFalse(path.exists())  # export is periodic; fresh store skips it
+
+            graph = self.m._discovery_load_lineage_graph(path)
+            self.assertEqual([e["child_group_id"] for e in graph["edges"]], ["og:stem:b", "og:stem:c"])
+            self.assertIs(self.m._discovery_load_lineage_graph(path), graph)  # cached until next insert
+            self.m._discovery_persist_lineage_edge_rows(cfg, [_edge("og:stem:d", "og:stem:c", "output/og/c.mp4")])
+            self.assertEqual(len(self.m._discovery_load_lineage_graph(path)["edges"]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
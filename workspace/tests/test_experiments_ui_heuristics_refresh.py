@@ -0,0 +1,73 @@
+"""Star / appetite clicks hand their heuristics delta to a background worker."""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import support  # noqa: F401
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SERVER_PATH = REPO_ROOT / "scripts" / "experiments_ui_server.py"
+
+
+def _load_server():
+    spec = importlib.util.spec_from_file_location("experiments_ui_server_heuristics_refresh_test", SERVER_PATH)
+    assert spec and spec.loader
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class HeuristicsRefreshTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.m = _load_server()
+
+    def test_click_returns_before_apply_and_repeats_coalesce(self) -> None:
+        import shape_factory_heuristics_incremental as hi
+
+        release = threading.Event()
+        calls: list = []
+
+        def slow_apply(**kwargs):
+            release.wait(10)
+            calls.append(kwargs["discovery_key"])
+            return {"ok": True, "touched_buckets": 1}
+
+        with tempfile.TemporaryDirectory() as td:
+            status = Path(td) / "_status"
+            status.mkdir()
+            (status / "heuristics_index.json").write_text("{}", encoding="utf-8")
+            cfg = SimpleNamespace(discovery_index_path=status / "discovery_og_wip_index.json")
+            with mock.patch.object(hi, "apply_output_event", side_effect=slow_apply):
+                t0 = time.perf_counter()
+                first = self.m._refresh_heuristics_for_output(cfg, {"discovery_key": "og/a.mp4"})
+                self.assertLess(time.perf_counter() - t0, 2.0)
+                self.assertEqual((first["ok"], first["queued"]), (True, True))
+                # While a.mp4 is being applied, two more clicks on b.mp4 collapse into one pass.
+                for _ in range(2):
+                    self.m._refresh_heuristics_for_output(cfg, {"discovery_key": "og/b.mp4"})
+                self.assertEqual(calls, [])
+                release.set()
+                self.m._HEURISTICS_REFRESH_QUEUE.join()
+            self.assertEqual(calls, ["og/a.mp4", "og/b.mp4"])
+            self.assertIsNone(self.m._refresh_heuristics_for_output(cfg, {}))
+
+    def test_no_index_is_not_queued(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            cfg = SimpleNamespace(discovery_index_path=Path(td) / "discovery_og_wip_index.json")
+            self.assertIsNone(self.m._refresh_heuristics_for_output(cfg, {"discovery_key": "og/a.mp4"}))
+            self.assertEqual(self.m._HEURISTICS_REFRESH_QUEUE.qsize(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""_stream_file: sendfile bodies, validators / 304, single and multi-range responses."""
+
+from __future__ import annotations
+
+import email.utils
+import http.client
+import importlib.util
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SERVER_PATH = REPO_ROOT / "scripts" / "experiments_ui_server.py"
+
+
+def _load_server():
+    spec = importlib.util.spec_from_file_location("experiments_ui_server_stream_file_test", SERVER_PATH)
+    assert spec and spec.loader
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class TestStreamFile(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.m = _load_server()
+        cls._td = tempfile.TemporaryDirectory()
+        cls.path = Path(cls._td.name) / "clip.mp4"
+        cls.data = bytes((i * 7 + i // 251) % 256 for i in range(3 * 1024 * 1024 + 17))
+        cls.path.write_bytes(cls.data)
+        m = cls.m
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *_args):
+                return None
+
+            def do_GET(self):  # noqa: N802
+                m._stream_file(self, cls.path, content_type="video/mp4", cache_control="public, max-age=60")
+
+            def do_HEAD(self):  # noqa: N802
+                self.do_GET()
+
+        cls.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=cls.httpd.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.httpd.shutdown()
+        cls.httpd.server_close()
+        cls._td.cleanup()
+
+    def _get(self, headers: Optional[Dict[str, str]] = None, method: str = "GET") -> Tuple[int, Dict[str, str], bytes]:
+        conn = http.client.HTTPConnection("127.0.0.1", self.httpd.server_address[1], timeout=10)
+        try:
+            conn.request(method, "/clip.mp4", headers=headers or {})
+            resp = conn.getresponse()
+            body = resp.read()
+            return resp.status, {k.lower(): v for k, v in resp.getheaders()}, body
+        finally:
+            conn.close()
+
+    def test_full_body_with_validators(self):
+        for sendfile in ("1", "0"):
+            with mock.patch.dict(os.environ, {"EXPERIMENTS_UI_SENDFILE": sendfile}):
+                status, headers, body = self._get()
+            self.assertEqual(status, 200)
+            self.assertEqual(body, self.data)
+            self.assertEqual(headers["content-length"], str(len(self.data)))
+            self.assertEqual(headers["accept-ranges"], "bytes")
+            st = self.path.stat()
+            self.assertEqual(headers["etag"], f'"{st.st_size:x}-{st.st_mtime_ns:x}"')
+            self.assertEqual(headers["last-modified"], email.utils.formatdate(st.st_mtime, usegmt=True))
+
+    def test_conditional_get(self):
+        _, headers, _ = self._get()
+        etag, last_modified = headers["etag"], headers["last-modified"]
+        status, h304, body = self._get({"If-None-Match": f'"nope", W/{etag}'})
+        self.assertEqual((status, body), (304, b""))
+        self.assertEqual(h304["etag"], etag)
+        self.assertEqual(self._get({"If-Modified-Since": last_modified})[0], 304)
+        # If-None-Match wins over a matching date.
+        self.assertEqual(self._get({"If-None-Match": '"stale"', "If-Modified-Since": last_modified})[0], 200)
+        self.assertEqual(self._get({"If-Modified-Since": "Thu, 01 Jan 1998 00:00:00 GMT"})[0], 200)
+
+    def test_single_and_suffix_ranges(self):
+        status, headers, body = self._get({"Range": "bytes=1048570-1048585"})
+        self.assertEqual(status, 206)
+        self.assertEqual(body, self.data[1048570:1048586])
+        self.assertEqual(headers["content-range"], f"bytes 1048570-1048585/{len(self.data)}")
+        status, _, body = self._get({"Range": "bytes=-100"})
+        self.assertEqual((status, body), (206, self.data[-100:]))
+        status, headers, body = self._get({"Range": f"bytes={len(self.data)}-"})
+        self.assertEqual(status, 416)
+        self.assertEqual(headers["content-range"], f"bytes */{len(self.data)}")
+        self.assertEqual(self._get({"Range": "bytes=9-3"})[0], 200)
+
+    def test_multi_range_multipart(self):
+        status, headers, body = self._get({"Range": "bytes=0-9, 2000000-2000009, -4, 5-12"})
+        self.assertEqual(status, 206)
+        ctype = headers["content-type"]
+        self.assertTrue(ctype.startswith("multipart/byteranges; boundary="))
+        self.assertEqual(int(headers["content-length"]), len(body))
+        boundary = ctype.split("boundary=", 1)[1].encode()
+        parts = body.split(b"--" + boundary)
+        self.assertEqual(parts[-1], b"--\r\n")
+        got = []
+        for part in parts[1:-1]:
+            head, _, payload = part.partition(b"\r\n\r\n")
+            rng = [ln for ln in head.split(b"\r\n") if ln.startswith(b"Content-Range:")][0]
+            start, end = (int(x) for x in rng.split(b" ")[-1].split(b"/")[0].split(b"-"))
+            self.assertIn(b"Content-Type: video/mp4", head)
+            got.append((start, end))
+            self.assertEqual(payload[:-2] if payload.endswith(b"\r\n") else payload, self.data[start : end + 1])
+        n = len(self.data)
+        self.assertEqual(got, [(0, 12), (2000000, 2000009), (n - 4, n - 1)])  # 0-9 and 5-12 coalesced
+
+    def test_if_range_and_head(self):
+        _, headers, _ = self._get()
+        status, _, body = self._get({"Range": "bytes=0-3", "If-Range": headers["etag"]})
+        self.assertEqual((status, body), (206, self.data[:4]))
+        status, _, body = self._get({"Range": "bytes=0-3", "If-Range": '"other-version"'})
+        self.assertEqual((status, len(body)), (200, len(self.data)))
+        status, headers, body = self._get({"Range": "bytes=0-3,10-20"}, method="HEAD")
+        self.assertEqual((status, body), (206, b""))
+        self.assertTrue(headers["content-type"].startswith("multipart/byteranges"))
+
+    def test_parse_range_set(self):
+        p = self.m._parse_range_set
+        self.assertIsNone(p(None, 10))
+        self.assertIsNone(p("items=0-1", 10))
+        self.assertEqual(p("bytes=0-0,1-1,3-", 10), [(0, 1), (3, 9)])
+        self.assertEqual(p("bytes=-20", 10), [(0, 9)])
+        self.assertEqual(p("bytes=10-", 10), [])
+        self.assertIsNone(p("bytes=" + ",".join(f"{i}-{i}" for i in range(0, 80, 2)), 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Tests for columnar hourly weighting and the batched replay sampler."""
+
+from __future__ import annotations
+
+import os
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import support  # noqa: F401
+from hourly_weight_engine import PrefixSampler, WeightColumns
+
+
+def _linear_choice(weights: list, rng: random.Random) -> int:
+    """The pre-engine ``_weighted_choice`` walk."""
+    total = sum(max(0.0, w) for w in weights)
+    if total <= 0:
+        return rng.randrange(len(weights))
+    pick = rng.random() * total
+    acc = 0.0
+    for i, w in enumerate(weights):
+        acc += max(0.0, w)
+        if acc >= pick:
+            return i
+    return len(weights) - 1
+
+
+class PrefixSamplerTests(unittest.TestCase):
+    def test_matches_linear_scan_for_same_rng(self) -> None:
+        gen = random.Random(7)
+        cases = [
+            [gen.random() * 5 for _ in range(50)],
+            [0.0, 0.0, 3.0, 0.0, 1e-9, 2.5],
+            [-1.0, 2.0, -0.5, 0.0, 4.0],
+            [0.0, 0.0, 0.0],
+            [-2.0, -1.0],
+            [1.0],
+        ]
+        for weights in cases:
+            sampler = PrefixSampler(weights)
+            for seed in range(300):
+                self.assertEqual(sampler.choose(random.Random(seed)), _linear_choice(weights, random.Random(seed)))
+            rngs = [random.Random(seed) for seed in range(300)]
+            self.assertEqual(
+                sampler.choose_many(rngs), [_linear_choice(weights, random.Random(seed)) for seed in range(300)]
+            )
+
+    def test_columns_fold_in_order(self) -> None:
+        cols = WeightColumns([1.0, 2.0, 0.0]).multiply("a", [0.35, 1.0, 4.0]).multiply("b", [3.0, 0.5, 1.0])
+        self.assertEqual(cols.fold(), [1.0 * 0.35 * 3.0, 2.0 * 1.0 * 0.5, 0.0])
+        self.assertEqual(cols.factor("b"), [3.0, 0.5, 1.0])
+        self.assertEqual(cols.factor("missing"), [1.0, 1.0, 1.0])
+        with self.assertRaises(ValueError):
+            cols.multiply("short", [1.0])
+
+
+class SimulateReplaySelectionTests(unittest.TestCase):
+    def test_batch_plans_equal_per_cursor_plans(self) -> None:
+        import shape_factory_hourly as hourly
+
+        with tempfile.TemporaryDirectory() as td:
+            data_root = Path(td).resolve() / "data"
+            og = data_root / "output" / "og" / "2024-01-01"
+            og.mkdir(parents=True)
+            recipes = []
+            for i in range(40):
+                out = og / f"R_{i:05d}.mp4"
+                out.write_bytes(b"mp4")
+                if i % 2:
+                    os.utime(out, (1_600_000_000, 1_600_000_000))  # old enough for archive-OG forcing
+                recipes.append(
+                    {
+                        "combo_key": f"c{i % 11}",
+                        "source": "og:archive" if i % 3 == 0 else f"FAM__j{i}",
+                        "output_path": str(out),
+                        "picks": {"source_video": f"/in/s{i % 5}.mp4"},
+                    }
+                )
+
+            def weight(recipe: dict, **_kw: object) -> tuple:
+                i = int(Path(recipe["output_path"]).stem.split("_")[1])
+                if i % 7 == 0:
+                    return 0.0, {"omit": True, "evidence": []}
+                return 0.2 + (i * 31 % 17) / 4.0, {"rating_effective": None, "evidence": []}
+
+            with mock.patch.object(hourly, "collect_replay_recipes", lambda *a, **k: [dict(r) for r in recipes]), \
+                mock.patch.object(hourly, "_recipe_selection_weight", weight), \
+                mock.patch.object(hourly, "_recipe_selection_weights", lambda rs, **k: [weight(r) for r in rs]), \
+                mock.patch.object(hourly, "_recent_combo_keys", lambda **k: {"c1", "c4"}):
+                one_by_one = [
+                    hourly.plan_hourly_replay(family="FAM", cursor=c, data_root=data_root) for c in range(120)
+                ]
+                sim = hourly.simulate_replay_selection(120, data_root=data_root, family="FAM", include_plans=True)
+
+        self.assertTrue(sim["ok"])
+        self.assertEqual(sim["plans"], one_by_one)
+        self.assertEqual(sum(row["picks"] for row in sim["top_combos"]), 120)
+        self.assertGreater(sim["archive_og_forced"], 0)
+        omitted = {f"R_{i:05d}.mp4" for i in range(0, 40, 7)}
+        self.assertFalse({Path(p["output_path"]).name for p in one_by_one} & omitted)
+
+
+if __name__ == "__main__":
+    unittest.main()
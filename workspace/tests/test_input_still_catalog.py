@@ -103,6 +103,8 @@ class InputStillCatalogTests(unittest.TestCase):
             now = time.time()
             os.utime(still, (now - 40 * 86400, now - 40 * 86400))
             cat = Path(td) / "cat.sqlite"
+            # Dir mtime as of the bootstrap scan; the utime to ``now`` below must read as a change.
+            os.utime(root, (now - 100, now - 100))
             # Pretend catalog already bootstrapped so first_seen=now despite old mtime.
             scan_input_stills(input_root=root, catalog_path=cat, now_ts=now - 100)
             # Force a second insert path: mark bootstrapped then add another file.
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Tests for lineage_csr (CSR lineage graph shared by heuristics / ratings / lineage API)."""
+
+from __future__ import annotations
+
+import random
+import unittest
+from collections import defaultdict
+
+import support  # noqa: F401
+from lineage_csr import DOWN, LineageCSR
+from shape_factory_heuristics import LineageGraph
+from shape_factory_ratings import AggBucket, apply_lineage_uplift
+
+
+def _reference_bfs(adj, gid, max_depth):
+    out, seen, frontier = [], {gid}, [(gid, 0)]
+    while frontier:
+        cur, depth = frontier.pop(0)
+        if depth >= max_depth:
+            continue
+        for nxt in adj.get(cur, []):
+            if nxt not in seen:
+                seen.add(nxt)
+                out.append((nxt, depth + 1))
+                frontier.append((nxt, depth + 1))
+    return out
+
+
+class LineageCSRTests(unittest.TestCase):
+    def test_closure_matches_dict_of_lists_bfs(self) -> None:
+        rng = random.Random(7)
+        pairs = [(f"n{c}", f"n{rng.randint(max(0, c - 6), c - 1)}") for c in range(1, 400) for _ in range(rng.randint(1, 3))]
+        parents, children = defaultdict(list), defaultdict(list)
+        for c, p in pairs:
+            parents[c].append(p)
+            children[p].append(c)
+        g = LineageCSR.from_pairs(pairs, closure_cache_size=8)
+        for name in ("n0", "n5", "n199", "n399", "missing"):
+            for depth in (1, 3, 50):
+                self.assertEqual(g.ancestors(name, max_depth=depth), _reference_bfs(parents, name, depth))
+                self.assertEqual(g.descendants(name, max_depth=depth), _reference_bfs(children, name, depth))
+        self.assertEqual(g.parents("n10"), parents["n10"])
+        self.assertEqual(g.children("n10"), children["n10"])
+        self.assertEqual(g.edge_count, len(pairs))
+
+        g.ancestors("n300", max_depth=4)
+        hits = g.closure_hits
+        g.ancestors("n300", max_depth=4)
+        self.assertEqual(g.closure_hits, hits + 1)
+        self.assertLessEqual(len(g._closure), 8)
+
+    def test_walk_reports_every_edge_and_first_visits(self) -> None:
+        edges = [
+            {"child_group_id": "b", "parent_group_id": "a", "via": 1},
+            {"child_group_id": "c", "parent_group_id": "a", "via": 2},
+            {"child_group_id": "c", "parent_group_id": "b", "via": 3},
+            {"child_group_id": "", "parent_group_id": "a"},
+        ]
+        g = LineageCSR.from_edges(edges)
+        self.assertEqual(len(g.edges), 3)
+        steps = [(g.names[s], g.edges[e]["via"], g.names[d], hop, new) for s, e, d, hop, new in g.walk(g.ids["a"], DOWN)]
+        self.assertEqual(steps, [("a", 1, "b", 0, True), ("a", 2, "c", 0, True), ("b", 3, "c", 1, False)])
+
+    def test_heuristics_graph_and_uplift_use_csr(self) -> None:
+        graph = LineageGraph.from_edges(
+            [
+                {"child_group_id": "og:stem:c", "parent_group_id": "og:stem:b", "evidence": "queue"},
+                {"child_group_id": "og:stem:b", "parent_group_id": "og:stem:a", "evidence": "basename_heuristic"},
+            ]
+        )
+        self.assertEqual(graph.ancestors("og:stem:c"), [("og:stem:b", 1), ("og:stem:a", 2)])
+        self.assertEqual(graph.edge_weight_by_pair[("og:stem:b", "og:stem:a")], 0.5)
+        self.assertEqual(graph.children("og:stem:b"), ["og:stem:c"])
+
+        parent_index = {
+            "c": [{"parent_stem": "b", "parent_basename": "b.mp4", "weight": 1.0, "evidence": "queue"}],
+            "b": [{"parent_stem": "a", "parent_basename": "a.mp4", "weight": 0.5, "evidence": "basename"}],
+        }
+        buckets = defaultdict(AggBucket)
+        stats = apply_lineage_uplift(
+            rated_outputs=[{"rating": 5, "output_short_key": "og/c.mp4", "source_basenames": []}],
+            parent_index=parent_index,
+            by_source_basename=buckets,
+            source_contributors=defaultdict(list),
+            max_hops=1,
+        )
+        self.assertEqual((stats["lineage_credits"], sorted(buckets)), (1, ["b.mp4"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Tests for media_probe (cached combined ffprobe)."""
+
+from __future__ import annotations
+
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import support  # noqa: F401
+import media_probe as mp
+
+_FAKE = """#!{python}
+import json, os, sys
+with open({counter!r}, "a") as fh:
+    fh.write(sys.argv[-1] + "\\n")
+if sys.argv[-1].endswith("bad.mp4"):
+    sys.stderr.write("Invalid data found when processing input")
+    sys.exit(1)
+print(json.dumps({{"streams": [{{"codec_type": "video", "nb_frames": "12"}}], "format": {{"duration": "0.5"}}}}))
+"""
+
+
+class MediaProbeCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        root = Path(self._td.name)
+        self.counter = root / "calls.txt"
+        self.counter.write_text("", encoding="utf-8")
+        self.ffprobe = root / "ffprobe"
+        self.ffprobe.write_text(_FAKE.format(python=sys.executable, counter=str(self.counter)), encoding="utf-8")
+        self.ffprobe.chmod(self.ffprobe.stat().st_mode | stat.S_IEXEC)
+        self.clip = root / "clip.mp4"
+        self.clip.write_bytes(b"x" * 10)
+        self._env = mock.patch.dict(os.environ, {mp.MEDIA_PROBE_CACHE_ENV: str(root / "probe.sqlite")})
+        self._env.start()
+        mp.reset_probe_memo()
+
+    def tearDown(self) -> None:
+        self._env.stop()
+        mp.reset_probe_memo()
+        self._td.cleanup()
+
+    def _calls(self) -> int:
+        return len(self.counter.read_text(encoding="utf-8").splitlines())
+
+    def test_memo_then_sqlite_then_invalidate_on_change(self) -> None:
+        first = mp.probe_media(self.clip, ffprobe=str(self.ffprobe))
+        self.assertEqual(mp.video_stream(first)["nb_frames"], "12")
+        self.assertEqual(mp.format_duration_sec(first), 0.5)
+        mp.probe_media(self.clip, ffprobe=str(self.ffprobe))
+        mp.reset_probe_memo(stats=False)  # new process: only the SQLite tier survives
+        mp.probe_media(self.clip, ffprobe=str(self.ffprobe))
+        self.assertEqual(self._calls(), 1)
+        self.assertEqual(mp.probe_stats(), {"spawned": 1, "memory_hits": 1, "cache_hits": 1})
+
+        st = self.clip.stat()
+        os.utime(self.clip, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        mp.probe_media(self.clip, ffprobe=str(self.ffprobe))
+        self.assertEqual(self._calls(), 2)
+
+    def test_failures_are_cached_per_file_version(self) -> None:
+        bad = self.clip.with_name("bad.mp4")
+        bad.write_bytes(b"junk")
+        for _ in range(2):
+            with self.assertRaises(mp.ProbeError):
+                mp.probe_media(bad, ffprobe=str(self.ffprobe))
+        self.assertEqual(self._calls(), 1)
+        with self.assertRaises(mp.ProbeError):
+            mp.probe_media(self.clip.with_name("missing.mp4"), ffprobe=str(self.ffprobe))
+        with self.assertRaisesRegex(mp.ProbeError, "not found"):
+            mp.probe_media(self.clip, ffprobe=str(self.clip.with_name("no-ffprobe")))
+
+    def test_probe_many_returns_per_path_results(self) -> None:
+        clips = [self.clip.with_name(f"c{i}.mp4") for i in range(6)]
+        for c in clips:
+            c.write_bytes(b"y")
+        bad = self.clip.with_name("bad.mp4")
+        bad.write_bytes(b"junk")
+        out = mp.probe_many([*clips, bad, clips[0]], workers=3, ffprobe=str(self.ffprobe))
+        self.assertEqual(list(out), [str(c) for c in clips] + [str(bad)])
+        self.assertIsInstance(out[str(bad)], mp.ProbeError)
+        self.assertEqual(self._calls(), 7)
+        mp.probe_many(clips, workers=3, ffprobe=str(self.ffprobe))
+        self.assertEqual(self._calls(), 7)
+
+    def test_default_cache_sits_in_the_output_status_dir(self) -> None:
+        out = Path(self._td.name) / "output"
+        with mock.patch.dict(os.environ, {mp.MEDIA_PROBE_CACHE_ENV: "", "COMFYUI_BIND_OUTPUT_DIR": str(out)}):
+            self.assertEqual(mp.default_probe_cache_path(), out.resolve() / "_status" / mp.MEDIA_PROBE_CACHE_BASENAME)
+        with mock.patch.dict(os.environ, {mp.MEDIA_PROBE_CACHE_ENV: "off"}):
+            self.assertIsNone(mp.default_probe_cache_path())
+
+
+if __name__ == "__main__":
+    unittest.main()
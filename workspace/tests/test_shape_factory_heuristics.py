@@ -142,6 +142,45 @@ class ShapeFactoryHeuristicsTests(unittest.TestCase):
         self.assertEqual(int(pattern["n"]), 1)
         self.assertEqual(float(pattern["inferred"]), 5.0)
 
+    def test_recipe_scorer_batch_matches_score_recipe(self) -> None:
+        from shape_factory_heuristics import recipe_scorer, score_recipe
+
+        shape = {"graph_hash": "abc" * 16, "family": "FB9_GEX2"}
+        heuristics_doc = {
+            "updated_at": "2026-04-01T00:00:00Z",
+            "by_pattern": {"FB9_GEX2+catalog-default": {"inferred": 3.2, "n": 4}},
+            "by_group_lineage": {
+                "input:src_1.mp4": {"inferred": 4.0, "n": 2},
+                "og:stem:fb9_00003": {"inferred": 4.5, "n": 1},
+            },
+            "by_group_lineage_appetite": {"input:src_2.mp4": {"inferred": 4.0}},
+        }
+        ratings_doc = {
+            "by_output_relpath": {"og/2026-04-01/FB9_00002": {"explicit": 0}},
+            "by_source_basename": {"src_0.mp4": {"inferred": 2.0, "n": 7}},
+        }
+        appetite_doc = {"by_output_relpath": {"og/2026-04-01/FB9_00004": {"appetite": "fast_track", "facet": "source"}}}
+        recipes = [
+            {
+                "output_path": f"/data/output/og/2026-04-01/FB9_{i:05d}.mp4",
+                "picks": {"prompt_profile": "/tmp/catalog-default.json", "source_video": f"/in/src_{i % 3}.mp4"},
+            }
+            for i in range(12)
+        ]
+        docs = dict(ratings_doc=ratings_doc, heuristics_doc=heuristics_doc, appetite_doc=appetite_doc)
+        scorer = recipe_scorer(**docs)
+        self.assertIs(recipe_scorer(**docs), scorer)
+        batch = scorer.score_many(recipes, shape=shape)
+        self.assertEqual(batch, [score_recipe(r, shape=shape, **docs) for r in recipes])
+        self.assertEqual((scorer.partial_misses, scorer.partial_hits), (3, 8))  # omit returns early
+        self.assertTrue(batch[2][1]["omit"])
+        self.assertEqual(batch[3][1]["lineage_group_id"], "og:stem:fb9_00003")
+        self.assertTrue(batch[4][1]["fast_track"])
+        self.assertEqual(batch[5][1]["appetite_evidence"], "lineage_appetite")
+
+        bumped = dict(heuristics_doc, updated_at="2026-04-02T00:00:00Z")
+        self.assertIsNot(recipe_scorer(**dict(docs, heuristics_doc=bumped)), scorer)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Tests for delta heuristics updates on rating / appetite events."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import support  # noqa: F401
+
+
+def _edges() -> list:
+    return [
+        {"child_group_id": "og:stem:fam_00001", "parent_group_id": "og:stem:src_a", "evidence": "png_prompt_source_path"},
+        {"child_group_id": "og:stem:fam_00002", "parent_group_id": "og:stem:src_a", "evidence": "png_prompt_source_path"},
+        {"child_group_id": "og:stem:src_a", "parent_group_id": "input:root.mp4", "evidence": "workspace_input"},
+        {"child_group_id": "og:stem:fam_00003", "parent_group_id": "og:stem:src_b", "evidence": "png_prompt_source_path"},
+    ]
+
+
+class HeuristicsIncrementalTests(unittest.TestCase):
+    def _fixture(self, td: str) -> dict:
+        from shape_factory_ratings import open_ratings_db, ratings_db_path_for_index, upsert_rating_row
+
+        status = Path(td).resolve() / "output" / "_status"
+        status.mkdir(parents=True)
+        ratings_index = status / "ratings_index.json"
+        lineage = status / "discovery_lineage_edges.json"
+        lineage.write_text(json.dumps({"edges": _edges()}), encoding="utf-8")
+        con = open_ratings_db(ratings_db_path_for_index(ratings_index), ratings_json=ratings_index)
+        try:
+            for i, (stars, recipe) in enumerate(((5, "FAM+alpha"), (3, "FAM+alpha"), (4, "FAM+beta")), start=1):
+                upsert_rating_row(
+                    con,
+                    asset_key=f"output/og/2026-04-01/FAM_{i:05d}.mp4",
+                    row={
+                        "short_key": f"og/2026-04-01/FAM_{i:05d}",
+                        "explicit": stars,
+                        "shape_recipe": recipe,
+                        "graph_hash": f"gh{i % 2}",
+                    },
+                )
+        finally:
+            con.close()
+        return {
+            "ratings": ratings_index,
+            "lineage": lineage,
+            "index": status / "heuristics_index.json",
+            "tags": status / "asset_tags.json",
+        }
+
+    def _full_build(self, paths: dict, *, out: bool) -> dict:
+        from shape_factory_heuristics import LineageGraph, build_heuristics_index
+        from shape_factory_heuristics_incremental import default_heuristics_state_path
+        from shape_factory_ratings import load_appetite_doc, load_ratings_doc
+
+        kwargs = {}
+        if out:
+            kwargs = {"out_path": paths["index"], "state_path": default_heuristics_state_path(paths["index"])}
+        return build_heuristics_index(
+            ratings_doc=load_ratings_doc(paths["ratings"]),
+            lineage_graph=LineageGraph.load(paths["lineage"]),
+            appetite_doc=load_appetite_doc(paths["ratings"].with_name("appetite_index.json")),
+            **kwargs,
+        )
+
+    def _apply(self, paths: dict, key: str) -> dict:
+        from shape_factory_heuristics_incremental import apply_output_event
+
+        return apply_output_event(
+            heuristics_index_path=paths["index"],
+            ratings_index_path=paths["ratings"],
+            lineage_edges_path=paths["lineage"],
+            asset_tags_path=paths["tags"],
+            discovery_key=key,
+        )
+
+    def test_rating_and_appetite_events_match_full_rebuild(self) -> None:
+        from shape_factory_heuristics_incremental import diff_heuristics_docs
+        from shape_factory_ratings import (
+            delete_rating_row,
+            open_ratings_db,
+            ratings_db_path_for_index,
+            upsert_appetite_row,
+            upsert_rating_row,
+        )
+
+        with tempfile.TemporaryDirectory() as td:
+            paths = self._fixture(td)
+            self._full_build(paths, out=True)
+            db = ratings_db_path_for_index(paths["ratings"])
+
+            def check(key: str) -> dict:
+                out = self._apply(paths, key)
+                self.assertTrue(out["ok"], out)
+                current = json.loads(paths["index"].read_text(encoding="utf-8"))
+                self.assertEqual(diff_heuristics_docs(current, self._full_build(paths, out=False)), [])
+                return current
+
+            con = open_ratings_db(db)
+            upsert_rating_row(
+                con,
+                asset_key="output/og/2026-04-01/FAM_00002.mp4",
+                row={"short_key": "og/2026-04-01/FAM_00002", "explicit": 1, "shape_recipe": "FAM+beta", "graph_hash": "gh0"},
+            )
+            con.close()
+            doc = check("output/og/2026-04-01/FAM_00002.mp4")
+            self.assertNotIn("og:stem:fam_00002", doc["by_group_lineage"])
+            self.assertEqual(int(doc["by_pattern"]["FAM+alpha"]["n"]), 1)
+
+            con = open_ratings_db(db)
+            upsert_appetite_row(
+                con,
+                asset_key="output/og/2026-04-01/FAM_00001.mp4",
+                short_key="og/2026-04-01/FAM_00001",
+                appetite="more",
+                facet="both",
+            )
+            con.close()
+            doc = check("output/og/2026-04-01/FAM_00001.mp4")
+            self.assertIn("FAM+alpha", doc["by_pattern_appetite"])
+
+            con = open_ratings_db(db)
+            delete_rating_row(con, asset_key="output/og/2026-04-01/FAM_00003.mp4")
+            con.close()
+            doc = check("output/og/2026-04-01/FAM_00003.mp4")
+            self.assertNotIn("og:stem:src_b", doc["by_group_lineage"])
+            self.assertEqual(doc["stats"]["rated_outputs_used"], 2)
+
+    def test_apply_without_state_is_noop(self) -> None:
+        from shape_factory_heuristics import LineageGraph, build_heuristics_index
+        from shape_factory_ratings import load_ratings_doc
+
+        with tempfile.TemporaryDirectory() as td:
+            paths = self._fixture(td)
+            build_heuristics_index(
+                ratings_doc=load_ratings_doc(paths["ratings"]),
+                lineage_graph=LineageGraph.load(paths["lineage"]),
+                out_path=paths["index"],
+            )
+            before = paths["index"].read_text(encoding="utf-8")
+            out = self._apply(paths, "output/og/2026-04-01/FAM_00001.mp4")
+            self.assertFalse(out["ok"])
+            self.assertEqual(out["error"], "no_heuristics_state")
+            self.assertEqual(paths["index"].read_text(encoding="utf-8"), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
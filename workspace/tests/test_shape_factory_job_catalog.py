@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Tests for shape_factory_job_catalog and the catalog-backed job lookups."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+import support  # noqa: F401
+import shape_factory as sf
+from shape_factory_job_catalog import (
+    default_job_catalog_path,
+    lookup_by_job_key,
+    lookup_by_prompt_id,
+    open_job_catalog,
+    open_synced_job_catalog,
+    rebuild_job_catalog,
+    recent_jobs,
+    sync_job_catalog,
+    verify_job_catalog,
+)
+
+
+def _write(path: Path, job: dict) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(job), encoding="utf-8")
+    return path
+
+
+class JobCatalogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.data_root = Path(self._td.name)
+        self.jobs = self.data_root / "shape_factory" / "jobs"
+        _write(self.jobs / "Fam" / "job_a.job.json", {"job_key": "job_a", "submit": {"status": "queued", "prompt_id": "pid-a"}})
+        _write(self.jobs / "Fam" / "job_b.job.json", {"job_key": "job_b", "submit": {"status": "pending"}})
+        _write(self.jobs / "Other" / "job_c.job.json", {"job_key": "job_c", "submit": {"status": "editing"}})
+
+    def tearDown(self) -> None:
+        self._td.cleanup()
+
+    def test_sync_only_rescans_changed_dirs(self) -> None:
+        con = open_job_catalog(default_job_catalog_path(self.jobs))
+        try:
+            first = sync_job_catalog(con, self.jobs)
+            self.assertEqual(first["parsed"], 3)
+            again = sync_job_catalog(con, self.jobs)
+            self.assertEqual((again["dirs_rescanned"], again["parsed"]), (0, 0))
+
+            _write(self.jobs / "Fam" / "job_d.job.json", {"job_key": "job_d", "submit": {"prompt_id": "pid-d"}})
+            (self.jobs / "Other" / "job_c.job.json").unlink()
+            st = (self.jobs / "Other").stat()
+            os.utime(self.jobs / "Other", (st.st_atime, st.st_mtime + 5))
+            delta = sync_job_catalog(con, self.jobs)
+            self.assertEqual(delta["parsed"], 1)
+            self.assertEqual(delta["removed"], 1)
+            self.assertEqual(lookup_by_prompt_id(con, "pid-d")["file_key"], "job_d")
+            self.assertIsNone(lookup_by_job_key(con, "job_c"))
+        finally:
+            con.close()
+
+    def test_lookups_use_catalog_and_write_hook(self) -> None:
+        path, job = sf.find_job_by_prompt_id(self.jobs, "pid-a")
+        self.assertEqual(path.name, "job_a.job.json")
+        self.assertTrue(default_job_catalog_path(self.jobs).is_file())
+        self.assertEqual(sf.find_job_by_prompt_id(self.jobs, "pid-missing"), (None, None))
+
+        # In-place rewrite through atomic_write_json keeps the catalog current.
+        job["submit"] = {"status": "queued", "prompt_id": "pid-a2"}
+        sf.atomic_write_json(path, job)
+        self.assertEqual(sf.find_job_by_prompt_id(self.jobs, "pid-a2")[0], path)
+        self.assertEqual(sf.find_job_by_prompt_id(self.jobs, "pid-a"), (None, None))
+        self.assertEqual(sf.find_job_by_key(self.data_root, "job_b")[1]["job_key"], "job_b")
+        self.assertEqual(sf.find_job_by_key(self.data_root, "nope"), (None, None))
+        self.assertTrue(verify_job_catalog(jobs_root=self.jobs)["ok"])
+
+    def test_reader_open_does_not_write_and_miss_sees_in_place_edits(self) -> None:
+        con = open_synced_job_catalog(self.jobs)
+        try:
+            before = con.execute("PRAGMA data_version").fetchone()[0]
+            open_synced_job_catalog(self.jobs).close()
+            self.assertEqual(con.execute("PRAGMA data_version").fetchone()[0], before)  # no commit from a reader
+        finally:
+            con.close()
+
+        # Rewritten in place: the file moves, its directory mtime does not.
+        target = self.jobs / "Fam" / "job_b.job.json"
+        dir_st = target.parent.stat()
+        target.write_text(json.dumps({"job_key": "job_b", "submit": {"status": "queued", "prompt_id": "pid-b"}}), encoding="utf-8")
+        os.utime(target.parent, (dir_st.st_atime, dir_st.st_mtime))
+        path, job = sf.find_job_by_prompt_id(self.jobs, "pid-b")
+        self.assertEqual((path, job["submit"]["status"]), (target, "queued"))
+
+    def test_pending_only_matches_tree_walk(self) -> None:
+        _write(
+            self.jobs / "Fam" / "job_e.job.json",
+            {"job_key": "job_e", "created_at": "2099-01-01T00:00:00Z", "submit": {"status": "pending"}},
+        )
+        args = argparse.Namespace(job=None, jobs_dir=str(self.jobs), family=None, job_dir=None, limit=None)
+        walked = sf._pending_submit_paths_scan(args)
+        self.assertEqual([p.name for p in sf.iter_pending_submit_job_paths(args)], [p.name for p in walked])
+        self.assertEqual([p.name for p in walked], ["job_e.job.json", "job_b.job.json"])
+
+        fam = argparse.Namespace(job=None, jobs_dir=None, family="Other", job_dir=str(self.jobs), limit=5)
+        self.assertEqual(sf.iter_pending_submit_job_paths(fam), [])
+
+    def test_verify_flags_drift_and_rebuild_fixes_it(self) -> None:
+        rebuild_job_catalog(jobs_root=self.jobs)
+        target = self.jobs / "Fam" / "job_b.job.json"
+        st = target.stat()
+        target.write_text(json.dumps({"job_key": "job_b", "submit": {"prompt_id": "pid-b"}}), encoding="utf-8")
+        os.utime(target, (st.st_atime, st.st_mtime + 5))
+        report = verify_job_catalog(jobs_root=self.jobs)
+        self.assertFalse(report["ok"])
+        self.assertEqual(report["counts"]["stale"], 1)
+        self.assertEqual(rebuild_job_catalog(jobs_root=self.jobs)["jobs"], 3)
+        self.assertTrue(verify_job_catalog(jobs_root=self.jobs)["ok"])
+
+
+    def test_recent_jobs_keyset_pages_and_old_schema_is_rebuilt(self) -> None:
+        path = default_job_catalog_path(self.jobs)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        old = sqlite3.connect(str(path))
+        old.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        old.execute("INSERT INTO meta VALUES('schema_version', '1')")
+        old.execute("CREATE TABLE jobs (job_path TEXT PRIMARY KEY, file_key TEXT NOT NULL)")
+        old.execute("CREATE TABLE dirs (dir_path TEXT PRIMARY KEY, mtime REAL NOT NULL)")
+        old.execute("INSERT INTO dirs VALUES(?, 9e18)", (str(self.jobs / "Fam"),))
+        old.commit()
+        old.close()
+
+        for i in range(3):
+            _write(
+                self.jobs / "Fam" / f"hourly__{i}.job.json",
+                {"job_key": f"hourly__{i}", "family_slug": "Fam", "created_at": f"2026-10-0{i + 1}T00:00:00Z"},
+            )
+        con = open_job_catalog(path)
+        try:
+            sync_job_catalog(con, self.jobs)
+            page = recent_jobs(con, limit=2)
+            self.assertEqual([r["job_key"] for r in page], ["hourly__2", "hourly__1"])
+            after = (page[-1]["recency_ts"], page[-1]["job_path"])
+            self.assertEqual([r["job_key"] for r in recent_jobs(con, limit=2, after=after)], ["hourly__0"])
+            self.assertEqual(len(recent_jobs(con, limit=10, hourly_only=False)), 6)
+            self.assertEqual(recent_jobs(con, limit=10, family="Other"), [])
+        finally:
+            con.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
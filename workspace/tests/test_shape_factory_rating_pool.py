@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Tests for the persisted rating-sampler candidate pool."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import support  # noqa: F401
+
+_N = 40
+_WORKFLOWS = ("a1b2c3d4e5f60718aaaa", "ffee00112233445566bb", "")
+
+
+def _item(i: int) -> dict:
+    return {
+        "library": "og",
+        "relpath": f"output/og/2026-04-01/FAM_{i:05d}.mp4",
+        "group_id": f"og:stem:fam_{i:05d}",
+        "mtime": 1_700_000_000 + i,
+        "workflow_fingerprint": _WORKFLOWS[i % 3],
+        "has_embedded_prompt": i % 2 == 0,
+        "tags": ["kneel"] if i % 4 == 0 else [],
+    }
+
+
+def _write_json(path: Path, doc: dict) -> None:
+    path.write_text(json.dumps(doc), encoding="utf-8")
+
+
+class RatingPoolTests(unittest.TestCase):
+    def _fixture(self, td: str) -> Path:
+        og = Path(td).resolve() / "output" / "og"
+        status = og.parent / "_status"
+        status.mkdir(parents=True)
+        items = [_item(i) for i in range(_N)]
+        items.append({"library": "wip", "relpath": "output/wip/skip.mp4"})
+        _write_json(status / "discovery_og_wip_index.json", {"items": items})
+        edges = [
+            {"child_group_id": f"og:stem:fam_{i:05d}", "parent_group_id": f"og:stem:src_{i % 5}"} for i in range(_N)
+        ] + [{"child_group_id": f"og:stem:src_{j}", "parent_group_id": f"input:root_{j % 2}.mp4"} for j in range(5)]
+        _write_json(status / "discovery_lineage_edges.json", {"edges": edges})
+        _write_json(
+            status / "heuristics_index.json",
+            {
+                "by_group_lineage": {"og:stem:src_1": {"inferred": 4.2}, "og:stem:fam_00007": {"inferred": 1.5}},
+                "by_pattern": {
+                    "FAM+alpha": {"graph_hash": _WORKFLOWS[0] + "9999", "inferred": 3.4, "n": 2},
+                    "FAM+beta": {"graph_hash": _WORKFLOWS[1], "inferred": 1.2, "n": 6},
+                },
+                "by_tag_appetite": {"kneel": {"inferred": 4.0}},
+            },
+        )
+        _write_json(
+            status / "asset_tags.json", {"by_group_id": {f"og:stem:fam_{i:05d}": {"tags": ["kneel"]} for i in range(0, _N, 4)}}
+        )
+        self._rate(og, 2, stars=5, complete=False)
+        return og
+
+    def _rate(self, og: Path, i: int, *, stars: int, complete: bool) -> None:
+        from shape_factory_ratings import open_ratings_db, upsert_appetite_row, upsert_rating_row
+
+        status = og.parent / "_status"
+        asset_key = f"output/og/2026-04-01/FAM_{i:05d}.mp4"
+        short_key = f"og/2026-04-01/FAM_{i:05d}"
+        axes = {"subject_beauty": stars, "render_quality": stars, "action_quality": stars} if complete else {}
+        con = open_ratings_db(status / "ratings.sqlite", ratings_json=status / "ratings_index.json")
+        try:
+            upsert_rating_row(con, asset_key=asset_key, row={"short_key": short_key, "explicit": stars, "axes": axes})
+            if complete:
+                upsert_appetite_row(con, asset_key=asset_key, short_key=short_key, appetite="more", facet="both")
+        finally:
+            con.close()
+
+    def _draws_match(self, og: Path) -> dict:
+        from shape_factory_rating_sampler import sample_rating_queue
+
+        stats: dict = {}
+        for kwargs in (
+            {"mode": "mixed", "limit": 12, "seed": 4},
+            {"mode": "mixed", "limit": 8, "min_predicted": 2.0},
+            {"mode": "random", "limit": 10, "seed": 3},
+            {"mode": "latest", "limit": 5, "include_done": True},
+            {"mode": "search", "limit": 5, "query": "fam_0001"},
+        ):
+            pooled = sample_rating_queue(og_root=og, use_pool=True, **kwargs)
+            fresh = sample_rating_queue(og_root=og, use_pool=False, **kwargs)
+            for key in ("candidates", "vision_priority", "stats"):
+                self.assertEqual(pooled[key], fresh[key], (key, kwargs))
+            stats = stats or pooled["candidate_pool"]
+        return stats
+
+    def test_pool_draws_match_uncached_through_events(self) -> None:
+        from shape_factory_rating_pool import default_rating_pool_path, open_rating_pool, verify_rating_pool
+        from shape_factory_rating_sampler import sampler_inputs
+
+        with tempfile.TemporaryDirectory() as td:
+            og = self._fixture(td)
+            first = self._draws_match(og)
+            self.assertTrue(first["rebuilt"])
+            self.assertEqual(first["scored"], _N)
+            self.assertEqual(self._draws_match(og)["scored"], 0)
+
+            # Completing fam_00006 drops it; its src_1 siblings lose / gain the keeper boost.
+            self._rate(og, 6, stars=5, complete=True)
+            stats = self._draws_match(og)
+            self.assertFalse(stats["rebuilt"])
+            self.assertEqual(stats["moved"], ["ratings"])
+            self.assertEqual(stats["scored"], _N // 5)
+
+            heuristics = og.parent / "_status" / "heuristics_index.json"
+            doc = json.loads(heuristics.read_text(encoding="utf-8"))
+            doc["by_group_lineage"]["og:stem:src_3"] = {"inferred": 4.9}
+            doc["by_pattern"]["FAM+beta"]["inferred"] = 4.4
+            _write_json(heuristics, doc)
+            stats = self._draws_match(og)
+            self.assertEqual(stats["moved"], ["heuristics"])
+            self.assertLess(stats["scored"], _N)
+
+            discovery = og.parent / "_status" / "discovery_og_wip_index.json"
+            doc = json.loads(discovery.read_text(encoding="utf-8"))
+            doc["items"] = [_item(_N)] + [it for it in doc["items"] if not it["relpath"].endswith("_00011.mp4")]
+            _write_json(discovery, doc)
+            stats = self._draws_match(og)
+            self.assertEqual((stats["scored"], stats["removed"]), (1, 1))
+
+            con = open_rating_pool(default_rating_pool_path(og))
+            try:
+                self.assertEqual(verify_rating_pool(con, sampler_inputs(og)), [])
+            finally:
+                con.close()
+
+    def test_rating_events_follow_the_change_log(self) -> None:
+        from shape_factory_rating_pool import pool_sampler_docs, input_versions, reset_pool_docs_cache
+        from shape_factory_rating_sampler import load_sampler_docs, sampler_inputs
+        from shape_factory_ratings import delete_rating_row, open_ratings_db
+
+        with tempfile.TemporaryDirectory() as td:
+            og = self._fixture(td)
+            inputs = sampler_inputs(og)
+            reset_pool_docs_cache()
+            self._draws_match(og)
+
+            self._rate(og, 9, stars=1, complete=True)  # new rows
+            self._rate(og, 2, stars=4, complete=False)  # update in place
+            stats = self._draws_match(og)
+            self.assertTrue(stats["ratings_log"])
+            self.assertEqual(stats["moved"], ["ratings"])
+
+            # A deleted row cannot be patched into the cached docs; both still match a full load.
+            status = og.parent / "_status"
+            con = open_ratings_db(status / "ratings.sqlite", ratings_json=status / "ratings_index.json")
+            try:
+                delete_rating_row(con, asset_key="output/og/2026-04-01/FAM_00009.mp4")
+            finally:
+                con.close()
+            stats = self._draws_match(og)
+            self.assertTrue(stats["ratings_log"])
+            docs, _seq = pool_sampler_docs(inputs, input_versions(inputs))
+            fresh = load_sampler_docs(inputs)
+            for field in ("rated_keys", "rated_by_gid"):
+                self.assertEqual(getattr(docs, field), getattr(fresh, field))
+            self.assertEqual(
+                docs.ratings_doc["by_output_relpath"], fresh.ratings_doc["by_output_relpath"]
+            )
+            self.assertEqual(
+                list(docs.appetite_doc["by_output_relpath"]), list(fresh.appetite_doc["by_output_relpath"])
+            )
+
+    def test_pool_disabled_by_env(self) -> None:
+        from shape_factory_rating_sampler import sample_rating_queue
+
+        with tempfile.TemporaryDirectory() as td:
+            og = self._fixture(td)
+            with mock.patch.dict(os.environ, {"RATING_SAMPLER_POOL": "off"}):
+                session = sample_rating_queue(og_root=og, limit=5)
+            self.assertTrue(session["ok"])
+            self.assertIsNone(session["candidate_pool"])
+            self.assertFalse((og.parent / "_status" / "rating_sampler_pool.sqlite").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
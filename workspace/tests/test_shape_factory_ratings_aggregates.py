@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Tests for the materialized rating aggregates in ratings.sqlite and the SQL-backed explorer."""
+
+from __future__ import annotations
+
+import json
+import struct
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+
+import support  # noqa: F401
+import comfy_meta_lib as cml
+from shape_factory_ratings import (
+    AGG_GRAPH_HASH,
+    AGG_SHAPE_RECIPE,
+    AGG_SOURCE_BASENAME,
+    build_asset_ratings_explorer,
+    build_asset_ratings_explorer_from_db,
+    build_ratings_index,
+    delete_rating_row,
+    fetch_rating_aggregate,
+    open_ratings_db,
+    ratings_db_path_for_index,
+    rebuild_rating_aggregates,
+    upsert_rating_row,
+)
+
+
+def _png_with_prompt(prompt: dict) -> bytes:
+    def chunk(ctype: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + ctype + data + struct.pack(">I", zlib.crc32(ctype + data) & 0xFFFFFFFF)
+
+    ihdr = chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0))
+    text = chunk(b"tEXt", b"prompt\x00" + json.dumps(prompt).encode("utf-8"))
+    return cml.PNG_MAGIC + ihdr + text + chunk(b"IEND", b"")
+
+
+def _row(stars: int, sources: list, *, gh: str = "", recipe: str = "") -> dict:
+    row = {"explicit": stars, "short_key": "", "sources": sources, "source_paths": [f"input/{s}" for s in sources]}
+    if gh:
+        row["graph_hash"] = gh
+    if recipe:
+        row["shape_recipe"] = recipe
+    return row
+
+
+class MaterializedAggregateTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.index_path = Path(self._td.name) / "_status" / "ratings_index.json"
+        self.con = open_ratings_db(ratings_db_path_for_index(self.index_path), ratings_json=self.index_path)
+
+    def tearDown(self) -> None:
+        self.con.close()
+        self._td.cleanup()
+
+    def test_upsert_and_delete_move_bucket_sums(self) -> None:
+        upsert_rating_row(self.con, asset_key="output/og/d/a", row=_row(5, ["src.png"], gh="g1", recipe="F+p"))
+        upsert_rating_row(self.con, asset_key="output/og/d/b", row=_row(3, ["src.png", "clip.mp4"], gh="g1"))
+        src = fetch_rating_aggregate(self.con, AGG_SOURCE_BASENAME, "src.png")
+        assert src is not None
+        self.assertEqual((src["n"], src["inferred"], src["keepers_4plus"]), (2, 4.0, 1))
+        self.assertEqual([c["output_discovery_key"] for c in src["contributors"]], ["output/og/d/a", "output/og/d/b"])
+        self.assertEqual(fetch_rating_aggregate(self.con, AGG_SHAPE_RECIPE, "F+p")["n"], 1)
+
+        # Re-star: old contribution removed, new one added (no double count).
+        upsert_rating_row(self.con, asset_key="output/og/d/b", row=_row(1, ["src.png"], gh="g1"))
+        self.assertEqual(fetch_rating_aggregate(self.con, AGG_SOURCE_BASENAME, "src.png")["inferred"], 3.0)
+        self.assertIsNone(fetch_rating_aggregate(self.con, AGG_SOURCE_BASENAME, "clip.mp4"))
+        self.assertEqual(fetch_rating_aggregate(self.con, AGG_GRAPH_HASH, "g1")["n"], 2)
+
+        # Omit star (0) and delete both drop contributions.
+        upsert_rating_row(self.con, asset_key="output/og/d/a", row=_row(0, ["src.png"], gh="g1", recipe="F+p"))
+        self.assertIsNone(fetch_rating_aggregate(self.con, AGG_SHAPE_RECIPE, "F+p"))
+        delete_rating_row(self.con, asset_key="output/og/d/b")
+        self.assertIsNone(fetch_rating_aggregate(self.con, AGG_GRAPH_HASH, "g1"))
+
+    def test_contributors_page(self) -> None:
+        for i in range(5):
+            upsert_rating_row(self.con, asset_key=f"output/og/d/o{i}", row=_row(4, ["hub.png"]))
+        first = fetch_rating_aggregate(self.con, AGG_SOURCE_BASENAME, "hub.png", contributors_limit=2)
+        self.assertEqual(len(first["contributors"]), 2)
+        self.assertEqual(first["contributors_next_offset"], 2)
+        last = fetch_rating_aggregate(
+            self.con, AGG_SOURCE_BASENAME, "hub.png", contributors_limit=2, contributors_offset=4
+        )
+        self.assertEqual([c["output_discovery_key"] for c in last["contributors"]], ["output/og/d/o4"])
+        self.assertIsNone(last["contributors_next_offset"])
+
+
+class BuildMaterializesAggregatesTests(unittest.TestCase):
+    def test_sql_aggregates_and_explorer_match_built_doc(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            data_root = Path(td).resolve() / "data"
+            og = data_root / "output" / "og" / "2026-04-01"
+            og.mkdir(parents=True)
+            out = data_root / "output" / "_status" / "ratings_index.json"
+            edges = out.with_name("discovery_lineage_edges.json")
+            edges.parent.mkdir(parents=True)
+            for stem, stars, src in (("A_00001", 5, "src_a.png"), ("A_00002", 2, "src_a.png"), ("A_00003", 4, "src_b.png")):
+                (og / f"{stem}.XMP").write_text(f'<x xmp:Rating="{stars}"/>', encoding="utf-8")
+                prompt = {"1": {"class_type": "LoadImage", "inputs": {"image": src}}}
+                (og / f"{stem}.png").write_bytes(_png_with_prompt(prompt))
+            edges.write_text(
+                json.dumps(
+                    {
+                        "edges": [
+                            {
+                                "child_group_id": "og:stem:A_00001",
+                                "parent_group_id": "og:stem:root",
+                                "via_source_raw": "output/og/root.mp4",
+                                "evidence": "png_prompt_source_path",
+                            }
+                        ]
+                    }
+                ),
+                encoding="utf-8",
+            )
+            doc = build_ratings_index(
+                og_root=og.parent, jobs_root=Path(td) / "jobs", data_root=data_root, out_path=out, lineage_edges_path=edges
+            )
+            out.unlink()  # the SQL path must not need the export
+
+            con = open_ratings_db(ratings_db_path_for_index(out), ratings_json=out)
+            try:
+                for bn, row in doc["by_source_basename"].items():
+                    sql = fetch_rating_aggregate(con, AGG_SOURCE_BASENAME, bn)
+                    assert sql is not None
+                    for k in ("inferred", "n", "keepers_4plus", "contributors", "evidence"):
+                        self.assertEqual(sql.get(k), row.get(k), (bn, k))
+                rel = "output/og/2026-04-01/A_00002.mp4"
+                from_db = build_asset_ratings_explorer_from_db(con, relpath=rel)
+            finally:
+                con.close()
+            from_doc = build_asset_ratings_explorer(relpath=rel, ratings_doc=doc)
+            self.assertIn("root.mp4", doc["by_source_basename"])
+            for k in ("rating_effective", "explicit", "sources_cited", "index_stats"):
+                self.assertEqual(from_db[k], from_doc[k], k)
+
+    def test_axis_star_differing_from_xmp_aggregates_like_the_doc(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            data_root = Path(td).resolve() / "data"
+            og = data_root / "output" / "og" / "2026-04-01"
+            og.mkdir(parents=True)
+            out = data_root / "output" / "_status" / "ratings_index.json"
+            for stem, stars in (("B_00001", 2), ("B_00002", 4)):
+                (og / f"{stem}.XMP").write_text(f'<x xmp:Rating="{stars}"/>', encoding="utf-8")
+                prompt = {"1": {"class_type": "LoadImage", "inputs": {"image": "src_b.png"}}}
+                (og / f"{stem}.png").write_bytes(_png_with_prompt(prompt))
+            kwargs = dict(og_root=og.parent, jobs_root=Path(td) / "jobs", data_root=data_root, out_path=out, join_lineage=False)
+            build_ratings_index(**kwargs)
+            # Discovery axes give B_00001 a 5★ explicit; its XMP still says 2★.
+            con = open_ratings_db(ratings_db_path_for_index(out), ratings_json=out)
+            try:
+                axes = {"subject_beauty": 5, "render_quality": 5, "action_quality": 5}
+                upsert_rating_row(
+                    con,
+                    asset_key="output/og/2026-04-01/B_00001",
+                    row={"short_key": "og/2026-04-01/B_00001", "explicit": 5, "axes": axes, "sources": ["src_b.png"]},
+                )
+            finally:
+                con.close()
+
+            doc = build_ratings_index(**kwargs)
+            row = doc["by_output_relpath"]["og/2026-04-01/B_00001"]
+            self.assertEqual((row["explicit"], row["xmp_explicit"]), (5, 2))
+            con = open_ratings_db(ratings_db_path_for_index(out), ratings_json=out)
+            try:
+                sql = fetch_rating_aggregate(con, AGG_SOURCE_BASENAME, "src_b.png")
+                assert sql is not None
+                self.assertEqual((sql["inferred"], sql["n"]), (doc["by_source_basename"]["src_b.png"]["inferred"], 2))
+                self.assertEqual(sql["inferred"], 3.0)
+                # A reopen that re-materializes from rating_row keeps the XMP star too.
+                rebuild_rating_aggregates(con)
+                self.assertEqual(fetch_rating_aggregate(con, AGG_SOURCE_BASENAME, "src_b.png")["inferred"], 3.0)
+            finally:
+                con.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Tests for the incremental ratings build (per-XMP manifest + aggregate deltas)."""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+from unittest import mock
+
+import support  # noqa: F401
+import comfy_meta_lib as cml
+import shape_factory_ratings_incremental as inc
+from shape_factory_ratings import compute_ratings_index
+
+
+def _chunk(ctype: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + ctype + data + struct.pack(">I", zlib.crc32(ctype + data) & 0xFFFFFFFF)
+
+
+def _png_with_prompt(prompt: dict) -> bytes:
+    ihdr = _chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0))
+    text = _chunk(b"tEXt", b"prompt\x00" + json.dumps(prompt).encode("utf-8"))
+    return cml.PNG_MAGIC + ihdr + text + _chunk(b"IEND", b"")
+
+
+def _xmp(stars: int) -> str:
+    return (
+        '<x:xmpmeta xmlns:x="adobe:ns:meta/"><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">'
+        f'<rdf:Description xmlns:xmp="http://ns.adobe.com/xap/1.0/" xmp:Rating="{stars}"/></rdf:RDF></x:xmpmeta>\n'
+    )
+
+
+class IncrementalRatingsBuildTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.data_root = Path(self._td.name).resolve() / "data"
+        self.og = self.data_root / "output" / "og"
+        self.jobs = Path(self._td.name).resolve() / "jobs"
+        self.out = self.data_root / "output" / "_status" / "ratings_index.json"
+        self.edges = self.out.with_name("discovery_lineage_edges.json")
+        self.jobs.mkdir(parents=True)
+        self.edges.parent.mkdir(parents=True)
+
+        self._rate("2026-04-01/A_00001", 5, sources={"1": ("LoadImage", "image", "src_a.png")})
+        self._rate(
+            "2026-04-01/A_00002",
+            3,
+            sources={"1": ("LoadImage", "image", "src_a.png"), "2": ("VHS_LoadVideo", "video", "input/clip.mp4")},
+        )
+        self._rate("2026-04-02/B_00001", 4)
+        self._rate("2026-04-02/B_00002", 0)
+        (self.og / "2026-04-02" / "C_00001.XMP").write_text("<x:xmpmeta/>\n", encoding="utf-8")  # unrated
+        self._job("b1", "B_00001", graph_hash="gh_b", profile="backfill")
+        self.edges.write_text(
+            json.dumps(
+                {
+                    "edges": [
+                        {
+                            "child_group_id": "og:stem:A_00001",
+                            "parent_group_id": "og:stem:root",
+                            "via_source_raw": "output/og/root.mp4",
+                            "evidence": "png_prompt_source_path",
+                        }
+                    ]
+                }
+            ),
+            encoding="utf-8",
+        )
+
+    def tearDown(self) -> None:
+        self._td.cleanup()
+
+    def _rate(self, stem_rel: str, stars: int, *, sources: dict | None = None) -> None:
+        xmp = self.og / f"{stem_rel}.XMP"
+        xmp.parent.mkdir(parents=True, exist_ok=True)
+        existed = xmp.exists()
+        xmp.write_text(_xmp(stars), encoding="utf-8")
+        if existed:  # same byte size: make sure the stamp moves even on coarse clocks
+            st = xmp.stat()
+            os.utime(xmp, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        if sources:
+            prompt = {nid: {"class_type": ct, "inputs": {key: val}} for nid, (ct, key, val) in sources.items()}
+            xmp.with_suffix(".png").write_bytes(_png_with_prompt(prompt))
+
+    def _job(self, name: str, stem: str, *, graph_hash: str, profile: str) -> None:
+        job = {
+            "job_key": f"FAM__{profile}__{stem}",
+            "family_slug": "FAM",
+            "shape_id": "wan-v2v",
+            "graph_hash": graph_hash,
+            "submit": {"prompt_source": profile, "outputs": [str(self.og / "2026-04-02" / f"{stem}.mp4")]},
+        }
+        (self.jobs / f"{name}.job.json").write_text(json.dumps(job), encoding="utf-8")
+
+    def _kwargs(self) -> dict:
+        return dict(
+            og_root=self.og,
+            jobs_root=self.jobs,
+            data_root=self.data_root,
+            out_path=self.out,
+            lineage_edges_path=self.edges,
+        )
+
+    def _assert_matches_full(self) -> dict:
+        doc, stats = inc.build_ratings_index_incremental(**self._kwargs())
+        full = compute_ratings_index(**self._kwargs())
+        self.assertEqual(inc.diff_ratings_docs(doc, full), [])
+        self.assertEqual(json.loads(self.out.read_text(encoding="utf-8"))["stats"], full["stats"])
+        return stats
+
+    def test_incremental_matches_full_build_across_edits(self) -> None:
+        stats = self._assert_matches_full()
+        self.assertEqual((stats["xmps"], stats["reextracted"], stats["unrated"]), (5, 5, 1))
+        doc = json.loads(self.out.read_text(encoding="utf-8"))
+        self.assertEqual(doc["by_source_basename"]["src_a.png"]["n"], 2)
+        self.assertIn("root.mp4", doc["by_source_basename"])  # lineage uplift still applied
+        self.assertEqual(doc["by_shape_recipe"]["FAM+backfill"]["n"], 1)
+
+        self._rate("2026-04-01/A_00002", 1, sources={"1": ("LoadImage", "image", "src_a.png")})
+        (self.og / "2026-04-02" / "B_00002.XMP").unlink()
+        self._rate("2026-04-03/D_00001", 4, sources={"1": ("LoadImage", "image", "src_d.png")})
+        self._job("b1", "B_00001", graph_hash="gh_b2", profile="pp-hero")  # re-join without touching the XMP
+
+        stats = self._assert_matches_full()
+        self.assertEqual((stats["reextracted"], stats["removed"], stats["jobs_reparsed"]), (2, 1, 1))
+        doc = json.loads(self.out.read_text(encoding="utf-8"))
+        self.assertEqual(doc["by_source_basename"]["src_a.png"]["inferred"], 3.0)
+        self.assertNotIn("clip.mp4", doc["by_source_basename"])
+        self.assertNotIn("gh_b", doc["by_graph_hash"])
+        self.assertEqual(doc["by_graph_hash"]["gh_b2"]["contributors"][0]["rating"], 4)
+
+    def test_unchanged_xmps_are_not_reread(self) -> None:
+        inc.build_ratings_index_incremental(**self._kwargs())
+        with mock.patch.object(inc, "rated_og_record", wraps=inc.rated_og_record) as extract, mock.patch.object(
+            inc, "parse_xmp_rating", wraps=inc.parse_xmp_rating
+        ) as parse:
+            _, stats = inc.build_ratings_index_incremental(**self._kwargs())
+            self.assertEqual((extract.call_count, parse.call_count), (0, 0))
+            self.assertEqual((stats["reused"], stats["contribution_deltas"], stats["jobs_reparsed"]), (5, 0, 0))
+
+            self._rate("2026-04-02/B_00001", 2)
+            _, stats = inc.build_ratings_index_incremental(**self._kwargs())
+            self.assertEqual((extract.call_count, stats["contribution_deltas"]), (1, 1))
+
+    def test_scope_change_resets_manifest(self) -> None:
+        inc.build_ratings_index_incremental(**self._kwargs())
+        doc, stats = inc.build_ratings_index_incremental(name_glob="A_*.XMP", **self._kwargs())
+        self.assertTrue(stats["manifest_reset"])
+        self.assertEqual(doc["stats"]["rated_outputs"], 2)
+        self.assertNotIn("gh_b", doc["by_graph_hash"])
+
+
+if __name__ == "__main__":
+    unittest.main()
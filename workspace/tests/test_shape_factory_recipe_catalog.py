@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Tests for the persisted hourly replay recipe catalog."""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+from unittest import mock
+
+import support  # noqa: F401
+import comfy_meta_lib as cml
+import shape_factory_recipe_catalog as rc
+
+SHAPE_YAML = """\
+family_slug: FAM
+requires:
+  - slot: source_video
+    binding: {type: vhs_load_video_path, node_id: 1}
+  - slot: prompt_profile
+    binding:
+      type: prompt_bundle
+      positive: {node_id: 2, widget_index: 0}
+      negative: {node_id: 3, widget_index: 0}
+"""
+
+
+def _png_with_workflow(workflow: dict) -> bytes:
+    def chunk(ctype: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + ctype + data + struct.pack(">I", zlib.crc32(ctype + data) & 0xFFFFFFFF)
+
+    ihdr = chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0))
+    text = chunk(b"tEXt", b"workflow\x00" + json.dumps(workflow).encode("utf-8"))
+    return cml.PNG_MAGIC + ihdr + text + chunk(b"IEND", b"")
+
+
+class RecipeCatalogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.data_root = Path(self._td.name).resolve() / "data"
+        (self.data_root / "shapes").mkdir(parents=True)
+        (self.data_root / "shapes" / "FAM.shape.yaml").write_text(SHAPE_YAML, encoding="utf-8")
+        self.inputs = self.data_root / "input"
+        self.inputs.mkdir()
+        self.og = self.data_root / "output" / "og" / "2026-04-01"
+        self.og.mkdir(parents=True)
+        self.jobs = self.data_root / "shape_factory" / "jobs" / "FAM"
+        self.jobs.mkdir(parents=True)
+        self.profile = self.data_root / "pools" / "FAM" / "prompts" / "p1.json"
+        self.profile.parent.mkdir(parents=True)
+        self.profile.write_text("{}", encoding="utf-8")
+
+        self._job("j1", "clip_a.mp4", deposited=[str(self.og / "J1_00001.mp4")])
+        self._job("j2", "clip_b.mp4")
+        self._og("J1_00001", "clip_a.mp4", "dup of j1")  # job_key j1 → skipped in favour of the job
+        self._og("OLD_00001", "clip_c.mp4", "archive prompt")
+        self._og("OLD_00002", "clip_c.mp4", "archive prompt")
+        self._index([("J1_00001", "FAM__j1"), ("OLD_00001", ""), ("OLD_00002", ""), ("GONE_00001", "")])
+
+    def tearDown(self) -> None:
+        self._td.cleanup()
+
+    def _job(self, name: str, clip: str, *, deposited: list | None = None) -> Path:
+        (self.inputs / clip).write_bytes(b"v")
+        job = {
+            "job_key": f"FAM__{name}",
+            "family_slug": "FAM",
+            "submit": {"status": "complete"},
+            "bindings": {
+                "source_video": {"path": str(self.inputs / clip)},
+                "prompt_profile": {"path": str(self.profile)},
+            },
+        }
+        if deposited:
+            job["deposit"] = {"videos": deposited}
+        path = self.jobs / f"{name}.job.json"
+        path.write_text(json.dumps(job), encoding="utf-8")
+        return path
+
+    def _og(self, stem: str, clip: str, positive: str) -> None:
+        (self.inputs / clip).write_bytes(b"v")
+        (self.og / f"{stem}.mp4").write_bytes(b"mp4")
+        workflow = {
+            "nodes": [
+                {"id": 1, "widgets_values": {"video": str(self.inputs / clip)}},
+                {"id": 2, "widgets_values": [positive]},
+                {"id": 3, "widgets_values": ["neg"]},
+            ]
+        }
+        (self.og / f"{stem}.png").write_bytes(_png_with_workflow(workflow))
+
+    def _index(self, members: list) -> None:
+        doc = {
+            "pools": {
+                "deposit": {
+                    "members": [{"path": str(self.og / f"{stem}.mp4"), "job_key": jk} for stem, jk in members]
+                }
+            }
+        }
+        (self.data_root / "pools" / "FAM" / "index.json").write_text(json.dumps(doc), encoding="utf-8")
+
+    def _read(self) -> tuple:
+        return rc.catalog_replay_recipes("FAM", data_root=self.data_root)
+
+    def _scan(self) -> list:
+        from shape_factory_hourly import collect_replay_recipes
+
+        return collect_replay_recipes("FAM", data_root=self.data_root, use_catalog=False)
+
+    def test_catalog_matches_scan_and_reuses_unchanged_entries(self) -> None:
+        import shape_factory_hourly as hourly
+
+        recipes, stats = self._read()
+        self.assertEqual(recipes, self._scan())
+        self.assertEqual([r["source"] for r in recipes][:2], ["FAM__j1", "FAM__j2"])
+        self.assertEqual(len(recipes), 4)
+        self.assertEqual((stats["reparsed"], stats["unresolved"]), (4, 1))
+
+        with mock.patch.object(hourly, "_png_workflow_for_output") as png, mock.patch.object(
+            hourly, "_picks_from_job"
+        ) as picks:
+            again, stats = self._read()
+            self.assertEqual((png.call_count, picks.call_count), (0, 0))
+        self.assertEqual(again, recipes)
+        self.assertEqual((stats["reused"], stats["reparsed"]), (4, 0))
+        self.assertEqual(rc.lookup_recipe("FAM", recipes[2]["combo_key"], data_root=self.data_root), [recipes[2]])
+
+    def test_mtime_moves_and_removals_are_picked_up(self) -> None:
+        self._read()
+        job = self._job("j2", "clip_d.mp4")
+        st = job.stat()
+        os.utime(job, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        (self.jobs / "j1.job.json").unlink()  # its OG member is no longer shadowed
+        self._og("OLD_00002", "clip_e.mp4", "edited prompt")
+        st = (self.og / "OLD_00002.png").stat()
+        os.utime(self.og / "OLD_00002.png", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        recipes, stats = self._read()
+        self.assertEqual(recipes, self._scan())
+        self.assertEqual(stats["pruned"], 1)
+        self.assertEqual(stats["reparsed"], 3)  # j2, J1_00001 (first read), OLD_00002
+        self.assertIn(str(self.inputs / "clip_d.mp4"), [r["picks"]["source_video"] for r in recipes])
+
+    def test_deleted_input_media_invalidates_cached_recipes(self) -> None:
+        recipes, _ = self._read()
+        self.assertEqual(len(recipes), 4)
+        (self.inputs / "clip_b.mp4").unlink()  # j2's source clip
+        (self.inputs / "clip_c.mp4").unlink()  # both archive OG members
+
+        recipes, stats = self._read()
+        self.assertEqual(recipes, self._scan())
+        self.assertEqual([r["source"] for r in recipes], ["FAM__j1"])
+        self.assertEqual((stats["reparsed"], stats["unresolved"]), (3, 4))  # + GONE_00001
+        self.assertTrue(rc.verify_recipe_catalog("FAM", data_root=self.data_root)["ok"])
+
+        # Nothing negative was cached: the media coming back restores the recipes.
+        (self.inputs / "clip_b.mp4").write_bytes(b"v")
+        (self.inputs / "clip_c.mp4").write_bytes(b"v")
+        recipes, stats = self._read()
+        self.assertEqual(recipes, self._scan())
+        self.assertEqual(len(recipes), 4)
+        self.assertEqual(stats["reused"], 1)
+
+    def test_shape_change_resets_family_and_deposit_refreshes_job(self) -> None:
+        self._read()
+        path = self._job("j3", "clip_f.mp4")
+        self.assertTrue(rc.note_job_deposited(path, json.loads(path.read_text()), data_root=self.data_root))
+        _, stats = self._read()
+        self.assertEqual(stats["reparsed"], 0)
+
+        shape = self.data_root / "shapes" / "FAM.shape.yaml"
+        shape.write_text(SHAPE_YAML + "# edited\n", encoding="utf-8")
+        recipes, stats = self._read()
+        self.assertTrue(stats["family_reset"])
+        self.assertEqual(recipes, self._scan())
+        self.assertTrue(rc.verify_recipe_catalog("FAM", data_root=self.data_root)["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Tests for shape_factory_status_daemon (ws-driven job status + batched resync)."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict
+from unittest import mock
+
+import support  # noqa: F401
+import shape_factory as sf
+from comfy_live_preview import DEFAULT_CLIENT_IDS
+from shape_factory_status_daemon import STATUS_CLIENT_ID, ComfyStatusDaemon, ComfyStatusTracker
+
+
+def _write(path: Path, job: dict) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(job), encoding="utf-8")
+    return path
+
+
+class FakeComfy:
+    """``/queue`` and ``/history``; ``/history`` answers only once :attr:`release` is set."""
+
+    def __init__(self, *, queue: Dict[str, Any], history: Dict[str, Any]) -> None:
+        self.queue = queue
+        self.history = history
+        self.history_requested = threading.Event()
+        self.release = threading.Event()
+        self.requests: list = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *_args: Any) -> None:
+                return None
+
+            def do_GET(self) -> None:  # noqa: N802
+                fake.requests.append(self.path)
+                if self.path.startswith("/history"):
+                    fake.history_requested.set()
+                    fake.release.wait(10)
+                    doc = fake.history
+                else:
+                    doc = fake.queue
+                body = json.dumps(doc).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self) -> "FakeComfy":
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.release.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class StatusDaemonTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.data_root = Path(self._td.name)
+        jobs = self.data_root / "shape_factory" / "jobs" / "Fam"
+        self.job_a = _write(jobs / "job_a.job.json", {"job_key": "job_a", "submit": {"status": "queued", "prompt_id": "pid-a"}})
+        self.job_b = _write(jobs / "job_b.job.json", {"job_key": "job_b", "submit": {"status": "running", "prompt_id": "pid-b"}})
+        _write(jobs / "job_c.job.json", {"job_key": "job_c", "submit": {"status": "complete", "prompt_id": "pid-c"}})
+        self.tracker = ComfyStatusTracker(server="http://comfy.invalid", data_root=self.data_root)
+        patches = [
+            mock.patch.object(sf, "attach_model_io_timings", return_value=None),
+            mock.patch.object(sf, "discover_job_outputs", return_value=[]),
+            mock.patch.object(sf, "DEFAULT_TIMINGS_LEDGER", self.data_root / "timings.jsonl"),
+            # Event handling must never fall back to per-prompt polling.
+            mock.patch.object(sf, "fetch_comfy_history", side_effect=AssertionError("per-prompt /history")),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self) -> None:
+        self._td.cleanup()
+
+    def _submit(self, path: Path) -> dict:
+        return json.loads(path.read_text(encoding="utf-8"))["submit"]
+
+    def test_events_drive_running_then_terminal_status(self) -> None:
+        t0 = 1_800_000_000.0
+        self.assertEqual(self.tracker.on_event("execution_start", {"prompt_id": "pid-a"}, recv_ts=t0), "running")
+        self.assertEqual(self._submit(self.job_a)["status"], "running")
+
+        self.tracker.on_event("executing", {"prompt_id": "pid-a", "node": "3"}, recv_ts=t0 + 1)
+        self.tracker.on_event("executed", {"prompt_id": "pid-a", "node": "9", "output": {"images": []}}, recv_ts=t0 + 4)
+        self.tracker.on_event("executing", {"prompt_id": "pid-a", "node": None}, recv_ts=t0 + 5)
+        status = self.tracker.on_event("execution_success", {"prompt_id": "pid-a"}, recv_ts=t0 + 5)
+        self.assertEqual(status, "complete")
+
+        job = json.loads(self.job_a.read_text(encoding="utf-8"))
+        self.assertEqual(job["submit"]["status"], "complete")
+        self.assertTrue((self.data_root / "timings.jsonl").is_file())
+        self.assertEqual(self.tracker.stats["job_writes"], 2)
+
+        # Same mapping as a polled /history entry carrying the interrupt message.
+        self.tracker.on_event("execution_interrupted", {"prompt_id": "pid-b", "node_id": "7"}, recv_ts=t0 + 6)
+        self.assertEqual(self._submit(self.job_b)["status"], sf.history_status_str({"status": {"status_str": "error"}}))
+
+    def test_unknown_prompt_and_other_messages_are_ignored(self) -> None:
+        self.assertIsNone(self.tracker.on_event("execution_start", {"prompt_id": "not-ours"}))
+        self.assertIsNone(self.tracker.on_event("progress", {"prompt_id": "pid-a", "value": 1, "max": 2}))
+        self.assertIsNone(self.tracker.on_event("status", {"status": {"exec_info": {"queue_remaining": 0}}}))
+        self.assertEqual(self.tracker.stats["ignored"], 1)
+        self.assertEqual(self._submit(self.job_a)["status"], "queued")
+
+    def test_resync_uses_one_queue_and_one_history_request(self) -> None:
+        history = {"pid-b": {"status": {"status_str": "success", "completed": True, "messages": []}, "outputs": {}}}
+        with mock.patch.object(
+            sf, "fetch_comfy_queue", return_value={"queue_running": [[0, "pid-a", {}]], "queue_pending": []}
+        ) as queue, mock.patch.object(sf, "fetch_comfy_history_batch", return_value=history) as batch:
+            result = self.tracker.resync()
+        self.assertEqual(queue.call_count, 1)
+        self.assertEqual(batch.call_count, 1)
+        self.assertEqual(result, {"jobs": 2, "updated": 2})
+        self.assertEqual(self._submit(self.job_a)["status"], "running")
+        self.assertEqual(self._submit(self.job_b)["status"], "complete")
+
+    def test_events_apply_while_resync_waits_on_comfy(self) -> None:
+        # The snapshot predates the interrupt: pid-b still looks running to /queue.
+        queue = {"queue_running": [[0, "pid-a", {}], [1, "pid-b", {}]], "queue_pending": []}
+        with FakeComfy(queue=queue, history={}) as fake:
+            tracker = ComfyStatusTracker(server=fake.url, data_root=self.data_root)
+            result: Dict[str, Any] = {}
+            resync = threading.Thread(target=lambda: result.update(tracker.resync()))
+            resync.start()
+            self.assertTrue(fake.history_requested.wait(10))
+
+            events = threading.Thread(
+                target=lambda: (
+                    tracker.on_event("execution_start", {"prompt_id": "pid-a"}),
+                    tracker.on_event("execution_interrupted", {"prompt_id": "pid-b"}),
+                )
+            )
+            events.start()
+            events.join(5)
+            self.assertFalse(events.is_alive(), "events blocked behind the resync fetch")
+            fake.release.set()
+            resync.join(10)
+
+        self.assertEqual([p.split("?")[0] for p in fake.requests], ["/queue", "/history"])
+        self.assertEqual(self._submit(self.job_a)["status"], "running")
+        self.assertEqual(self._submit(self.job_b)["status"], "error")
+        self.assertEqual(result, {"jobs": 2, "updated": 0})
+
+    def test_bridge_text_frames_feed_tracker(self) -> None:
+        daemon = ComfyStatusDaemon(tracker=self.tracker)
+        daemon._handle_text(json.dumps({"type": "execution_start", "data": {"prompt_id": "pid-a"}}), None)
+        daemon._handle_text("not json", None)
+        self.assertEqual(self._submit(self.job_a)["status"], "running")
+
+    def test_daemon_refuses_the_ui_bridge_client_ids(self) -> None:
+        self.assertEqual(ComfyStatusDaemon(tracker=self.tracker).client_ids, (STATUS_CLIENT_ID,))
+        self.assertNotIn(STATUS_CLIENT_ID, DEFAULT_CLIENT_IDS)
+        with self.assertRaises(ValueError):
+            ComfyStatusDaemon(tracker=self.tracker, client_ids=["shape_factory"])
+
+    def test_broadcast_queue_count_change_triggers_resync(self) -> None:
+        daemon = ComfyStatusDaemon(tracker=self.tracker)
+        done = threading.Event()
+
+        def status(remaining: int) -> str:
+            return json.dumps({"type": "status", "data": {"status": {"exec_info": {"queue_remaining": remaining}}}})
+
+        with mock.patch.object(self.tracker, "resync", side_effect=lambda: done.set() or {"jobs": 0, "updated": 0}) as resync:
+            daemon._handle_text(status(2), None)  # first sighting: nothing to compare
+            daemon._handle_text(status(2), None)
+            self.assertEqual(resync.call_count, 0)
+            daemon._handle_text(status(1), None)  # a prompt finished
+            self.assertTrue(done.wait(5))
+        self.assertEqual(resync.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Tests for the one-ahead prepare / serial-POST submit pipeline."""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import support  # noqa: F401
+import shape_factory as sf
+
+
+def _args(root: Path, **kw) -> argparse.Namespace:
+    base = dict(
+        family="Fam",
+        job=None,
+        jobs_dir=None,
+        job_dir=str(root / "shape_factory" / "jobs"),
+        limit=None,
+        server="http://comfy.invalid",
+        client_id="shape_factory",
+        front=False,
+        force=False,
+        dry_run=False,
+        data_root=str(root),
+        timeout=5,
+        convert_timeout=5,
+        delay=0.0,
+        pending_only=False,
+        quiet=True,
+        workers=4,
+    )
+    base.update(kw)
+    return argparse.Namespace(**base)
+
+
+class SubmitPipelineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.root = Path(self._td.name)
+        fam = self.root / "shape_factory" / "jobs" / "Fam"
+        fam.mkdir(parents=True)
+        self.paths = []
+        for i in range(8):
+            p = fam / f"job_{i}.job.json"
+            p.write_text(
+                json.dumps({"job_key": f"job_{i}", "created_at": f"2026-10-01T00:00:{59 - i:02d}Z", "submit": {"status": "pending"}}),
+                encoding="utf-8",
+            )
+            self.paths.append(p)
+        self.posted: list[str] = []
+        self.post_threads: set[str] = set()
+        self.in_prepare = 0
+        self.max_in_prepare = 0
+        self.started: list[str] = []
+        self.started_at_post: list[int] = []
+        self.posting = False
+        self.prepared_during_post = False
+        self._lock = threading.Lock()
+
+    def tearDown(self) -> None:
+        self._td.cleanup()
+
+    def _prepare(self, job_path: Path, **kw):
+        with self._lock:
+            self.in_prepare += 1
+            self.max_in_prepare = max(self.max_in_prepare, self.in_prepare)
+            self.started.append(job_path.stem.replace(".job", ""))
+            self.prepared_during_post = self.prepared_during_post or self.posting
+        try:
+            time.sleep(random.uniform(0.005, 0.03))
+            key = job_path.stem.replace(".job", "")
+            if key == "job_3":
+                raise RuntimeError("convert failed")
+            now = time.time()
+            return {
+                "prepared": True,
+                "job_key": key,
+                "load_started_ts": now,
+                "prompt_started_ts": now,
+                "prompt_finished_ts": now,
+                "prepared_ts": now,
+            }
+        finally:
+            with self._lock:
+                self.in_prepare -= 1
+
+    def _post(self, prepared, **kw):
+        with self._lock:
+            self.posting = True
+            self.started_at_post.append(len(self.started))
+        time.sleep(0.02)
+        with self._lock:
+            self.posting = False
+        self.posted.append(prepared["job_key"])
+        self.post_threads.add(threading.current_thread().name)
+        return {"ok": True, "job_key": prepared["job_key"], "prompt_id": "pid-" + prepared["job_key"], "stage_sec": {"post": 0.01}}
+
+    def _run(self, args) -> tuple[int, str]:
+        out, self.err = io.StringIO(), io.StringIO()
+        with mock.patch.object(sf, "prepare_job_submit", side_effect=self._prepare), mock.patch.object(
+            sf, "post_prepared_job_submit", side_effect=self._post
+        ), contextlib.redirect_stdout(out), contextlib.redirect_stderr(self.err):
+            rc = sf.cmd_submit(args)
+        return rc, out.getvalue()
+
+    def test_next_prepare_overlaps_post_but_posts_keep_job_order(self) -> None:
+        rc, out = self._run(_args(self.root))
+        self.assertEqual(rc, 1)
+        order = [p.stem.replace(".job", "") for p in sf.iter_job_paths(_args(self.root))]
+        self.assertEqual(self.posted, [k for k in order if k != "job_3"])
+        self.assertEqual(self.post_threads, {threading.current_thread().name})
+        self.assertTrue(self.prepared_during_post)
+        # Prepare writes files and calls /workflow/convert: never more than one job ahead of the POST.
+        self.assertEqual(self.max_in_prepare, 1)
+        for key, started in zip(self.posted, self.started_at_post):
+            self.assertLessEqual(started, order.index(key) + 2, key)
+        self.assertIn("submit_ok=7", out)
+        self.assertIn("submit_stage_sec=", out)
+
+        # Prepare failures keep the retry / abandon accounting.
+        failed = json.loads((self.paths[3]).read_text(encoding="utf-8"))
+        self.assertEqual(failed["submit"]["status"], "error")
+        self.assertEqual(sf.submit_attempt_count(failed), 1)
+
+    def test_single_worker_matches_parallel_order(self) -> None:
+        self._run(_args(self.root, workers=1))
+        serial = list(self.posted)
+        self.assertEqual(self.max_in_prepare, 1)
+        self.posted.clear()
+        for p in self.paths:
+            job = json.loads(p.read_text(encoding="utf-8"))
+            job["submit"] = {"status": "pending"}
+            p.write_text(json.dumps(job), encoding="utf-8")
+        self._run(_args(self.root, workers=4))
+        self.assertEqual(serial, self.posted)
+
+    def test_pending_drain_checks_queue_before_each_prepare_and_stops(self) -> None:
+        busy = iter([(True, 0, 0), (False, 1, 1)])
+        with mock.patch.object(sf, "comfy_waiting_queue_empty", side_effect=lambda *a, **k: next(busy)):
+            rc, out = self._run(_args(self.root, pending_only=True, quiet=False))
+        self.assertEqual(rc, 0)
+        self.assertEqual(len(self.posted), 1)
+        self.assertIn("stop pending drain", out)
+        # The queue turned busy after the first POST: the job the drain stopped on was never prepared.
+        self.assertEqual(self.started, self.posted)
+
+    def test_busy_comfy_prepares_nothing(self) -> None:
+        before = {p: p.read_bytes() for p in self.paths}
+        with mock.patch.object(sf, "comfy_waiting_queue_empty", return_value=(False, 1, 2)):
+            rc, out = self._run(_args(self.root, pending_only=True, quiet=False))
+        self.assertEqual(rc, 0)
+        self.assertEqual((self.started, self.posted), ([], []))
+        self.assertIn("stop pending drain", out)
+        self.assertEqual({p: p.read_bytes() for p in self.paths}, before)
+
+    def test_workers_above_two_warn(self) -> None:
+        self._run(_args(self.root, workers=8))
+        self.assertIn("using 2", self.err.getvalue())
+        self.assertEqual(self.max_in_prepare, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
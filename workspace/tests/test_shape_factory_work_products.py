@@ -2,6 +2,7 @@ import json
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 import support  # noqa: F401  — injects workspace/scripts onto sys.path
 from shape_factory_work_products import (
@@ -257,6 +258,71 @@ class TestWorkProducts(unittest.TestCase):
             payload = list_recent_work_products(data_root=data, output_root=out, limit=10, hourly_only=True)
             self.assertEqual([it["job_key"] for it in payload["items"]], ["hourly__new", "hourly__old"])
 
+    def test_list_recent_pages_with_cursor_without_overlap(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            data = root / "data"
+            out = root / "output"
+            out.mkdir(parents=True)
+            jobs = data / "shape_factory" / "jobs"
+            for i in range(7):
+                fam = "DEMO" if i % 2 == 0 else "OTHER"
+                (jobs / fam).mkdir(parents=True, exist_ok=True)
+                job = {
+                    "created_at": f"2026-07-14T12:00:{i:02d}+00:00",
+                    "family_slug": fam,
+                    "job_key": f"hourly__j{i}",
+                    "submit": {"status": "complete"},
+                }
+                (jobs / fam / f"hourly__j{i}.job.json").write_text(json.dumps(job) + "\n", encoding="utf-8")
+            (jobs / "DEMO" / "not_hourly.job.json").write_text(
+                json.dumps({"created_at": "2027-01-01T00:00:00+00:00", "job_key": "not_hourly"}), encoding="utf-8"
+            )
+
+            seen = []
+            cursor = None
+            while True:
+                payload = list_recent_work_products(data_root=data, output_root=out, limit=3, cursor=cursor)
+                seen.extend(it["job_key"] for it in payload["items"])
+                cursor = payload["next_cursor"]
+                if cursor is None:
+                    break
+            self.assertEqual(seen, [f"hourly__j{i}" for i in range(6, -1, -1)])
+
+            first = list_recent_work_products(data_root=data, output_root=out, limit=2, family="DEMO")
+            self.assertEqual([it["job_key"] for it in first["items"]], ["hourly__j6", "hourly__j4"])
+            rest = list_recent_work_products(
+                data_root=data, output_root=out, limit=10, family="DEMO", cursor=first["next_cursor"]
+            )
+            self.assertEqual([it["job_key"] for it in rest["items"]], ["hourly__j2", "hourly__j0"])
+            self.assertIsNone(rest["next_cursor"])
+
+    def test_list_recent_only_opens_page_job_docs(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            data = root / "data"
+            out = root / "output"
+            out.mkdir(parents=True)
+            jobs = data / "shape_factory" / "jobs" / "DEMO"
+            jobs.mkdir(parents=True)
+            for i in range(20):
+                job = {"created_at": f"2026-07-14T12:00:{i:02d}+00:00", "job_key": f"hourly__j{i}"}
+                (jobs / f"hourly__j{i}.job.json").write_text(json.dumps(job), encoding="utf-8")
+            list_recent_work_products(data_root=data, output_root=out, limit=2)  # warm catalog
+
+            opened = []
+            real_read_text = Path.read_text
+
+            def _read_text(path, *a, **kw):
+                if path.name.endswith(".job.json"):
+                    opened.append(path.name)
+                return real_read_text(path, *a, **kw)
+
+            with mock.patch.object(Path, "read_text", _read_text):
+                payload = list_recent_work_products(data_root=data, output_root=out, limit=2)
+            self.assertEqual([it["job_key"] for it in payload["items"]], ["hourly__j19", "hourly__j18"])
+            self.assertEqual(sorted(set(opened)), ["hourly__j18.job.json", "hourly__j19.job.json"])
+
     def test_shape_view_parses_contract(self):
         with tempfile.TemporaryDirectory() as td:
             root = Path(td)
@@ -4,7 +4,9 @@
 from __future__ import annotations
 
 import json
+import stat
 import subprocess
+import sys
 import tempfile
 import unittest
 from pathlib import Path
@@ -25,6 +27,8 @@ from vision_slice_runner import (
 )
 from vision_slice_sample import (
     extract_excerpt_mp4,
+    extract_frame_jpeg,
+    extract_frames_jpeg,
     plan_excerpt_span,
     plan_excerpt_spans,
     plan_windows,
@@ -121,6 +125,56 @@ class ExtractExcerptIdempotentTests(unittest.TestCase):
                 )
 
 
+# Fake ffmpeg over a 10 fps, 2 s clip: writes the frame index as the "JPEG" body.
+# ``-ss T`` → first frame at/after T (else the last one); ``select`` → the select rule,
+# one f_%05d.jpg + showinfo line per selected frame.
+_FAKE_FFMPEG = """#!{python}
+import re, sys
+args = sys.argv[1:]
+with open({calls!r}, "a") as fh:
+    fh.write("x\\n")
+frames = [k / 10.0 for k in range(20)]
+out = args[-1]
+if "-ss" in args:
+    t = float(args[args.index("-ss") + 1])
+    k = next((i for i, ft in enumerate(frames) if ft >= t - 1e-6), len(frames) - 1)
+    open(out, "w").write(str(k))
+    sys.exit(0)
+lows = [float(x) for x in re.findall(r"gte\\(t\\\\,([0-9.]+)\\)", args[args.index("-vf") + 1])]
+prev, n = None, 0
+for k, ft in enumerate(frames):
+    if any(ft >= lo and (prev is None or prev < lo) for lo in lows):
+        n += 1
+        open(out.replace("%05d", "%05d" % n), "w").write(str(k))
+        sys.stderr.write("[Parsed_showinfo_1 @ 0x1] n:%4d pts:%7d pts_time:%g duration:1\\n" % (n - 1, k * 1000, ft))
+        prev = ft
+"""
+
+
+class ExtractFramesSinglePassTests(unittest.TestCase):
+    def test_single_pass_matches_per_frame_seeks(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            calls = root / "calls.txt"
+            ffmpeg = root / "ffmpeg"
+            ffmpeg.write_text(_FAKE_FFMPEG.format(python=sys.executable, calls=str(calls)), encoding="utf-8")
+            ffmpeg.chmod(ffmpeg.stat().st_mode | stat.S_IEXEC)
+            video = root / "clip.mp4"
+            video.write_bytes(b"")
+            # Duplicates, two targets inside one frame, out of order, and past the last frame.
+            ts = [0.25, 1.0, 0.25, 0.31, 0.33, 1.55, 0.0, 3.0]
+            single = [root / "single" / f"{i}.jpg" for i in range(len(ts))]
+            n_calls = extract_frames_jpeg(video, frame_ts=ts, out_jpegs=single, ffmpeg=str(ffmpeg))
+            self.assertEqual(n_calls, 2)  # one pass + one seek for 3.0
+            self.assertEqual(len(calls.read_text().splitlines()), 2)
+            for i, t in enumerate(ts):
+                seek = root / "seek" / f"{i}.jpg"
+                extract_frame_jpeg(video, frame_t=t, out_jpeg=seek, ffmpeg=str(ffmpeg))
+                self.assertEqual(single[i].read_text(), seek.read_text(), t)
+            self.assertEqual([p.read_text() for p in single], ["3", "10", "3", "4", "4", "16", "0", "19"])
+            self.assertEqual([p.name for p in (root / "single").iterdir() if p.name.startswith(".")], [])
+
+
 class ResolvePathTests(unittest.TestCase):
     def test_relative_requires_root(self) -> None:
         with self.assertRaises(ValueError):
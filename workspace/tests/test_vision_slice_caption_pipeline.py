@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""Pipelined Comfy caption runner and caption cache against a local fake Comfy server."""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import support  # noqa: F401
+
+import vision_slice_caption_run as vcr
+from vision_slice_runner import make_runner
+
+
+class FakeComfy:
+    """
+    /upload/image, /prompt, /history and /history/<id>, with one worker "GPU".
+
+    The worker picks a random queued prompt (real Comfy is FIFO) so completions arrive
+    out of order; images whose name contains ``fail`` finish with an error status.
+    """
+
+    def __init__(self, *, exec_s: float = 0.01) -> None:
+        self.exec_s = exec_s
+        self.queue: List[Dict[str, Any]] = []
+        self.history: Dict[str, Any] = {}
+        self.max_depth = 0
+        self.history_calls = 0
+        self.prompts = 0
+        self.lock = threading.Lock()
+        self.rng = random.Random(3)
+        self._stop = threading.Event()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *_args: Any) -> None:
+                return None
+
+            def _json(self, doc: Any) -> None:
+                body = json.dumps(doc).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self) -> None:
+                raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if self.path == "/upload/image":
+                    name = re.search(rb'filename="([^"]+)"', raw).group(1).decode()
+                    self._json({"name": name, "subfolder": "vision_v1", "type": "input"})
+                    return
+                prompt = json.loads(raw)["prompt"]
+                pid = uuid.uuid4().hex
+                with fake.lock:
+                    fake.queue.append({"id": pid, "image": prompt["1"]["inputs"]["image"]})
+                    fake.prompts += 1
+                    fake.max_depth = max(fake.max_depth, len(fake.queue))
+                self._json({"prompt_id": pid, "number": 0})
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                with fake.lock:
+                    fake.history_calls += 1
+                    if url.path.startswith("/history/"):
+                        pid = url.path.rsplit("/", 1)[-1]
+                        self._json({pid: fake.history[pid]} if pid in fake.history else {})
+                        return
+                    n = int((parse_qs(url.query).get("max_items") or ["0"])[0]) or len(fake.history)
+                    items = list(fake.history.items())[-n:]
+                self._json(dict(items))
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            with self.lock:
+                job = self.queue.pop(self.rng.randrange(len(self.queue))) if self.queue else None
+            if job is None:
+                time.sleep(0.002)
+                continue
+            time.sleep(self.exec_s)
+            if "fail" in job["image"]:
+                entry = {"outputs": {}, "status": {"status_str": "error", "completed": True, "messages": ["boom"]}}
+            else:
+                entry = {"outputs": {"4": {"text": [f"caption of {job['image']}"]}}, "status": {"status_str": "success"}}
+            with self.lock:
+                self.history[job["id"]] = entry
+
+    def __enter__(self) -> "FakeComfy":
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        threading.Thread(target=self._work, daemon=True).start()
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self._stop.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _fast_make_runner(**kwargs: Any) -> Any:
+    runner = make_runner(**kwargs)
+    runner.cfg.poll_interval_s = 0.005
+    return runner
+
+
+class _FakeComfyCase(unittest.TestCase):
+    def _manifest(self, root: Path, n: int = 14) -> Path:
+        frames = []
+        for i in range(n):
+            name = f"clip_{i:03d}_{'fail' if i == 5 else 'window'}.jpg"
+            rel = f"frames/clip/{name}"
+            if i != 9:  # frame 9 was never extracted
+                (root / rel).parent.mkdir(parents=True, exist_ok=True)
+                (root / rel).write_bytes(b"\xff\xd8jpeg" + bytes([i]))
+            frames.append({"asset_relpath": "og/clip.mp4", "frame_relpath": rel, "t0": i, "t1": i + 1, "frame_t": i + 0.5})
+        frames.append({"asset_relpath": "og/clip.mp4", "t0": 99})  # no frame_relpath
+        path = root / "frames_manifest.json"
+        path.write_text(json.dumps({"work_dir": str(root), "frames": frames, "frame_count": len(frames)}), encoding="utf-8")
+        return path
+
+    def _run(
+        self,
+        fake: FakeComfy,
+        manifest: Path,
+        status: Path,
+        *,
+        in_flight: int,
+        append: bool = False,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        with mock.patch.object(vcr, "make_runner", _fast_make_runner):
+            return vcr.run_caption(
+                manifest,
+                status_dir=status,
+                run_id="pipe",
+                runner="comfy",
+                provider="comfy",
+                comfy_server=fake.url,
+                in_flight=in_flight,
+                append=append,
+                **kwargs,
+            )
+
+    def _rows(self, status: Path) -> List[Dict[str, Any]]:
+        nd = status / "vision_slice_captions__base_caption.ndjson"
+        return [json.loads(line) for line in nd.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+class PipelinedCaptionTests(_FakeComfyCase):
+    def test_pipelined_rows_match_serial_order(self) -> None:
+        with tempfile.TemporaryDirectory() as td, FakeComfy() as fake:
+            root = Path(td)
+            manifest = self._manifest(root)
+            serial = self._run(fake, manifest, root / "serial", in_flight=1)
+            self.assertEqual(fake.max_depth, 1)
+            fake.max_depth = 0
+            piped = self._run(fake, manifest, root / "piped", in_flight=4)
+            self.assertGreater(fake.max_depth, 1)
+            self.assertLessEqual(fake.max_depth, 4)
+
+            strip = lambda rows: [{k: v for k, v in r.items() if k != "runner_raw"} for r in rows]  # noqa: E731
+            self.assertEqual(strip(self._rows(root / "piped")), strip(self._rows(root / "serial")))
+            rows = self._rows(root / "piped")
+            self.assertEqual([r["t0"] for r in rows], [i for i in range(14) if i not in (5, 9)])
+            self.assertEqual(rows[0]["caption"], "caption of vision_v1/clip_000_window.jpg")
+            self.assertEqual(rows[0]["runner_raw"]["timing"]["in_flight"], 4)
+
+            self.assertEqual((serial["error_count"], piped["error_count"]), (3, 3))
+            self.assertEqual([e["frame_relpath"] for e in piped["errors"]], [e["frame_relpath"] for e in serial["errors"]])
+            self.assertIn("execution error", piped["errors"][0]["error"])
+            self.assertEqual(piped["timing"]["in_flight"], 4)
+            self.assertIn("captions_per_min_wall", piped["timing"])
+
+    def test_append_keeps_earlier_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as td, FakeComfy() as fake:
+            root = Path(td)
+            manifest = self._manifest(root, n=6)
+            self._run(fake, manifest, root / "s", in_flight=3)
+            first = self._rows(root / "s")
+            self._run(fake, manifest, root / "s", in_flight=3, append=True)
+            both = self._rows(root / "s")
+            self.assertEqual(len(both), 2 * len(first))
+            self.assertEqual([r["frame_relpath"] for r in both[len(first) :]], [r["frame_relpath"] for r in first])
+
+
+class CaptionCacheTests(_FakeComfyCase):
+    def test_rerun_serves_cached_captions(self) -> None:
+        with tempfile.TemporaryDirectory() as td, FakeComfy() as fake:
+            root = Path(td)
+            manifest = self._manifest(root, n=8)
+            first = self._run(fake, manifest, root / "s", in_flight=4)
+            rows_first = self._rows(root / "s")
+            sent = fake.prompts
+            self.assertEqual(sent, 8)
+            self.assertEqual(first["caption_cache"]["hits"], 0)
+            self.assertEqual(first["caption_cache"]["misses"], 8)
+            self.assertEqual(first["caption_cache"]["stored"], 7)  # frame 5 fails on the GPU
+
+            again = self._run(fake, manifest, root / "s", in_flight=4)
+            self.assertEqual(fake.prompts, sent + 1)  # only the failed frame is retried
+            self.assertEqual(again["caption_cache"]["hits"], 7)
+            self.assertEqual(again["caption_cache"]["misses"], 1)
+            rows = self._rows(root / "s")
+            self.assertEqual([r["caption"] for r in rows], [r["caption"] for r in rows_first])
+            self.assertTrue(all(r.get("caption_cache") == "hit" for r in rows))
+            self.assertEqual(again["timing"]["caption_timed_count"], 0)
+
+    def test_key_covers_frame_bytes_and_variant_params(self) -> None:
+        with tempfile.TemporaryDirectory() as td, FakeComfy() as fake:
+            root = Path(td)
+            manifest = self._manifest(root, n=3)
+            self._run(fake, manifest, root / "s", in_flight=2)
+            sent = fake.prompts
+            # Re-sampled frame with new bytes → miss; same bytes elsewhere → hit.
+            (root / "frames/clip/clip_001_window.jpg").write_bytes(b"\xff\xd8changed")
+            out = self._run(fake, manifest, root / "s", in_flight=2)
+            self.assertEqual((out["caption_cache"]["hits"], out["caption_cache"]["misses"]), (2, 1))
+            self.assertEqual(fake.prompts, sent + 1)
+            out = self._run(fake, manifest, root / "s", in_flight=2, max_new_tokens=256)
+            self.assertEqual(out["caption_cache"]["hits"], 0)
+            out = self._run(fake, manifest, root / "s", in_flight=2, caption_cache=False)
+            self.assertEqual(out["caption_cache"], {"enabled": False})
+            self.assertEqual(fake.prompts, sent + 1 + 3 + 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,19 +4,26 @@
 from __future__ import annotations
 
 import math
+import os
+import random
 import unittest
+from unittest import mock
 
 import support  # noqa: F401
 
+import vision_slice_quality_metrics as qm
 from vision_slice_quality_metrics import (
     Gray,
     artifacting_score,
     convergence_score,
     rollup_quality_rows,
     score_frame,
+    score_frames,
     sharpness_score,
 )
 
+_TOLERANCE = 2e-4
+
 
 def _flat(v: float, h: int = 64, w: int = 64) -> Gray:
     return [[float(v) for _ in range(w)] for _ in range(h)]
@@ -113,5 +120,52 @@ class VisionSliceQualityMetricsTests(unittest.TestCase):
         self.assertTrue(math.isfinite(rolled["sharpness"]["mean"]))
 
 
+def _raster(gray: Gray) -> bytes:
+    return bytes(int(round(v * 255)) for row in gray for v in row)
+
+
+@unittest.skipIf(qm._np is None, "numpy not installed")
+class VisionSliceQualityEngineTests(unittest.TestCase):
+    """The ndarray engine matches the list-of-rows metrics within _TOLERANCE."""
+
+    def _frames(self) -> list:
+        rng = random.Random(7)
+        noisy = [[min(1.0, max(0.0, 0.5 + rng.uniform(-0.3, 0.3))) for _ in range(72)] for _ in range(40)]
+        return [_checker(), _blur(_checker(period=4), passes=3), _blocky(), _flat(0.3), noisy, _checker(period=1)]
+
+    def test_engines_agree(self) -> None:
+        frames = self._frames()
+        sizes = [(len(g[0]), len(g)) for g in frames]
+        rasters = [_raster(g) for g in frames]
+        with mock.patch.dict(os.environ, {"VISION_QUALITY_ENGINE": "python"}):
+            lists = [qm.gray_from_bytes(r, w, h) for r, (w, h) in zip(rasters, sizes)]
+            self.assertIsInstance(lists[0], list)
+            expect = score_frames(lists)
+        with mock.patch.dict(os.environ, {"VISION_QUALITY_ENGINE": "numpy"}):
+            arrays = [qm.gray_from_bytes(r, w, h) for r, (w, h) in zip(rasters, sizes)]
+        self.assertEqual(arrays[0].dtype, qm._np.float32)
+        got = score_frames(arrays)
+        one_by_one = [score_frame(arrays[0])] + [score_frame(arrays[i], prev=arrays[i - 1]) for i in range(1, len(arrays))]
+        for e, g, o in zip(expect, got, one_by_one):
+            self.assertEqual(list(e), list(g))
+            for k in qm.QUALITY_KEYS:
+                if e[k] is None:
+                    self.assertIsNone(g[k])
+                    self.assertIsNone(o[k])
+                    continue
+                self.assertLessEqual(abs(e[k] - g[k]), _TOLERANCE, k)
+                self.assertLessEqual(abs(e[k] - o[k]), _TOLERANCE, k)
+
+    def test_batch_prev_and_mixed_inputs(self) -> None:
+        a, b = _checker(), _blocky()
+        arr_b = qm._np.asarray(b, dtype=qm._np.float32)
+        # A list frame before an ndarray batch still feeds convergence.
+        rows = score_frames([a, arr_b, arr_b])
+        self.assertIsNone(rows[0]["convergence"])
+        self.assertAlmostEqual(rows[1]["convergence"], score_frame(b, prev=a)["convergence"], delta=_TOLERANCE)
+        self.assertEqual(rows[2]["convergence"], 1.0)
+        self.assertEqual(score_frames([arr_b], prev=arr_b)[0]["convergence"], 1.0)
+
+
 if __name__ == "__main__":
     unittest.main()
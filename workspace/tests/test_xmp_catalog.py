@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Tests for the XMP sidecar catalog in ratings.sqlite."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import support  # noqa: F401
+
+_XMP = '<x:xmpmeta><rdf:RDF><rdf:Description xmp:Rating="{r}"/></rdf:RDF></x:xmpmeta>'
+_XMP_UNRATED = "<x:xmpmeta><rdf:RDF><rdf:Description/></rdf:RDF></x:xmpmeta>"
+
+
+def _walk(og: Path, name_glob: str, *, days: int = 0, rated_only: bool = False) -> list:
+    from xmp_catalog import scan_xmps
+
+    cut = time.time() - days * 86400 if days else None
+    return [
+        e
+        for e in scan_xmps(og, name_glob=name_glob)
+        if not (cut and e.mtime < cut) and not (rated_only and e.rating is None)
+    ]
+
+
+class XmpCatalogTests(unittest.TestCase):
+    def _tree(self, td: str) -> Path:
+        og = Path(td).resolve() / "output" / "og"
+        old = time.time() - 20 * 86400
+        for i, (day, stem, body) in enumerate(
+            (
+                ("2026-04-01", "X-Kneel_00001", _XMP.format(r=5)),
+                ("2026-04-01", "X-Kneel_00002", _XMP_UNRATED),
+                ("2026-04-01", "Other_00001", _XMP.format(r=2)),
+                ("2026-04-01.b", "X-Kneel_00003", _XMP.format(r=3)),
+                ("2026-04-02", "X-Kneel_00004", _XMP.format(r=1)),
+            )
+        ):
+            d = og / day
+            d.mkdir(parents=True, exist_ok=True)
+            p = d / f"{stem}.XMP"
+            p.write_text(body, encoding="utf-8")
+            if i % 2 == 0:
+                os.utime(p, (old, old))
+        return og
+
+    def test_catalog_matches_walk_after_sync(self) -> None:
+        from xmp_catalog import list_xmps, open_xmp_catalog, scan_xmps
+
+        with tempfile.TemporaryDirectory() as td:
+            og = self._tree(td)
+            entries, source = list_xmps(og)
+            self.assertEqual(source, "scan")  # no store yet
+
+            con = open_xmp_catalog(og, create=True)
+            scan_xmps(og, con=con)
+            con.close()
+            for name_glob in ("*.XMP", "X-Kneel*.XMP"):
+                for days in (0, 7):
+                    for rated_only in (False, True):
+                        got, source = list_xmps(og, name_glob=name_glob, days=days, rated_only=rated_only)
+                        self.assertEqual(source, "catalog")
+                        self.assertEqual(got, _walk(og, name_glob, days=days, rated_only=rated_only))
+            # Walk order is sorted(Path): "2026-04-01/…" before "2026-04-01.b/…".
+            self.assertEqual([e.path.stem for e in entries], [e.path.stem for e in list_xmps(og)[0]])
+
+            with mock.patch.dict(os.environ, {"XMP_CATALOG": "off"}):
+                self.assertEqual(list_xmps(og)[1], "scan")
+
+    def test_star_writes_update_catalog_and_rescan_prunes(self) -> None:
+        from shape_factory_ratings import _clear_xmp_rating, _write_xmp_rating
+        from xmp_catalog import list_xmps, open_xmp_catalog, scan_xmps
+
+        with tempfile.TemporaryDirectory() as td:
+            og = self._tree(td)
+            con = open_xmp_catalog(og, create=True)
+            scan_xmps(og, con=con)
+            con.close()
+
+            fresh = og / "2026-04-03" / "X-Kneel_00009.mp4"
+            fresh.parent.mkdir()
+            fresh.write_bytes(b"")
+            _write_xmp_rating(fresh, 4, og_root=og)
+            _clear_xmp_rating(og / "2026-04-01" / "X-Kneel_00001.mp4", og_root=og)
+            got, source = list_xmps(og, rated_only=True)
+            self.assertEqual(source, "catalog")
+            self.assertEqual(got, _walk(og, "*.XMP", rated_only=True))
+            self.assertIn(("X-Kneel_00009", 4), [(e.path.stem, e.rating) for e in got])
+
+            (og / "2026-04-02" / "X-Kneel_00004.XMP").unlink()
+            self.assertEqual(len(list_xmps(og)[0]), 6)  # catalog still lists it
+            rescanned, source = list_xmps(og, scan=True)
+            self.assertEqual(source, "scan")
+            self.assertEqual(list_xmps(og)[0], rescanned)
+            self.assertNotIn("X-Kneel_00004", [e.path.stem for e in rescanned])
+
+
+if __name__ == "__main__":
+    unittest.main()